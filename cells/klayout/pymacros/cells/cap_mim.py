@@ -18,7 +18,9 @@
 
 import pya
 import os
-from .draw_cap_mim import draw_cap_mim
+from .lazy_draw import lazy_draw
+
+draw_cap_mim = lazy_draw("draw_cap_mim", "draw_cap_mim")
 
 mim_min_l = 5
 mim_min_w = 5
@@ -118,4 +120,4 @@ class cap_mim(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
@@ -17,7 +17,9 @@
 ########################################################################################################################
 
 import pya
-from .draw_cap_mos import draw_cap_mos
+from .lazy_draw import lazy_draw
+
+draw_cap_mos = lazy_draw("draw_cap_mos", "draw_cap_mos")
 
 cap_nmos_w = 1
 cap_nmos_l = 1
@@ -116,7 +118,7 @@ class cap_nmos(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class cap_pmos(pya.PCellDeclarationHelper):
@@ -201,7 +203,7 @@ class cap_pmos(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class cap_nmos_b(pya.PCellDeclarationHelper):
@@ -284,7 +286,7 @@ class cap_nmos_b(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class cap_pmos_b(pya.PCellDeclarationHelper):
@@ -367,4 +369,4 @@ class cap_pmos_b(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
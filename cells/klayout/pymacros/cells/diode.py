@@ -17,14 +17,14 @@
 ########################################################################################################################
 
 import pya
-from .draw_diode import (
-    draw_diode_dw2ps,
-    draw_diode_nd2ps,
-    draw_diode_nw2ps,
-    draw_diode_pd2nw,
-    draw_diode_pw2dw,
-    draw_sc_diode,
-)
+from .lazy_draw import lazy_draw
+
+draw_diode_dw2ps = lazy_draw("draw_diode", "draw_diode_dw2ps")
+draw_diode_nd2ps = lazy_draw("draw_diode", "draw_diode_nd2ps")
+draw_diode_nw2ps = lazy_draw("draw_diode", "draw_diode_nw2ps")
+draw_diode_pd2nw = lazy_draw("draw_diode", "draw_diode_pd2nw")
+draw_diode_pw2dw = lazy_draw("draw_diode", "draw_diode_pw2dw")
+draw_sc_diode = lazy_draw("draw_diode", "draw_sc_diode")
 
 np_l = 0.36
 np_w = 0.36
@@ -139,7 +139,7 @@ class diode_nd2ps(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class diode_pd2nw(pya.PCellDeclarationHelper):
@@ -229,7 +229,7 @@ class diode_pd2nw(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class diode_nw2ps(pya.PCellDeclarationHelper):
@@ -315,7 +315,7 @@ class diode_nw2ps(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class diode_pw2dw(pya.PCellDeclarationHelper):
@@ -405,7 +405,7 @@ class diode_pw2dw(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class diode_dw2ps(pya.PCellDeclarationHelper):
@@ -492,7 +492,7 @@ class diode_dw2ps(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class sc_diode(pya.PCellDeclarationHelper):
@@ -575,4 +575,4 @@ class sc_diode(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
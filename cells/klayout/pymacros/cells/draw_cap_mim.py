@@ -2,9 +2,11 @@ import gdsfactory as gf
 
 from .via_generator import via_generator, via_stack
 from .layers_def import layer
-import os
+from .layout_bridge import component_to_cell
+from .pcell_cache import cached_pcell
 
 
+@cached_pcell
 def draw_cap_mim(
     layout,
     mim_option: str = "A",
@@ -137,8 +139,4 @@ def draw_cap_mim(
     )
     c.add_ref(via)
 
-    c.write_gds("mim_cap_temp.gds")
-    layout.read("mim_cap_temp.gds")
-    os.remove("mim_cap_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
@@ -21,9 +21,10 @@ from gdsfactory.typings import Float2, LayerSpec
 
 from .via_generator import via_generator, via_stack
 from .layers_def import layer
+from .layout_bridge import component_to_cell
+from .pcell_cache import cached_pcell
 
 import numpy as np
-import os
 
 
 @gf.cell
@@ -152,6 +153,7 @@ def cap_mos_inst(
     return c_inst
 
 
+@cached_pcell
 def draw_cap_mos(
     layout,
     type: str = "cap_nmos",
@@ -521,8 +523,4 @@ def draw_cap_mos(
             )
         )  # guardring metal1
 
-    c.write_gds("cap_mos_temp.gds")
-    layout.read("cap_mos_temp.gds")
-    os.remove("cap_mos_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
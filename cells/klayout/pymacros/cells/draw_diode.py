@@ -18,13 +18,15 @@
 
 import gdsfactory as gf
 from .layers_def import layer
+from .layout_bridge import component_to_cell
+from .pcell_cache import cached_pcell
 from gdsfactory.typings import Float2
 from .via_generator import via_generator, via_stack
 
 import numpy as np
-import os
 
 
+@cached_pcell
 def draw_diode_nd2ps(
     layout,
     la: float = 0.1,
@@ -361,13 +363,10 @@ def draw_diode_nd2ps(
 
     # creating layout and cell in klayout
 
-    c.write_gds("diode_nd2ps_temp.gds")
-    layout.read("diode_nd2ps_temp.gds")
-    os.remove("diode_nd2ps_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
 
 
+@cached_pcell
 def draw_diode_pd2nw(
     layout,
     la: float = 0.1,
@@ -694,13 +693,10 @@ def draw_diode_pd2nw(
 
     # creating layout and cell in klayout
 
-    c.write_gds("diode_pd2nw_temp.gds")
-    layout.read("diode_pd2nw_temp.gds")
-    os.remove("diode_pd2nw_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
 
 
+@cached_pcell
 def draw_diode_nw2ps(
     layout,
     la: float = 0.1,
@@ -834,13 +830,10 @@ def draw_diode_nw2ps(
 
     # creating layout and cell in klayout
 
-    c.write_gds("diode_nw2ps_temp.gds")
-    layout.read("diode_nw2ps_temp.gds")
-    os.remove("diode_nw2ps_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
 
 
+@cached_pcell
 def draw_diode_pw2dw(
     layout,
     la: float = 0.1,
@@ -1270,13 +1263,10 @@ def draw_diode_pw2dw(
 
     # creating layout and cell in klayout
 
-    c.write_gds("diode_pw2dw_temp.gds")
-    layout.read("diode_pw2dw_temp.gds")
-    os.remove("diode_pw2dw_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
 
 
+@cached_pcell
 def draw_diode_dw2ps(
     layout,
     la: float = 0.1,
@@ -1671,13 +1661,10 @@ def draw_diode_dw2ps(
 
     # creating layout and cell in klayout
 
-    c.write_gds("diode_dw2ps_temp.gds")
-    layout.read("diode_dw2ps_temp.gds")
-    os.remove("diode_dw2ps_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
 
 
+@cached_pcell
 def draw_sc_diode(
     layout,
     la: float = 0.1,
@@ -2066,8 +2053,4 @@ def draw_sc_diode(
 
     # creating layout and cell in klayout
 
-    c.write_gds("sc_diode_temp.gds")
-    layout.read("sc_diode_temp.gds")
-    os.remove("sc_diode_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
@@ -19,11 +19,12 @@
 from math import ceil, floor
 import numpy as np
 
-import gdsfactory as gf
+from .geometry_backend import gf, selectable_backend
 from gdsfactory.typings import Float2, LayerSpec
 from .via_generator import via_generator, via_stack
 from .layers_def import layer
-import os
+from .layout_bridge import component_to_cell
+from .pcell_cache import cached_pcell
 
 
 @gf.cell
@@ -1208,6 +1209,8 @@ def bulk_m1_check(bulk_con_area, m1_area, c_inst, bulk_con):
         bulk_m1.ymin = bulk_con.ymin - (bulk_m1.size[1] - bulk_con.size[1]) / 2
 
 
+@selectable_backend
+@cached_pcell
 def draw_nfet(
     layout,
     l_gate: float = 0.28,
@@ -1708,11 +1711,7 @@ def draw_nfet(
         )
 
     # creating layout and cell in klayout
-    c.write_gds("nfet_temp.gds")
-    layout.read("nfet_temp.gds")
-    os.remove("nfet_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
 
 
 @gf.cell
@@ -1819,6 +1818,8 @@ def pfet_deep_nwell(
     return c
 
 
+@selectable_backend
+@cached_pcell
 def draw_pfet(
     layout,
     l_gate: float = 0.28,
@@ -2337,13 +2338,11 @@ def draw_pfet(
 
     # creating layout and cell in klayout
 
-    c.write_gds("pfet_temp.gds")
-    layout.read("pfet_temp.gds")
-    os.remove("pfet_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
 
 
+@selectable_backend
+@cached_pcell
 def draw_nfet_06v0_nvt(
     layout,
     l_gate: float = 1.8,
@@ -2968,8 +2967,4 @@ def draw_nfet_06v0_nvt(
 
     # creating layout and cell in klayout
 
-    c.write_gds("nfet_nvt_temp.gds")
-    layout.read("nfet_nvt_temp.gds")
-    os.remove("nfet_nvt_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
@@ -19,10 +19,12 @@
 import gdsfactory as gf
 from gdsfactory.typings import LayerSpec, Float2
 from .layers_def import layer
+from .layout_bridge import component_to_cell
+from .pcell_cache import cached_pcell
 from .via_generator import via_generator, via_stack
-import os
 
 
+@cached_pcell
 def draw_metal_res(
     layout,
     l_res: float = 0.1,
@@ -106,11 +108,7 @@ def draw_metal_res(
 
     # creating layout and cell in klayout
 
-    c.write_gds("res_temp.gds")
-    layout.read("res_temp.gds")
-    os.remove("res_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
 
 
 @gf.cell
@@ -401,6 +399,7 @@ def plus_res_inst(
     return c
 
 
+@cached_pcell
 def draw_nplus_res(
     layout,
     l_res: float = 0.1,
@@ -474,13 +473,10 @@ def draw_nplus_res(
         if pcmpgr == 1:
             c.add_ref(pcmpgr_gen(dn_rect=dn_rect, grw=sub_w))
 
-    c.write_gds("res_temp.gds")
-    layout.read("res_temp.gds")
-    os.remove("res_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
 
 
+@cached_pcell
 def draw_pplus_res(
     layout,
     l_res: float = 0.1,
@@ -558,11 +554,7 @@ def draw_pplus_res(
         nw_rect.xmin = r_inst.xmin - nw_enc_pcmp
         nw_rect.ymin = r_inst.ymin - nw_enc_pcmp
 
-    c.write_gds("res_temp.gds")
-    layout.read("res_temp.gds")
-    os.remove("res_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
 
 
 @gf.cell
@@ -703,6 +695,7 @@ def polyf_res_inst(
     return c
 
 
+@cached_pcell
 def draw_npolyf_res(
     layout,
     l_res: float = 0.1,
@@ -766,13 +759,10 @@ def draw_npolyf_res(
         if pcmpgr == 1:
             c.add_ref(pcmpgr_gen(dn_rect=dn_rect, grw=sub_w))
 
-    c.write_gds("res_temp.gds")
-    layout.read("res_temp.gds")
-    os.remove("res_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
 
 
+@cached_pcell
 def draw_ppolyf_res(
     layout,
     l_res: float = 0.1,
@@ -841,13 +831,10 @@ def draw_ppolyf_res(
         if pcmpgr == 1:
             c.add_ref(pcmpgr_gen(dn_rect=dn_rect, grw=sub_w))
 
-    c.write_gds("res_temp.gds")
-    layout.read("res_temp.gds")
-    os.remove("res_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
 
 
+@cached_pcell
 def draw_ppolyf_u_high_Rs_res(
     layout,
     l_res: float = 0.42,
@@ -1054,13 +1041,10 @@ def draw_ppolyf_u_high_Rs_res(
             dg.xmin = resis_mk.xmin
             dg.ymin = resis_mk.ymin
 
-    c.write_gds("res_temp.gds")
-    layout.read("res_temp.gds")
-    os.remove("res_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
 
 
+@cached_pcell
 def draw_well_res(
     layout,
     l_res: float = 0.42,
@@ -1230,8 +1214,4 @@ def draw_well_res(
             layer=layer["metal1_label"],
         )
 
-    c.write_gds("res_temp.gds")
-    layout.read("res_temp.gds")
-    os.remove("res_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
@@ -16,7 +16,11 @@
 # FET Generator for GF180MCU
 ########################################################################################################################
 import pya
-from .draw_fet import draw_nfet, draw_nfet_06v0_nvt, draw_pfet
+from .lazy_draw import lazy_draw
+
+draw_nfet = lazy_draw("draw_fet", "draw_nfet")
+draw_nfet_06v0_nvt = lazy_draw("draw_fet", "draw_nfet_06v0_nvt")
+draw_pfet = lazy_draw("draw_fet", "draw_pfet")
 
 fet_3p3_l = float(0.28)
 fet_3p3_w = float(0.22)
@@ -195,7 +199,7 @@ class nfet(pya.PCellDeclarationHelper):
             1,
         )
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class pfet(pya.PCellDeclarationHelper):
@@ -352,7 +356,7 @@ class pfet(pya.PCellDeclarationHelper):
             1,
         )
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class nfet_06v0_nvt(pya.PCellDeclarationHelper):
@@ -487,4 +491,4 @@ class nfet_06v0_nvt(pya.PCellDeclarationHelper):
             1,
         )
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
@@ -0,0 +1,130 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+########################################################################################################################
+## Geometry backend selection of GF180MCU Pcells generators
+########################################################################################################################
+
+"""
+FET and via generators draw through `gf` of this module instead of gdsfactory.
+
+`gf` forwards to the geometry backend of the running generator: gdsfactory,
+or the native Klayout shapes of `native_geometry`. Both backends run the same
+generator code, so they use the same rules constants. Generators decorated
+with `selectable_backend` get a `backend` parameter, its default is given by
+`use_backend()` or the GF180_FET_BACKEND environment variable.
+"""
+
+import contextlib
+import contextvars
+import functools
+import inspect
+import os
+
+import gdsfactory
+
+from . import native_geometry
+
+## Geometry backends by name
+BACKENDS = {"gdsfactory": gdsfactory, "klayout": native_geometry}
+## Backend of selectable generators when no backend is given
+DEFAULT_BACKEND = os.environ.get("GF180_FET_BACKEND", "gdsfactory")
+
+## Backend used by `gf` [generators that aren't selectable always run with gdsfactory]
+_ACTIVE = contextvars.ContextVar("gf180_geometry_backend", default="gdsfactory")
+## Backend of selectable generators called without backend
+_SELECTED = contextvars.ContextVar("gf180_selected_backend", default=DEFAULT_BACKEND)
+
+
+def active_backend() -> str:
+    """Returns name of the backend used by `gf` in the running generator"""
+
+    return _ACTIVE.get()
+
+
+@contextlib.contextmanager
+def use_backend(backend: str):
+    """Selects backend of generators called without backend in this context
+
+    Args:
+        backend : backend name [gdsfactory, klayout]
+    """
+
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown geometry backend {backend}, allowed backends: {', '.join(BACKENDS)}"
+        )
+
+    token = _SELECTED.set(backend)
+    try:
+        yield
+    finally:
+        _SELECTED.reset(token)
+
+
+class _BackendNamespace:
+    """gdsfactory namespace of the active backend [Component, components, geometry, cell]"""
+
+    def __getattr__(self, name):
+        return getattr(BACKENDS[_ACTIVE.get()], name)
+
+    def cell(self, func):
+        """Cell decorator of the active backend, chosen on every call"""
+
+        gf_cell = gdsfactory.cell(func)
+        native_cell = native_geometry.cell(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _ACTIVE.get() == "gdsfactory":
+                return gf_cell(*args, **kwargs)
+            return native_cell(*args, **kwargs)
+
+        return wrapper
+
+
+gf = _BackendNamespace()
+
+
+def selectable_backend(draw_func):
+    """Adds a `backend` parameter to a generator drawing through `gf`
+
+    Args:
+        draw_func : generator drawing a Pcell in layout
+    """
+
+    signature = inspect.signature(draw_func)
+    backend_param = inspect.Parameter(
+        "backend", inspect.Parameter.KEYWORD_ONLY, default=None
+    )
+
+    @functools.wraps(draw_func)
+    def wrapper(*args, backend: str = None, **kwargs):
+        backend = backend or _SELECTED.get()
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown geometry backend {backend}, allowed backends: {', '.join(BACKENDS)}"
+            )
+
+        token = _ACTIVE.set(backend)
+        try:
+            with native_geometry.cell_cache():
+                return draw_func(*args, **kwargs)
+        finally:
+            _ACTIVE.reset(token)
+
+    wrapper.__signature__ = signature.replace(
+        parameters=list(signature.parameters.values()) + [backend_param]
+    )
+    return wrapper
@@ -0,0 +1,302 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+########################################################################################################################
+## gdsfactory to Klayout bridge of GF180MCU Pcells
+########################################################################################################################
+
+import numpy as np
+import pya
+
+from .layers_def import layer
+from .native_geometry import Component as NativeComponent
+
+## Cut layers, their single shape cells are kept as cell instances
+VIA_LAYERS = {
+    layer[name] for name in ("contact", "via1", "via2", "via3", "via4", "via5")
+}
+
+
+def polygon_shape(points, dbu: float):
+    """Returns klayout shape of polygon points given in um
+
+    Rectangles are returned as boxes, same as what the GDS reader gives.
+
+    Args:
+        points : (N, 2) array of polygon points in um
+        dbu : database unit of the target layout
+    """
+
+    pts = np.round(np.asarray(points) / dbu).astype(np.int64)
+    xs = np.unique(pts[:, 0])
+    ys = np.unique(pts[:, 1])
+
+    if len(pts) == 4 and len(xs) == 2 and len(ys) == 2:
+        return pya.Box(int(xs[0]), int(ys[0]), int(xs[1]), int(ys[1]))
+
+    return pya.Polygon([pya.Point(int(x), int(y)) for x, y in pts])
+
+
+def via_cell(layout, lay, box):
+    """Returns the cell of layout holding a single via box, created once per layout
+
+    Args:
+        layout : layout object the cell is looked up in
+        lay : (layer, datatype) of the via
+        box : via box in dbu
+    """
+
+    name = f"via_{lay[0]}_{lay[1]}_{box.left}_{box.bottom}_{box.right}_{box.top}"
+    cell = layout.cell(name)
+    if cell is None:
+        cell = layout.create_cell(name)
+        cell.shapes(layout.layer(*lay)).insert(box)
+    return cell
+
+
+def copy_cell(layout, source):
+    """Returns a new cell of layout holding a copy of a generated cell
+
+    Generated cells only instantiate via cells, these instances point to the
+    via cells of the same name in layout, so copies share them.
+
+    Args:
+        layout : layout object the cell is created in
+        source : generated cell, from any layout of the same database unit
+    """
+
+    cell = layout.create_cell(source.name)
+    cell.copy_shapes(source)
+
+    src_layout = source.layout()
+    for inst in source.each_inst():
+        child = src_layout.cell(inst.cell_index)
+        target = layout.cell(child.name)
+        if target is None:
+            target = layout.create_cell(child.name)
+            target.copy_shapes(child)
+
+        cell_inst = inst.cell_inst.dup()
+        cell_inst.cell_index = target.cell_index()
+        cell.insert(cell_inst)
+
+    return cell
+
+
+def _insert_via_ref(cell, via, trans, ref_trans, columns: int, rows: int, spacing):
+    """Inserts a reference [or array] of a via cell
+
+    Args:
+        cell : cell the instance is inserted in
+        via : via cell
+        trans : transformation of the reference owner, array spacing is given in its coordinates
+        ref_trans : transformation of the reference in cell coordinates
+        columns : number of columns of the array
+        rows : number of rows of the array
+        spacing : (x, y) spacing of the array in um
+    """
+
+    if columns * rows == 1:
+        cell.insert(pya.DCellInstArray(via.cell_index(), ref_trans))
+        return
+
+    cell.insert(
+        pya.DCellInstArray(
+            via.cell_index(),
+            ref_trans,
+            trans * pya.DVector(spacing[0], 0),
+            trans * pya.DVector(0, spacing[1]),
+            columns,
+            rows,
+        )
+    )
+
+
+def _gf_via_box(c, dbu: float):
+    """Returns (layer, box) of a gdsfactory component holding a single via box,
+    False if it has no via, None otherwise
+
+    Args:
+        c : gdsfactory component
+        dbu : database unit of the target layout
+    """
+
+    polys = {tuple(k): v for k, v in c.get_polygons(by_spec=True).items()}
+    if not VIA_LAYERS.intersection(polys):
+        return False
+    if len(polys) != 1 or c.get_labels():
+        return None
+
+    ((lay, points),) = polys.items()
+    if len(points) != 1:
+        return None
+
+    shape = polygon_shape(points[0], dbu)
+    return (lay, shape) if isinstance(shape, pya.Box) else None
+
+
+def _copy_gf_vias(layout, cell, c, trans, via_boxes: dict):
+    """Copies via layers polygons of a gdsfactory component, via cells references are kept as instances
+
+    Args:
+        layout : layout object of cell
+        cell : cell the polygons are copied to
+        c : gdsfactory component
+        trans : transformation of the component in cell [um]
+        via_boxes : `_gf_via_box` of components already seen
+    """
+
+    dbu = layout.dbu
+
+    for lay, polys in c.get_polygons(by_spec=True, depth=0).items():
+        if tuple(lay) not in VIA_LAYERS:
+            continue
+        shapes = cell.shapes(layout.layer(*lay))
+        for points in polys:
+            points = [trans * pya.DPoint(x, y) for x, y in points]
+            shapes.insert(polygon_shape([(p.x, p.y) for p in points], dbu))
+
+    for ref in c.references:
+        child = ref.parent
+        if id(child) not in via_boxes:
+            via_boxes[id(child)] = _gf_via_box(child, dbu)
+
+        via_box = via_boxes[id(child)]
+        if via_box is False:
+            continue
+
+        local = pya.DCplxTrans(
+            ref.magnification,
+            ref.rotation,
+            ref.x_reflection,
+            pya.DVector(*ref.origin),
+        )
+        spacing = ref.spacing if ref.spacing is not None else (0, 0)
+
+        if via_box is not None:
+            via = via_cell(layout, *via_box)
+            _insert_via_ref(
+                cell, via, trans, trans * local, ref.columns, ref.rows, spacing
+            )
+            continue
+
+        # Array offsets are added after the reference transformation
+        for i in range(ref.columns):
+            for j in range(ref.rows):
+                offset = pya.DCplxTrans(pya.DVector(i * spacing[0], j * spacing[1]))
+                _copy_gf_vias(layout, cell, child, trans * offset * local, via_boxes)
+
+
+def _native_via_box(c, dbu: float):
+    """Returns (layer, box) of a native component holding a single via box, None otherwise"""
+
+    if len(c.shapes) != 1 or c.references or c.labels:
+        return None
+
+    lay, shape = c.shapes[0]
+    if lay not in VIA_LAYERS or not isinstance(shape, pya.DBox):
+        return None
+
+    return lay, shape.to_itype(dbu)
+
+
+def _copy_native(layout, cell, c, dx: float, dy: float, via_boxes: dict):
+    """Copies shapes and labels of a native component moved by (dx, dy), via cells references are kept as instances"""
+
+    dbu = layout.dbu
+    disp = pya.DVector(dx, dy)
+
+    for lay, shape in c.shapes:
+        cell.shapes(layout.layer(*lay)).insert(shape.moved(disp).to_itype(dbu))
+
+    for text, (x, y), lay in c.labels:
+        cell.shapes(layout.layer(*lay)).insert(
+            pya.Text(
+                text, pya.Trans(pya.Point(round((x + dx) / dbu), round((y + dy) / dbu)))
+            )
+        )
+
+    for ref in c.references:
+        child = ref.parent
+        if id(child) not in via_boxes:
+            via_boxes[id(child)] = _native_via_box(child, dbu)
+
+        ox, oy = ref.origin[0] + dx, ref.origin[1] + dy
+
+        if via_boxes[id(child)] is not None:
+            via = via_cell(layout, *via_boxes[id(child)])
+            ref_trans = pya.DCplxTrans(pya.DVector(ox, oy))
+            _insert_via_ref(
+                cell,
+                via,
+                pya.DCplxTrans(),
+                ref_trans,
+                ref.columns,
+                ref.rows,
+                ref.spacing,
+            )
+            continue
+
+        for i in range(ref.columns):
+            for j in range(ref.rows):
+                _copy_native(
+                    layout,
+                    cell,
+                    child,
+                    ox + i * ref.spacing[0],
+                    oy + j * ref.spacing[1],
+                    via_boxes,
+                )
+
+
+def component_to_cell(layout, c):
+    """Returns a new klayout cell holding the geometry of gdsfactory component
+
+    Polygons and labels of all levels of the component are copied in memory
+    to the layout, instead of writing the component to a GDS file and reading
+    it back. References to single via cells [contact and via arrays] are
+    written as instances of one via cell per layout, other references are
+    flattened. Pcells flatten one level of the returned cell into their own
+    cell, so via arrays are kept as cell arrays in Pcells. Components of the
+    native backend are written the same way.
+
+    Args:
+        layout : layout object the cell is created in
+        c : gdsfactory component
+    """
+
+    cell = layout.create_cell(c.name)
+
+    if isinstance(c, NativeComponent):
+        _copy_native(layout, cell, c, 0.0, 0.0, {})
+        return cell
+
+    dbu = layout.dbu
+
+    for (lay, datatype), polys in c.get_polygons(by_spec=True).items():
+        if (lay, datatype) in VIA_LAYERS:
+            continue
+        shapes = cell.shapes(layout.layer(lay, datatype))
+        for points in polys:
+            shapes.insert(polygon_shape(points, dbu))
+
+    _copy_gf_vias(layout, cell, c, pya.DCplxTrans(), {})
+
+    for label in c.get_labels():
+        x, y = np.round(np.asarray(label.origin) / dbu).astype(np.int64)
+        cell.shapes(layout.layer(label.layer, label.texttype)).insert(
+            pya.Text(label.text, pya.Trans(pya.Point(int(x), int(y))))
+        )
+
+    return cell
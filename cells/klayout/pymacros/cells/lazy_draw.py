@@ -0,0 +1,43 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+########################################################################################################################
+## Deferred draw functions of GF180MCU Pcells
+########################################################################################################################
+
+"""
+Pcells declarations only need their draw functions in `produce_impl`.
+
+Draw modules import gdsfactory, which makes registering the library at
+Klayout startup slow. Declarations call draw functions through `lazy_draw`,
+which imports the draw module on the first Pcell produced.
+"""
+
+import importlib
+
+
+def lazy_draw(module: str, name: str):
+    """Returns function calling draw function of a module of this package, the module is imported on first call
+
+    Args:
+        module : draw module name, e.g. "draw_fet"
+        name : draw function name, e.g. "draw_nfet"
+    """
+
+    def draw(*args, **kwargs):
+        func = getattr(importlib.import_module(f".{module}", __package__), name)
+        return func(*args, **kwargs)
+
+    draw.__name__ = draw.__qualname__ = name
+    return draw
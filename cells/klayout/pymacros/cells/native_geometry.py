@@ -0,0 +1,425 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+########################################################################################################################
+## Native Klayout geometry backend of GF180MCU Pcells generators
+########################################################################################################################
+
+"""
+Subset of the gdsfactory API used by the FET and via generators, drawn with Klayout shapes.
+
+Components hold `pya.DBox`/`pya.DPolygon` shapes in um and references to
+other components. Bounding boxes are cached and invalidated up the
+hierarchy when a component or a reference changes. Components are written
+to a layout by `layout_bridge.component_to_cell`, same as gdsfactory ones.
+
+As gdsfactory names cells from their arguments, cells called again with
+the same arguments in a `cell_cache` context return the same component.
+"""
+
+import contextlib
+import contextvars
+import functools
+import inspect
+from types import SimpleNamespace
+
+import numpy as np
+import pya
+
+## Database unit of booleans [um], same precision as gdsfactory booleans
+DBU = 1e-4
+## Float arguments of cells are compared with this number of digits, as gdsfactory cell names
+CELL_DIGITS = 3
+
+## Components drawn by cells of the running generator
+_CELLS = contextvars.ContextVar("gf180_native_cells", default=None)
+
+
+class Port:
+    """Electrical port of a rectangle, used to abut rectangles"""
+
+    def __init__(self, name: str, center, orientation: float):
+        self.name = name
+        self.center = center
+        self.orientation = orientation
+
+    def moved(self, dx: float, dy: float):
+        return Port(
+            self.name, (self.center[0] + dx, self.center[1] + dy), self.orientation
+        )
+
+
+class _Geometry:
+    """Bounding box helpers shared by components and references, as in gdsfactory"""
+
+    @property
+    def xmin(self):
+        return self.bbox[0][0]
+
+    @xmin.setter
+    def xmin(self, value):
+        self.move((value - self.xmin, 0))
+
+    @property
+    def ymin(self):
+        return self.bbox[0][1]
+
+    @ymin.setter
+    def ymin(self, value):
+        self.move((0, value - self.ymin))
+
+    @property
+    def xmax(self):
+        return self.bbox[1][0]
+
+    @xmax.setter
+    def xmax(self, value):
+        self.move((value - self.xmax, 0))
+
+    @property
+    def ymax(self):
+        return self.bbox[1][1]
+
+    @ymax.setter
+    def ymax(self, value):
+        self.move((0, value - self.ymax))
+
+    @property
+    def size(self):
+        (x0, y0), (x1, y1) = self.bbox
+        return (x1 - x0, y1 - y0)
+
+    @property
+    def center(self):
+        (x0, y0), (x1, y1) = self.bbox
+        return ((x0 + x1) / 2, (y0 + y1) / 2)
+
+    @center.setter
+    def center(self, value):
+        cx, cy = self.center
+        self.move((value[0] - cx, value[1] - cy))
+
+    @property
+    def x(self):
+        return self.center[0]
+
+    @property
+    def y(self):
+        return self.center[1]
+
+    def movex(self, dx: float):
+        return self.move((dx, 0))
+
+    def movey(self, dy: float):
+        return self.move((0, dy))
+
+
+class Component(_Geometry):
+    """Cell of shapes, labels and references to other components"""
+
+    def __init__(self, name: str = "Unnamed"):
+        self.name = name
+        self.shapes = []
+        self.labels = []
+        self.references = []
+        self.ports = {}
+        self._extent_cache = None
+        self._parents = []
+
+    def _changed(self):
+        # Parents extent is only known once the extent of all children is known
+        if self._extent_cache is None:
+            return
+        self._extent_cache = None
+        for parent in self._parents:
+            parent._changed()
+
+    def _extent(self):
+        """Returns (xmin, ymin, xmax, ymax) of all shapes, None for an empty component"""
+
+        if self._extent_cache is None:
+            boxes = [shape.bbox() for _, shape in self.shapes]
+            extent = None
+            if boxes:
+                extent = (
+                    min(b.left for b in boxes),
+                    min(b.bottom for b in boxes),
+                    max(b.right for b in boxes),
+                    max(b.top for b in boxes),
+                )
+            for ref in self.references:
+                ref_extent = ref._extent()
+                if ref_extent is None:
+                    continue
+                if extent is None:
+                    extent = ref_extent
+                else:
+                    extent = (
+                        min(extent[0], ref_extent[0]),
+                        min(extent[1], ref_extent[1]),
+                        max(extent[2], ref_extent[2]),
+                        max(extent[3], ref_extent[3]),
+                    )
+            self._extent_cache = extent if extent is not None else ()
+
+        return self._extent_cache or None
+
+    @property
+    def bbox(self):
+        extent = self._extent() or (0, 0, 0, 0)
+        return ((extent[0], extent[1]), (extent[2], extent[3]))
+
+    def add_shape(self, layer, shape):
+        self.shapes.append((tuple(layer), shape))
+        self._changed()
+
+    def add_polygon(self, points, layer=(1, 0)):
+        self.add_shape(layer, pya.DPolygon([pya.DPoint(x, y) for x, y in points]))
+
+    def add_label(self, text: str = "", position=(0.0, 0.0), layer=(10, 0)):
+        self.labels.append((str(text), (position[0], position[1]), tuple(layer)))
+
+    def add_ref(self, component):
+        return self.add_array(component, columns=1, rows=1, spacing=(0, 0))
+
+    def add_array(self, component, columns: int = 2, rows: int = 2, spacing=(100, 100)):
+        ref = Reference(component, self, int(columns), int(rows), spacing)
+        self.references.append(ref)
+        component._parents.append(self)
+        self._changed()
+        return ref
+
+
+class Reference(_Geometry):
+    """Placement of a component, or a columns x rows array of it"""
+
+    def __init__(
+        self, component, owner, columns: int = 1, rows: int = 1, spacing=(0, 0)
+    ):
+        self.parent = component
+        self.owner = owner
+        self.columns = columns
+        self.rows = rows
+        self.spacing = (spacing[0], spacing[1])
+        self.origin = (0.0, 0.0)
+
+    def _extent(self):
+        extent = self.parent._extent()
+        if extent is None:
+            return None
+
+        ox, oy = self.origin
+        nx = (self.columns - 1) * self.spacing[0]
+        ny = (self.rows - 1) * self.spacing[1]
+        return (
+            extent[0] + ox + min(0, nx),
+            extent[1] + oy + min(0, ny),
+            extent[2] + ox + max(0, nx),
+            extent[3] + oy + max(0, ny),
+        )
+
+    @property
+    def bbox(self):
+        extent = self._extent() or (self.origin[0], self.origin[1]) * 2
+        return ((extent[0], extent[1]), (extent[2], extent[3]))
+
+    @property
+    def ports(self):
+        return {
+            name: port.moved(*self.origin) for name, port in self.parent.ports.items()
+        }
+
+    def move(self, origin=(0, 0), destination=None):
+        """Moves by origin, or from origin to destination, as gdsfactory does"""
+
+        if destination is None:
+            dx, dy = origin
+        else:
+            dx, dy = destination[0] - origin[0], destination[1] - origin[1]
+        self.origin = (self.origin[0] + dx, self.origin[1] + dy)
+        self.owner._changed()
+        return self
+
+    def connect(self, port: str, destination: Port):
+        """Moves the reference so its port abuts destination port, ports have to face each other"""
+
+        src = self.ports[port]
+        if (src.orientation - destination.orientation) % 360 != 180:
+            raise NotImplementedError(
+                "Only ports facing each other are connected, references aren't rotated"
+            )
+
+        return self.move(src.center, destination.center)
+
+
+def _iter_shapes(obj, dx: float = 0.0, dy: float = 0.0):
+    """Yields (layer, shape) of a component, reference or list of them, moved by (dx, dy)"""
+
+    if isinstance(obj, (list, tuple)):
+        for item in obj:
+            yield from _iter_shapes(item, dx, dy)
+
+    elif isinstance(obj, Reference):
+        ox, oy = obj.origin
+        for i in range(obj.columns):
+            for j in range(obj.rows):
+                yield from _iter_shapes(
+                    obj.parent,
+                    dx + ox + i * obj.spacing[0],
+                    dy + oy + j * obj.spacing[1],
+                )
+
+    else:
+        for lay, shape in obj.shapes:
+            yield lay, shape.moved(pya.DVector(dx, dy))
+        for ref in obj.references:
+            yield from _iter_shapes(ref, dx, dy)
+
+
+def _region(obj):
+    region = pya.Region()
+    for _, shape in _iter_shapes(obj):
+        region.insert(shape.to_itype(DBU))
+    return region
+
+
+def _cell_key(value):
+    """Returns hashable key of a cell argument, components are compared by identity"""
+
+    if isinstance(value, (bool, str)) or value is None:
+        return value
+    if isinstance(value, (float, np.floating)):
+        return float(np.round(value, CELL_DIGITS))
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(_cell_key(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _cell_key(v)) for k, v in value.items()))
+    if isinstance(value, Reference):
+        return ("ref", id(value.parent), _cell_key(value.origin))
+    return ("id", id(value))
+
+
+@contextlib.contextmanager
+def cell_cache():
+    """Shares components of cells called with the same arguments in this context"""
+
+    token = _CELLS.set({})
+    try:
+        yield
+    finally:
+        _CELLS.reset(token)
+
+
+def cell(func):
+    """Returns the component drawn by an earlier call with the same arguments in a `cell_cache` context
+
+    Numbers given to int and float arguments are converted, as gdsfactory cells validate them.
+
+    Args:
+        func : function returning a component
+    """
+
+    signature = inspect.signature(func)
+    numbers = {
+        name: param.annotation
+        for name, param in signature.parameters.items()
+        if param.annotation in (int, float)
+    }
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        for name, kind in numbers.items():
+            value = bound.arguments[name]
+            if isinstance(value, (int, float, np.number)) and not isinstance(
+                value, bool
+            ):
+                bound.arguments[name] = kind(value)
+
+        cells = _CELLS.get()
+        if cells is None:
+            return func(*bound.args, **bound.kwargs)
+
+        key = (func.__module__, func.__qualname__, _cell_key(bound.arguments))
+        if key not in cells:
+            # Arguments are kept with the component, so ids in the key aren't reused
+            cells[key] = (func(*bound.args, **bound.kwargs), bound.arguments)
+        return cells[key][0]
+
+    return wrapper
+
+
+@cell
+def rectangle(size=(4.0, 2.0), layer=(1, 0), centered: bool = False, **kwargs):
+    """Returns a rectangle component with ports e1 [west], e2 [north], e3 [east] and e4 [south]
+
+    Args:
+        size : width and height of the rectangle
+        layer : layer of the rectangle
+        centered : True to center the rectangle at (0, 0), its lower left corner is at (0, 0) otherwise
+    """
+
+    w, h = size
+    x0, y0 = (-w / 2, -h / 2) if centered else (0, 0)
+
+    c = Component("rectangle")
+    c.add_shape(layer, pya.DBox(x0, y0, x0 + w, y0 + h))
+    c.ports = {
+        "e1": Port("e1", (x0, y0 + h / 2), 180),
+        "e2": Port("e2", (x0 + w / 2, y0 + h), 90),
+        "e3": Port("e3", (x0 + w, y0 + h / 2), 0),
+        "e4": Port("e4", (x0 + w / 2, y0), 270),
+    }
+    return c
+
+
+@cell
+def boolean(A, B, operation: str, layer=(1, 0), **kwargs):
+    """Returns a component holding a boolean operation of A and B on one layer
+
+    Args:
+        A : component, reference or list of them
+        B : component, reference or list of them
+        operation : one of "A-B" [or "not"], "B-A", "and", "or" and "xor"
+        layer : layer of the result
+    """
+
+    a = _region(A)
+    b = _region(B)
+    op = operation.lower()
+
+    if op in ("a-b", "not"):
+        result = a - b
+    elif op == "b-a":
+        result = b - a
+    elif op == "and":
+        result = a & b
+    elif op == "or":
+        result = a + b
+    elif op == "xor":
+        result = a ^ b
+    else:
+        raise ValueError(f"Boolean operation {operation} is not supported")
+
+    c = Component("boolean")
+    for poly in result.merged().each():
+        c.add_shape(layer, poly.to_dtype(DBU))
+    return c
+
+
+components = SimpleNamespace(rectangle=rectangle)
+geometry = SimpleNamespace(boolean=boolean)
@@ -0,0 +1,172 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+########################################################################################################################
+## Pcells geometry cache for Klayout of GF180MCU
+########################################################################################################################
+
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+
+import pya
+
+from .geometry_backend import active_backend
+from .layout_bridge import copy_cell
+
+## Max number of parameter sets kept by the process-wide cache
+PCELL_CACHE_SIZE = 256
+## Float parameters are compared with this number of digits [um]
+PARAM_DIGITS = 6
+
+
+def normalize_param(value):
+    """Returns hashable value of a Pcell parameter used in cache keys
+
+    Args:
+        value : parameter value [float, int, str, list, ...]
+    """
+
+    if isinstance(value, float):
+        return round(value, PARAM_DIGITS)
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize_param(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, normalize_param(v)) for k, v in value.items()))
+    return value
+
+
+class PCellCache:
+    """
+    LRU cache of generated Pcells geometry
+
+    Each entry is a cell of a private layout holding the shapes of all layers
+    generated for one parameter set, and the instances of its via cells. A hit
+    copies these to the target layout instead of building the gdsfactory
+    component again. Cells are kept in one private layout per database unit,
+    so they are stored and copied back without scaling.
+    """
+
+    def __init__(self, max_size: int = PCELL_CACHE_SIZE):
+        self.max_size = max_size
+        self.layouts = {}
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+
+    def get(self, key, layout):
+        """Returns a new cell of layout holding the cached geometry, None if key isn't cached
+
+        Args:
+            key : normalized parameters tuple
+            layout : layout object the cell is created in
+        """
+
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != layout.dbu:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            dbu, cell_index = entry
+            return copy_cell(layout, self.layouts[dbu].cell(cell_index))
+
+    def put(self, key, cell):
+        """Stores a copy of the generated cell, the least recently used entries are evicted
+
+        Args:
+            key : normalized parameters tuple
+            cell : generated cell
+        """
+
+        with self._lock:
+            if self.max_size <= 0 or key in self.entries:
+                return
+
+            dbu = cell.layout().dbu
+            if dbu not in self.layouts:
+                self.layouts[dbu] = pya.Layout()
+                self.layouts[dbu].dbu = dbu
+
+            entry = copy_cell(self.layouts[dbu], cell)
+            self.entries[key] = (dbu, entry.cell_index())
+
+            while len(self.entries) > self.max_size:
+                _, (dbu, cell_index) = self.entries.popitem(last=False)
+                self.layouts[dbu].cell(cell_index).prune_cell()
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.layouts = {}
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Returns hits, misses and number of cached parameter sets"""
+
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+
+PCELL_CACHE = PCellCache()
+
+
+def cached_pcell(draw_func):
+    """Caches the cells returned by a draw function in PCELL_CACHE
+
+    The key is the function name with all its parameters [defaults included]
+    except the layout, the database unit of the layout and the geometry backend.
+
+    Args:
+        draw_func : function drawing a Pcell in layout, its first parameter is the layout
+    """
+
+    signature = inspect.signature(draw_func)
+
+    @functools.wraps(draw_func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        layout = bound.arguments["layout"]
+
+        params = tuple(
+            (name, normalize_param(value))
+            for name, value in bound.arguments.items()
+            if name != "layout"
+        )
+        key = (
+            draw_func.__module__,
+            draw_func.__name__,
+            layout.dbu,
+            active_backend(),
+            params,
+        )
+
+        try:
+            hash(key)
+        except TypeError:
+            return draw_func(*args, **kwargs)
+
+        cell = PCELL_CACHE.get(key, layout)
+        if cell is None:
+            cell = draw_func(*args, **kwargs)
+            PCELL_CACHE.put(key, cell)
+        return cell
+
+    return wrapper
@@ -18,15 +18,15 @@
 
 import pya
 import os
-from .draw_res import (
-    draw_metal_res,
-    draw_nplus_res,
-    draw_pplus_res,
-    draw_npolyf_res,
-    draw_ppolyf_res,
-    draw_ppolyf_u_high_Rs_res,
-    draw_well_res,
-)
+from .lazy_draw import lazy_draw
+
+draw_metal_res = lazy_draw("draw_res", "draw_metal_res")
+draw_nplus_res = lazy_draw("draw_res", "draw_nplus_res")
+draw_pplus_res = lazy_draw("draw_res", "draw_pplus_res")
+draw_npolyf_res = lazy_draw("draw_res", "draw_npolyf_res")
+draw_ppolyf_res = lazy_draw("draw_res", "draw_ppolyf_res")
+draw_ppolyf_u_high_Rs_res = lazy_draw("draw_res", "draw_ppolyf_u_high_Rs_res")
+draw_well_res = lazy_draw("draw_res", "draw_well_res")
 
 rm1_l = 0.23
 rm1_w = 0.23
@@ -217,7 +217,7 @@ class metal_resistor(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class nplus_s_resistor(pya.PCellDeclarationHelper):
@@ -317,7 +317,7 @@ class nplus_s_resistor(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class pplus_s_resistor(pya.PCellDeclarationHelper):
@@ -415,7 +415,7 @@ class pplus_s_resistor(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class nplus_u_resistor(pya.PCellDeclarationHelper):
@@ -515,7 +515,7 @@ class nplus_u_resistor(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class pplus_u_resistor(pya.PCellDeclarationHelper):
@@ -613,7 +613,7 @@ class pplus_u_resistor(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class nwell_resistor(pya.PCellDeclarationHelper):
@@ -708,7 +708,7 @@ class nwell_resistor(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class pwell_resistor(pya.PCellDeclarationHelper):
@@ -804,7 +804,7 @@ class pwell_resistor(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class npolyf_s_resistor(pya.PCellDeclarationHelper):
@@ -902,7 +902,7 @@ class npolyf_s_resistor(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class ppolyf_s_resistor(pya.PCellDeclarationHelper):
@@ -1000,7 +1000,7 @@ class ppolyf_s_resistor(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class npolyf_u_resistor(pya.PCellDeclarationHelper):
@@ -1098,7 +1098,7 @@ class npolyf_u_resistor(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class ppolyf_u_resistor(pya.PCellDeclarationHelper):
@@ -1196,7 +1196,7 @@ class ppolyf_u_resistor(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
 
 
 class ppolyf_u_high_Rs_resistor(pya.PCellDeclarationHelper):
@@ -1302,4 +1302,4 @@ class ppolyf_u_high_Rs_resistor(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
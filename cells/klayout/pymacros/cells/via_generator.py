@@ -17,10 +17,11 @@
 ########################################################################################################################
 
 from math import ceil, floor
-import gdsfactory as gf
+from .geometry_backend import gf
 from gdsfactory.typings import Float2, LayerSpec
 from .layers_def import layer
-import os
+from .layout_bridge import component_to_cell
+from .pcell_cache import cached_pcell
 
 
 def get_level_num(base_layer, base_layers, metal_level, metal_layers):
@@ -226,6 +227,7 @@ def via_stack(
     return c
 
 
+@cached_pcell
 def draw_via_dev(
     layout,
     x_min: float = 0,
@@ -394,8 +396,4 @@ def draw_via_dev(
         )
         c.add_ref(v5)
 
-    c.write_gds("via_stack_temp.gds")
-    layout.read("via_stack_temp.gds")
-    os.remove("via_stack_temp.gds")
-
-    return layout.cell(c.name)
+    return component_to_cell(layout, c)
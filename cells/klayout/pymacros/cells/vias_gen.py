@@ -17,7 +17,9 @@
 ########################################################################################################################
 
 import pya
-from .via_generator import draw_via_dev
+from .lazy_draw import lazy_draw
+
+draw_via_dev = lazy_draw("via_generator", "draw_via_dev")
 
 via_size = 0.26
 via_enc = 0.07
@@ -116,4 +118,4 @@ class via_dev(pya.PCellDeclarationHelper):
         )
 
         self.cell.insert(write_cells)
-        self.cell.flatten(1)
+        self.cell.flatten(1, True)
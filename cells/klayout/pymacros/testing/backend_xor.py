@@ -0,0 +1,196 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+########################################################################################################################
+## FET geometry backends XOR check for Klayout of GF180MCU
+########################################################################################################################
+
+"""
+Globalfoundries 180u FET geometry backends XOR check.
+
+Draws each FET pattern with the gdsfactory and the klayout geometry backends,
+and checks that both have the same shapes on every layer. Generators place
+some edges on half database units, which each backend rounds to either side,
+so XOR slivers of one database unit are ignored.
+
+Usage:
+    backend_xor.py (--help| -h)
+    backend_xor.py (--device=<device_name>)
+
+Options:
+    --help -h                   Print this help message.
+    --device=<device_name>      Select your device name. Allowed devices are (nfet_03v3, nfet_05v0, nfet_06v0, pfet_03v3, pfet_05v0, pfet_06v0)
+"""
+
+import os
+import sys
+import glob
+import time
+import logging
+from docopt import docopt
+import gdsfactory as gf
+import pandas as pd
+import pya
+
+pcell_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, pcell_path)
+
+from cells.draw_fet import draw_nfet, draw_nfet_06v0_nvt, draw_pfet  # noqa E402
+from cells.pcell_cache import PCELL_CACHE  # noqa E402
+
+FET_GENERATORS = {
+    "nfet": draw_nfet,
+    "pfet": draw_pfet,
+    "nfet_06v0_nvt": draw_nfet_06v0_nvt,
+}
+BACKENDS = ("gdsfactory", "klayout")
+## XOR of both backends is sized down by this value before being checked [dbu]
+XOR_TOLERANCE = 1
+
+
+def fet_params(row) -> dict:
+    """
+    Returns FET generator parameters of a pattern row
+
+    Args :
+        row : pattern row of FET patterns csv file
+    """
+
+    param = dict(
+        l_gate=row["l_gate"],
+        w_gate=row["w_gate"],
+        sd_con_col=int(row["sd_con_col"]),
+        inter_sd_l=row["ld"],
+        nf=int(row["nf"]),
+        bulk=row["bulk"],
+        con_bet_fin=int(row["cont_bet_fin"]),
+        gate_con_pos=row["gate_con_pos"],
+        interdig=int(row["interdig"]),
+        patt="" if pd.isna(row["patt"]) else str(row["patt"]),
+        patt_lbl=int(row["patt_lbl"]),
+        lbl=int(row["lbl"]),
+        g_lbl=str(row["g_lbl"]).split("_"),
+        sd_lbl=str(row["sd_lbl"]).split("_"),
+        sub_lbl=str(row["sub_lbl"]),
+    )
+
+    if row["pcell_name"] != "nfet_06v0_nvt":
+        param["volt"] = row["volt"]
+        param["deepnwell"] = int(row.get("deepnwell", 0))
+        param["pcmpgr"] = int(row.get("pcmpgr", 0))
+
+    return param
+
+
+def backend_xor(pcell_name: str, param: dict):
+    """
+    Returns layers with different shapes between backends, and generation time of each backend
+
+    Args :
+        pcell_name : FET pcell name
+        param : FET generator parameters
+    """
+
+    # gdsfactory cells are shared between patterns, klayout ones only within a generator call
+    gf.clear_cache()
+
+    layout = pya.Layout()
+    layout.dbu = 0.001
+
+    regions = {}
+    run_time = {}
+    for backend in BACKENDS:
+        start = time.perf_counter()
+        cell = FET_GENERATORS[pcell_name](layout, backend=backend, **param)
+        cell.flatten(True)
+        run_time[backend] = time.perf_counter() - start
+
+        regions[backend] = {
+            layout.get_info(lay).to_s(): pya.Region(cell.begin_shapes_rec(lay))
+            for lay in layout.layer_indexes()
+            if not cell.bbox_per_layer(lay).empty()
+        }
+
+    ref, native = (regions[backend] for backend in BACKENDS)
+    diff_layers = []
+    for lay in sorted(set(ref) | set(native)):
+        xor = ref.get(lay, pya.Region()) ^ native.get(lay, pya.Region())
+        if not xor.sized(-XOR_TOLERANCE).is_empty():
+            diff_layers.append(lay)
+
+    return diff_layers, run_time
+
+
+def run_xor(target_device: str) -> int:
+    """
+    Runs XOR check of all FET patterns of the device under test, returns number of failed patterns
+
+    Args :
+        target_device : category of device under test
+    """
+
+    file_path = os.path.dirname(os.path.abspath(__file__))
+    list_patt_files = glob.glob(
+        os.path.join(file_path, "patterns", target_device, "*.csv")
+    )
+
+    failed = 0
+    run_time = dict.fromkeys(BACKENDS, 0.0)
+
+    for p in list_patt_files:
+        df = pd.read_csv(p)
+        df = df[df["pcell_name"].isin(FET_GENERATORS)]
+
+        for _, row in df.iterrows():
+            param = fet_params(row)
+            diff_layers, pattern_time = backend_xor(row["pcell_name"], param)
+
+            for backend in BACKENDS:
+                run_time[backend] += pattern_time[backend]
+
+            if diff_layers:
+                failed += 1
+                logging.error(
+                    f"Backends differ on layers {diff_layers} for {row['pcell_name']} {param}"
+                )
+
+    logging.info(
+        "Generation time: "
+        + ", ".join(f"{backend} {t:.2f} s" for backend, t in run_time.items())
+    )
+    return failed
+
+
+if __name__ == "__main__":
+
+    # logs format
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s | %(levelname)-7s | %(message)s",
+        datefmt="%d-%b-%Y %H:%M:%S",
+    )
+
+    # arguments
+    arguments = docopt(__doc__, version="FET Backends XOR: 0.1")
+    target_device = arguments["--device"]
+
+    # Generated cells are compared, not cached ones
+    PCELL_CACHE.max_size = 0
+
+    failed = run_xor(target_device)
+    if failed:
+        logging.error(f"{failed} patterns differ between geometry backends")
+        sys.exit(1)
+
+    logging.info("Geometry backends are the same for all patterns")
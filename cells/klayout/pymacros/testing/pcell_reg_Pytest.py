@@ -48,6 +48,58 @@ def test_cdl_generation(device):
     assert bool(check_call(call_str, shell=True)) == 0
 
 
+def test_backend_xor(device):
+    """
+    check that both geometry backends of fet generators draw the same shapes
+
+    Args:
+        device : name of the device under test
+    """
+
+    if "fet" not in device:
+        pytest.skip("geometry backends are only selectable for fet devices")
+
+    # xor check command string
+    call_str = f"""
+    python3 backend_xor.py --device={device}
+    """
+
+    # assert whether xor check is passed
+    assert bool(check_call(call_str, shell=True)) == 0
+
+
+def test_lazy_registration():
+    """
+    check that registering the pcells library doesn't import the generators
+    """
+
+    # registration command string
+    call_str = """
+    python3 -c "import sys; sys.path.insert(0, '..'); from cells import gf180mcu; gf180mcu(); sys.exit('gdsfactory' in sys.modules)"
+    """
+
+    # assert whether registration is lazy
+    assert bool(check_call(call_str, shell=True)) == 0
+
+
+def test_cache_dbu():
+    """
+    check that cached pcells are given back at the database unit of the target layout
+    """
+
+    # cache check command string, coarse dbu is cached first and the second cell of each dbu is a cache hit
+    call_str = """
+    python3 -c "import sys; sys.path.insert(0, '..'); import pya; from cells.draw_fet import draw_nfet
+boxes = []
+for dbu in (0.005, 0.001, 0.005, 0.001):
+    layout = pya.Layout(); layout.dbu = dbu; boxes.append(draw_nfet(layout, nf=2).dbbox())
+sys.exit(boxes[:2] != boxes[2:] or boxes[0] == boxes[1])"
+    """
+
+    # assert whether cached cells match generated ones
+    assert bool(check_call(call_str, shell=True)) == 0
+
+
 @pytest.mark.dependency(depends=["test_gds_generation"])
 def test_drc_run(device, device_name):
     """
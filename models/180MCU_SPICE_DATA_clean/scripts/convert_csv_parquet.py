@@ -0,0 +1,70 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Usage:
+  convert_csv_parquet.py [--data_dir=<data_dir>]
+
+  --data_dir=<data_dir>           Directory of extracted csv files. [default: gf180mcu_data]
+  -h, --help                      Show help text.
+  -v, --version                   Show version.
+"""
+
+from docopt import docopt
+import pandas as pd
+import os
+import logging
+import glob
+from utils import HAS_PARQUET, write_parquet
+
+
+def main(data_dir):
+    """
+    main function to write Parquet copies of all extracted csv files.
+
+    Parameters
+    ----------
+    data_dir : str
+        Directory that holds extracted data, searched recursively.
+    Returns
+    -------
+        None
+    """
+
+    if not HAS_PARQUET:
+        logging.error("pyarrow is required to write Parquet files, please install it")
+        exit(1)
+
+    csv_files = sorted(glob.glob(os.path.join(data_dir, "**", "*.csv"), recursive=True))
+    for csv_path in csv_files:
+        parquet_path = write_parquet(pd.read_csv(csv_path), csv_path)
+        logging.info(
+            f"{csv_path} ({os.path.getsize(csv_path)} B) -> {parquet_path} ({os.path.getsize(parquet_path)} B)"
+        )
+
+
+if __name__ == "__main__":
+
+    # Args
+    arguments = docopt(__doc__, version="DATA EXTRACTOR: 0.1")
+
+    logging.basicConfig(
+        level=logging.DEBUG,
+        handlers=[
+            logging.StreamHandler(),
+        ],
+        format="%(asctime)s | %(levelname)-7s | %(message)s",
+        datefmt="%d-%b-%Y %H:%M:%S",
+    )
+
+    main(arguments["--data_dir"])
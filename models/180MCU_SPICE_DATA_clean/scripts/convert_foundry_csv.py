@@ -22,94 +22,138 @@ Usage:
 """
 
 from docopt import docopt
-import pandas as pd
 import os
+import sys
 import logging
 import glob
-from fets_iv_extraction import fet_iv_meas_extraction
-from fets_cv_extraction import fet_cv_meas_extraction
-from cap_cv_extraction import cap_meas_extraction
-from diode_iv_extraction import diode_iv_meas_extraction
-from res_r_extraction import ext_temp_corners, ext_const_temp_corners
-from bjt_iv_extraction import bjt_iv_meas_extraction
-from bjt_beta_extraction import bjt_beta_meas_extraction
+import importlib
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from gf180_regress.xlsx_reader import read_excel  # noqa: E402
 
-def main(args):
+
+def run_extractor(module_name, func_name, df, dev_type):
     """
-    main function to extract measurement data for GF180MCU models.
+    Import the extraction script of one measurement and run it.
+
+    Only the extractor of the selected device is imported, so each run doesn't
+    load all the extraction scripts.
 
     Parameters
     ----------
-    arguments : dict
-        Dictionary that holds the arguments used by user in the run command. This is generated by docopt library.
+    module_name : str
+        Name of extraction script [e.g. fets_iv_extraction].
+    func_name : str
+        Name of extraction function in the script [e.g. fet_iv_meas_extraction].
+    df : pd.DataFrame
+        Measured data of the excel sheet.
+    dev_type : str
+        Name of device need to extracted its data.
     Returns
     -------
         None
     """
 
-    # Assign some args to variables to be used later
-    excel_path = args["--excel_path"]
-    excel_path = glob.glob(excel_path)[0]
-    dev_type = args["--device_type"]
+    getattr(importlib.import_module(module_name), func_name)(df, dev_type)
 
-    # Verify the measurement data file is exist or no
-    if not os.path.exists(excel_path) or not os.path.isfile(excel_path):
-        logging.error(
-            f"Provided {excel_path} excel sheet doesn't exist, please recheck"
-        )
-        exit(1)
+
+def extract_excel(excel_path, dev_type):
+    """
+    Extract measurement data of one excel sheet, csv files are written to the current directory.
+
+    Parameters
+    ----------
+    excel_path : str
+        Path of the foundry excel sheet.
+    dev_type : str
+        Name of device need to extracted its data.
+    Returns
+    -------
+    bool
+        True if the device is supported and its data got extracted.
+    """
 
     # Checking that selected device is supported.
     if "fet" in dev_type:
-        df = pd.read_excel(excel_path)
+        df = read_excel(excel_path)
         logging.info(f"Starting data extraction from {excel_path} sheet for {dev_type} device")
 
         if 'iv' in excel_path:
             # Extracting data for FETs-IV measurement
-            fet_iv_meas_extraction(df, dev_type)
+            run_extractor("fets_iv_extraction", "fet_iv_meas_extraction", df, dev_type)
         else:
             # Extracting data for FETs-CV measurement
-            fet_cv_meas_extraction(df, dev_type)
+            run_extractor("fets_cv_extraction", "fet_cv_meas_extraction", df, dev_type)
 
     elif "cap_mos" in dev_type or "cap_mim" in dev_type:
-        df = pd.read_excel(excel_path)
+        df = read_excel(excel_path)
         logging.info(f"Starting data extraction from {excel_path} sheet for {dev_type} device")
         # Extracting data for MOSCAP/MIMCAP devices for CV measurement
-        cap_meas_extraction(df, dev_type)
+        run_extractor("cap_cv_extraction", "cap_meas_extraction", df, dev_type)
 
     elif "diode" in dev_type:
-        df = pd.read_excel(excel_path)
+        df = read_excel(excel_path)
         logging.info(f"Starting data extraction from {excel_path} sheet for {dev_type} device")
 
         if 'iv' in excel_path:
             # Extracting data for FETs-IV measurement
-            diode_iv_meas_extraction(df, dev_type)
+            run_extractor("diode_iv_extraction", "diode_iv_meas_extraction", df, dev_type)
 
     elif "RES" in excel_path:
-        df = pd.read_excel(excel_path)
+        df = read_excel(excel_path)
         logging.info(f"Starting data extraction from {excel_path} sheet for {dev_type} device")
 
         if 'temp' in excel_path:
             # Extracting data for RES-R with temp variations measurement
-            ext_temp_corners(df, dev_type)
+            run_extractor("res_r_extraction", "ext_temp_corners", df, dev_type)
         else:
             # Extracting data for RES-R with W&L variations measurement
-            ext_const_temp_corners(df, dev_type)
+            run_extractor("res_r_extraction", "ext_const_temp_corners", df, dev_type)
 
     elif "bjt" in excel_path:
-        df = pd.read_excel(excel_path)
+        df = read_excel(excel_path)
         logging.info(f"Starting data extraction from {excel_path} sheet for {dev_type} device")
 
         if 'icvc' in excel_path:
             # Extracting data for RES-R with temp variations measurement
-            bjt_iv_meas_extraction(df, dev_type)
+            run_extractor("bjt_iv_extraction", "bjt_iv_meas_extraction", df, dev_type)
 
         elif 'beta' in excel_path:
             # Extracting data for RES-R with temp variations measurement
-            bjt_beta_meas_extraction(df, dev_type)
+            run_extractor("bjt_beta_extraction", "bjt_beta_meas_extraction", df, dev_type)
 
     else:
+        return False
+
+    return True
+
+
+def main(args):
+    """
+    main function to extract measurement data for GF180MCU models.
+
+    Parameters
+    ----------
+    arguments : dict
+        Dictionary that holds the arguments used by user in the run command. This is generated by docopt library.
+    Returns
+    -------
+        None
+    """
+
+    # Assign some args to variables to be used later
+    excel_path = args["--excel_path"]
+    excel_path = glob.glob(excel_path)[0]
+    dev_type = args["--device_type"]
+
+    # Verify the measurement data file is exist or no
+    if not os.path.exists(excel_path) or not os.path.isfile(excel_path):
+        logging.error(
+            f"Provided {excel_path} excel sheet doesn't exist, please recheck"
+        )
+        exit(1)
+
+    if not extract_excel(excel_path, dev_type):
         logging.error("Suported devices are: Fets, MOSCAP, MIMCAP, RES, BJT")
         exit(1)
 
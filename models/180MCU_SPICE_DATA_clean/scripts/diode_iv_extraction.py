@@ -14,13 +14,8 @@
 
 import pandas as pd
 import logging
-from utils import dataframe_cleanup, get_orig_col_names, stack_df_cols
-
-# CONSTANT VALUES
-## These values are manually selected after some analysis
-## for provided measuremnet data.
-# === diode_IV ===
-NUM_DP_PER_VAR = 8
+from utils import add_variation_data, write_extracted_data
+from sheet_layout import SheetLayout
 
 
 def diode_iv_meas_extraction(df: pd.DataFrame, dev_name: str):
@@ -38,71 +33,23 @@ def diode_iv_meas_extraction(df: pd.DataFrame, dev_name: str):
        None
     """
 
-    # Drop any unwanted columns
-    dummy_cols = [c for c in df.columns if "dummy_" in c]
-    cj_cols = [c for c in df.columns if "In1(A)" in c and "diode" not in c]
-    unwanted_cols = (
-        ["Area", "Pj", "Ion (A/um²) @V=Von", "Ioff (pA/um²) @V=-Vdd"]
-        + dummy_cols
-        + cj_cols
-    )
-
-    # Cleanup dataframe from unwanted columns we don't use
-    df = dataframe_cleanup(df, unwanted_cols)
+    # Layout of diode workbooks [unwanted columns, variations and measured tables] is described in layouts/diode_iv.json
 
     # For diode, There are 24 variations = 2*4*3 [For A_P_variation * temp * corners]
     ## We have 4 A&P  combination [(100, 40), (50, 102) um]
     ## We have 3 corners [typical, ff, ss]
     ## We have 3 temperature [-40, 25, 125, 175]
-    all_temp = [-40] + [25] + [125] + [175] + [-40] + [25] + [125] + [175]
-
-    # Define new data frame that holds all variations
-    dp_df = pd.DataFrame({"temp": all_temp})
 
     # "Unnamed: 2" cols: This column holds some info related to each device [name, W&L]
     ## Example dnwps (100u x40u ,  nf=1,  m=1)
-    dp_df["Area (pm^2)"] = df["Unnamed: 2"][df["Unnamed: 2"].notnull()].apply(
-        lambda x: x.split("\n")[1].split("x")[0].replace("(", "").replace("u", "")
-    )
-    dp_df["Pj (um)"] = df["Unnamed: 2"][df["Unnamed: 2"].notnull()].apply(
-        lambda x: x.split("\n")[1].split("x")[1].split("u")[0]
-    )
-    dp_df["Area (pm^2)"] = dp_df["Area (pm^2)"].astype(float)
-    dp_df["Pj (um)"] = dp_df["Pj (um)"].astype(float)
-
-    # Cleanup dataframe from unwanted columns we don't use
-    unwanted_cols = ["Unnamed: 2", "corners"]
-    df = dataframe_cleanup(df, unwanted_cols)
-
-    # Get number of columns that holds measurement data for each variation
-    # Get columns names that holds data for each variation
-    ## Using NUM_DP_PER_CORNER * 3: As data is all 3 corners are combined in one table
-    num_data_col_per_dp, orig_col_names = get_orig_col_names(df, NUM_DP_PER_VAR)
-
-    # Generating all data points per each variation and combining all data in one DF
-    all_dfs = []
-    col_untouched = "Vn1 (V)"  # Name of column we don't need to touch it while stacking other columns
-    stacked_col_name = "corner"  # Name of new column in which we stacked other columns
-    stacked_col_index = (
-        "In1(A)"  # Name of column that holds all values of stacked columns
-    )
+    layout = SheetLayout("diode_iv", dev_name)
+    dp_df, data, tables = layout.extract(df)
 
-    for i in range(0, len(df.columns), num_data_col_per_dp):
-        sub_df = df[df.columns[i : i + num_data_col_per_dp]].copy()
-        sub_df.columns = orig_col_names
-        stacked_corner_df = stack_df_cols(
-            sub_df, col_untouched, stacked_col_name, stacked_col_index
-        )
-        for c in dp_df.columns:
-            stacked_corner_df[c] = dp_df.loc[len(all_dfs), c]
-        all_dfs.append(stacked_corner_df)
-
-    all_dfs = pd.concat(all_dfs)
+    # Generating all data points of all variations at once, all corners of each variation are stacked in one column
+    ## Corner names are cleaned to use same name in GF180MCU models
+    all_dfs = add_variation_data(tables["iv"].stack(data), dp_df)
     all_dfs.drop_duplicates(inplace=True)
 
-    # Cleaning corner column to use same name in GF180MCU models
-    all_dfs["corner"] = all_dfs["corner"].apply(lambda x: x.split(" ")[-1])
-
     # Generiting sweep file for Diode-iv devices
     gen_diode_iv_sweeps(all_dfs, dev_name)
 
@@ -120,7 +67,7 @@ def diode_iv_meas_extraction(df: pd.DataFrame, dev_name: str):
 
     # Writing final dataframe that holds all clean data
     all_dfs.drop_duplicates(inplace=True)
-    all_dfs.to_csv(f"{dev_name}_iv_meas.csv", index=False)
+    write_extracted_data(all_dfs, f"{dev_name}_iv_meas.csv")
     logging.info(f"Full extracted measurement data for {dev_name}:\n {all_dfs}")
     logging.info(
         f"Full extracted measurement data for {dev_name} at: {dev_name}_iv_meas.csv"
@@ -161,7 +108,7 @@ def gen_diode_iv_sweeps(df: pd.DataFrame, dev_name: str):
     sweeps_df = sweeps_df.reindex(columns=sweeps_df_cols)
 
     # Writing final dataframe that holds all clean data
-    sweeps_df.to_csv(f"{dev_name}_iv_sweeps.csv", index=False)
+    write_extracted_data(sweeps_df, f"{dev_name}_iv_sweeps.csv")
     logging.info(f"Sweep data points for {dev_name}:\n {sweeps_df}")
     logging.info(f"Number of sweep points for {dev_name}: {len(sweeps_df)}")
     logging.info(
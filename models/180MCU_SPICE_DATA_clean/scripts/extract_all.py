@@ -0,0 +1,331 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Usage:
+  extract_all.py [--manifest=<manifest>] [--data_dir=<data_dir>] [--groups=<groups>] [--jobs=<jobs>] [--force] [--no_validation]
+
+  --manifest=<manifest>           CSV file of (group, excel_path, device_type) to be extracted. [default: scripts/extraction_manifest.csv]
+  --data_dir=<data_dir>           Output directory, data of each group is written to <data_dir>/<group>. [default: gf180mcu_data]
+  --groups=<groups>               Comma separated groups to be extracted [e.g. MOS_iv,MOS_cv], all groups by default.
+  --jobs=<jobs>                   Number of extraction processes, number of cpus by default.
+  --force                         Extract all sheets even if they didn't change since last run.
+  --no_validation                 Don't check extracted data, by default all extracted files are checked and reported in <data_dir>/validation_report.json.
+  -h, --help                      Show help text.
+  -v, --version                   Show version.
+"""
+
+from docopt import docopt
+import os
+import sys
+import json
+import glob
+import shutil
+import hashlib
+import logging
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from gf180_regress.lazy import lazy_import  # noqa: E402
+
+# pandas is imported on first use, so --help doesn't wait for it
+pd = lazy_import("pandas")
+futures = lazy_import("concurrent.futures")
+
+# CONSTANT VALUES
+STATE_FILE = ".extraction_state.json"
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def file_digest(path):
+    """
+    Get sha256 digest of a file content.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+    Returns
+    -------
+    str
+        Hex digest of the file.
+    """
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def scripts_digest():
+    """
+    Get one digest of all extraction scripts, any change in them invalidates previous runs.
+
+    Returns
+    -------
+    str
+        Hex digest of the python files and sheet layouts in the scripts directory and of the shared readers.
+    """
+
+    shared = [os.path.join(SCRIPTS_DIR, "..", "..", "gf180_regress", f) for f in ["xlsx_reader.py", "sweeps.py"]]
+    layouts = sorted(glob.glob(os.path.join(SCRIPTS_DIR, "layouts", "*.json")))
+    h = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(SCRIPTS_DIR, "*.py"))) + layouts + shared:
+        h.update(os.path.basename(path).encode())
+        h.update(file_digest(path).encode())
+    return h.hexdigest()
+
+
+def load_manifest(manifest_path, groups=None):
+    """
+    Load extraction jobs from manifest, excel paths with wildcards are resolved to first match.
+
+    Missing excel sheets are reported and left out, so that the rest of the data is still extracted.
+
+    Parameters
+    ----------
+    manifest_path : str
+        Path of the manifest csv file.
+    groups : list
+        Groups to be kept, all groups if None.
+    Returns
+    -------
+    jobs : list
+        One dict per excel sheet with group, excel_path and device_type.
+    missing : list
+        Excel paths of the manifest that don't exist.
+    """
+
+    manifest_df = pd.read_csv(manifest_path, dtype=str)
+    if groups:
+        unknown = set(groups) - set(manifest_df["group"])
+        if unknown:
+            logging.error(f"Unknown groups {sorted(unknown)}, please recheck {manifest_path}")
+            exit(1)
+        manifest_df = manifest_df[manifest_df["group"].isin(groups)]
+
+    jobs = []
+    missing = []
+    for row in manifest_df.itertuples(index=False):
+        matches = sorted(glob.glob(row.excel_path))
+        if not matches:
+            logging.error(f"Provided {row.excel_path} excel sheet doesn't exist, please recheck")
+            missing.append(row.excel_path)
+            continue
+        jobs.append(
+            {"group": row.group, "excel_path": matches[0], "device_type": row.device_type}
+        )
+
+    return jobs, missing
+
+
+def job_key(job):
+    """
+    Key of an extraction job in the state file.
+
+    Parameters
+    ----------
+    job : dict
+        Extraction job.
+    Returns
+    -------
+    str
+        Group, excel path and device type of the job.
+    """
+
+    return f"{job['group']}|{job['excel_path']}|{job['device_type']}"
+
+
+def is_up_to_date(job, entry, data_dir, scripts_hash):
+    """
+    Check that the excel sheet didn't change since its last extraction.
+
+    mtime and size are checked first, content is hashed only if they differ
+    [e.g. after a fresh clone].
+
+    Parameters
+    ----------
+    job : dict
+        Extraction job.
+    entry : dict
+        State of the previous extraction of this job, None if never extracted.
+    data_dir : str
+        Output directory.
+    scripts_hash : str
+        Digest of current extraction scripts.
+    Returns
+    -------
+    bool
+        True if the job can be skipped.
+    """
+
+    if not entry or entry.get("scripts") != scripts_hash:
+        return False
+
+    out_dir = os.path.join(data_dir, job["group"])
+    if not entry["outputs"] or not all(os.path.isfile(os.path.join(out_dir, f)) for f in entry["outputs"]):
+        return False
+
+    stat = os.stat(job["excel_path"])
+    if stat.st_mtime == entry["mtime"] and stat.st_size == entry["size"]:
+        return True
+
+    if file_digest(job["excel_path"]) == entry["sha256"]:
+        entry["mtime"] = stat.st_mtime
+        return True
+
+    return False
+
+
+def run_extraction(job, data_dir):
+    """
+    Extract one excel sheet in a private directory then move its outputs to the group directory.
+
+    Parameters
+    ----------
+    job : dict
+        Extraction job.
+    data_dir : str
+        Output directory.
+    Returns
+    -------
+    outputs : list
+        Names of the written files.
+    """
+
+    # Extraction modules are only needed by worker processes
+    from convert_foundry_csv import extract_excel
+
+    excel_path = os.path.abspath(job["excel_path"])
+    out_dir = os.path.abspath(os.path.join(data_dir, job["group"]))
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Extraction scripts write to the current directory
+    work_dir = tempfile.mkdtemp(prefix=".ext_", dir=out_dir)
+    cwd = os.getcwd()
+    try:
+        os.chdir(work_dir)
+        if not extract_excel(excel_path, job["device_type"]):
+            raise ValueError(f"Not supported device {job['device_type']} for {excel_path}")
+        outputs = sorted(os.listdir(work_dir))
+        for f in outputs:
+            os.replace(os.path.join(work_dir, f), os.path.join(out_dir, f))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return outputs
+
+
+def main(args):
+    """
+    main function to extract all measurement data of GF180MCU models in parallel.
+
+    Parameters
+    ----------
+    arguments : dict
+        Dictionary that holds the arguments used by user in the run command. This is generated by docopt library.
+    Returns
+    -------
+        None
+    """
+
+    data_dir = args["--data_dir"]
+    groups = args["--groups"].split(",") if args["--groups"] else None
+    workers = int(args["--jobs"]) if args["--jobs"] else os.cpu_count()
+
+    jobs, missing = load_manifest(args["--manifest"], groups)
+
+    os.makedirs(data_dir, exist_ok=True)
+    state_path = os.path.join(data_dir, STATE_FILE)
+    state = {}
+    if os.path.isfile(state_path):
+        with open(state_path) as f:
+            state = json.load(f)
+
+    scripts_hash = scripts_digest()
+    pending = []
+    for job in jobs:
+        if not args["--force"] and is_up_to_date(job, state.get(job_key(job)), data_dir, scripts_hash):
+            logging.info(f"Skipping {job['excel_path']} for {job['device_type']}, not changed since last run")
+        else:
+            pending.append(job)
+
+    logging.info(f"Extracting {len(pending)} of {len(jobs)} excel sheets using {workers} processes")
+
+    failed = []
+    with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        submitted = {executor.submit(run_extraction, job, data_dir): job for job in pending}
+        for future in futures.as_completed(submitted):
+            job = submitted[future]
+            try:
+                outputs = future.result()
+            except Exception as e:
+                logging.error(f"Extraction of {job['excel_path']} for {job['device_type']} failed: {e}")
+                failed.append(job)
+                state.pop(job_key(job), None)
+                continue
+
+            stat = os.stat(job["excel_path"])
+            state[job_key(job)] = {
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "sha256": file_digest(job["excel_path"]),
+                "scripts": scripts_hash,
+                "outputs": outputs,
+            }
+            logging.info(f"Extracted {job['excel_path']} for {job['device_type']}: {', '.join(outputs)}")
+
+    with open(state_path, "w") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+
+    # Checking all extracted data of selected jobs, including the ones skipped in this run
+    invalid = False
+    if not args["--no_validation"]:
+        from validate_extraction import REPORT_FILE, validate_files
+
+        csv_paths = [
+            os.path.join(data_dir, job["group"], f)
+            for job in jobs
+            if job_key(job) in state
+            for f in state[job_key(job)]["outputs"]
+            if f.endswith(".csv")
+        ]
+        report = validate_files(csv_paths, os.path.join(data_dir, REPORT_FILE))
+        invalid = report["errors"] > 0
+
+    if failed or missing:
+        logging.error(f"{len(failed) + len(missing)} excel sheets failed to be extracted")
+        exit(1)
+
+    if invalid:
+        logging.error(f"Extracted data has errors, please check {os.path.join(data_dir, REPORT_FILE)}")
+        exit(1)
+
+
+if __name__ == "__main__":
+
+    # Args
+    arguments = docopt(__doc__, version="DATA EXTRACTOR: 0.1")
+
+    # logging setup
+    logging.basicConfig(
+        level=logging.DEBUG,
+        handlers=[logging.StreamHandler(), ],
+        format="%(asctime)s | %(levelname)-7s | %(message)s",
+        datefmt="%d-%b-%Y %H:%M:%S",
+    )
+
+    # Calling main function
+    main(arguments)
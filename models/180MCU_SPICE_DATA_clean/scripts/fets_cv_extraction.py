@@ -13,345 +13,286 @@
 # limitations under the License.
 
 import pandas as pd
+import numpy as np
 import logging
-from utils import dataframe_cleanup, get_orig_col_names, get_variation_count
+from utils import get_sweep_steps, add_variation_data, write_extracted_data
+from sheet_layout import SheetLayout
 
-# CONSTANT VALUES
-## These values are manually selected after some analysis
-## for provided measuremnet data.
-# === FETS-IV ===
-NUM_COLS_MEAS_VBS_03v3 = 7
-NUM_COLS_MEAS_VBS_06v0 = 6
-NUM_COLS_MEAS_VDS_CV = 3
-NUM_COLS_MEAS_VGS_CV = 6
 
-
-def parse_cgd_vds_vgs(sub_df, dev_type, dev_name):
+def parse_cgd_vds_vgs(data, table, dev_types):
     """
     Function to parse measurement data for Cgd Vs Vds with Vgs sweep to be used in simulation.
 
     Parameters
     ----------
-    sub_df : pd.DataFrame
-        DataFrame that holds sub measurement information per each variation.
-    dev_type : str
-        Type of device we want to extract data for [nfet or pfet].
-    dev_name : str
-        Device we want to extract data for.
+    data : np.ndarray
+        Measurement data of all variations, shape (rows, variations, columns per variation).
+    table : SheetTable
+        Cgd Vs Vds table of each variation, as described in layouts/fets_cv.json.
+    dev_types : np.ndarray
+        Type of device of each variation [nfet or pfet].
     Returns
     ----------
     df_cgd_vds_vgs : pd.DataFrame
         DataFrame that holds all measurement points for Cgd Vs Vds with Vgs sweep
     """
 
-    # Get no of cols per variation for vbs sweep
-    NUM_COLS_MEAS_VBS = NUM_COLS_MEAS_VBS_03v3 if '03v3' in dev_name else NUM_COLS_MEAS_VBS_06v0
+    const_val = table.const_value
 
-    ## Cgc Vs Vds [Vgs sweep]
-    df_cgd_vds_vgs = sub_df.iloc[
-        :, NUM_COLS_MEAS_VBS + NUM_COLS_MEAS_VDS_CV + NUM_COLS_MEAS_VGS_CV : NUM_COLS_MEAS_VBS + NUM_COLS_MEAS_VDS_CV + 2 * NUM_COLS_MEAS_VGS_CV
-    ]
+    # Get vds sweep values
+    vds_vals = table.x_values(data)
 
-    vbs_df_cgd_vds_vgs = float(df_cgd_vds_vgs.columns[0].split("/")[0].split("=")[1])
-    df_cgd_vds_vgs.drop(columns=df_cgd_vds_vgs.columns[0], inplace=True)
+    # Get Vds step value
+    vds_step_val = [round(abs(v), 2) for v in vds_vals[1] - vds_vals[0]]
 
-    # Get vgs sweep values
-    vds_col_name = "Vds (V).1"
+    # Multiplying vds by -1 for pfet devices to match provided data
+    sign = np.where(dev_types == "pfet", -1.0, 1.0)
+    vds_vals = vds_vals * sign
 
-    # Get Vgs step value
-    vds_step_val = round(abs(df_cgd_vds_vgs[vds_col_name][1] - df_cgd_vds_vgs[vds_col_name][0]), 2)
+    # Get min/max values of vds sweep
+    vds_min_val = np.nanmin(vds_vals, axis=0)
+    vds_max_val = np.nanmax(vds_vals, axis=0)
 
-    # Stacking all vbs sweeps in one column
-    df_cgd_vds_vgs = (
-        df_cgd_vds_vgs.set_index([vds_col_name])
-        .stack()
-        .reset_index(name="cgd")
-        .rename(columns={"level_1": "vgs"})
-        .rename(columns={vds_col_name: "vds"})
-    )
-
-    # Multiplying vgs by -1 for pfet devices to match provided data
-    df_cgd_vds_vgs["vds"] = df_cgd_vds_vgs["vds"].apply(lambda x: x * -1) if "pfet" in dev_type else df_cgd_vds_vgs["vds"]
-
-    # Get min/max values of vgs sweep
-    vds_min_val = df_cgd_vds_vgs["vds"].min()
-    vds_max_val = df_cgd_vds_vgs["vds"].max()
+    # Stacking all vgs sweeps in one column
+    df_cgd_vds_vgs = table.stack(data)
+    dp_idx = df_cgd_vds_vgs["dp_idx"].to_numpy()
+    df_cgd_vds_vgs["vds"] = df_cgd_vds_vgs["vds"] * sign[dp_idx]
+    df_cgd_vds_vgs["vgs"] = df_cgd_vds_vgs["vgs"] * sign[dp_idx]
 
     # Adding columns for all voltage sweeps and output
-    df_cgd_vds_vgs["vgs"] = df_cgd_vds_vgs["vgs"].apply(
-        lambda x: ".".join(x.split("=")[1].split(".")[:-1])
-    )
-    df_cgd_vds_vgs["vgs"] = df_cgd_vds_vgs["vgs"].astype(float)
-    df_cgd_vds_vgs["vgs"] = df_cgd_vds_vgs["vgs"].apply(lambda x: x * -1) if "pfet" in dev_type else df_cgd_vds_vgs["vgs"]
-
-    df_cgd_vds_vgs["vbs"] = vbs_df_cgd_vds_vgs
+    df_cgd_vds_vgs["vbs"] = const_val
     df_cgd_vds_vgs["const_var"] = "vbs"
-    df_cgd_vds_vgs["const_var_val"] = vbs_df_cgd_vds_vgs
+    df_cgd_vds_vgs["const_var_val"] = const_val
     df_cgd_vds_vgs["out_col"] = "cgd"
 
-    # Get vds sweep values
-    vgs_min_val = df_cgd_vds_vgs["vgs"].min()
-    vgs_max_val = df_cgd_vds_vgs["vgs"].max()
-    vgs_step_val = abs(df_cgd_vds_vgs["vgs"][1] - df_cgd_vds_vgs["vgs"][0])
+    # Get vgs sweep values, per each variation as they are multiplied by -1 for pfet devices
+    vgs_vals = table.y_values[None, :] * sign[:, None]
+    vgs_min_val = vgs_vals.min(axis=1)
+    vgs_max_val = vgs_vals.max(axis=1)
+    vgs_step_val = get_sweep_steps(df_cgd_vds_vgs, "vgs", len(sign))
 
     # Adding sweeps used per each variation
-    df_cgd_vds_vgs[
-        "sweeps"
-    ] = f"vds {vds_min_val} {vds_max_val} {vds_step_val} vgs {vgs_min_val} {vgs_max_val} {vgs_step_val}"
+    sweeps = [
+        f"vds {vds_min_val[i]} {vds_max_val[i]} {vds_step_val[i]} vgs {vgs_min_val[i]} {vgs_max_val[i]} {vgs_step_val[i]}"
+        for i in range(len(sign))
+    ]
+    df_cgd_vds_vgs["sweeps"] = np.array(sweeps, dtype=object)[dp_idx]
 
     return df_cgd_vds_vgs
 
 
-def parse_cgs_vds_vgs(sub_df, dev_type, dev_name):
+def parse_cgs_vds_vgs(data, table, dev_types):
     """
     Function to parse measurement data for Cgs Vs Vds with Vgs sweep to be used in simulation.
 
     Parameters
     ----------
-    sub_df : pd.DataFrame
-        DataFrame that holds sub measurement information per each variation.
-    dev_type : str
-        Type of device we want to extract data for [nfet or pfet].
-    dev_name : str
-        Device we want to extract data for.
+    data : np.ndarray
+        Measurement data of all variations, shape (rows, variations, columns per variation).
+    table : SheetTable
+        Cgs Vs Vds table of each variation, as described in layouts/fets_cv.json.
+    dev_types : np.ndarray
+        Type of device of each variation [nfet or pfet].
     Returns
     ----------
     df_cgs_vds_vgs : pd.DataFrame
         DataFrame that holds all measurement points for Cgs Vs Vds with Vgs sweep
     """
 
-    # Get no of cols per variation for vbs sweep
-    NUM_COLS_MEAS_VBS = NUM_COLS_MEAS_VBS_03v3 if '03v3' in dev_name else NUM_COLS_MEAS_VBS_06v0
+    const_val = table.const_value
 
-    ## Cgc Vs Vds [Vgs sweep]
-    df_cgs_vds_vgs = sub_df.iloc[
-        :, NUM_COLS_MEAS_VBS + NUM_COLS_MEAS_VDS_CV : NUM_COLS_MEAS_VBS + NUM_COLS_MEAS_VDS_CV + NUM_COLS_MEAS_VGS_CV
-    ]
+    # Get vds sweep values
+    vds_vals = table.x_values(data)
 
-    vbs_df_cgs_vds_vgs = float(df_cgs_vds_vgs.columns[0].split("/")[0].split("=")[1])
-    df_cgs_vds_vgs.drop(columns=df_cgs_vds_vgs.columns[0], inplace=True)
+    # Get Vds step value
+    vds_step_val = [round(abs(v), 2) for v in vds_vals[1] - vds_vals[0]]
 
-    # Get vgs sweep values
-    vds_col_name = "Vds (V)"
+    # Multiplying vds by -1 for pfet devices to match provided data
+    sign = np.where(dev_types == "pfet", -1.0, 1.0)
+    vds_vals = vds_vals * sign
 
-    # Get Vgs step value
-    vds_step_val = round(abs(df_cgs_vds_vgs[vds_col_name][1] - df_cgs_vds_vgs[vds_col_name][0]), 2)
+    # Get min/max values of vds sweep
+    vds_min_val = np.nanmin(vds_vals, axis=0)
+    vds_max_val = np.nanmax(vds_vals, axis=0)
 
-    # Stacking all vbs sweeps in one column
-    df_cgs_vds_vgs = (
-        df_cgs_vds_vgs.set_index([vds_col_name])
-        .stack()
-        .reset_index(name="cgs")
-        .rename(columns={"level_1": "vgs"})
-        .rename(columns={vds_col_name: "vds"})
-    )
-
-    # Multiplying vgs by -1 for pfet devices to match provided data
-    df_cgs_vds_vgs["vds"] = df_cgs_vds_vgs["vds"].apply(lambda x: x * -1) if "pfet" in dev_type else df_cgs_vds_vgs["vds"]
-
-    # Get min/max values of vgs sweep
-    vds_min_val = df_cgs_vds_vgs["vds"].min()
-    vds_max_val = df_cgs_vds_vgs["vds"].max()
+    # Stacking all vgs sweeps in one column
+    df_cgs_vds_vgs = table.stack(data)
+    dp_idx = df_cgs_vds_vgs["dp_idx"].to_numpy()
+    df_cgs_vds_vgs["vds"] = df_cgs_vds_vgs["vds"] * sign[dp_idx]
+    df_cgs_vds_vgs["vgs"] = df_cgs_vds_vgs["vgs"] * sign[dp_idx]
 
     # Adding columns for all voltage sweeps and output
-    df_cgs_vds_vgs["vgs"] = df_cgs_vds_vgs["vgs"].apply(lambda x: x.split("=")[1])
-    df_cgs_vds_vgs["vgs"] = df_cgs_vds_vgs["vgs"].astype(float)
-    df_cgs_vds_vgs["vgs"] = df_cgs_vds_vgs["vgs"].apply(lambda x: x * -1) if "pfet" in dev_type else df_cgs_vds_vgs["vgs"]
-
-    df_cgs_vds_vgs["vbs"] = vbs_df_cgs_vds_vgs
+    df_cgs_vds_vgs["vbs"] = const_val
     df_cgs_vds_vgs["const_var"] = "vbs"
-    df_cgs_vds_vgs["const_var_val"] = vbs_df_cgs_vds_vgs
+    df_cgs_vds_vgs["const_var_val"] = const_val
     df_cgs_vds_vgs["out_col"] = "cgs"
 
-    # Get vds sweep values
-    vgs_min_val = df_cgs_vds_vgs["vgs"].min()
-    vgs_max_val = df_cgs_vds_vgs["vgs"].max()
-    vgs_step_val = abs(df_cgs_vds_vgs["vgs"][1] - df_cgs_vds_vgs["vgs"][0])
+    # Get vgs sweep values, per each variation as they are multiplied by -1 for pfet devices
+    vgs_vals = table.y_values[None, :] * sign[:, None]
+    vgs_min_val = vgs_vals.min(axis=1)
+    vgs_max_val = vgs_vals.max(axis=1)
+    vgs_step_val = get_sweep_steps(df_cgs_vds_vgs, "vgs", len(sign))
 
     # Adding sweeps used per each variation
-    df_cgs_vds_vgs[
-        "sweeps"
-    ] = f"vds {vds_min_val} {vds_max_val} {vds_step_val} vgs {vgs_min_val} {vgs_max_val} {vgs_step_val}"
+    sweeps = [
+        f"vds {vds_min_val[i]} {vds_max_val[i]} {vds_step_val[i]} vgs {vgs_min_val[i]} {vgs_max_val[i]} {vgs_step_val[i]}"
+        for i in range(len(sign))
+    ]
+    df_cgs_vds_vgs["sweeps"] = np.array(sweeps, dtype=object)[dp_idx]
 
     return df_cgs_vds_vgs
 
 
-def parse_cgg_vgs_vds(sub_df, dev_type, dev_name):
+def parse_cgg_vgs_vds(data, table, dev_types):
     """
     Function to parse measurement data for Cgg Vs Vgs with Vds sweep to be used in simulation.
 
     Parameters
     ----------
-    sub_df : pd.DataFrame
-        DataFrame that holds sub measurement information per each variation.
-    dev_type : str
-        Type of device we want to extract data for [nfet or pfet].
-    dev_name : str
-        Device we want to extract data for.
+    data : np.ndarray
+        Measurement data of all variations, shape (rows, variations, columns per variation).
+    table : SheetTable
+        Cgg Vs Vgs table of each variation, as described in layouts/fets_cv.json.
+    dev_types : np.ndarray
+        Type of device of each variation [nfet or pfet].
     Returns
     ----------
     df_cgg_vgs_vds : pd.DataFrame
         DataFrame that holds all measurement points for Cgg Vs Vgs with Vds sweep
     """
 
-    # Get no of cols per variation for vbs sweep
-    NUM_COLS_MEAS_VBS = NUM_COLS_MEAS_VBS_03v3 if '03v3' in dev_name else NUM_COLS_MEAS_VBS_06v0
-
-    ## Cgc Vs Vgs [Vbs sweep]
-    df_cgg_vgs_vds = sub_df.iloc[
-        :, NUM_COLS_MEAS_VBS : NUM_COLS_MEAS_VBS + NUM_COLS_MEAS_VDS_CV
-    ]
-
-    vbs_df_cgg_vgs_vds = float(df_cgg_vgs_vds.columns[0].split("/")[0].split("=")[1])
-    df_cgg_vgs_vds.drop(columns=df_cgg_vgs_vds.columns[0], inplace=True)
+    const_val = table.const_value
 
     # Get vgs sweep values
-    vgs_col_name = "Vgs (V).1"
+    vgs_vals = table.x_values(data)
 
     # Get Vgs step value
-    vgs_step_val = round(abs(df_cgg_vgs_vds[vgs_col_name][1] - df_cgg_vgs_vds[vgs_col_name][0]), 2)
-
-    # Stacking all vbs sweeps in one column
-    df_cgg_vgs_vds = (
-        df_cgg_vgs_vds.set_index([vgs_col_name])
-        .stack()
-        .reset_index(name="cgg")
-        .rename(columns={"level_1": "vds"})
-        .rename(columns={vgs_col_name: "vgs"})
-    )
+    vgs_step_val = [round(abs(v), 2) for v in vgs_vals[1] - vgs_vals[0]]
 
     # Multiplying vgs by -1 for pfet devices to match provided data
-    df_cgg_vgs_vds["vgs"] = df_cgg_vgs_vds["vgs"].apply(lambda x: x * -1) if "pfet" in dev_type else df_cgg_vgs_vds["vgs"]
+    sign = np.where(dev_types == "pfet", -1.0, 1.0)
+    vgs_vals = vgs_vals * sign
 
     # Get min/max values of vgs sweep
-    vgs_min_val = df_cgg_vgs_vds["vgs"].min()
-    vgs_max_val = df_cgg_vgs_vds["vgs"].max()
+    vgs_min_val = np.nanmin(vgs_vals, axis=0)
+    vgs_max_val = np.nanmax(vgs_vals, axis=0)
 
-    # Adding columns for all voltage sweeps and output
-    df_cgg_vgs_vds["vds"] = df_cgg_vgs_vds["vds"].apply(lambda x: x.split("=")[1])
-    df_cgg_vgs_vds["vds"] = df_cgg_vgs_vds["vds"].astype(float)
-    df_cgg_vgs_vds["vds"] = df_cgg_vgs_vds["vds"].apply(lambda x: x * -1) if "pfet" in dev_type else df_cgg_vgs_vds["vds"]
+    # Stacking all vds sweeps in one column
+    df_cgg_vgs_vds = table.stack(data)
+    dp_idx = df_cgg_vgs_vds["dp_idx"].to_numpy()
+    df_cgg_vgs_vds["vgs"] = df_cgg_vgs_vds["vgs"] * sign[dp_idx]
+    df_cgg_vgs_vds["vds"] = df_cgg_vgs_vds["vds"] * sign[dp_idx]
 
-    df_cgg_vgs_vds["vbs"] = vbs_df_cgg_vgs_vds
+    # Adding columns for all voltage sweeps and output
+    df_cgg_vgs_vds["vbs"] = const_val
     df_cgg_vgs_vds["const_var"] = "vds"
-    df_cgg_vgs_vds["const_var_val"] = vbs_df_cgg_vgs_vds
+    df_cgg_vgs_vds["const_var_val"] = const_val
     df_cgg_vgs_vds["out_col"] = "cgg"
 
-    # Get vds sweep values
-    vbs_min_val = df_cgg_vgs_vds["vds"].min()
-    vbs_max_val = df_cgg_vgs_vds["vds"].max()
-    vbs_step_val = abs(df_cgg_vgs_vds["vds"][1] - df_cgg_vgs_vds["vds"][0])
+    # Get vds sweep values, per each variation as they are multiplied by -1 for pfet devices
+    vds_vals = table.y_values[None, :] * sign[:, None]
+    vds_min_val = vds_vals.min(axis=1)
+    vds_max_val = vds_vals.max(axis=1)
+    vds_step_val = get_sweep_steps(df_cgg_vgs_vds, "vds", len(sign))
 
     # Adding sweeps used per each variation
-    df_cgg_vgs_vds[
-        "sweeps"
-    ] = f"vgs {vgs_min_val} {vgs_max_val} {vgs_step_val} vbs {vbs_min_val} {vbs_max_val} {vbs_step_val}"
+    sweeps = [
+        f"vgs {vgs_min_val[i]} {vgs_max_val[i]} {vgs_step_val[i]} vbs {vds_min_val[i]} {vds_max_val[i]} {vds_step_val[i]}"
+        for i in range(len(sign))
+    ]
+    df_cgg_vgs_vds["sweeps"] = np.array(sweeps, dtype=object)[dp_idx]
 
     return df_cgg_vgs_vds
 
 
-def parse_cgc_vgs_vbs(sub_df, dev_type, dev_name):
+def parse_cgc_vgs_vbs(data, table, dev_types):
     """
     Function to parse measurement data for Cgc Vs Vgs with Vbs sweep to be used in simulation.
 
     Parameters
     ----------
-    sub_df : pd.DataFrame
-        DataFrame that holds sub measurement information per each variation.
-    dev_type : str
-        Type of device we want to extract data for [nfet or pfet].
-    dev_name : str
-        Device we want to extract data for.
+    data : np.ndarray
+        Measurement data of all variations, shape (rows, variations, columns per variation).
+    table : SheetTable
+        Cgc Vs Vgs table of each variation, as described in layouts/fets_cv.json.
+    dev_types : np.ndarray
+        Type of device of each variation [nfet or pfet].
     Returns
     ----------
     df_cgc_vgs_vbs : pd.DataFrame
         DataFrame that holds all measurement points for Cgc Vs Vgs with Vbs sweep
     """
 
-    # Get no of cols per variation for vbs sweep
-    NUM_COLS_MEAS_VBS = NUM_COLS_MEAS_VBS_03v3 if '03v3' in dev_name else NUM_COLS_MEAS_VBS_06v0
-
-    ## Cgc Vs Vgs [Vbs sweep]
-    df_cgc_vgs_vbs = sub_df.iloc[:, :NUM_COLS_MEAS_VBS]
-    vds_df_cgc_vgs_vbs = float(df_cgc_vgs_vbs.columns[0].split("/")[0].split("=")[1])
-    df_cgc_vgs_vbs.drop(columns=df_cgc_vgs_vbs.columns[0], inplace=True)
+    const_val = table.const_value
 
     # Get vgs sweep values
-    vgs_col_name = "Vgs (V)"
+    vgs_vals = table.x_values(data)
 
     # Get Vgs step value
-    vgs_step_val = round(abs(df_cgc_vgs_vbs[vgs_col_name][1] - df_cgc_vgs_vbs[vgs_col_name][0]), 2)
-
-    # Stacking all vbs sweeps in one column
-    df_cgc_vgs_vbs = (
-        df_cgc_vgs_vbs.set_index([vgs_col_name])
-        .stack()
-        .reset_index(name="cgc")
-        .rename(columns={"level_1": "vbs"})
-        .rename(columns={vgs_col_name: "vgs"})
-    )
+    vgs_step_val = [round(abs(v), 2) for v in vgs_vals[1] - vgs_vals[0]]
 
-    # Multiplying vgs by -1 for pfet devices to match provided data
-    df_cgc_vgs_vbs["vgs"] = df_cgc_vgs_vbs["vgs"].apply(lambda x: x * -1) if "pfet" in dev_type else df_cgc_vgs_vbs["vgs"]
+    # Get min/max values of vgs sweep, multiplying vgs by -1 for pfet devices to match provided data
+    ## Measured vgs values are kept as provided for pfet devices [multiplied twice by -1]
+    sign = np.where(dev_types == "pfet", -1.0, 1.0)
+    vgs_min_val = np.nanmin(vgs_vals * sign, axis=0)
+    vgs_max_val = np.nanmax(vgs_vals * sign, axis=0)
 
-    # Get min/max values of vgs sweep
-    vgs_min_val = df_cgc_vgs_vbs["vgs"].min()
-    vgs_max_val = df_cgc_vgs_vbs["vgs"].max()
+    # Stacking all vbs sweeps in one column
+    df_cgc_vgs_vbs = table.stack(data)
+    dp_idx = df_cgc_vgs_vbs["dp_idx"].to_numpy()
 
     # Adding columns for all voltage sweeps and output
-    df_cgc_vgs_vbs["vbs"] = df_cgc_vgs_vbs["vbs"].apply(lambda x: x.split("=")[1])
-    df_cgc_vgs_vbs["vbs"] = df_cgc_vgs_vbs["vbs"].astype(float)
-    df_cgc_vgs_vbs["vgs"] = df_cgc_vgs_vbs["vgs"].apply(lambda x: x * -1) if "pfet" in dev_type else df_cgc_vgs_vbs["vgs"]
-
-    df_cgc_vgs_vbs["vds"] = vds_df_cgc_vgs_vbs
+    df_cgc_vgs_vbs["vds"] = const_val
     df_cgc_vgs_vbs["const_var"] = "vds"
-    df_cgc_vgs_vbs["const_var_val"] = vds_df_cgc_vgs_vbs
+    df_cgc_vgs_vbs["const_var_val"] = const_val
     df_cgc_vgs_vbs["out_col"] = "cgc"
 
-    # Get vgs sweep values
-    vbs_min_val = df_cgc_vgs_vbs["vbs"].min()
-    vbs_max_val = df_cgc_vgs_vbs["vbs"].max()
-    vbs_step_val = abs(df_cgc_vgs_vbs["vbs"][1] - df_cgc_vgs_vbs["vbs"][0])
+    # Get vbs sweep values
+    vbs_min_val = np.full(len(sign), np.min(table.y_values))
+    vbs_max_val = np.full(len(sign), np.max(table.y_values))
+    vbs_step_val = get_sweep_steps(df_cgc_vgs_vbs, "vbs", len(sign))
 
     # Adding sweeps used per each variation
-    df_cgc_vgs_vbs[
-        "sweeps"
-    ] = f"vgs {vgs_min_val} {vgs_max_val} {vgs_step_val} vbs {vbs_min_val} {vbs_max_val} {vbs_step_val}"
+    sweeps = [
+        f"vgs {vgs_min_val[i]} {vgs_max_val[i]} {vgs_step_val[i]} vbs {vbs_min_val[i]} {vbs_max_val[i]} {vbs_step_val[i]}"
+        for i in range(len(sign))
+    ]
+    df_cgc_vgs_vbs["sweeps"] = np.array(sweeps, dtype=object)[dp_idx]
 
     return df_cgc_vgs_vbs
 
 
-def parse_fet_cv_sweeps(sub_df, dev_type, dev_name):
+def parse_fet_cv_sweeps(data, tables, dev_types):
     """
     Function to parse measurement data to be used in simulation.
 
     Parameters
     ----------
-    sub_df : pd.DataFrame
-        DataFrame that holds sub measurement information per each variation.
-    dev_type : str
-        Type of device we want to extract data for [nfet or pfet].
-    dev_name : str
-        Device we want to extract data for.
+    data : np.ndarray
+        Measurement data of all variations, shape (rows, variations, columns per variation).
+    tables : dict
+        Measured tables of each variation, as described in layouts/fets_cv.json.
+    dev_types : np.ndarray
+        Type of device of each variation [nfet or pfet].
     Returns
     -------
     df_cv_sweeps : pd.DataFrame
-        DataFrame that holds all extracted points for cv measurement
+        DataFrame that holds all extracted points for cv measurement, `dp_idx` holds variation of each point.
     """
 
     ## Cgc Vs Vgs [Vbs sweep]
-    df_cgc_vgs_vbs = parse_cgc_vgs_vbs(sub_df, dev_type, dev_name)
+    df_cgc_vgs_vbs = parse_cgc_vgs_vbs(data, tables["cgc_vgs_vbs"], dev_types)
 
     ## Cgg Vs Vgs [Vds sweep]
-    df_cgg_vgs_vds = parse_cgg_vgs_vds(sub_df, dev_type, dev_name)
+    df_cgg_vgs_vds = parse_cgg_vgs_vds(data, tables["cgg_vgs_vds"], dev_types)
 
     # ## Cgs Vs Vds [Vgs sweep]
-    df_cgs_vds_vgs = parse_cgs_vds_vgs(sub_df, dev_type, dev_name)
+    df_cgs_vds_vgs = parse_cgs_vds_vgs(data, tables["cgs_vds_vgs"], dev_types)
 
     # ## Cgd Vs Vds [Vgs sweep]
-    df_cgd_vds_vgs = parse_cgd_vds_vgs(sub_df, dev_type, dev_name)
+    df_cgd_vds_vgs = parse_cgd_vds_vgs(data, tables["cgd_vds_vgs"], dev_types)
 
-    df_cv_sweeps = pd.concat([df_cgc_vgs_vbs, df_cgg_vgs_vds, df_cgs_vds_vgs, df_cgd_vds_vgs])
+    df_cv_sweeps = pd.concat([df_cgc_vgs_vbs, df_cgg_vgs_vds, df_cgs_vds_vgs, df_cgd_vds_vgs], ignore_index=True)
 
     return df_cv_sweeps
 
@@ -399,10 +340,10 @@ def gen_cv_sweeps(all_dfs, dev_name):
     sweeps_df_cgs = sweeps_df_cgs.drop('out_col', axis=1)
     sweeps_df_cgd = sweeps_df_cgd.drop('out_col', axis=1)
     # Saving sweep data files to csv
-    sweeps_df_cgc.to_csv(f"{dev_name}_sweeps_cgc.csv", index=False)
-    sweeps_df_cgg.to_csv(f"{dev_name}_sweeps_cgg.csv", index=False)
-    sweeps_df_cgs.to_csv(f"{dev_name}_sweeps_cgs.csv", index=False)
-    sweeps_df_cgd.to_csv(f"{dev_name}_sweeps_cgd.csv", index=False)
+    write_extracted_data(sweeps_df_cgc, f"{dev_name}_sweeps_cgc.csv")
+    write_extracted_data(sweeps_df_cgg, f"{dev_name}_sweeps_cgg.csv")
+    write_extracted_data(sweeps_df_cgs, f"{dev_name}_sweeps_cgs.csv")
+    write_extracted_data(sweeps_df_cgd, f"{dev_name}_sweeps_cgd.csv")
     # logs for info
     logging.info(f"Number of sweep points for {dev_name}-cgc: {len(sweeps_df_cgc)}")
     logging.info(f"Number of sweep points for {dev_name}-cgc: {len(sweeps_df_cgg)}")
@@ -414,44 +355,32 @@ def gen_cv_sweeps(all_dfs, dev_name):
     logging.info(f"Sweep csv file for {dev_name}-cgd at : {dev_name}_sweeps_cgd.csv")
 
 
-def gen_cv_variations(df, dp_df, dev_name, variations_count):
+def gen_cv_variations(data, tables, dp_df, dev_name):
     """
     Function to generate full data frame of measured data with all variations.
 
     Parameters
     ----------
-    df : pd.DataFrame
-        DataFrame that holds all the measurement information for selected fet.
+    data : np.ndarray
+        Measurement data of all variations, shape (rows, variations, columns per variation).
+    tables : dict
+        Measured tables of each variation, as described in layouts/fets_cv.json.
     dp_df : pd.DataFrame
         DataFrame that holds all data points for all varaitions.
     dev_name : str
         Device we want to extract data for.
-    variations_count : float
-        Number of variations per each selected device
     Returns
     -------
         None
     """
 
-    # Get number of columns that holds measurement data for each variation
-    # Get columns names that holds data for each variation
-    num_data_col_per_dp, orig_col_names = get_orig_col_names(df, variations_count)
-
-    # Generating all data points per each variation and combining all data in one DF
-    all_dfs = []
-    no_cols_df = len(df.columns)
-    for i in range(0, no_cols_df, num_data_col_per_dp):
-        # Half data for nfet and other half for pfet
-        dev_type = 'nfet' if i < no_cols_df / 2 else 'pfet'
-        # Get sub dataframe per each sweep
-        sub_df = df[df.columns[i : i + num_data_col_per_dp]].copy()
-        sub_df.columns = orig_col_names
-        parsed_df = parse_fet_cv_sweeps(sub_df, dev_type, dev_name)
-        for c in dp_df.columns:
-            parsed_df[c] = dp_df.loc[len(all_dfs), c]
-        all_dfs.append(parsed_df)
-
-    all_dfs = pd.concat(all_dfs)
+    # Half data for nfet and other half for pfet
+    dp_df = dp_df.copy()
+    dev_types = dp_df.pop("dev_type").to_numpy()
+
+    # Generating all data points of all variations at once and adding variation data
+    all_dfs = parse_fet_cv_sweeps(data, tables, dev_types)
+    all_dfs = add_variation_data(all_dfs, dp_df)
     all_dfs.drop_duplicates(inplace=True)
 
     # Generate data file that holds all sweep values per each variation to be used in simulation
@@ -496,57 +425,15 @@ def fet_cv_meas_extraction(df: pd.DataFrame, dev_name: str):
        None
     """
 
-    # Drop any unwanted columns
-    cgc_cols = [c for c in df.columns if "Cgc (fF)" in c]
-    cgg_cols = [c for c in df.columns if "Cgg (fF)" in c]
-    cgs_cols = [c for c in df.columns if "Cgs (fF)" in c]
-    cgd_cols = [c for c in df.columns if "Cgd (fF)" in c]
-
-    unwanted_cols = ["CV"] + cgc_cols + cgg_cols + cgs_cols + cgd_cols
-
-    # Cleanup dataframe from unwanted columns we don't use
-    df = dataframe_cleanup(df, unwanted_cols)
-
-    # Get num of variations for fets depending on length values in data
-    variations_count = get_variation_count(df, "L (um)")
-
-    # For MOS-CV 03v3/06v0, There are 8 variations = 4*2 [For device_type * W_L_variation * corners * temp]
-    ## We have 2 types of MOS-CV [nfet, pfet]
-    ## We have 4 W&L combination [(200, 0.28), (100, 10), (0.22, 0.28), (0.22, 10) um]
-    ## We have 1 corners [typical]
-    ## We have 1 temperature [25]
-
-    all_temp = (
-        [25] * variations_count
-    )
-
-    # Define new data frame that holds all variations
-    dp_df = pd.DataFrame({'temp': all_temp})
-
-    # "Unnamed: 2" cols: This column holds some info related to each device [name, W&L&nf]
-    ## Example nmos_3p3 (200u x0.28u ,  nf=20,  m=1)
-    dp_df["device_data"] = df["Unnamed: 2"].copy()
-    dp_df["device_name"] = dp_df["device_data"].apply(lambda x: x.split("\n")[0])
-    dp_df["W (um)"] = dp_df["device_data"].apply(lambda x: x.split("\n")[1].split("x")[0].replace("(", "").replace("u", ""))
-    dp_df["L (um)"] = dp_df["device_data"].apply(lambda x: x.split("\n")[1].split("x")[1].split(",")[0].replace("u", ""))
-    dp_df["nf"] = dp_df["device_data"].apply(lambda x: x.split("=")[1].split(",")[0])
-    dp_df["W (um)"] = dp_df["W (um)"].astype(float)
-    dp_df["L (um)"] = dp_df["L (um)"].astype(float)
-    dp_df["nf"] = dp_df["nf"].astype(int)
-    dp_df["corner"] = df["corners"].copy()
-    dp_df.drop('device_data', axis=1, inplace=True)
-
-    # Updating devices names to match latest names for GF180MCU models
-    dp_df["device_name"] = dp_df["device_name"].apply(lambda x: x.replace("nmos", "nfet").replace("3p3", "03v3"))
-    dp_df["device_name"] = dp_df["device_name"].apply(lambda x: x.replace("pmos", "pfet").replace("6p0", "06v0"))
-    dp_df["device_name"] = dp_df["device_name"].apply(lambda x: x.replace("sab", "dss").replace("nat", "nvt"))
-
-    # Cleanup dataframe from unwanted columns we don't use
-    unwanted_cols = ["W (um)", "L (um)", 'Unnamed: 2', 'corners']
-    df = dataframe_cleanup(df, unwanted_cols)
+    # Layout of MOS-CV workbooks [unwanted columns, variations and measured tables] is described in layouts/fets_cv.json
+    ## We have 2 types of MOS-CV [nfet, pfet], 1st half of variations are nfet devices
+    ## "Unnamed: 2" column holds some info related to each device [name, W&L&nf], example nmos_3p3 (200u x0.28u ,  nf=20,  m=1)
+    ## We have 1 corners [typical] and 1 temperature [25]
+    layout = SheetLayout("fets_cv", dev_name)
+    dp_df, data, tables = layout.extract(df)
 
     # Generate the full dataframe that holds all meas data in a clean format
-    all_dfs = gen_cv_variations(df, dp_df, dev_name, variations_count)
+    all_dfs = gen_cv_variations(data, tables, dp_df, dev_name)
 
     # Writing final dataframe that holds all clean data
     all_dfs.drop_duplicates(inplace=True)
@@ -564,10 +451,10 @@ def fet_cv_meas_extraction(df: pd.DataFrame, dev_name: str):
     all_dfs_cgd = all_dfs_cgd.drop(['cgc', 'cgg', 'cgs'], axis=1)
 
     # Saving full extracted measured data to csv
-    all_dfs_cgc.to_csv(f"{dev_name}_meas_cgc.csv", index=False)
-    all_dfs_cgg.to_csv(f"{dev_name}_meas_cgg.csv", index=False)
-    all_dfs_cgs.to_csv(f"{dev_name}_meas_cgs.csv", index=False)
-    all_dfs_cgd.to_csv(f"{dev_name}_meas_cgd.csv", index=False)
+    write_extracted_data(all_dfs_cgc, f"{dev_name}_meas_cgc.csv")
+    write_extracted_data(all_dfs_cgg, f"{dev_name}_meas_cgg.csv")
+    write_extracted_data(all_dfs_cgs, f"{dev_name}_meas_cgs.csv")
+    write_extracted_data(all_dfs_cgd, f"{dev_name}_meas_cgd.csv")
 
     # logs for info
     logging.info(
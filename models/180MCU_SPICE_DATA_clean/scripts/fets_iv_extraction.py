@@ -15,27 +15,20 @@
 import pandas as pd
 import numpy as np
 import logging
-from utils import dataframe_cleanup, get_orig_col_names, get_variation_count
+from utils import get_sweep_steps, add_variation_data, write_extracted_data
+from sheet_layout import SheetLayout
 
-# CONSTANT VALUES
-## These values are manually selected after some analysis
-## for provided measuremnet data.
-# === FETS-IV ===
-NUM_DP_PER_TEMP_FET_03V3 = 25
-NUM_DP_PER_TEMP_FET_06V0_NVT = 12
-NUM_DP_PER_TEMP_FET_06V0 = 20
-NUM_COLS_MEAS_VBS = 7
-NUM_COLS_MEAS_VGS = 8
 
-
-def parse_dp_id_vgs_vbs(sub_df, dev_name):
+def parse_dp_id_vgs_vbs(data, table, dev_name):
     """
     Function to parse measurement data for Ids Vs Vgs with Vbs sweep to be used in simulation.
 
     Parameters
     ----------
-    sub_df : pd.DataFrame
-        DataFrame that holds sub measurement information per each variation.
+    data : np.ndarray
+        Measurement data of all variations, shape (rows, variations, columns per variation).
+    table : SheetTable
+        Id Vs Vgs table of each variation, as described in layouts/fets_iv.json.
     dev_name : str
         Device we want to extract data for.
     Returns
@@ -45,34 +38,27 @@ def parse_dp_id_vgs_vbs(sub_df, dev_name):
     """
 
     ## Id Vs Vgs [Vbs sweep]
-    df_id_vgs_vbs = sub_df.iloc[:, :NUM_COLS_MEAS_VBS]
-    vds_df_id_vgs_vbs = float(df_id_vgs_vbs.columns[0].split("/")[0].split("=")[1])
-    df_id_vgs_vbs.drop(columns=df_id_vgs_vbs.columns[0], inplace=True)
+    vds_df_id_vgs_vbs = table.const_value
 
     # Get vgs sweep values
-    vgs_col_name = "vgs " if "nfet" in dev_name else "-vgs "
+    vgs_vals = table.x_values(data)
     # Get Vgs step value
-    vgs_step_val = abs(df_id_vgs_vbs[vgs_col_name][1] - df_id_vgs_vbs[vgs_col_name][0])
-
-    # Stacking all vbs sweeps in one column
-    df_id_vgs_vbs = (
-        df_id_vgs_vbs.set_index([vgs_col_name])
-        .stack()
-        .reset_index(name="id")
-        .rename(columns={"level_1": "vbs"})
-        .rename(columns={vgs_col_name: "vgs"})
-    )
+    vgs_step_val = np.abs(vgs_vals[1] - vgs_vals[0])
 
     # Multiplying vgs by -1 for pfet devices to match provided data
-    df_id_vgs_vbs["vgs"] = df_id_vgs_vbs["vgs"].apply(lambda x: x * -1) if "pfet" in dev_name else df_id_vgs_vbs["vgs"]
+    vgs_vals = vgs_vals * -1 if "pfet" in dev_name else vgs_vals
 
     # Get min/max values of vgs sweep
-    vgs_min_val = df_id_vgs_vbs["vgs"].min()
-    vgs_max_val = df_id_vgs_vbs["vgs"].max()
+    vgs_min_val = np.nanmin(vgs_vals, axis=0)
+    vgs_max_val = np.nanmax(vgs_vals, axis=0)
+
+    # Stacking all vbs sweeps in one column
+    df_id_vgs_vbs = table.stack(data)
+    dp_idx = df_id_vgs_vbs["dp_idx"].to_numpy()
+    if "pfet" in dev_name:
+        df_id_vgs_vbs["vgs"] = df_id_vgs_vbs["vgs"] * -1
 
     # Adding columns for all voltage sweeps and output
-    df_id_vgs_vbs["vbs"] = df_id_vgs_vbs["vbs"].apply(lambda x: x.split("=")[1])
-    df_id_vgs_vbs["vbs"] = df_id_vgs_vbs["vbs"].astype(float)
     df_id_vgs_vbs["vds"] = vds_df_id_vgs_vbs
     df_id_vgs_vbs["rds"] = np.nan
     df_id_vgs_vbs["const_var"] = "vds"
@@ -80,26 +66,30 @@ def parse_dp_id_vgs_vbs(sub_df, dev_name):
     df_id_vgs_vbs["out_col"] = "id"
 
     # Get vgs sweep values
-    vbs_min_val = df_id_vgs_vbs["vbs"].min()
-    vbs_max_val = df_id_vgs_vbs["vbs"].max()
-    vbs_step_val = abs(df_id_vgs_vbs["vbs"][1] - df_id_vgs_vbs["vbs"][0])
+    vbs_min_val = np.min(table.y_values)
+    vbs_max_val = np.max(table.y_values)
+    vbs_step_val = get_sweep_steps(df_id_vgs_vbs, "vbs", data.shape[1])
 
     # Adding sweeps used per each variation
-    df_id_vgs_vbs[
-        "sweeps"
-    ] = f"vgs {vgs_min_val} {vgs_max_val} {vgs_step_val} vbs {vbs_min_val} {vbs_max_val} {vbs_step_val}"
+    sweeps = [
+        f"vgs {vgs_min_val[i]} {vgs_max_val[i]} {vgs_step_val[i]} vbs {vbs_min_val} {vbs_max_val} {vbs_step_val[i]}"
+        for i in range(data.shape[1])
+    ]
+    df_id_vgs_vbs["sweeps"] = np.array(sweeps, dtype=object)[dp_idx]
 
     return df_id_vgs_vbs
 
 
-def parse_dp_id_vds_vgs(sub_df, dev_name):
+def parse_dp_id_vds_vgs(data, table, dev_name):
     """
     Function to parse measurement data for Ids Vs Vds with Vgs sweep to be used in simulation.
 
     Parameters
     ----------
-    sub_df : pd.DataFrame
-        DataFrame that holds sub measurement information per each variation.
+    data : np.ndarray
+        Measurement data of all variations, shape (rows, variations, columns per variation).
+    table : SheetTable
+        Id Vs Vds table of each variation, as described in layouts/fets_iv.json.
     dev_name : str
         Device we want to extract data for.
 
@@ -110,37 +100,28 @@ def parse_dp_id_vds_vgs(sub_df, dev_name):
     """
 
     ## Id Vs Vds [Vgs sweep]
-    df_id_vds_vgs = sub_df.iloc[
-        :, NUM_COLS_MEAS_VBS : NUM_COLS_MEAS_VBS + NUM_COLS_MEAS_VGS
-    ]
-    vbs_df_id_vds_vgs = float(df_id_vds_vgs.columns[0].split("/")[0].split("=")[1])
-    df_id_vds_vgs.drop(columns=df_id_vds_vgs.columns[0], inplace=True)
+    vbs_df_id_vds_vgs = table.const_value
 
     # Get vds sweep values
-    vgs_col_name = "vds (V)" if "nfet" in dev_name else "-vds (V)"
+    vds_vals = table.x_values(data)
 
     # Get vds step vaule used in sweep
-    vds_step_val = abs(df_id_vds_vgs[vgs_col_name][1] - df_id_vds_vgs[vgs_col_name][0])
-
-    # Stacking all vgs sweeps in one column
-    df_id_vds_vgs = (
-        df_id_vds_vgs.set_index([vgs_col_name])
-        .stack()
-        .reset_index(name="id")
-        .rename(columns={"level_1": "vgs"})
-        .rename(columns={vgs_col_name: "vds"})
-    )
+    vds_step_val = np.abs(vds_vals[1] - vds_vals[0])
 
     # Multiplying vds by -1 for pfet devices to match provided data
-    df_id_vds_vgs["vds"] = df_id_vds_vgs["vds"].apply(lambda x: x * -1) if "pfet" in dev_name else df_id_vds_vgs["vds"]
+    vds_vals = vds_vals * -1 if "pfet" in dev_name else vds_vals
 
     # Get vds min/max values used in sweep
-    vds_min_val = df_id_vds_vgs["vds"].min()
-    vds_max_val = df_id_vds_vgs["vds"].max()
+    vds_min_val = np.nanmin(vds_vals, axis=0)
+    vds_max_val = np.nanmax(vds_vals, axis=0)
+
+    # Stacking all vgs sweeps in one column
+    df_id_vds_vgs = table.stack(data)
+    dp_idx = df_id_vds_vgs["dp_idx"].to_numpy()
+    if "pfet" in dev_name:
+        df_id_vds_vgs["vds"] = df_id_vds_vgs["vds"] * -1
 
     # Adding columns for all voltage sweeps and output
-    df_id_vds_vgs["vgs"] = df_id_vds_vgs["vgs"].apply(lambda x: x.split("=")[1])
-    df_id_vds_vgs["vgs"] = df_id_vds_vgs["vgs"].astype(float)
     df_id_vds_vgs["vbs"] = vbs_df_id_vds_vgs
     df_id_vds_vgs["rds"] = np.nan
     df_id_vds_vgs["const_var"] = "vbs"
@@ -148,26 +129,30 @@ def parse_dp_id_vds_vgs(sub_df, dev_name):
     df_id_vds_vgs["out_col"] = "id"
 
     # Get vgs sweep values
-    vgs_min_val = df_id_vds_vgs["vgs"].min()
-    vgs_max_val = df_id_vds_vgs["vgs"].max()
-    vgs_step_val = abs(df_id_vds_vgs["vgs"][1] - df_id_vds_vgs["vgs"][0])
+    vgs_min_val = np.min(table.y_values)
+    vgs_max_val = np.max(table.y_values)
+    vgs_step_val = get_sweep_steps(df_id_vds_vgs, "vgs", data.shape[1])
 
     # Adding sweeps used per each variation
-    df_id_vds_vgs[
-        "sweeps"
-    ] = f"vds {vds_min_val} {vds_max_val} {vds_step_val} vgs {vgs_min_val} {vgs_max_val} {vgs_step_val}"
+    sweeps = [
+        f"vds {vds_min_val[i]} {vds_max_val[i]} {vds_step_val[i]} vgs {vgs_min_val} {vgs_max_val} {vgs_step_val[i]}"
+        for i in range(data.shape[1])
+    ]
+    df_id_vds_vgs["sweeps"] = np.array(sweeps, dtype=object)[dp_idx]
 
     return df_id_vds_vgs
 
 
-def parse_dp_rds_vds_vgs(sub_df, dev_name):
+def parse_dp_rds_vds_vgs(data, table, dev_name):
     """
     Function to parse measurement data for Rds Vs Vds with Vgs sweep to be used in simulation.
 
     Parameters
     ----------
-    sub_df : pd.DataFrame
-        DataFrame that holds sub measurement information per each variation.
+    data : np.ndarray
+        Measurement data of all variations, shape (rows, variations, columns per variation).
+    table : SheetTable
+        Rds Vs Vds table of each variation, as described in layouts/fets_iv.json.
     dev_name : str
         Device we want to extract data for.
     Returns
@@ -177,37 +162,27 @@ def parse_dp_rds_vds_vgs(sub_df, dev_name):
     """
 
     ## Rds Vs Vds [Vgs sweep]
-    df_rds_vds_vgs = sub_df.iloc[:, -NUM_COLS_MEAS_VGS:]
-
-    vbs_df_rds_vds_vgs = float(df_rds_vds_vgs.columns[0].split("/")[0].split("=")[1])
-    df_rds_vds_vgs.drop(columns=df_rds_vds_vgs.columns[0], inplace=True)
+    vbs_df_rds_vds_vgs = table.const_value
 
     # Get vds sweep values
-    vgs_col_name = "vds (V).1" if "nfet" in dev_name else "-vds (V).1"
+    vds_vals = table.x_values(data)
 
-    vds_step_val = abs(df_rds_vds_vgs[vgs_col_name][1] - df_rds_vds_vgs[vgs_col_name][0])
-
-    # Stacking all vgs sweeps in one column
-    df_rds_vds_vgs = (
-        df_rds_vds_vgs.set_index([vgs_col_name])
-        .stack()
-        .reset_index(name="rds")
-        .rename(columns={"level_1": "vgs"})
-        .rename(columns={vgs_col_name: "vds"})
-    )
+    vds_step_val = np.abs(vds_vals[1] - vds_vals[0])
 
     # Multiplying vds by -1 for pfet devices to match provided data
-    df_rds_vds_vgs["vds"] = df_rds_vds_vgs["vds"].apply(lambda x: x * -1) if "pfet" in dev_name else df_rds_vds_vgs["vds"]
+    vds_vals = vds_vals * -1 if "pfet" in dev_name else vds_vals
 
     # Get min/max values for vds sweeps
-    vds_min_val = df_rds_vds_vgs["vds"].min()
-    vds_max_val = df_rds_vds_vgs["vds"].max()
+    vds_min_val = np.nanmin(vds_vals, axis=0)
+    vds_max_val = np.nanmax(vds_vals, axis=0)
+
+    # Stacking all vgs sweeps in one column
+    df_rds_vds_vgs = table.stack(data)
+    dp_idx = df_rds_vds_vgs["dp_idx"].to_numpy()
+    if "pfet" in dev_name:
+        df_rds_vds_vgs["vds"] = df_rds_vds_vgs["vds"] * -1
 
     # Adding columns for all voltage sweeps and output
-    df_rds_vds_vgs["vgs"] = df_rds_vds_vgs["vgs"].apply(
-        lambda x: ".".join(x.split("=")[1].split(".")[:-1])
-    )
-    df_rds_vds_vgs["vgs"] = df_rds_vds_vgs["vgs"].astype(float)
     df_rds_vds_vgs["vbs"] = vbs_df_rds_vds_vgs
     df_rds_vds_vgs["id"] = np.nan
     df_rds_vds_vgs["const_var"] = "vbs"
@@ -215,13 +190,15 @@ def parse_dp_rds_vds_vgs(sub_df, dev_name):
     df_rds_vds_vgs["out_col"] = "rds"
 
     # Get vgs sweep values
-    vgs_min_val = df_rds_vds_vgs["vgs"].min()
-    vgs_max_val = df_rds_vds_vgs["vgs"].max()
-    vgs_step_val = abs(df_rds_vds_vgs["vgs"][1] - df_rds_vds_vgs["vgs"][0])
+    vgs_min_val = np.min(table.y_values)
+    vgs_max_val = np.max(table.y_values)
+    vgs_step_val = get_sweep_steps(df_rds_vds_vgs, "vgs", data.shape[1])
 
-    df_rds_vds_vgs[
-        "sweeps"
-    ] = f"vds {vds_min_val} {vds_max_val} {vds_step_val} vgs {vgs_min_val} {vgs_max_val} {vgs_step_val}"
+    sweeps = [
+        f"vds {vds_min_val[i]} {vds_max_val[i]} {vds_step_val[i]} vgs {vgs_min_val} {vgs_max_val} {vgs_step_val[i]}"
+        for i in range(data.shape[1])
+    ]
+    df_rds_vds_vgs["sweeps"] = np.array(sweeps, dtype=object)[dp_idx]
 
     return df_rds_vds_vgs
 
@@ -263,79 +240,68 @@ def generate_fets_sweeps(all_dfs, dev_name):
     sweeps_df_id = sweeps_df_id.drop('out_col', axis=1)
     sweeps_df_rds = sweeps_df_rds.drop('out_col', axis=1)
     # Saving sweep data files to csv
-    sweeps_df_id.to_csv(f"{dev_name}_sweeps_id.csv", index=False)
-    sweeps_df_rds.to_csv(f"{dev_name}_sweeps_rds.csv", index=False)
+    write_extracted_data(sweeps_df_id, f"{dev_name}_sweeps_id.csv")
+    write_extracted_data(sweeps_df_rds, f"{dev_name}_sweeps_rds.csv")
     logging.info(f"Sweep csv file for {dev_name}: {sweeps_df}")
     logging.info(f"Number of sweep points for {dev_name}: {len(sweeps_df)}")
     logging.info(f"Sweep csv file for {dev_name} at : {sweeps_df}_sweeps.csv")
 
 
-def parse_fet_iv_sweeps(sub_df, dev_name):
+def parse_fet_iv_sweeps(data, tables, dev_name):
     """
     Function to parse measurement data to be used in simulation.
 
     Parameters
     ----------
-    sub_df : pd.DataFrame
-        DataFrame that holds sub measurement information per each variation.
+    data : np.ndarray
+        Measurement data of all variations, shape (rows, variations, columns per variation).
+    tables : dict
+        Measured tables of each variation, as described in layouts/fets_iv.json.
     dev_name : str
         Device we want to extract data for.
     Returns
     -------
     df_dp_sweeps : pd.DataFrame
-        DataFrame that holds all extracted points for all sweeps.
+        DataFrame that holds all extracted points for all sweeps, `dp_idx` holds variation of each point.
     """
 
     ## Id Vs Vgs [Vbs sweep]
-    df_id_vgs_vbs = parse_dp_id_vgs_vbs(sub_df, dev_name)
+    df_id_vgs_vbs = parse_dp_id_vgs_vbs(data, tables["id_vgs_vbs"], dev_name)
 
     ## Id Vs Vds [Vgs sweep]
-    df_id_vds_vgs = parse_dp_id_vds_vgs(sub_df, dev_name)
+    df_id_vds_vgs = parse_dp_id_vds_vgs(data, tables["id_vds_vgs"], dev_name)
 
     ## Rds Vs Vds [Vgs sweep]
-    df_rds_vds_vgs = parse_dp_rds_vds_vgs(sub_df, dev_name)
+    df_rds_vds_vgs = parse_dp_rds_vds_vgs(data, tables["rds_vds_vgs"], dev_name)
 
-    df_dp_sweeps = pd.concat([df_id_vgs_vbs, df_id_vds_vgs, df_rds_vds_vgs])
+    df_dp_sweeps = pd.concat([df_id_vgs_vbs, df_id_vds_vgs, df_rds_vds_vgs], ignore_index=True)
 
     return df_dp_sweeps
 
 
-def generate_fets_iv_variations(df, dp_df, dev_name, variations_count):
+def generate_fets_iv_variations(data, tables, dp_df, dev_name):
     """
     Function to generate full data frame of measured data with all variations.
 
     Parameters
     ----------
-    df : pd.DataFrame
-        DataFrame that holds all the measurement information for selected fet.
+    data : np.ndarray
+        Measurement data of all variations, shape (rows, variations, columns per variation).
+    tables : dict
+        Measured tables of each variation, as described in layouts/fets_iv.json.
     dp_df : pd.DataFrame
         DataFrame that holds all data points for all varaitions.
     dev_name : str
         Device we want to extract data for.
-    variations_count : float
-        Number of variations per each selected device
     Returns
     -------
         None
     """
 
-    # Get number of columns that holds measurement data for each variation
-    # Get columns names that holds data for each variation
-    num_data_col_per_dp, orig_col_names = get_orig_col_names(df, variations_count)
-
-    # Generating all data points per each variation and combining all data in one DF
-    all_dfs = []
-    for i in range(0, len(df.columns), num_data_col_per_dp):
-        sub_df = df[df.columns[i : i + num_data_col_per_dp]].copy()
-        sub_df.columns = orig_col_names
-        parsed_df = parse_fet_iv_sweeps(sub_df, dev_name)
-        for c in dp_df.columns:
-            parsed_df[c] = dp_df.loc[len(all_dfs), c]
-        all_dfs.append(parsed_df)
-
-    all_dfs = pd.concat(all_dfs)
+    # Generating all data points of all variations at once and adding variation data
+    all_dfs = parse_fet_iv_sweeps(data, tables, dev_name)
+    all_dfs = add_variation_data(all_dfs, dp_df)
     all_dfs.drop_duplicates(inplace=True)
-    all_dfs.rename(columns={"corners": "corner"}, inplace=True)
 
     # Generate data file that holds all sweep values per each variation to be used in simulation
     generate_fets_sweeps(all_dfs, dev_name)
@@ -379,40 +345,13 @@ def fet_iv_meas_extraction(df: pd.DataFrame, dev_name: str):
         None
     """
 
-    # Drop any unwanted columns
-    id_cols = [c for c in df.columns if "Id (A)" in c]
-    rd_cols = [c for c in df.columns if "Rds" in c]
-    unwanted_cols = ["Unnamed: 2", "Ids"] + id_cols + rd_cols
-
-    # Cleanup dataframe from unwanted columns we don't use
-    df = dataframe_cleanup(df, unwanted_cols)
-
-    # Get num of variations for fets depending on length values in data
-    variations_count = get_variation_count(df, "L (um)")
-
-    # For Fets 03v3, There are 75 variations = 25*3 [For each temp] and all variations are extracted at tt corner
-    ## For Fets 06v0, There are 60 variations = 20*3 [For each temp] and all variations are extracted at tt corner
-    ## For Fets 06v0_nvt, There are 36 variations = 12*3 [For each temp] and all variations are extracted at tt corner
-    ## Please note that the temp variation wasn't included in dataset so we will have to add that new column
-    if "03v3" in dev_name:
-        NUM_DP_PER_TEMP = NUM_DP_PER_TEMP_FET_03V3
-    elif "06v0_nvt" in dev_name:
-        NUM_DP_PER_TEMP = NUM_DP_PER_TEMP_FET_06V0_NVT
-    else:
-        NUM_DP_PER_TEMP = NUM_DP_PER_TEMP_FET_06V0
-
-    all_temp = (
-        [25] * NUM_DP_PER_TEMP + [-40] * NUM_DP_PER_TEMP + [125] * NUM_DP_PER_TEMP
-    )
-
-    # Define new data frame that holds all variations
-    dp_cols = ["W (um)", "L (um)", "corners"]
-    dp_df = df[dp_cols].iloc[:variations_count].copy()
-    dp_df["temp"] = all_temp
-    df.drop(columns=dp_cols, inplace=True)
+    # Layout of MOS-IV workbooks [unwanted columns, variations and measured tables] is described in layouts/fets_iv.json
+    ## Temperature isn't included in dataset, 1st third of variations are at 25C, then -40C and 125C
+    layout = SheetLayout("fets_iv", dev_name)
+    dp_df, data, tables = layout.extract(df)
 
     # Generate the full dataframe that holds all meas data in a clean format
-    all_dfs = generate_fets_iv_variations(df, dp_df, dev_name, variations_count)
+    all_dfs = generate_fets_iv_variations(data, tables, dp_df, dev_name)
 
     # Writing final dataframe that holds all clean data
     all_dfs.drop_duplicates(inplace=True)
@@ -424,8 +363,8 @@ def fet_iv_meas_extraction(df: pd.DataFrame, dev_name: str):
     all_dfs_id = all_dfs_id.drop('rds', axis=1)
     all_dfs_rds = all_dfs_rds.drop('id', axis=1)
     # Saving full extracted measured data to csv
-    all_dfs_id.to_csv(f"{dev_name}_meas_id.csv", index=False)
-    all_dfs_rds.to_csv(f"{dev_name}_meas_rds.csv", index=False)
+    write_extracted_data(all_dfs_id, f"{dev_name}_meas_id.csv")
+    write_extracted_data(all_dfs_rds, f"{dev_name}_meas_rds.csv")
     logging.info(f"Full extracted measurement data for {dev_name}:\n {all_dfs}")
     logging.info(
         f"Full extracted measurement data for {dev_name} at: {dev_name}_meas.csv"
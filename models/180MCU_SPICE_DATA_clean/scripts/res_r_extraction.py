@@ -14,6 +14,8 @@
 
 import pandas as pd
 import logging
+from utils import write_extracted_data
+from sheet_layout import SheetLayout
 
 # CONSTANT VALUES
 ## These values are manually selected after some analysis
@@ -38,24 +40,8 @@ def ext_const_temp_corners(df: pd.DataFrame, dev_name: str) -> pd.DataFrame:
        None
     """
 
-    # Process corners measured in RES-R
-    corners = ["typical", "ff", "ss"]
-
-    all_dfs = []
-    for corner in corners:
-        idf = df[["l (um)", "w (um)", f"res_{corner} Rev9 "]].copy()
-        idf.rename(
-            columns={
-                f"res_{corner} Rev9 ": "res",
-                "l (um)": "length",
-                "w (um)": "width",
-            },
-            inplace=True,
-        )
-        idf["corner"] = corner
-        all_dfs.append(idf)
-
-    df = pd.concat(all_dfs)
+    # Process corners measured in RES-R, corner columns are described in layouts/res_wl.json
+    df = SheetLayout("res_wl", dev_name).stack_columns(df)
     df["temp"] = DEFAULT_TEMP
     df["device"] = dev_name
     df["voltage"] = DEFAULT_VOLTAGE
@@ -64,7 +50,7 @@ def ext_const_temp_corners(df: pd.DataFrame, dev_name: str) -> pd.DataFrame:
 
     # Writing final dataframe that holds all clean data
     df.drop_duplicates(inplace=True)
-    df.to_csv(f"{dev_name}_res_wl_meas.csv", index=False)
+    write_extracted_data(df, f"{dev_name}_res_wl_meas.csv")
     logging.info(f"Full extracted measurement data for {dev_name}-r with W&L variation:\n {df}")
     logging.info(
         f"Full extracted measurement data for {dev_name}-r with W&L variation at: {dev_name}_res_wl_meas.csv"
@@ -86,27 +72,8 @@ def ext_temp_corners(df: pd.DataFrame, dev_name: str) -> pd.DataFrame:
        None
     """
 
-    # Process corners measured in RES-R
-    corners = ["typical", "ff", "ss"]
-
-    all_dfs = []
-    for corner in corners:
-        idf = df[
-            ["Temperature (C)", "l (um)", "Unnamed: 2", f"res_{corner} Rev9 "]
-        ].copy()
-        idf.rename(
-            columns={
-                f"res_{corner} Rev9 ": "res",
-                "l (um)": "length",
-                "Unnamed: 2": "info",
-                "Temperature (C)": "temp",
-            },
-            inplace=True,
-        )
-        idf["corner"] = corner
-        all_dfs.append(idf)
-
-    df = pd.concat(all_dfs)
+    # Process corners measured in RES-R, corner columns are described in layouts/res_temp.json
+    df = SheetLayout("res_temp", dev_name).stack_columns(df)
     df["width"] = df["info"].str.extract(r"w=([\d\.]+)").astype(float)
     df["device"] = dev_name
     df["voltage"] = DEFAULT_VOLTAGE
@@ -115,7 +82,7 @@ def ext_temp_corners(df: pd.DataFrame, dev_name: str) -> pd.DataFrame:
 
     # Writing final dataframe that holds all clean data
     df.drop_duplicates(inplace=True)
-    df.to_csv(f"{dev_name}_res_temp_meas.csv", index=False)
+    write_extracted_data(df, f"{dev_name}_res_temp_meas.csv")
     logging.info(f"Full extracted measurement data for {dev_name}-r with temp variation:\n {df}")
     logging.info(
         f"Full extracted measurement data for {dev_name}-r with temp variation at: {dev_name}_res_temp_meas.csv"
@@ -0,0 +1,395 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+import json
+import logging
+import functools
+import numpy as np
+import pandas as pd
+from utils import get_variation_blocks, get_header_values, stack_variation_blocks
+
+# CONSTANT VALUES
+LAYOUTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "layouts")
+
+
+@functools.lru_cache(maxsize=None)
+def load_layout(family: str) -> dict:
+    """
+    Function to load the layout schema of a workbook family from `layouts/<family>.json`.
+
+    Parameters
+    ----------
+    family : str
+        Name of workbook family [e.g. fets_iv, cap_cv].
+    Returns
+    -------
+    dict
+        Layout schema as written in the json file.
+    """
+
+    with open(os.path.join(LAYOUTS_DIR, f"{family}.json")) as f:
+        return json.load(f)
+
+
+def resolve_device_values(value, dev_name: str):
+    """
+    Function to select device dependent values of a layout schema.
+
+    Values written as {"by_device": {"pfet": ..., "default": ...}} are replaced by
+    the first entry whose key is part of the device name, or by "default" entry.
+
+    Parameters
+    ----------
+    value : object
+        Schema value, nested dicts and lists are resolved recursively.
+    dev_name : str
+        Device we want to extract data for.
+    Returns
+    -------
+    object
+        Schema value with device dependent entries selected for this device.
+    """
+
+    if isinstance(value, list):
+        return [resolve_device_values(v, dev_name) for v in value]
+
+    if not isinstance(value, dict):
+        return value
+
+    if "by_device" in value:
+        choices = value["by_device"]
+        key = next((k for k in choices if k != "default" and k in dev_name), "default")
+        if key not in choices:
+            raise ValueError(f"No layout value for {dev_name} in {choices}")
+        return resolve_device_values(choices[key], dev_name)
+
+    return {k: resolve_device_values(v, dev_name) for k, v in value.items()}
+
+
+def replace_values(values: pd.Series, replacements: list) -> pd.Series:
+    """
+    Function to apply ordered (old, new) string replacements to a column.
+
+    Parameters
+    ----------
+    values : pd.Series
+        String column to be updated.
+    replacements : list
+        List of [old, new] pairs, applied in order to each value.
+    Returns
+    -------
+    pd.Series
+        Updated column.
+    """
+
+    for old, new in replacements:
+        values = values.str.replace(old, new, regex=False)
+    return values
+
+
+class SheetTable:
+    """
+    One measured table repeated in the column block of each variation.
+
+    A table is a fixed-width slice of the variation block, it has a swept
+    column [x], one output column per value of a second sweep [y] with the
+    sweep value written in the column name, and optionally a first column
+    whose name holds a constant bias [e.g. "vds=0.05/Vs=0"]. Column
+    positions and sweep values are computed once from column names, then
+    applied to all variations at once.
+    """
+
+    def __init__(self, spec: dict, start: int, col_names: pd.Index):
+        """
+        Parameters
+        ----------
+        spec : dict
+            Table entry of the layout schema, device dependent values already resolved.
+        start : int
+            Position of the first column of the table in the variation block.
+        col_names : pd.Index
+            Column names of the table in the variation block.
+        """
+
+        self.name = spec["name"]
+        self.start = start
+        self.x_name = spec["x"]["name"]
+        self.y_name = spec["y"]["name"]
+        self.out_name = spec["out"]
+        self.const_name = spec.get("const")
+
+        # Constant bias is written in the first column name [e.g. "vbs=0/Vs=0" -> 0]
+        first_col = 0
+        self.const_value = None
+        if self.const_name:
+            self.const_value = float(col_names[0].split("/")[0].split("=")[1])
+            first_col = 1
+
+        self.x_idx = start + col_names.get_loc(spec["x"]["column"])
+        self.y_idx = [start + i for i in range(first_col, len(col_names)) if start + i != self.x_idx]
+
+        y_cols = col_names[[i - start for i in self.y_idx]]
+        if spec["y"].get("type", "float") == "float":
+            self.y_values = get_header_values(y_cols, spec["y"]["header"])
+        else:
+            self.y_values = y_cols.to_series().str.extract(spec["y"]["header"])[0].to_numpy(dtype=object)
+
+    def x_values(self, data: np.ndarray) -> np.ndarray:
+        """
+        Function to get swept values of all variations.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            Measurement data of all variations, shape (rows, variations, columns per variation).
+        Returns
+        -------
+        np.ndarray
+            Swept values of shape (rows, variations).
+        """
+
+        return data[:, :, self.x_idx]
+
+    def stack(self, data: np.ndarray, dropna: bool = True) -> pd.DataFrame:
+        """
+        Function to stack measured points of all variations in one table.
+
+        Points are ordered by variation, swept value then second sweep value,
+        the same as `set_index(x).stack()` of each variation block.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            Measurement data of all variations, shape (rows, variations, columns per variation).
+        dropna : bool
+            Drop points without measured output, as done by `stack()` before pandas 3.
+        Returns
+        -------
+        pd.DataFrame
+            Measured points with `dp_idx` holding variation of each point.
+        """
+
+        dp_idx, x_pos, y_pos, values = stack_variation_blocks(data, self.x_idx, self.y_idx)
+        if dropna:
+            keep = ~np.isnan(values)
+            dp_idx, x_pos, y_pos, values = dp_idx[keep], x_pos[keep], y_pos[keep], values[keep]
+
+        return pd.DataFrame(
+            {
+                "dp_idx": dp_idx,
+                self.x_name: data[x_pos, dp_idx, self.x_idx],
+                self.y_name: self.y_values[y_pos],
+                self.out_name: values,
+            }
+        )
+
+
+class SheetLayout:
+    """
+    Layout of a workbook family compiled for one device.
+
+    The schema describes columns to be dropped, how variations are counted
+    and described [W, L, corner, temp, ...], and the tables held by the
+    column block of each variation. See `layouts/README.md` for the format.
+    """
+
+    def __init__(self, family: str, dev_name: str):
+        """
+        Parameters
+        ----------
+        family : str
+            Name of workbook family [e.g. fets_iv, cap_cv].
+        dev_name : str
+            Device we want to extract data for.
+        """
+
+        self.family = family
+        self.dev_name = dev_name
+        self.schema = resolve_device_values(load_layout(family), dev_name)
+
+    def cleanup(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Function to drop empty columns and columns of the sheet that aren't used.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Measured data provided by foundry.
+        Returns
+        -------
+        pd.DataFrame
+            Sheet without unused columns.
+        """
+
+        df = df.loc[:, ~df.isna().all().to_numpy()]
+
+        patterns = [re.compile(p) for p in self.schema.get("drop_columns_matching", [])]
+        matched = [c for c in df.columns if any(p.search(str(c)) for p in patterns)]
+
+        return df.drop(columns=self.schema.get("drop_columns", []) + matched)
+
+    def variations(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Function to get data of each variation from first rows of the sheet.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Sheet after cleanup.
+        Returns
+        -------
+        dp_df : pd.DataFrame
+            One row per variation, in the order of column blocks.
+        """
+
+        spec = self.schema["variations"]
+        if "count_column" in spec:
+            variations_count = int(df[spec["count_column"]].count())
+        else:
+            variations_count = int(spec["count"])
+        logging.info(f"No of variations are {variations_count}")
+
+        dp_df = pd.DataFrame(index=pd.RangeIndex(variations_count))
+
+        # Variation axes written by position [e.g. temp of 1st, 2nd and 3rd third of variations]
+        for axis in spec.get("axes", []):
+            values = axis["values"]
+            if variations_count % len(values):
+                raise ValueError(f"{variations_count} variations can't be split on {axis['name']} values {values}")
+            repeat = variations_count // len(values)
+            if axis.get("order", "outer") == "outer":
+                dp_df[axis["name"]] = np.repeat(values, repeat)
+            else:
+                dp_df[axis["name"]] = np.tile(values, repeat)
+
+        first_rows = df.iloc[:variations_count].reset_index(drop=True)
+        for col, name in spec.get("columns", {}).items():
+            dp_df[name] = first_rows[col]
+
+        # Variation data written as text [e.g. "nmos_3p3\n(200u x0.28u ,  nf=20,  m=1)"]
+        for parse in spec.get("parse", []):
+            text = first_rows[parse["column"]]
+            for name, field in parse["fields"].items():
+                values = text.str.extract(field["regex"])[0]
+                dp_df[name] = values.astype(field["type"]) if field.get("type", "str") != "str" else values
+
+        for name, replacements in spec.get("replace", {}).items():
+            dp_df[name] = replace_values(dp_df[name], replacements)
+
+        return dp_df
+
+    def info_columns(self) -> list:
+        """
+        Function to get sheet columns holding variation data, they are dropped before reading tables.
+
+        Returns
+        -------
+        list
+            Column names.
+        """
+
+        spec = self.schema["variations"]
+        return (
+            list(spec.get("columns", {}))
+            + [p["column"] for p in spec.get("parse", [])]
+            + spec.get("drop_columns", [])
+        )
+
+    def compile(self, col_names: pd.Index) -> dict:
+        """
+        Function to compute position of all tables in the variation block.
+
+        Tables follow each other in the block unless `start` is given, a
+        negative start counts from the end of the block.
+
+        Parameters
+        ----------
+        col_names : pd.Index
+            Column names of the first variation block.
+        Returns
+        -------
+        dict
+            SheetTable per table name.
+        """
+
+        tables = {}
+        start = 0
+        for spec in self.schema["tables"]:
+            start = spec.get("start", start)
+            if start < 0:
+                start += len(col_names)
+            width = spec.get("width", len(col_names) - start)
+
+            # Tables repeated in the block [e.g. Ic and Ib tables] are read with the names of the first one
+            header_start = tables[spec["headers_from"]].start if "headers_from" in spec else start
+
+            tables[spec["name"]] = SheetTable(spec, start, col_names[header_start : header_start + width])
+            start += width
+
+        return tables
+
+    def extract(self, df: pd.DataFrame):
+        """
+        Function to read variations and measured tables of a workbook sheet.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Measured data provided by foundry.
+        Returns
+        -------
+        dp_df : pd.DataFrame
+            One row per variation.
+        data : np.ndarray
+            Measurement data of all variations, shape (rows, variations, columns per variation).
+        tables : dict
+            SheetTable per table name.
+        """
+
+        df = self.cleanup(df)
+        dp_df = self.variations(df)
+
+        df = df.drop(columns=self.info_columns())
+        df = df.loc[:, ~df.isna().all().to_numpy()]
+
+        data, col_names = get_variation_blocks(df, len(dp_df))
+
+        return dp_df, data, self.compile(col_names)
+
+    def stack_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Function to read sheets with one row per variation and one column per corner [e.g. RES-R].
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Measured data provided by foundry.
+        Returns
+        -------
+        pd.DataFrame
+            One row per variation and corner, corners are concatenated in schema order.
+        """
+
+        spec = self.schema["columns"]
+        id_cols = spec["id_columns"]
+        value_cols = spec["values"]["columns"]
+
+        rows = np.tile(np.arange(len(df)), len(value_cols))
+        stacked_df = df[list(id_cols)].iloc[rows].rename(columns=id_cols)
+        stacked_df[spec["values"]["out"]] = np.concatenate([df[c].to_numpy() for c in value_cols])
+        stacked_df[spec["values"]["name"]] = np.repeat(list(value_cols.values()), len(df))
+
+        return stacked_df
@@ -13,108 +13,234 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import sys
 import logging
+import numpy as np
+import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from gf180_regress.sweeps import add_typed_sweeps  # noqa: E402
 
-def dataframe_cleanup(df, unwanted_cols):
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+
+def get_orig_col_names(df, variations_count):
     """
-    Function to clean data frame from unwanted cols.
+    Function to get original columns names for dataframe and number of columns per variation.
 
     Parameters
     ----------
     df : pd.DataFrame
-        DataFrame we want to clean it
-    unwanted_cols: list
-        List of unwanted columns you need to remove
+        DataFrame we need to extract some info from it
+    variations_count: int
+        Number of variation in the dataframe
     Returns
     -------
+        num_data_col_per_dp: Number of data columns per variation
+        orig_col_names: Original column names of dataframe per variation
+    """
+
+    # Get number of columns that holds measurement data for each variation
+    num_data_col_per_dp = int(len(df.columns) / variations_count)
+    # Get columns names that holds data for each variation
+    orig_col_names = df.columns[:num_data_col_per_dp]
+
+    logging.info(f" No of data columns per variation: {num_data_col_per_dp}")
+    logging.info(f" Original columns per variation:\n {orig_col_names}")
+
+    return num_data_col_per_dp, orig_col_names
+
+
+def get_variation_blocks(df, variations_count):
+    """
+    Function to reshape measured data of all variations to one array of variation blocks.
+
+    Parameters
+    ----------
     df : pd.DataFrame
-        Output dataFrame after removing unwanted cols.
+        DataFrame that holds data columns of all variations side by side.
+    variations_count: int
+        Number of variation in the dataframe
+    Returns
+    -------
+        data: Float array of shape (rows, variations, columns per variation)
+        orig_col_names: Original column names of dataframe per variation
+    """
+
+    num_data_col_per_dp, orig_col_names = get_orig_col_names(df, variations_count)
+    blocks_df = df.iloc[:, : variations_count * num_data_col_per_dp]
+
+    # Label columns [e.g. "vds=0.05/Vs=0" holding text] aren't measurement data, they are left as nan
+    numeric_cols = np.array([pd.api.types.is_numeric_dtype(t) for t in blocks_df.dtypes])
+    data = np.full(blocks_df.shape, np.nan)
+    data[:, numeric_cols] = blocks_df.loc[:, numeric_cols].to_numpy(dtype=float)
+
+    return data.reshape(len(df), variations_count, num_data_col_per_dp), orig_col_names
+
+
+def get_header_values(col_names, pattern=r"=([^=]*)"):
     """
+    Function to get sweep values written in column names [e.g. "vbs =-0.825" -> -0.825].
 
-    # Get the columns with only NaN values
-    nan_columns = df.columns[df.isna().all()]
-    # Drop the columns with only NaN values
-    df.drop(columns=nan_columns, inplace=True)
-    df.drop(columns=unwanted_cols, inplace=True)
+    Parameters
+    ----------
+    col_names : pd.Index
+        Column names that hold sweep values.
+    pattern : str
+        Regex with one group that matches the value in column name.
+    Returns
+    -------
+        values: Float array of sweep values
+    """
 
-    return df
+    return col_names.to_series().str.extract(pattern)[0].astype(float).to_numpy()
 
 
-def stack_df_cols(sub_df, col_untouched, stacked_col_name, stacked_col_index):
+def stack_variation_blocks(data, x_idx, y_idx):
     """
-    Function to stack dataframe columns in new column with column index.
+    Function to stack sweep columns of all variations at once.
+
+    Same points as `set_index(x).stack()` of each variation block, with all
+    variations concatenated in order.
 
     Parameters
     ----------
-    sub_df : pd.DataFrame
-        DataFrame that we need to stack columns in it.
-    col_untouched : str
-       Name of column that we need to keep it untouched while stacking other columns.
-    stacked_col_name : str
-       Name of column we stack all data of other columns in it.
-    stacked_col_index : str
-        Name of column that contains index of stacked columns.
+    data : np.ndarray
+        Variation blocks of shape (rows, variations, columns per variation).
+    x_idx : int
+        Column of the swept variable in each block.
+    y_idx : list
+        Columns of the measured output, one per value of the second sweep.
     Returns
     -------
-        stack_df_cols: Reshaped dataframe that contains stacked columns with column index.
+        dp_idx: Variation of each point
+        x_pos: Row of each point in its variation block
+        y_pos: Position in `y_idx` of each point
+        values: Measured output of each point
     """
 
-    sub_df = (
-        sub_df.set_index([col_untouched])
-        .stack()
-        .reset_index(name=stacked_col_index)
-        .rename(columns={"level_1": stacked_col_name})
-    )
+    n_rows, n_var, _ = data.shape
+    n_y = len(y_idx)
+
+    dp_idx = np.repeat(np.arange(n_var), n_rows * n_y)
+    x_pos = np.tile(np.repeat(np.arange(n_rows), n_y), n_var)
+    y_pos = np.tile(np.arange(n_y), n_var * n_rows)
+    values = data[:, :, y_idx].transpose(1, 0, 2).reshape(-1)
 
-    return sub_df
+    return dp_idx, x_pos, y_pos, values
 
 
-def get_variation_count(df, col_name):
+def get_sweep_steps(points_df, col_name, variations_count):
     """
-    Function to extract measurement data for Fets.
+    Function to get step of a stacked sweep per variation, as difference of first two points of each variation.
 
     Parameters
     ----------
-    df : pd.dataframe
-        Data frame for measured data to get variaitons from it
+    points_df : pd.DataFrame
+        Stacked points ordered by variation, with `dp_idx` column holding the variation of each point.
     col_name : str
-        Name of column we will use to count it as a variation.
+        Name of column that holds sweep values.
+    variations_count: int
+        Number of variation in the dataframe
     Returns
     -------
-        variation_count: Number of variations in the provided dataframe
+        steps: Step of the sweep per variation, nan for variations with less than 2 points
     """
-    # Get num of variations for fets depending on length values in data
-    variations_count = df[col_name].count()
 
-    logging.info(f"No of variations are {variations_count}")
-    logging.info(f"Length of data points is {len(df.columns)}")
+    dp_idx = points_df["dp_idx"].to_numpy()
+    values = points_df[col_name].to_numpy(dtype=float)
+    if len(values) == 0:
+        return np.full(variations_count, np.nan)
 
-    return variations_count
+    first = np.minimum(np.searchsorted(dp_idx, np.arange(variations_count)), len(values) - 1)
+    second = np.minimum(first + 1, len(values) - 1)
+    steps = np.abs(values[second] - values[first])
 
+    return np.where(np.bincount(dp_idx, minlength=variations_count) >= 2, steps, np.nan)
 
-def get_orig_col_names(df, variations_count):
+
+def add_variation_data(all_dfs, dp_df):
+    """
+    Function to order points of all variations and add data of each variation [W, L, corner, ...].
+
+    Parameters
+    ----------
+    all_dfs : pd.DataFrame
+        Parsed points of all sweeps, with `dp_idx` column holding the variation of each point.
+    dp_df : pd.DataFrame
+        DataFrame that holds all data points for all varaitions.
+    Returns
+    -------
+        all_dfs: Points ordered by variation, with one column per `dp_df` column
     """
-    Function to get original columns names for dataframe and number of columns per variation.
+
+    # Points of each variation are kept together, in the order of parsed sweeps
+    all_dfs = all_dfs.iloc[np.argsort(all_dfs["dp_idx"].to_numpy(), kind="stable")]
+    dp_idx = all_dfs.pop("dp_idx").to_numpy()
+
+    for c in dp_df.columns:
+        col = dp_df[c].reset_index(drop=True).take(dp_idx).infer_objects()
+        col.index = all_dfs.index
+        all_dfs[c] = col
+
+    return all_dfs
+
+
+def write_parquet(df, csv_path):
+    """
+    Function to write a typed Parquet copy of extracted data next to its csv file.
+
+    Text columns [device, corner, sweeps, ...] are stored as categorical columns
+    and the file is compressed, so regressions could load it without parsing csv.
 
     Parameters
     ----------
     df : pd.DataFrame
-        DataFrame we need to extract some info from it
-    variations_count: int
-        Number of variation in the dataframe
+        DataFrame of extracted data.
+    csv_path : str
+        Path of the csv file of the same data.
     Returns
     -------
-        num_data_col_per_dp: Number of data columns per variation
-        orig_col_names: Original column names of dataframe per variation
+        parquet_path: Path of written Parquet file, None if pyarrow isn't installed.
     """
 
-    # Get number of columns that holds measurement data for each variation
-    num_data_col_per_dp = int(len(df.columns) / variations_count)
-    # Get columns names that holds data for each variation
-    orig_col_names = df.columns[:num_data_col_per_dp]
+    if not HAS_PARQUET:
+        logging.warning(f"pyarrow isn't installed, Parquet copy of {csv_path} isn't written")
+        return None
 
-    logging.info(f" No of data columns per variation: {num_data_col_per_dp}")
-    logging.info(f" Original columns per variation:\n {orig_col_names}")
+    typed_df = df.reset_index(drop=True)
+    for col in typed_df.select_dtypes(include="object").columns:
+        typed_df[col] = typed_df[col].astype("category")
 
-    return num_data_col_per_dp, orig_col_names
+    parquet_path = f"{os.path.splitext(csv_path)[0]}.parquet"
+    typed_df.to_parquet(parquet_path, index=False, compression="zstd")
+
+    return parquet_path
+
+
+def write_extracted_data(df, csv_path):
+    """
+    Function to write extracted data as csv with a Parquet copy.
+
+    Sweep strings [e.g. "vgs 0.0 3.3 0.05 vbs -3.3 0.0 0.825"] are also written
+    as typed columns sweep<i>_var/start/stop/step, so regressions don't parse them.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame of extracted data.
+    csv_path : str
+        Path of the output csv file.
+    Returns
+    -------
+        None
+    """
+
+    df = add_typed_sweeps(df)
+    df.to_csv(csv_path, index=False)
+    write_parquet(df, csv_path)
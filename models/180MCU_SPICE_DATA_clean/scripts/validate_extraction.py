@@ -0,0 +1,617 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Usage:
+  validate_extraction.py [--data_dir=<data_dir>] [--report=<report>]
+
+  --data_dir=<data_dir>           Directory of extracted data, all csv files under it are checked. [default: gf180mcu_data]
+  --report=<report>               Path of json report, <data_dir>/validation_report.json by default.
+  -h, --help                      Show help text.
+  -v, --version                   Show version.
+"""
+
+from __future__ import annotations
+
+from docopt import docopt
+import os
+import re
+import sys
+import glob
+import json
+import time
+import logging
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from gf180_regress.lazy import lazy_import  # noqa: E402
+from gf180_regress.meas_data import read_meas_data  # noqa: E402
+from gf180_regress.sweeps import (  # noqa: E402
+    add_typed_sweeps,
+    axis_columns,
+    parse_sweeps,
+    sweep_axes,
+    sweep_text_column,
+)
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# CONSTANT VALUES
+REPORT_FILE = "validation_report.json"
+## Max number of failing rows written in the report per check
+MAX_EXAMPLES = 5
+
+# Columns of measured outputs, other numeric columns are sweeps or variation data
+OUTPUT_COLS = ["id", "rds", "cgc", "cgg", "cgs", "cgd", "Cj", "In", "ic", "ib", "res"]
+# Columns swept in each variation
+SWEEP_COLS = ["vds", "vgs", "vbs", "Vj", "Vn", "vcp", "vbp", "ibp"]
+# Columns of sweep files that aren't variation data
+SWEEP_FILE_COLS = ["const_var", "const_var_val", "sweeps", "sweep", "cj_max"]
+# Typed sweep columns of sweep files [e.g. sweep1_start]
+SWEEP_AXIS_COL = re.compile(r"^sweep\d+_(var|start|stop|step)$")
+# Sweep names used in sweep strings that differ from column names of measured data
+SWEEP_ALIASES = {"ib": "ibp"}
+
+# Allowed [min, max] of columns, wide enough for all devices to catch unit or column mix-ups
+VALUE_RANGES = {
+    "temp": (-55, 200),
+    "W (um)": (0.01, 1e4),
+    "L (um)": (0.01, 1e4),
+    "width": (0.01, 1e4),
+    "length": (0.01, 1e4),
+    "Area (pm^2)": (0.01, 1e6),
+    "Pj (um)": (0.01, 1e4),
+    "nf": (1, 1000),
+    "vds": (-10, 10),
+    "vgs": (-10, 10),
+    "vbs": (-10, 10),
+    "Vj": (-10, 10),
+    "Vn": (-50, 50),
+    "vcp": (-10, 10),
+    "vbp": (-10, 10),
+    "ibp": (-1, 1),
+    "id": (-1, 1),
+    "ic": (-1, 1),
+    "ib": (-1, 1),
+    "In": (-10, 10),
+    "rds": (0, None),
+    "res": (0, None),
+    "cgc": (0, None),
+    "cgg": (0, None),
+    "cgs": (0, None),
+    "cgd": (0, None),
+    "Cj": (0, None),
+}
+
+# Sign of bias columns per device type, as (file name regex, device regex, {column: sign})
+## pfet/pnp data is written with negative drain/collector and gate/base biases
+SIGN_RULES = [
+    (r"_meas_(id|rds)$", r"^pfet", {"vds": -1, "vgs": -1, "vbs": 1}),
+    (r"_meas_(id|rds)$", r"^nfet", {"vds": 1, "vbs": -1}),
+    (r"^bjt_.*_meas$", r"^pnp", {"vcp": -1, "vbp": -1, "ibp": -1}),
+    (r"^bjt_.*_meas$", r"^npn", {"vcp": 1, "vbp": 1, "ibp": 1}),
+]
+
+
+def check_result(name: str, severity: str, failed, examples=None) -> dict:
+    """
+    Function to build the report entry of one check.
+
+    Parameters
+    ----------
+    name : str
+        Name of the check.
+    severity : str
+        error or warning, errors fail the validation.
+    failed : np.ndarray or int
+        Mask of failing rows, or number of failures.
+    examples : pd.DataFrame
+        Failing rows to be written in the report, rows of `failed` mask by default.
+    Returns
+    -------
+    dict
+        Check name, status, severity, number of failures and some failing rows.
+    """
+
+    count = int(np.count_nonzero(failed)) if isinstance(failed, np.ndarray) else int(failed)
+    result = {"check": name, "status": "fail" if count else "pass", "severity": severity, "count": count}
+
+    if count and examples is not None:
+        examples = examples.head(MAX_EXAMPLES).astype(object).where(examples.head(MAX_EXAMPLES).notna(), None)
+        result["examples"] = examples.to_dict(orient="records")
+
+    return result
+
+
+def column_roles(df: pd.DataFrame):
+    """
+    Function to split columns of extracted data by role.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Extracted data.
+    Returns
+    -------
+    outputs : list
+        Measured outputs.
+    sweeps : list
+        Swept columns.
+    keys : list
+        Columns that identify one measured point [variation data and sweeps].
+    """
+
+    outputs = [c for c in df.columns if c in OUTPUT_COLS]
+    sweeps = [c for c in df.columns if c in SWEEP_COLS]
+    keys = [c for c in df.columns if c not in outputs and c not in SWEEP_FILE_COLS and not SWEEP_AXIS_COL.match(c)]
+
+    return outputs, sweeps, keys
+
+
+def check_missing_values(df: pd.DataFrame) -> dict:
+    """
+    Function to check for empty or infinite values.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Extracted data.
+    Returns
+    -------
+    dict
+        Check result.
+    """
+
+    failed = df.isna().to_numpy().any(axis=1)
+    num = df.select_dtypes("number")
+    if len(num.columns):
+        failed |= np.isinf(num.to_numpy(dtype=float)).any(axis=1)
+
+    return check_result("missing_values", "error", failed, df[failed])
+
+
+def check_duplicate_keys(df: pd.DataFrame, keys: list) -> dict:
+    """
+    Function to check for points measured more than once with different outputs.
+
+    Same rows are removed by the extraction, so rows sharing the same keys
+    hold conflicting measurements [e.g. points shared by two overlapping sweeps].
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Extracted data.
+    keys : list
+        Columns that identify one measured point.
+    Returns
+    -------
+    dict
+        Check result.
+    """
+
+    failed = df.duplicated(keys, keep=False).to_numpy()
+    return check_result("duplicate_keys", "warning", failed, df[failed])
+
+
+def check_monotonic_sweeps(df: pd.DataFrame, keys: list, sweeps: list, sweep_of_point=None) -> dict:
+    """
+    Function to check that each swept column is monotonic while other keys are fixed.
+
+    Points are checked in file order, points repeated by other sweeps are only
+    checked at their first occurrence.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Extracted data.
+    keys : list
+        Columns that identify one measured point.
+    sweeps : list
+        Swept columns.
+    sweep_of_point : np.ndarray
+        Sweep row of each point, points of different sweeps are checked separately.
+    Returns
+    -------
+    dict
+        Check result, a failure is one sweep that changes direction.
+    """
+
+    first_rows = ~df.duplicated(keys).to_numpy()
+    first = df.loc[first_rows, keys]
+    if sweep_of_point is not None:
+        first = first.assign(sweep_idx=sweep_of_point[first_rows])
+
+    count = 0
+    examples = []
+
+    for col in sweeps:
+        others = [k for k in first.columns if k != col]
+        group = (
+            first.groupby(others, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+            if others
+            else np.zeros(len(first), dtype=int)
+        )
+        order = np.argsort(group, kind="stable")
+        group = group[order]
+        steps = np.diff(first[col].to_numpy(dtype=float)[order])
+        same = group[1:] == group[:-1]
+
+        n_groups = group.max() + 1 if len(group) else 0
+        rising = np.bincount(group[1:][same & (steps > 0)], minlength=n_groups)
+        falling = np.bincount(group[1:][same & (steps < 0)], minlength=n_groups)
+        bad = np.flatnonzero((rising > 0) & (falling > 0))
+
+        count += len(bad)
+        if len(bad):
+            bad_rows = order[np.searchsorted(group, bad[:MAX_EXAMPLES])]
+            examples.append(first.iloc[bad_rows].assign(sweep=col))
+
+    return check_result("monotonic_sweeps", "error", count, pd.concat(examples) if examples else None)
+
+
+def check_signs(df: pd.DataFrame, file_name: str) -> dict:
+    """
+    Function to check sign conventions of bias columns [e.g. pfet vds <= 0].
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Extracted data.
+    file_name : str
+        Name of extracted file without extension [e.g. pfet_03v3_meas_id].
+    Returns
+    -------
+    dict
+        Check result.
+    """
+
+    failed = np.zeros(len(df), dtype=bool)
+    device = df["device_name"].astype(str) if "device_name" in df.columns else pd.Series(file_name, index=df.index)
+
+    for file_regex, dev_regex, signs in SIGN_RULES:
+        if not re.search(file_regex, file_name):
+            continue
+        rows = device.str.contains(dev_regex).to_numpy()
+        for col, sign in signs.items():
+            if col in df.columns:
+                failed |= rows & (df[col].to_numpy(dtype=float) * sign < 0)
+
+    return check_result("sign_convention", "error", failed, df[failed])
+
+
+def check_ranges(df: pd.DataFrame) -> dict:
+    """
+    Function to check that values are inside their allowed range.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Extracted data.
+    Returns
+    -------
+    dict
+        Check result.
+    """
+
+    failed = np.zeros(len(df), dtype=bool)
+    for col, (low, high) in VALUE_RANGES.items():
+        if col not in df.columns:
+            continue
+        values = df[col].to_numpy(dtype=float)
+        if low is not None:
+            failed |= values < low
+        if high is not None:
+            failed |= values > high
+
+    return check_result("out_of_range", "error", failed, df[failed])
+
+
+def sweep_axes_table(sweeps_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Function to get sweep axes of all rows from typed sweep columns, sweep strings are parsed for older files.
+
+    Parameters
+    ----------
+    sweeps_df : pd.DataFrame
+        Extracted sweeps data.
+    Returns
+    -------
+    pd.DataFrame
+        One row per sweep axis, with `sweep_idx` row of the sweep and name, start, stop, step
+        of the axis. Values of sweeps that can't be parsed are nan.
+    """
+
+    typed_df = add_typed_sweeps(sweeps_df).reset_index(drop=True)
+
+    axes = []
+    for axis in sweep_axes(typed_df):
+        axis_df = typed_df[axis_columns(axis)].set_axis(["name", "start", "stop", "step"], axis=1)
+        axis_df["sweep_idx"] = np.arange(len(axis_df))
+        axes.append(axis_df[axis_df["name"].notna()])
+
+    return pd.concat(axes, ignore_index=True) if axes else pd.DataFrame(columns=["name", "start", "stop", "step", "sweep_idx"])
+
+
+def check_sweeps_format(sweeps_df: pd.DataFrame) -> dict:
+    """
+    Function to check that sweeps are (name, start, stop, step) groups of numbers.
+
+    Typed sweep columns have to hold the same sweeps as sweep strings when both are written.
+
+    Parameters
+    ----------
+    sweeps_df : pd.DataFrame
+        Extracted sweeps data.
+    Returns
+    -------
+    dict
+        Check result.
+    """
+
+    axes = sweep_axes_table(sweeps_df)
+    bad_axes = axes[["start", "stop", "step"]].isna().any(axis=1) | (axes["step"] < 0)
+    failed = np.zeros(len(sweeps_df), dtype=bool)
+    failed[axes.loc[bad_axes, "sweep_idx"].to_numpy(dtype=int)] = True
+
+    text_col = sweep_text_column(sweeps_df)
+    if text_col and sweep_axes(sweeps_df):
+        typed_cols = [c for axis in sweep_axes(sweeps_df) for c in axis_columns(axis)]
+        parsed = parse_sweeps(sweeps_df[text_col]).reindex(columns=typed_cols)
+        for col in typed_cols:
+            typed, text = sweeps_df[col], parsed[col]
+            if col.endswith("_var"):
+                same = (typed.astype(object) == text.astype(object)) | (typed.isna() & text.isna())
+            else:
+                same = np.isclose(typed.to_numpy(dtype=float), text.to_numpy(dtype=float), equal_nan=True)
+            failed |= ~np.asarray(same, dtype=bool)
+
+    return check_result("sweeps_format", "error", failed, sweeps_df[failed])
+
+
+def check_sweep_steps(df: pd.DataFrame, sweeps_df: pd.DataFrame, keys: list, sweeps: list):
+    """
+    Function to check measured points against sweep strings of their variation.
+
+    Each point has to be inside [start, stop] of one of its sweeps and on the
+    grid of its steps, and each sweep has to be covered from start to stop.
+    Sweeps of one file could overlap [e.g. Id-Vgs at vds=0.05 and Id-Vds at
+    vbs=0], each point is assigned to the first sweep it fits in.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Extracted data.
+    sweeps_df : pd.DataFrame
+        Sweeps data of the same device.
+    keys : list
+        Columns that identify one measured point.
+    sweeps : list
+        Swept columns.
+    Returns
+    -------
+    results : list
+        Results of sweep_points and sweep_coverage checks.
+    sweep_of_point : np.ndarray
+        Sweep row assigned to each point, -1 for points that don't fit in any sweep.
+    """
+
+    id_cols = [c for c in keys if c in sweeps_df.columns and c not in sweeps]
+    axes = sweep_axes_table(sweeps_df).dropna()
+    col_of = {c.lower(): c for c in sweeps}
+    axes["column"] = axes["name"].str.lower().replace(SWEEP_ALIASES).map(col_of)
+    axes = axes[axes["column"].notna()]
+    n_sweeps = len(sweeps_df)
+
+    # Candidate sweeps of each point, sweeps holding a constant bias only hold points at this bias
+    sweep_rows = sweeps_df[id_cols].reset_index(drop=True)
+    sweep_rows["sweep_idx"] = np.arange(n_sweeps)
+    points = df[id_cols].reset_index(drop=True)
+    points["point_idx"] = np.arange(len(points))
+    pairs = points.merge(sweep_rows, on=id_cols, how="inner")
+    point_idx = pairs["point_idx"].to_numpy()
+    sweep_idx = pairs["sweep_idx"].to_numpy()
+
+    if "const_var" in sweeps_df.columns:
+        const_var = sweeps_df["const_var"].astype(str).to_numpy()[sweep_idx]
+        const_val = sweeps_df["const_var_val"].to_numpy(dtype=float)[sweep_idx]
+        keep = np.zeros(len(pairs), dtype=bool)
+        for var in np.unique(const_var):
+            if var in df.columns:
+                rows = const_var == var
+                keep[rows] = np.isclose(df[var].to_numpy(dtype=float)[point_idx[rows]], const_val[rows])
+        point_idx, sweep_idx = point_idx[keep], sweep_idx[keep]
+
+    # Sweep axes of each pair, nan if the sweep row has no such axis
+    pair_axes = []
+    for col, col_axes in axes.groupby("column"):
+        start = np.full(n_sweeps, np.nan)
+        stop = np.full(n_sweeps, np.nan)
+        step = np.full(n_sweeps, np.nan)
+        idx = col_axes["sweep_idx"].to_numpy(dtype=int)
+        start[idx], stop[idx], step[idx] = col_axes["start"], col_axes["stop"], col_axes["step"]
+        pair_axes.append((col, np.minimum(start, stop), np.maximum(start, stop), step))
+
+    # Sweep values are rounded in sheet headers [e.g. -3.3 + 0.825 written as -2.48], grid is checked to 1% of step
+    pair_bad = np.zeros(len(point_idx), dtype=bool)
+    for col, low, high, step in pair_axes:
+        values = df[col].to_numpy(dtype=float)[point_idx]
+        p_low, p_high, p_step = low[sweep_idx], high[sweep_idx], step[sweep_idx]
+        tol = 1e-6 * np.maximum(np.abs(p_low), np.abs(p_high)) + 1e-2 * p_step + 1e-12
+        n_steps = np.divide(values - p_low, p_step, out=np.zeros_like(values), where=p_step > 0)
+
+        pair_bad |= ~np.isnan(p_low) & (
+            (values < p_low - tol)
+            | (values > p_high + tol)
+            | ((p_step > 0) & (np.abs(n_steps - np.round(n_steps)) * p_step > tol))
+            | ((p_step == 0) & (np.abs(values - p_low) > tol))
+        )
+
+    sweep_of_point = np.full(len(df), n_sweeps)
+    np.minimum.at(sweep_of_point, point_idx[~pair_bad], sweep_idx[~pair_bad])
+    off_grid = sweep_of_point == n_sweeps
+    sweep_of_point[off_grid] = -1
+
+    # Sweep ends have to be measured by points of the sweep
+    uncovered = np.zeros(n_sweeps, dtype=bool)
+    ok_points, ok_sweeps = point_idx[~pair_bad], sweep_idx[~pair_bad]
+    for col, low, high, step in pair_axes:
+        values = df[col].to_numpy(dtype=float)[ok_points]
+        seen_low = np.full(n_sweeps, np.inf)
+        seen_high = np.full(n_sweeps, -np.inf)
+        np.minimum.at(seen_low, ok_sweeps, values)
+        np.maximum.at(seen_high, ok_sweeps, values)
+        tol = 1e-6 * np.maximum(np.abs(low), np.abs(high)) + 1e-2 * step + 1e-12
+        has_axis = ~np.isnan(low)
+        uncovered |= has_axis & ((np.abs(seen_low - low) > tol) | (np.abs(seen_high - high) > tol))
+
+    results = [
+        check_result("sweep_points", "error", off_grid, df[off_grid]),
+        check_result("sweep_coverage", "warning", uncovered, sweeps_df[uncovered]),
+    ]
+
+    return results, sweep_of_point
+
+
+def validate_file(csv_path: str) -> dict:
+    """
+    Function to run all checks of one extracted csv file.
+
+    Measured data files are checked against the sweeps file of the same
+    device when it exists [e.g. nfet_03v3_meas_id.csv and nfet_03v3_sweeps_id.csv].
+
+    Parameters
+    ----------
+    csv_path : str
+        Path of extracted csv file.
+    Returns
+    -------
+    dict
+        File report with the result of each check.
+    """
+
+    t0 = time.perf_counter()
+    file_name = os.path.splitext(os.path.basename(csv_path))[0]
+    df = read_meas_data(csv_path)
+    outputs, sweeps, keys = column_roles(df)
+
+    if "_sweeps" in file_name:
+        # Typed columns of axes that aren't used by all rows are empty, they are checked by sweeps_format
+        typed_cols = [c for axis in sweep_axes(df) for c in axis_columns(axis)]
+        checks = [check_missing_values(df.drop(columns=typed_cols))]
+        checks.append(check_sweeps_format(df))
+        checks.append(check_result("duplicate_keys", "error", df.duplicated().to_numpy(), df[df.duplicated()]))
+    else:
+        checks = [check_missing_values(df)]
+        checks.append(check_duplicate_keys(df, keys))
+        checks.append(check_signs(df, file_name))
+
+        sweep_of_point = None
+        sweeps_path = os.path.join(os.path.dirname(csv_path), f"{file_name.replace('_meas', '_sweeps')}.csv")
+        if sweeps and os.path.isfile(sweeps_path):
+            sweep_checks, sweep_of_point = check_sweep_steps(df, read_meas_data(sweeps_path), keys, sweeps)
+            checks.extend(sweep_checks)
+        checks.append(check_monotonic_sweeps(df, keys, sweeps, sweep_of_point))
+    checks.append(check_ranges(df))
+
+    return {
+        "file": csv_path,
+        "rows": len(df),
+        "errors": sum(c["status"] == "fail" and c["severity"] == "error" for c in checks),
+        "warnings": sum(c["status"] == "fail" and c["severity"] == "warning" for c in checks),
+        "seconds": round(time.perf_counter() - t0, 3),
+        "checks": checks,
+    }
+
+
+def validate_files(csv_paths: list, report_path: str) -> dict:
+    """
+    Function to check extracted files and write the json report.
+
+    Parameters
+    ----------
+    csv_paths : list
+        Paths of extracted csv files.
+    report_path : str
+        Path of json report.
+    Returns
+    -------
+    dict
+        Report with number of errors and warnings, and one entry per file.
+    """
+
+    files = []
+    for csv_path in sorted(csv_paths):
+        result = validate_file(csv_path)
+        for c in result["checks"]:
+            if c["status"] == "fail":
+                log = logging.error if c["severity"] == "error" else logging.warning
+                log(f"{csv_path}: {c['check']} failed for {c['count']} rows/sweeps")
+        files.append(result)
+
+    report = {
+        "errors": sum(f["errors"] for f in files),
+        "warnings": sum(f["warnings"] for f in files),
+        "files": files,
+    }
+
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=1)
+
+    logging.info(
+        f"Validated {len(files)} extracted files: {report['errors']} errors, {report['warnings']} warnings, report at {report_path}"
+    )
+
+    return report
+
+
+def main(args):
+    """
+    main function to validate extracted measurement data of GF180MCU models.
+
+    Parameters
+    ----------
+    arguments : dict
+        Dictionary that holds the arguments used by user in the run command. This is generated by docopt library.
+    Returns
+    -------
+        None
+    """
+
+    data_dir = args["--data_dir"]
+    report_path = args["--report"] or os.path.join(data_dir, REPORT_FILE)
+    csv_paths = glob.glob(os.path.join(data_dir, "*", "*.csv"))
+
+    if not csv_paths:
+        logging.error(f"No extracted data found in {data_dir}, please recheck")
+        exit(1)
+
+    report = validate_files(csv_paths, report_path)
+    if report["errors"]:
+        exit(1)
+
+
+if __name__ == "__main__":
+
+    # Args
+    arguments = docopt(__doc__, version="DATA VALIDATOR: 0.1")
+
+    # logging setup
+    logging.basicConfig(
+        level=logging.DEBUG,
+        handlers=[logging.StreamHandler(), ],
+        format="%(asctime)s | %(levelname)-7s | %(message)s",
+        datefmt="%d-%b-%Y %H:%M:%S",
+    )
+
+    # Calling main function
+    main(arguments)
@@ -0,0 +1,69 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ============================================================================
+# ------------- Shared helpers for GF180MCU models regressions --------------
+# ============================================================================
+
+import importlib
+
+# Helpers are imported on first use [e.g. gf180_regress.read_meas_data], so
+# scripts that only need one of them don't pay for pandas and numpy at startup.
+_EXPORTS = {
+    "NgspiceServer": "ngspice_pool",
+    "NgspicePool": "ngspice_pool",
+    "ModelCardIndex": "model_slicer",
+    "ModelCardSlicer": "model_slicer",
+    "batch_sweeps": "batching",
+    "split_batch_result": "batching",
+    "netlist_group": "mos_netlists",
+    "ResultCache": "result_cache",
+    "SimScheduler": "scheduler",
+    "configure_scheduler": "scheduler",
+    "run_simulator": "scheduler",
+    "SimulatorBackend": "simulators",
+    "NgspiceBackend": "simulators",
+    "XyceBackend": "simulators",
+    "get_simulator": "simulators",
+    "read_rawfile": "rawfile",
+    "read_sim_output": "rawfile",
+    "Comparison": "compare",
+    "join_results": "compare",
+    "relative_error": "compare",
+    "read_meas_data": "meas_data",
+    "SharedMeasData": "shared_data",
+    "read_excel": "xlsx_reader",
+    "iter_sheet_rows": "xlsx_reader",
+    "load_sweeps": "sweeps",
+    "parse_sweeps": "sweeps",
+    "format_sweeps": "sweeps",
+    "row_axes": "sweeps",
+    "format_axes": "sweeps",
+    "LazyModule": "lazy",
+    "lazy_import": "lazy",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,88 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Run GF180MCU models regression suites as `python -m gf180_regress`, all suites share one queue of simulations.
+
+Usage:
+  gf180_regress --sim=<sim> [--suite=<suites>] [--jobs=<jobs>] [--suite_args=<args>] [--sim_timeout=<s>]
+
+  -h, --help                Show help text.
+  -v, --version             Show version.
+  --sim=<sim>               Simulators to be tested, comma separated [ngspice, xyce].
+  --suite=<suites>          Suites to be run, comma separated [e.g. mos_id,bjt_beta], all suites by default.
+  --jobs=<jobs>             Max number of simulators running at once over all suites, number of cores by default.
+  --suite_args=<args>       Other arguments of models_regression.py [e.g. "--sim_cache --rawfile"], given to suites accepting them.
+  --sim_timeout=<s>         Max run time of one simulation in seconds, hung simulators are killed after it [0 for no timeout]. [default: 1800]
+"""
+
+import shlex
+import logging
+from docopt import docopt
+from .runner import SIMULATORS, list_suites, run_suites
+from .scheduler import available_cpus
+
+
+def main(args):
+    """
+    Run selected suites of selected simulators.
+
+    Parameters
+    ----------
+    args : dict
+        Command line arguments.
+    """
+
+    sims = args["--sim"].lower().split(",")
+    suites = [s for s in (args["--suite"] or "").split(",") if s]
+    jobs = int(args["--jobs"] or len(available_cpus()))
+
+    unknown = [s for s in sims if s not in SIMULATORS]
+    if unknown:
+        logging.error(f"Unknown simulator {', '.join(unknown)}, allowed simulators: {', '.join(SIMULATORS)}")
+        exit(1)
+
+    for sim in sims:
+        missing = [s for s in suites if s not in list_suites(sim)]
+        if missing:
+            logging.error(f"{sim} has no suite {', '.join(missing)}, allowed suites: {', '.join(list_suites(sim))}")
+            exit(1)
+
+    results = run_suites(
+        sims, suites, jobs, shlex.split(args["--suite_args"] or ""), float(args["--sim_timeout"])
+    )
+
+    failed = [name for name, returncode in results.items() if returncode != 0]
+    if failed:
+        logging.error(f"{len(failed)}/{len(results)} suites failed: {', '.join(failed)}")
+        exit(1)
+    logging.info(f"All {len(results)} suites passed")
+
+
+if __name__ == "__main__":
+
+    # Args
+    arguments = docopt(__doc__, version="GF180-REGRESS: 0.1")
+
+    # logging setup
+    logging.basicConfig(
+        level=logging.DEBUG,
+        handlers=[
+            logging.StreamHandler(),
+        ],
+        format="%(asctime)s | %(levelname)-7s | %(message)s",
+        datefmt="%d-%b-%Y %H:%M:%S",
+    )
+
+    # Calling main function
+    main(arguments)
@@ -0,0 +1,87 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# CONSTANT VALUES
+DEFAULT_BATCH_SIZE = 32
+
+
+def batch_sweeps(df: pd.DataFrame, group_cols: list, batch_size: int = DEFAULT_BATCH_SIZE) -> list:
+    """
+    Function to pack sweep rows that could share one netlist into batches.
+
+    Rows are grouped on the columns that have to be common for all instances
+    of one netlist [corner, temp, biases and sweeps], then every group is
+    split into chunks of at most `batch_size` rows.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Data frame contains all sweep points will be used in simulation
+    group_cols : list
+        Columns that must be identical for all rows of a batch.
+    batch_size : int
+        Max number of rows [device instances] per batch.
+    Returns
+    -------
+    batches : list
+        List of data frames, one per netlist.
+    """
+
+    batch_size = max(1, batch_size)
+    batches = []
+    for _, group_df in df.groupby(group_cols, sort=False, dropna=False, observed=True):
+        group_df = group_df.reset_index(drop=True)
+        for i in range(0, len(group_df), batch_size):
+            batches.append(group_df.iloc[i : i + batch_size])
+
+    return batches
+
+
+def split_batch_result(result_df: pd.DataFrame, num_variations: int,
+                       shared_cols: list, out_col: str) -> list:
+    """
+    Function to split the output of a batched simulation per variation.
+
+    Batched netlists write the shared sweep vectors once followed by one output
+    vector per instance named `<out_col>_<index>`.
+
+    Parameters
+    ----------
+    result_df : pd.DataFrame
+        Simulation output of the batched netlist.
+    num_variations : int
+        Number of instances simulated in the netlist.
+    shared_cols : list
+        Sweep columns common for all instances [e.g. vds, vgs, vbs].
+    out_col : str
+        Name of the simulated output [e.g. id, rds].
+    Returns
+    -------
+    frames : list
+        List of data frames with `shared_cols` and `out_col`, one per variation.
+    """
+
+    frames = []
+    for i in range(num_variations):
+        var_df = result_df[shared_cols + [f"{out_col}_{i}"]].copy()
+        var_df.rename(columns={f"{out_col}_{i}": out_col}, inplace=True)
+        frames.append(var_df)
+
+    return frames
@@ -0,0 +1,246 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# CONSTANT VALUES
+MAX_REPORTED_ERR = 100.0
+
+
+def key_codes(frames: list, keys: list) -> list:
+    """
+    Encode the key columns of many frames as one int64 code per row.
+
+    Values are factorized over all frames together, so equal keys get equal
+    codes in every frame.
+
+    Parameters
+    ----------
+    frames : list
+        Data frames holding all `keys` columns.
+    keys : list
+        Columns making up the key.
+    Returns
+    -------
+    codes : list
+        One int64 numpy array per frame.
+    """
+
+    lengths = [len(df) for df in frames]
+    combined = np.zeros(sum(lengths), dtype=np.int64)
+
+    for key in keys:
+        values = pd.concat([df[key] for df in frames], ignore_index=True)
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        combined, _ = pd.factorize(combined * len(uniques) + codes)
+        combined = combined.astype(np.int64)
+
+    return np.split(combined, np.cumsum(lengths)[:-1])
+
+
+def join_results(meas_df: pd.DataFrame, sim_df: pd.DataFrame, keys: list,
+                 suffixes: tuple = ("_meas", "_sim")) -> pd.DataFrame:
+    """
+    Left join simulated data on measured data with a sorted key search.
+
+    Same result as `meas_df.merge(sim_df, on=keys, how="left")` when sim keys
+    are unique, done with `np.searchsorted` on encoded keys.
+
+    Parameters
+    ----------
+    meas_df : pd.DataFrame
+        Measured data, all its rows are kept.
+    sim_df : pd.DataFrame
+        Simulated data, first match is used for duplicated keys.
+    keys : list
+        Columns used to match points [e.g. W, L, corner, temp, biases].
+    suffixes : tuple
+        Suffixes added to non key columns found in both frames.
+    Returns
+    -------
+    full_df : pd.DataFrame
+        Measured data with simulated columns added, NaN where not simulated.
+    """
+
+    meas_codes, sim_codes = key_codes([meas_df, sim_df], keys)
+
+    order = np.argsort(sim_codes, kind="stable")
+    sorted_codes = sim_codes[order]
+    pos = np.searchsorted(sorted_codes, meas_codes)
+    pos = np.minimum(pos, max(len(sorted_codes) - 1, 0))
+    found = (sorted_codes[pos] == meas_codes) if len(sorted_codes) else np.zeros(len(meas_codes), bool)
+
+    common = [c for c in meas_df.columns if c in sim_df.columns and c not in keys]
+    meas_part = meas_df.reset_index(drop=True).rename(columns={c: f"{c}{suffixes[0]}" for c in common})
+
+    sim_cols = [c for c in sim_df.columns if c not in keys]
+    sim_part = sim_df[sim_cols].iloc[order[pos] if len(order) else []].reset_index(drop=True)
+    sim_part = sim_part.rename(columns={c: f"{c}{suffixes[1]}" for c in common})
+    if not found.all():
+        sim_part = sim_part.reindex(range(len(meas_part)))
+        sim_part.loc[~found, :] = np.nan
+
+    return pd.concat([meas_part, sim_part], axis=1)
+
+
+def relative_error(meas: np.ndarray, sim: np.ndarray, signed: bool = False) -> np.ndarray:
+    """
+    Relative error in percent of simulated values against measured ones.
+
+    Parameters
+    ----------
+    meas : np.ndarray
+        Measured values.
+    sim : np.ndarray
+        Simulated values.
+    signed : bool
+        Keep the sign of the measured value [abs(sim - meas) * 100 / meas],
+        negative where meas is negative.
+    Returns
+    -------
+    np.ndarray
+        abs((meas - sim) * 100 / meas), NaN where a value is missing.
+    """
+
+    meas = np.asarray(meas, dtype=np.float64)
+    sim = np.asarray(sim, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if signed:
+            return np.abs(sim - meas) * 100.0 / meas
+        return np.abs((meas - sim) * 100.0 / meas)
+
+
+class Comparison:
+    """
+    Error report of one device between measured and simulated data.
+
+    The relative error is added to `full_df[err_col]` and summarized in one
+    vectorized pass: min, max and mean [clipped at 100%] and RMS error.
+    `signed` keeps the sign of the measured value in the error, see `relative_error`.
+    """
+
+    def __init__(self, full_df: pd.DataFrame, meas_col: str, sim_col: str, err_col: str,
+                 signed: bool = False):
+        self.full_df = full_df
+        self.meas_col = meas_col
+        self.sim_col = sim_col
+        self.err_col = err_col
+
+        self.err = relative_error(full_df[meas_col], full_df[sim_col], signed)
+        full_df[err_col] = self.err
+
+        valid = self.err[~np.isnan(self.err)]
+        if len(valid):
+            self.min_error = min(float(valid.min()), MAX_REPORTED_ERR)
+            self.max_error = min(float(valid.max()), MAX_REPORTED_ERR)
+            self.mean_error = min(float(valid.mean()), MAX_REPORTED_ERR)
+            self.rms_error = float(np.sqrt(np.mean(valid ** 2)))
+        else:
+            self.min_error = self.max_error = self.mean_error = self.rms_error = np.nan
+
+    def quantile(self, q: float) -> float:
+        """
+        Quantile of the relative error, missing points are skipped.
+
+        Parameters
+        ----------
+        q : float
+            Quantile to be calculated [e.g. 0.98].
+        Returns
+        -------
+        float
+            Relative error at this quantile.
+        """
+
+        valid = self.err[~np.isnan(self.err)]
+        return float(np.quantile(valid, q)) if len(valid) else np.nan
+
+    def passed(self, q: float, pass_thresh: float) -> tuple:
+        """
+        Check the error quantile against the pass threshold.
+
+        Parameters
+        ----------
+        q : float
+            Quantile to be checked.
+        pass_thresh : float
+            Max relative error allowed at this quantile.
+        Returns
+        -------
+        tuple
+            (passed, quantile target)
+        """
+
+        q_target = self.quantile(q)
+        return q_target <= pass_thresh, q_target
+
+    def bad_points(self, pass_thresh: float, detect_cols: list = None,
+                   max_val_detect: float = None) -> pd.DataFrame:
+        """
+        Points with relative error above the pass threshold.
+
+        Parameters
+        ----------
+        pass_thresh : float
+            Max relative error allowed per point.
+        detect_cols : list
+            Only points where one of these columns reaches `max_val_detect` are kept.
+        max_val_detect : float
+            Lowest value considered by `detect_cols`.
+        Returns
+        -------
+        pd.DataFrame
+            Rows of `full_df` failing the check.
+        """
+
+        mask = self.err > pass_thresh
+        if detect_cols and max_val_detect is not None:
+            detect = np.zeros(len(mask), dtype=bool)
+            for col in detect_cols:
+                detect |= np.asarray(self.full_df[col], dtype=np.float64) >= max_val_detect
+            mask &= detect
+
+        return self.full_df[mask]
+
+    def group_rms(self, group_cols: list) -> pd.DataFrame:
+        """
+        RMS of the relative error for every group of points [e.g. per variation].
+
+        Parameters
+        ----------
+        group_cols : list
+            Columns identifying a group.
+        Returns
+        -------
+        pd.DataFrame
+            `group_cols` with one `rms_error` per group.
+        """
+
+        codes = key_codes([self.full_df], group_cols)[0]
+        uniq, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+
+        valid = ~np.isnan(self.err)
+        sq_sum = np.bincount(inverse[valid], weights=self.err[valid] ** 2, minlength=len(uniq))
+        count = np.bincount(inverse[valid], minlength=len(uniq))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rms = np.sqrt(sq_sum / count)
+
+        rms_df = self.full_df.iloc[first][group_cols].reset_index(drop=True)
+        rms_df["rms_error"] = rms
+        return rms_df
@@ -0,0 +1,609 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Simulate the same sweep points with ngspice and Xyce models, and report differences between both simulators.
+
+Usage:
+  differential.py [--suite=<suite>] [--device=<devices>] [--jobs=<jobs>] [--compare_jobs=<jobs>] [--pass_thresh=<thresh>] [--quantile=<q>] [--run_dir=<run_dir>] [--sim_timeout=<s>]
+
+  -h, --help                Show help text.
+  -v, --version             Show version.
+  --suite=<suite>           Regression suite simulated on both simulators [mos_id, mos_rds]. [default: mos_id]
+  --device=<devices>        Devices to be checked, comma separated, all devices of the suite by default.
+  --jobs=<jobs>             Max number of simulators running at once, number of cores by default.
+  --compare_jobs=<jobs>     Worker processes comparing simulated points to measured data. [default: 2]
+  --pass_thresh=<thresh>    Max relative difference between simulators at the quantile, in %. [default: 1.0]
+  --quantile=<q>            Quantile of differences checked against the threshold. [default: 0.98]
+  --run_dir=<run_dir>       Directory of netlists and reports. [default: run_differential]
+  --sim_timeout=<s>         Max run time of one simulation in seconds, hung simulators are killed after it [0 for no timeout]. [default: 1800]
+"""
+
+from __future__ import annotations
+
+import os
+import logging
+import subprocess
+import multiprocessing
+import concurrent.futures
+from .lazy import lazy_import
+from .compare import join_results, relative_error
+from .meas_data import read_meas_data
+from .mos_netlists import netlist_group
+from .shared_data import SharedMeasData
+from .scheduler import available_cpus, configure_scheduler
+from .simulators import get_simulator
+from .sweeps import load_sweeps, sweep_axes, axis_columns, row_axes, format_axes
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+# CONSTANT VALUES
+MODELS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MEAS_DATA_DIR = os.path.join(MODELS_DIR, "180MCU_SPICE_DATA_clean", "gf180mcu_data")
+## Reference simulator of relative differences, and the simulator checked against it
+SIMULATORS = ["ngspice", "xyce"]
+## Lowest current, as used by Fets regressions
+CLIP_CURR = 10e-12
+## Columns of one variation, each variation is simulated by one netlist per simulator
+VARIATION_COLS = ["W (um)", "L (um)", "corner", "temp", "const_var", "const_var_val"]
+## Suites with netlist templates taking the same values for both simulators
+MOS_DEVICES = [
+    "nfet_03v3",
+    "pfet_03v3",
+    "nfet_06v0",
+    "pfet_06v0",
+    "nfet_06v0_nvt",
+    "nfet_03v3_dss",
+    "pfet_03v3_dss",
+    "nfet_06v0_dss",
+    "pfet_06v0_dss",
+]
+## Columns of measured data selecting the points of one variation
+VAR_KEYS = ["W (um)", "L (um)", "corner", "temp"]
+XYCE_MOS_COLUMNS = {"V(D_TN)": "vds", "V(G_TN)": "vgs", "V(B_TN)": "vbs"}
+## Arguments of each simulator are the ones used by the regressions of the suite
+DIFF_SUITES = {
+    "mos_id": {
+        "meas_result": "id",
+        "data_dir": "MOS_iv",
+        "devices": MOS_DEVICES,
+        "keys": ["W (um)", "L (um)", "corner", "temp", "vds", "vgs", "vbs"],
+        "columns": {"xyce": dict(XYCE_MOS_COLUMNS, **{"{-I(VDS)}": "id", "{I(VDS)}": "id"})},
+        "simulators": {"ngspice": None, "xyce": ["-hspice-ext", "all"]},
+    },
+    "mos_rds": {
+        "meas_result": "rds",
+        "data_dir": "MOS_iv",
+        "devices": MOS_DEVICES,
+        "keys": ["W (um)", "L (um)", "corner", "temp", "vds", "vgs", "vbs"],
+        "columns": {"xyce": dict(XYCE_MOS_COLUMNS, **{"{1/N(XMN1:M0:GDS)}": "rds", "{1/N(XMP1:M0:GDS)}": "rds"})},
+        "simulators": {"ngspice": None, "xyce": None},
+    },
+}
+
+## Measured data of the device compared by this worker process
+_meas_data = None
+
+
+def mos_template(suite: str, sim: str, device: str, meas_result: str) -> str:
+    """
+    Get the netlist template used by a Fets regression for one device.
+
+    Parameters
+    ----------
+    suite : str
+        Regression suite [mos_id or mos_rds].
+    sim : str
+        Simulator name.
+    device : str
+        Device name [e.g. nfet_03v3].
+    meas_result : str
+        Measurement of the suite [id or rds].
+    Returns
+    -------
+    str
+        Path of the template, it may not exist for all simulators.
+    """
+
+    return os.path.join(
+        MODELS_DIR, sim, "testing", "regression", suite, f"device_netlists_{meas_result}",
+        f"{netlist_group(device, meas_result)}.spice",
+    )
+
+
+def edge_vds(meas_result: str, device: str) -> list:
+    """
+    Get vds of points left out of comparison, as done by the Fets regressions.
+
+    Rds is a derivative of the sweep, so its first [vds = 0] and last points
+    [vds = 3.3 V for 03v3 devices, 6.6 V otherwise] aren't meaningful.
+
+    Parameters
+    ----------
+    meas_result : str
+        Measurement of the suite [id or rds].
+    device : str
+        Device name [e.g. nfet_03v3].
+    Returns
+    -------
+    list
+        vds values of points to be dropped, empty for other measurements.
+    """
+
+    if meas_result != "rds":
+        return []
+    last_vds = 3.3 if "03v3" in device else 6.6
+    return [0.0, -0.0, last_vds, -last_vds]  # Either nfet or pfet
+
+
+def sweep_points(df: pd.DataFrame) -> pd.Series:
+    """
+    Get the number of points simulated for each row of sweep data.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Sweep data with typed sweep columns.
+    Returns
+    -------
+    pd.Series
+        Number of points of each row, product of the points of all its sweep axes.
+    """
+
+    points = pd.Series(1, index=df.index)
+    for axis in sweep_axes(df):
+        _, start_col, stop_col, step_col = axis_columns(axis)
+        axis_points = np.floor(np.abs((df[stop_col] - df[start_col]) / df[step_col]) + 1e-9) + 1
+        points *= axis_points.fillna(1).astype(int)
+    return points
+
+
+class DiffBudget:
+    """
+    Bad points allowed for one device before its difference quantile is known to fail.
+
+    A point is bad if the relative difference between simulators is above
+    the threshold, or if one simulator has no result for it. Once more than
+    `allowed` points of the expected `total_points` are bad, the quantile of
+    all differences is above the threshold whatever the remaining points are.
+    """
+
+    def __init__(self, total_points: int, quantile: float, pass_thresh: float):
+        """
+        Parameters
+        ----------
+        total_points : int
+            Number of points expected for the device.
+        quantile : float
+            Quantile of differences checked against the threshold [e.g. 0.98].
+        pass_thresh : float
+            Max relative difference at the quantile, in %.
+        """
+
+        self.total_points = total_points
+        self.quantile = quantile
+        self.pass_thresh = pass_thresh
+        self.allowed = max(total_points - 1 - int(np.floor((total_points - 1) * quantile)), 0)
+        self.points = 0
+        self.bad = 0
+
+    def add(self, diff: np.ndarray) -> int:
+        """
+        Count differences of new points.
+
+        Parameters
+        ----------
+        diff : np.ndarray
+            Relative differences in %, NaN where a simulator has no result.
+        Returns
+        -------
+        int
+            Number of bad points among them.
+        """
+
+        bad = int(np.count_nonzero(~(diff <= self.pass_thresh)))
+        self.points += len(diff)
+        self.bad += bad
+        return bad
+
+    @property
+    def exceeded(self) -> bool:
+        return self.bad > self.allowed
+
+
+def simulate_variation(sim: str, backend, template: str, out_dir: str, device: str,
+                       row: dict, suite_cfg: dict) -> pd.DataFrame:
+    """
+    Simulate one variation of a device with one simulator.
+
+    Parameters
+    ----------
+    sim : str
+        Simulator name.
+    backend : SimulatorBackend
+        Backend of the simulator, shared by all variations of the device.
+    template : str
+        Path of the netlist template.
+    out_dir : str
+        Directory of netlists and results of this simulator.
+    device : str
+        Device name.
+    row : dict
+        Sweep row of the variation, with typed sweep columns.
+    suite_cfg : dict
+        Description of the suite, as in `DIFF_SUITES`.
+    Returns
+    -------
+    pd.DataFrame
+        Simulated points with variation and bias columns, None if the simulation failed.
+    """
+
+    width, length, corner, temp, const_var, const_var_val = (row[c] for c in VARIATION_COLS)
+    name = f"w{width}_l{length}_t{temp}_{corner}_{const_var}{const_var_val}"
+    netlist_path = os.path.join(out_dir, f"netlist_{name}.spice")
+    result_path = os.path.join(out_dir, f"simulated_{name}.{'dat' if sim == 'ngspice' else 'csv'}")
+
+    backend.render(
+        template,
+        netlist_path,
+        device=device,
+        meas_out_result=suite_cfg["meas_result"],
+        width=width,
+        length=length,
+        temp=temp,
+        corner=corner,
+        sweeps=format_axes(row_axes(row)),
+        vds_val=const_var_val if const_var == "vds" else 6,
+        vbs_val=const_var_val if const_var == "vbs" else 0,
+        const_var=const_var,
+        const_var_val=const_var_val,
+        result_path=result_path,
+        rawfile=False,
+        model_card_path=os.path.join(MODELS_DIR, sim, f"sm141064.{sim}"),
+        model_design_path=os.path.join(MODELS_DIR, sim, f"design.{sim}"),
+    )
+
+    try:
+        backend.run(netlist_path, check=True)
+    except subprocess.CalledProcessError:
+        logging.warning(f"{sim} failed for {device} {name}, log: {netlist_path}.log")
+        return None
+    if not os.path.isfile(result_path):
+        return None
+
+    result_df = backend.parse(result_path).rename(columns=suite_cfg["columns"].get(sim, {}))
+    result_df = result_df.drop(columns=["v-sweep"], errors="ignore")
+    for col in ["W (um)", "L (um)", "corner", "temp"]:
+        result_df[col] = row[col]
+
+    # Simulators use small values instead of 0 [10e-16 for example]
+    return result_df.round({"vbs": 2, "vgs": 2, "vds": 2}).drop_duplicates(subset=suite_cfg["keys"])
+
+
+def diff_points(results: dict, meas_df: pd.DataFrame, suite_cfg: dict, drop_vds: list = ()) -> pd.DataFrame:
+    """
+    Join results of both simulators of one variation with measured data.
+
+    Parameters
+    ----------
+    results : dict
+        Simulated points of each simulator, None for a failed simulation.
+    meas_df : pd.DataFrame
+        Measured points of the variation, could be empty.
+    suite_cfg : dict
+        Description of the suite, as in `DIFF_SUITES`.
+    drop_vds : list
+        vds of points left out, as returned by `edge_vds`.
+    Returns
+    -------
+    pd.DataFrame
+        One row per point with the output of each simulator, the measured
+        output and relative differences of Xyce against ngspice and of each
+        simulator against measured data.
+    """
+
+    out, keys = suite_cfg["meas_result"], suite_cfg["keys"]
+    frames = [
+        (df if df is not None else pd.DataFrame(columns=keys + [out]))[keys + [out]].rename(columns={out: f"{out}_{sim}"})
+        for sim, df in results.items()
+    ]
+
+    # Points simulated by any simulator, missing outputs are NaN
+    points_df = pd.concat([f[keys] for f in frames], ignore_index=True).drop_duplicates()
+    for frame in frames:
+        points_df = join_results(points_df, frame, keys)
+    points_df = join_results(points_df, meas_df[keys + [out]].rename(columns={out: f"{out}_meas"}), keys)
+    if len(drop_vds):
+        points_df = points_df[~points_df["vds"].isin(drop_vds)].reset_index(drop=True)
+
+    sim_cols = [f"{out}_{sim}" for sim in results]
+    if out == "id":
+        for col in sim_cols + [f"{out}_meas"]:
+            points_df[col] = points_df[col].astype(float).clip(lower=CLIP_CURR)
+
+    ref_col, other_col = sim_cols
+    points_df[f"{out}_diff"] = relative_error(points_df[ref_col], points_df[other_col])
+    for col in sim_cols:
+        points_df[f"{col}_err"] = relative_error(points_df[f"{out}_meas"], points_df[col])
+
+    return points_df
+
+
+def attach_meas_data(handle: dict):
+    """
+    Initializer of compare workers, attaching the measured data shared by `run_device`.
+
+    Parameters
+    ----------
+    handle : dict
+        Handle of the shared measured data of the device.
+    """
+
+    global _meas_data
+    _meas_data = SharedMeasData.attach(handle)
+
+
+def compare_variation(results: dict, variation: dict, suite_cfg: dict, drop_vds: list = ()) -> pd.DataFrame:
+    """
+    Compare results of both simulators of one variation in a compare worker.
+
+    Measured points of the variation are selected from the shared measured
+    data attached by `attach_meas_data`, so only simulated points are sent
+    to the worker.
+
+    Parameters
+    ----------
+    results : dict
+        Simulated points of each simulator, None for a failed simulation.
+    variation : dict
+        Value of each column of `VAR_KEYS` for the variation.
+    suite_cfg : dict
+        Description of the suite, as in `DIFF_SUITES`.
+    drop_vds : list
+        vds of points left out, as returned by `edge_vds`.
+    Returns
+    -------
+    pd.DataFrame
+        Points of the variation, as returned by `diff_points`.
+    """
+
+    columns = suite_cfg["keys"] + [suite_cfg["meas_result"]]
+    meas_df = _meas_data.frame(_meas_data.rows_where(variation), columns)
+    return diff_points(results, meas_df, suite_cfg, drop_vds)
+
+
+def run_device(suite: str, device: str, run_dir: str, jobs: int, quantile: float, pass_thresh: float,
+               compare_jobs: int = 2) -> bool:
+    """
+    Simulate all variations of one device on both simulators and stream their differences.
+
+    Both simulators of a variation are started together. Once both results
+    are read, the variation is compared by a pool of `compare_jobs` worker
+    processes sharing the measured data of the device, and its points are
+    appended to <run_dir>/<suite>/<device>/<device>_diff.csv. The device is
+    stopped once its bad points exceed the budget of the quantile check.
+
+    Parameters
+    ----------
+    suite : str
+        Suite name, key of `DIFF_SUITES`.
+    device : str
+        Device name.
+    run_dir : str
+        Directory of netlists and reports.
+    jobs : int
+        Max number of simulators running at once.
+    quantile : float
+        Quantile of differences checked against the threshold.
+    pass_thresh : float
+        Max relative difference at the quantile, in %.
+    compare_jobs : int
+        Number of worker processes comparing variations.
+    Returns
+    -------
+    bool
+        True if both simulators agree for this device.
+    """
+
+    suite_cfg = DIFF_SUITES[suite]
+    out = suite_cfg["meas_result"]
+    templates = {sim: mos_template(suite, sim, device, out) for sim in SIMULATORS}
+    # One backend per simulator, so each template is compiled once for all variations
+    backends = {sim: get_simulator(sim, suite_cfg["simulators"][sim]) for sim in SIMULATORS}
+    drop_vds = edge_vds(out, device)
+    missing = [t for t in templates.values() if not os.path.isfile(t)]
+    if missing:
+        logging.warning(f"# Device {device} skipped, no netlist template {', '.join(missing)}")
+        return True
+
+    data_dir = os.path.join(MEAS_DATA_DIR, suite_cfg["data_dir"])
+    sweeps_df = load_sweeps(os.path.join(data_dir, f"{device}_sweeps_{out}.csv"))
+
+    # Measured data is read once, compare workers select the points of each variation from a shared copy
+    meas_df = read_meas_data(os.path.join(data_dir, f"{device}_meas_{out}.csv"))
+    meas_df = meas_df.round({"vbs": 2, "vgs": 2, "vds": 2}).drop_duplicates()
+    meas_df = meas_df[suite_cfg["keys"] + [out]].reset_index(drop=True)
+
+    dev_dir = os.path.join(run_dir, suite, device)
+    for sim in SIMULATORS:
+        os.makedirs(os.path.join(dev_dir, sim), exist_ok=True)
+    report_path = os.path.join(dev_dir, f"{device}_diff.csv")
+    if os.path.exists(report_path):
+        os.remove(report_path)
+
+    budget = DiffBudget(int(sweep_points(sweeps_df).sum()), quantile, pass_thresh)
+    logging.info("######" * 10)
+    logging.info(f"# Checking Device {device}: {len(sweeps_df)} variations, ~{budget.total_points} points, "
+                 f"{budget.allowed} points allowed above {pass_thresh} %")
+
+    rows = sweeps_df.to_dict("records")
+    pending = {}
+    diffs = []
+    shared_meas = SharedMeasData.create(meas_df)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+    # Workers are spawned, the scheduler thread of this process isn't safe to fork
+    compare_pool = concurrent.futures.ProcessPoolExecutor(
+        max_workers=compare_jobs, mp_context=multiprocessing.get_context("spawn"),
+        initializer=attach_meas_data, initargs=(shared_meas.handle,),
+    )
+    try:
+        futures = {}
+        for i, row in enumerate(rows):
+            for sim in SIMULATORS:
+                future = executor.submit(
+                    simulate_variation, sim, backends[sim], templates[sim], os.path.join(dev_dir, sim), device, row,
+                    suite_cfg,
+                )
+                futures[future] = (i, sim)
+
+        # Simulations and comparisons are handled in the order they complete
+        compares = {}
+        while futures or compares:
+            done, _ = concurrent.futures.wait(
+                list(futures) + list(compares), return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                if future in futures:
+                    i, sim = futures.pop(future)
+                    pending.setdefault(i, {})[sim] = future.result()
+                    if len(pending[i]) == len(SIMULATORS):
+                        sim_results = pending.pop(i)
+                        results = {s: sim_results[s] for s in SIMULATORS}
+                        variation = {c: rows[i][c] for c in VAR_KEYS}
+                        compares[compare_pool.submit(compare_variation, results, variation, suite_cfg, drop_vds)] = i
+                    continue
+
+                row = rows[compares.pop(future)]
+                points_df = future.result()
+                points_df.to_csv(report_path, mode="a", header=not os.path.exists(report_path), index=False)
+
+                diff = points_df[f"{out}_diff"].to_numpy(dtype=float)
+                diffs.append(diff)
+                bad = budget.add(diff)
+                max_diff = np.nanmax(diff) if np.isfinite(diff).any() else np.nan
+                logging.info(
+                    f"{device} W={row['W (um)']} L={row['L (um)']} T={row['temp']} {row['corner']} "
+                    f"{row['const_var']}={row['const_var_val']}: {len(diff)} points, max diff {max_diff:.2f} %, "
+                    f"{bad} bad [{budget.bad}/{budget.allowed} allowed]"
+                )
+
+                if budget.exceeded:
+                    logging.error(f"# Device {device} stopped, {budget.bad} points differ above {pass_thresh} % "
+                                  f"after {budget.points}/{budget.total_points} points")
+                    return False
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        compare_pool.shutdown(wait=True, cancel_futures=True)
+        shared_meas.close()
+
+    all_diff = np.concatenate(diffs) if diffs else np.array([])
+    valid = all_diff[~np.isnan(all_diff)]
+    q_target = float(np.quantile(valid, quantile)) if len(valid) else np.nan
+    logging.info(f"# Device {device} {out} difference quantile: {q_target:.2f} %, "
+                 f"{budget.bad} bad points out of {budget.points}, report: {report_path}")
+
+    # Budget of the points actually simulated
+    final = DiffBudget(budget.points, quantile, pass_thresh)
+    final.bad = budget.bad
+    if final.exceeded:
+        logging.error(f"# Device {device} {out} differs between {' and '.join(SIMULATORS)}.")
+        return False
+
+    logging.info(f"# Device {device} {out} agrees between {' and '.join(SIMULATORS)}.")
+    return True
+
+
+def run_differential(suite: str, devices: list, jobs: int, quantile: float, pass_thresh: float, run_dir: str,
+                     sim_timeout: float = None, compare_jobs: int = 2) -> dict:
+    """
+    Check that ngspice and Xyce models give the same results for all devices of a suite.
+
+    Parameters
+    ----------
+    suite : str
+        Suite name, key of `DIFF_SUITES`.
+    devices : list
+        Devices to be checked, all devices of the suite if empty.
+    jobs : int
+        Max number of simulators running at once.
+    quantile : float
+        Quantile of differences checked against the threshold.
+    pass_thresh : float
+        Max relative difference at the quantile, in %.
+    run_dir : str
+        Directory of netlists and reports.
+    sim_timeout : float
+        Max run time of one simulation in seconds [0 for no timeout], default timeout of the scheduler if None.
+    compare_jobs : int
+        Number of worker processes comparing variations.
+    Returns
+    -------
+    dict
+        True for each device where both simulators agree.
+    """
+
+    configure_scheduler(max_jobs=jobs, timeout=sim_timeout)
+    for sim in SIMULATORS:
+        if not get_simulator(sim, DIFF_SUITES[suite]["simulators"][sim]).check_version():
+            raise RuntimeError(f"{sim} can't be used for differential run")
+
+    return {
+        device: run_device(suite, device, run_dir, jobs, quantile, pass_thresh, compare_jobs)
+        for device in devices or DIFF_SUITES[suite]["devices"]
+    }
+
+
+if __name__ == "__main__":
+    from docopt import docopt
+
+    # Args
+    arguments = docopt(__doc__, version="DIFFERENTIAL: 0.1")
+    suite = arguments["--suite"]
+    devices = [d for d in (arguments["--device"] or "").split(",") if d]
+    jobs = int(arguments["--jobs"] or len(available_cpus()))
+
+    # logging setup
+    logging.basicConfig(
+        level=logging.DEBUG,
+        handlers=[
+            logging.StreamHandler(),
+        ],
+        format="%(asctime)s | %(levelname)-7s | %(message)s",
+        datefmt="%d-%b-%Y %H:%M:%S",
+    )
+
+    if suite not in DIFF_SUITES:
+        logging.error(f"{suite} is not supported, allowed suites: {', '.join(DIFF_SUITES)}")
+        exit(1)
+
+    unknown = [d for d in devices if d not in DIFF_SUITES[suite]["devices"]]
+    if unknown:
+        logging.error(f"Unknown devices {', '.join(unknown)}, allowed devices: {', '.join(DIFF_SUITES[suite]['devices'])}")
+        exit(1)
+
+    # Calling main function
+    try:
+        results = run_differential(
+            suite, devices, jobs, float(arguments["--quantile"]), float(arguments["--pass_thresh"]), arguments["--run_dir"],
+            float(arguments["--sim_timeout"]), int(arguments["--compare_jobs"]),
+        )
+    except RuntimeError as err:
+        logging.error(str(err))
+        exit(1)
+
+    failed = [device for device, agreed in results.items() if not agreed]
+    if failed:
+        logging.error(f"{suite} differs between {' and '.join(SIMULATORS)} for {', '.join(failed)}")
+        exit(1)
+    logging.info(f"{suite} agrees between {' and '.join(SIMULATORS)} for all devices")
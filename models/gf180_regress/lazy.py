@@ -0,0 +1,53 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import types
+import importlib
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module that is imported on first access to one of its attributes.
+
+    Heavy modules [pandas, numpy, jinja2] take most of the startup time of
+    the regression and extraction scripts, even for `--help`. The real
+    module is imported by `importlib`, which holds the import lock, so the
+    first access could happen from any worker thread. Its attributes are
+    then copied to the proxy so later accesses are plain lookups.
+    """
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Get a module that is only imported when it's used.
+
+    Parameters
+    ----------
+    name : str
+        Full name of the module [e.g. pandas].
+    Returns
+    -------
+    types.ModuleType
+        The module itself if it's already imported, a LazyModule otherwise.
+    """
+
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
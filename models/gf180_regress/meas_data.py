@@ -0,0 +1,73 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import os
+import logging
+import importlib.util
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# pyarrow is only looked up here, it's imported by pandas when Parquet data is read
+HAS_PARQUET = importlib.util.find_spec("pyarrow") is not None
+
+
+def parquet_path_of(csv_path: str) -> str:
+    """
+    Get the Parquet file written next to an extracted csv file.
+
+    Parameters
+    ----------
+    csv_path : str
+        Path of the extracted csv file.
+    Returns
+    -------
+    str
+        Same path with `.parquet` extension.
+    """
+
+    return f"{os.path.splitext(csv_path)[0]}.parquet"
+
+
+def read_meas_data(csv_path: str, exact_floats: bool = False) -> pd.DataFrame:
+    """
+    Read extracted measured data or sweeps, preferring the Parquet copy.
+
+    The Parquet file is used when pyarrow is installed and it isn't older than
+    the csv file, otherwise the csv file is parsed as before. Parquet keeps the
+    column types of the extraction [categorical device, corner and sweeps].
+
+    Parameters
+    ----------
+    csv_path : str
+        Path of the extracted csv file [e.g. gf180mcu_data/MOS_iv/nfet_03v3_meas_id.csv].
+    exact_floats : bool
+        Parse csv floats so they round-trip to the same text [e.g. 0.04999999999999999],
+        as Parquet values do.
+    Returns
+    -------
+    df : pd.DataFrame
+        Extracted data.
+    """
+
+    parquet_path = parquet_path_of(csv_path)
+
+    if HAS_PARQUET and os.path.isfile(parquet_path):
+        if not os.path.isfile(csv_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+            return pd.read_parquet(parquet_path)
+        logging.warning(f"{parquet_path} is older than {csv_path}, using csv data")
+
+    return pd.read_csv(csv_path, float_precision="round_trip" if exact_floats else None)
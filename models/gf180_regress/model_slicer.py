@@ -0,0 +1,328 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Usage:
+  model_slicer.py --model_card=<path> --device=<device> --corner=<corner> [--out_dir=<dir>]
+
+  -h, --help                Show help text.
+  -v, --version             Show version.
+  --model_card=<path>       Model card to be sliced (e.g. models/ngspice/sm141064.ngspice).
+  --device=<device>         Device (subcircuit or model name) to keep in the fragment.
+  --corner=<corner>         Corner section of the model card (e.g. typical).
+  --out_dir=<dir>           Directory where fragments are written. [default: .model_slices]
+"""
+
+import os
+import re
+import hashlib
+import logging
+import threading
+from docopt import docopt
+
+# CONSTANT VALUES
+FRAGMENT_HASH_LEN = 16
+MODEL_BIN_RE = re.compile(r"^(.*)\.\d+$")
+TOKEN_RE = re.compile(r"[a-z_][\w.]*")
+
+
+class ModelCardIndex:
+    """
+    Index of the `.lib`/`.endl` sections of one model card file.
+
+    The file is read once, section bodies are kept as line offsets and nested
+    `.lib '<file>' <section>` calls are resolved through `ModelCardIndex.get`,
+    so every card file is only parsed once per process.
+    """
+
+    _indexes = {}
+    _lock = threading.Lock()
+
+    def __init__(self, card_path: str):
+        self.card_path = os.path.abspath(card_path)
+
+        with open(self.card_path) as f:
+            self.lines = f.read().splitlines()
+
+        self.sections = {}
+        open_sections = []
+        for i, line in enumerate(self.lines):
+            words = line.split()
+            if not words:
+                continue
+            keyword = words[0].lower()
+            if keyword == ".lib" and len(words) == 2:
+                open_sections.append((words[1].lower(), i + 1))
+            elif keyword == ".endl" and open_sections:
+                name, start = open_sections.pop()
+                self.sections[name] = (start, i)
+
+        logging.info(f"Indexed {len(self.sections)} sections in {self.card_path}")
+
+    @classmethod
+    def get(cls, card_path: str):
+        """
+        Get the shared index of a model card, building it on first use.
+
+        Parameters
+        ----------
+        card_path : str
+            Path of the model card file.
+        Returns
+        -------
+        ModelCardIndex
+            Index of the requested card.
+        """
+
+        card_path = os.path.abspath(card_path)
+        with cls._lock:
+            if card_path not in cls._indexes:
+                cls._indexes[card_path] = cls(card_path)
+            return cls._indexes[card_path]
+
+    def flatten(self, section: str, visited: tuple = ()) -> list:
+        """
+        Get the lines of a section with all nested `.lib` calls expanded.
+
+        Parameters
+        ----------
+        section : str
+            Name of the section to be expanded.
+        visited : tuple
+            Sections already being expanded, used to stop include loops.
+        Returns
+        -------
+        lines : list
+            All lines of the section after expanding nested libraries.
+        """
+
+        key = (self.card_path, section.lower())
+        if key in visited:
+            return []
+
+        if section.lower() not in self.sections:
+            raise ValueError(f"Section {section} doesn't exist in {self.card_path}")
+
+        start, end = self.sections[section.lower()]
+        lines = []
+        for line in self.lines[start:end]:
+            words = line.split()
+            if len(words) == 3 and words[0].lower() == ".lib":
+                lib_path = os.path.join(
+                    os.path.dirname(self.card_path), words[1].strip("'\"")
+                )
+                lines.extend(
+                    ModelCardIndex.get(lib_path).flatten(words[2], visited + (key,))
+                )
+            else:
+                lines.append(line)
+
+        return lines
+
+
+def split_statements(lines: list) -> list:
+    """
+    Group card lines into top level statements.
+
+    Parameters
+    ----------
+    lines : list
+        Lines of a flattened section.
+    Returns
+    -------
+    statements : list
+        List of (kind, name, lines) where kind is model, subckt or other.
+    """
+
+    statements = []
+    subckt = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("*"):
+            continue
+
+        if stripped.startswith("+"):
+            if subckt is not None:
+                subckt[2].append(line)
+            elif statements:
+                statements[-1][2].append(line)
+            continue
+
+        words = stripped.lower().split()
+        if subckt is not None:
+            subckt[2].append(line)
+            if words[0] == ".ends":
+                statements.append(subckt)
+                subckt = None
+        elif words[0] == ".subckt":
+            subckt = ("subckt", words[1], [line])
+        elif words[0] == ".model":
+            name = words[1]
+            bin_match = MODEL_BIN_RE.match(name)
+            statements.append(("model", bin_match.group(1) if bin_match else name, [line]))
+        else:
+            statements.append(("other", None, [line]))
+
+    return statements
+
+
+def needed_names(statements: list, device: str) -> set:
+    """
+    Get all subcircuits and models a device depends on.
+
+    Parameters
+    ----------
+    statements : list
+        Statements generated by `split_statements`.
+    device : str
+        Name of the device used in the netlist.
+    Returns
+    -------
+    needed : set
+        Names of subcircuits and model bins used by the device.
+    """
+
+    defined = {name for kind, name, _ in statements if kind != "other"}
+    subckt_refs = {}
+    for kind, name, body in statements:
+        if kind == "subckt":
+            refs = set(TOKEN_RE.findall(" ".join(body[1:]).lower()))
+            subckt_refs.setdefault(name, set()).update(refs & defined)
+
+    needed = set()
+    pending = [device.lower()]
+    while pending:
+        name = pending.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        pending.extend(subckt_refs.get(name, set()) - needed)
+
+    return needed & defined
+
+
+class ModelCardSlicer:
+    """
+    Generator of minimal per (device, corner) model card fragments.
+
+    Each fragment keeps the corner parameters and only the subcircuits and
+    model bins the device needs. It's written as a `.lib` with the same corner
+    section name, so netlists keep using `.lib <fragment> <corner>`.
+    Fragment names are derived from a hash of the card content, device and
+    corner, so stale fragments are never reused after the card is edited.
+    """
+
+    def __init__(self, out_dir: str = ".model_slices"):
+        self.out_dir = out_dir
+        self._fragments = {}
+        self._lock = threading.Lock()
+
+    def fragment_key(self, card_path: str, device: str, corner: str) -> str:
+        index = ModelCardIndex.get(card_path)
+        card_hash = hashlib.sha256("\n".join(index.lines).encode()).hexdigest()
+        key = f"{card_hash}|{device.lower()}|{corner.lower()}"
+        return hashlib.sha256(key.encode()).hexdigest()[:FRAGMENT_HASH_LEN]
+
+    def get_fragment(self, card_path: str, device: str, corner: str) -> str:
+        """
+        Get the path of the fragment for a device at one corner.
+
+        Parameters
+        ----------
+        card_path : str
+            Path of the full model card.
+        device : str
+            Name of the device used in the netlist.
+        corner : str
+            Corner section used in the netlist.
+        Returns
+        -------
+        fragment_path : str
+            Path of the fragment to be used instead of the full model card.
+        """
+
+        with self._lock:
+            cache_key = (os.path.abspath(card_path), device.lower(), corner.lower())
+            if cache_key in self._fragments:
+                return self._fragments[cache_key]
+
+            fragment_name = f"{device}_{corner}_{self.fragment_key(card_path, device, corner)}.lib"
+            fragment_path = os.path.abspath(os.path.join(self.out_dir, fragment_name))
+
+            if not os.path.isfile(fragment_path):
+                self.write_fragment(card_path, device, corner, fragment_path)
+
+            self._fragments[cache_key] = fragment_path
+            return fragment_path
+
+    def write_fragment(self, card_path: str, device: str, corner: str, fragment_path: str):
+        """
+        Slice the model card and write the fragment of a device at one corner.
+
+        Parameters
+        ----------
+        card_path : str
+            Path of the full model card.
+        device : str
+            Name of the device used in the netlist.
+        corner : str
+            Corner section used in the netlist.
+        fragment_path : str
+            Path of the output fragment.
+        """
+
+        statements = split_statements(ModelCardIndex.get(card_path).flatten(corner))
+        needed = needed_names(statements, device)
+
+        if device.lower() not in needed:
+            raise ValueError(f"Device {device} isn't defined at {corner} corner of {card_path}")
+
+        fragment_lines = [
+            f"* Fragment of {os.path.basename(card_path)} for {device} at {corner} corner",
+            f".lib {corner}",
+        ]
+        for kind, name, body in statements:
+            if kind == "other" or name in needed:
+                fragment_lines.extend(body)
+        fragment_lines.append(f".endl {corner}")
+
+        os.makedirs(os.path.dirname(fragment_path), exist_ok=True)
+        tmp_path = f"{fragment_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(fragment_lines) + "\n")
+        os.replace(tmp_path, fragment_path)
+
+        logging.info(f"Model card fragment for {device} at {corner} corner: {fragment_path} ({len(fragment_lines)} lines)")
+
+
+# ================================================================
+# -------------------------- MAIN --------------------------------
+# ================================================================
+
+
+if __name__ == "__main__":
+
+    # Args
+    arguments = docopt(__doc__, version="MODEL-SLICER: 0.1")
+
+    logging.basicConfig(
+        level=logging.DEBUG,
+        handlers=[
+            logging.StreamHandler(),
+        ],
+        format="%(asctime)s | %(levelname)-7s | %(message)s",
+        datefmt="%d-%b-%Y %H:%M:%S",
+    )
+
+    slicer = ModelCardSlicer(arguments["--out_dir"])
+    print(slicer.get_fragment(arguments["--model_card"], arguments["--device"], arguments["--corner"]))
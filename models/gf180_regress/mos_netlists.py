@@ -0,0 +1,41 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+def netlist_group(device: str, meas_out_result: str) -> str:
+    """
+    Get the netlist template group of a Fets device, same for ngspice and Xyce regressions.
+
+    Parameters
+    ----------
+    device : str
+        Device name [e.g. nfet_03v3].
+    meas_out_result : str
+        Measurement of the regression [id or rds].
+    Returns
+    -------
+    str
+        Name of the netlist template [without extension] in device_netlists_<meas_out_result>.
+    """
+
+    if meas_out_result == "id":
+        return "nfet" if "nfet" in device else "pfet"
+
+    # Rds of nfet_06v0 and pfet_06v0 [and their dss devices] is measured as a conductance
+    if "03v3" in device:
+        return "nfet_03v3" if "nfet" in device else "pfet_03v3"
+    elif "06v0_nvt" in device:
+        return "nfet_06v0_nvt"
+    else:
+        return "nfet_06v0" if "nfet" in device else "pfet_06v0"
@@ -0,0 +1,377 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+import shutil
+import logging
+import threading
+import subprocess
+from uuid import uuid4
+from .scheduler import default_timeout
+
+# Independent source with a dc value, e.g. "vds D_tn 0 dc=3.3"
+SOURCE_LINE = re.compile(r"^(v\S+)\s+(\S+)\s+(\S+)\s+dc\s*=?\s*(\S+)$", re.IGNORECASE)
+TEMP_LINE = re.compile(r"^\.temp\s+(\S+)$", re.IGNORECASE)
+
+
+def split_netlist(netlist_text: str) -> tuple:
+    """
+    Split a netlist to its circuit lines and its control commands.
+
+    Parameters
+    ----------
+    netlist_text : str
+        Netlist text, its first line is the title.
+    Returns
+    -------
+    circuit : tuple
+        Circuit lines without comments, continuation lines are joined.
+    control : list
+        Commands of the `.control` block.
+    """
+
+    circuit = []
+    control = []
+    in_control = False
+
+    for line in netlist_text.splitlines()[1:]:
+        line = line.strip()
+        if not line or line.startswith("*"):
+            continue
+
+        if line.lower() == ".control":
+            in_control = True
+        elif line.lower() == ".endc":
+            in_control = False
+        elif in_control:
+            control.append(line)
+        elif line.startswith("+") and circuit:
+            circuit[-1] = f"{circuit[-1]} {line[1:].strip()}"
+        elif line.lower() != ".end":
+            circuit.append(line)
+
+    return tuple(circuit), control
+
+
+def circuit_key(circuit: tuple) -> tuple:
+    """
+    Get the part of a circuit that needs a new netlist load when changed.
+
+    Source values and temperature are left out, as they are changed in
+    place. Instances [and so the W/L bin of their model], model card and
+    corner are kept.
+
+    Parameters
+    ----------
+    circuit : tuple
+        Circuit lines of `split_netlist`.
+    Returns
+    -------
+    tuple
+        Circuit lines with source values and temperature removed.
+    """
+
+    key = []
+    for line in circuit:
+        source = SOURCE_LINE.match(line)
+        if source:
+            key.append(" ".join(source.group(1, 2, 3)).lower())
+        elif not TEMP_LINE.match(line):
+            key.append(line)
+    return tuple(key)
+
+
+def alter_commands(loaded: tuple, circuit: tuple) -> list:
+    """
+    Get commands changing a loaded circuit to another one in place.
+
+    Parameters
+    ----------
+    loaded : tuple
+        Circuit lines of the loaded netlist.
+    circuit : tuple
+        Circuit lines of the next netlist.
+    Returns
+    -------
+    list
+        `alter` and `option temp` commands, None if the circuits differ by more
+        than source values and temperature.
+    """
+
+    if loaded is None or circuit_key(loaded) != circuit_key(circuit):
+        return None
+
+    commands = []
+    for old, new in zip(loaded, circuit):
+        if old == new:
+            continue
+
+        source = SOURCE_LINE.match(new)
+        temp = TEMP_LINE.match(new)
+        if source:
+            commands.append(f"alter {source.group(1)} dc = {source.group(4)}")
+        elif temp:
+            commands.append(f"option temp = {temp.group(1)}")
+
+    return commands
+
+
+class NgspiceServer:
+    """
+    Long-lived ngspice process driven through its pipe (-p) interface.
+
+    The first netlist is loaded with `source`, which parses its model card
+    and runs its `.control` block. Next netlists that only differ by source
+    values and temperature reuse the loaded circuit: sources are changed with
+    `alter`, temperature with `option temp`, then the control commands are
+    run again. Other netlists [e.g. new W/L, whose model bin is selected at
+    parse time] replace the circuit with a new `source`.
+
+    ngspice is killed if a netlist runs longer than `timeout` [`default_timeout()`
+    if not given], like simulators run by the scheduler.
+    """
+
+    def __init__(self, ngspice_cmd: str = "ngspice", cwd: str = None, timeout: float = None):
+        cmd = [ngspice_cmd, "-p"]
+        # ngspice block-buffers stdout when it isn't a terminal
+        if shutil.which("stdbuf"):
+            cmd = ["stdbuf", "-oL"] + cmd
+
+        self.cwd = cwd
+        self.timeout = default_timeout() if timeout is None else (timeout if timeout > 0 else None)
+        self.circuit = None
+        self.loads = 0
+        self.runs = 0
+        self.proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            cwd=cwd,
+            text=True,
+            bufsize=1,
+        )
+        self._send("set noaskquit")
+
+    def _send(self, command: str):
+        """
+        Write one interactive command to ngspice.
+
+        Parameters
+        ----------
+        command : str
+            ngspice front-end command to be executed.
+        """
+        self.proc.stdin.write(f"{command}\n")
+        self.proc.stdin.flush()
+
+    def is_alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def run_commands(self, commands: list) -> list:
+        """
+        Run a list of ngspice commands and collect their output.
+
+        Parameters
+        ----------
+        commands : list
+            ngspice front-end commands to be executed in order.
+        Returns
+        -------
+        lines : list
+            Output lines printed by ngspice while running the commands.
+        """
+
+        sentinel = f"gf180_regress_done_{uuid4().hex}"
+        for command in commands:
+            self._send(command)
+        self._send(f"echo {sentinel}")
+
+        # A hung ngspice is killed, so reading its output stops at end of file
+        watchdog = threading.Timer(self.timeout, self.proc.kill) if self.timeout else None
+        if watchdog is not None:
+            watchdog.daemon = True
+            watchdog.start()
+
+        lines = []
+        try:
+            while True:
+                line = self.proc.stdout.readline()
+                if not line:
+                    if watchdog is not None and not watchdog.is_alive():
+                        logging.warning(f"ngspice server timed out after {self.timeout} s, it was killed")
+                    raise subprocess.CalledProcessError(
+                        self.proc.wait() or -1, "ngspice -p", output="".join(lines)
+                    )
+                if sentinel in line:
+                    break
+                lines.append(line)
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+
+        return lines
+
+    def simulate(self, netlist_path: str) -> int:
+        """
+        Run one netlist on this server and write its log next to it.
+
+        Parameters
+        ----------
+        netlist_path : str
+            Path of the netlist to be simulated.
+        Returns
+        -------
+        int
+            0 if the simulation succeeded, raises CalledProcessError otherwise.
+        """
+
+        with open(netlist_path) as f:
+            circuit, control = split_netlist(f.read())
+
+        self.runs += 1
+        commands = alter_commands(self.circuit, circuit)
+        if commands is None:
+            # Loading the netlist, its control block is run by source
+            if self.circuit is not None:
+                self.run_commands(["remcirc"])
+            self.circuit = circuit
+            self.loads += 1
+            commands = [f"source {os.path.abspath(netlist_path)}"]
+        else:
+            self.circuit = circuit
+            commands += control
+
+        lines = self.run_commands(commands + ["destroy all"])
+
+        with open(f"{netlist_path}.log", "w") as f:
+            f.writelines(lines)
+
+        if any(line.lstrip().startswith("Error") for line in lines):
+            # Circuit state is unknown after an error, next netlist is loaded again
+            self.run_commands(["remcirc"])
+            self.circuit = None
+            raise subprocess.CalledProcessError(1, f"source {netlist_path}", output="".join(lines))
+
+        return 0
+
+    def close(self):
+        """
+        Quit ngspice and wait for the process to exit.
+        """
+        if self.is_alive():
+            try:
+                self._send("quit")
+                self.proc.stdin.close()
+                self.proc.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self.proc.kill()
+                self.proc.wait()
+
+
+class NgspicePool:
+    """
+    Pool of NgspiceServer instances shared by regression worker threads.
+
+    Servers are started on demand up to `size`, so small sweeps don't spawn
+    more simulators than they need. A netlist is given to an idle server that
+    has the same circuit loaded if any, so variations of the same W/L don't
+    load the model card again. A server that dies during a run is replaced by
+    a fresh one on the next request.
+    """
+
+    def __init__(self, size: int, ngspice_cmd: str = "ngspice", cwd: str = None, timeout: float = None):
+        self.size = max(1, size)
+        self.ngspice_cmd = ngspice_cmd
+        self.cwd = cwd
+        self.timeout = timeout
+        self._idle = []
+        self._servers = []
+        self._lock = threading.Condition()
+
+    def _acquire(self, key: tuple) -> NgspiceServer:
+        with self._lock:
+            while True:
+                for server in self._idle:
+                    if server.circuit is not None and circuit_key(server.circuit) == key:
+                        self._idle.remove(server)
+                        return server
+
+                if len(self._servers) < self.size:
+                    server = NgspiceServer(self.ngspice_cmd, self.cwd, self.timeout)
+                    self._servers.append(server)
+                    return server
+
+                if self._idle:
+                    return self._idle.pop(0)
+
+                self._lock.wait()
+
+    def _release(self, server: NgspiceServer):
+        if not server.is_alive():
+            logging.warning("ngspice server exited unexpectedly, starting a new one")
+            server.close()
+            new_server = NgspiceServer(self.ngspice_cmd, self.cwd, self.timeout)
+            with self._lock:
+                self._servers[self._servers.index(server)] = new_server
+            server = new_server
+
+        with self._lock:
+            self._idle.append(server)
+            self._lock.notify()
+
+    def simulate(self, netlist_path: str) -> int:
+        """
+        Run one netlist on the first available server.
+
+        Parameters
+        ----------
+        netlist_path : str
+            Path of the netlist to be simulated.
+        Returns
+        -------
+        int
+            0 if the simulation succeeded, raises CalledProcessError otherwise.
+        """
+
+        with open(netlist_path) as f:
+            circuit, _ = split_netlist(f.read())
+
+        server = self._acquire(circuit_key(circuit))
+        try:
+            return server.simulate(netlist_path)
+        finally:
+            self._release(server)
+
+    def close(self):
+        """
+        Quit all ngspice servers started by this pool.
+        """
+        with self._lock:
+            loads = sum(server.loads for server in self._servers)
+            runs = sum(server.runs for server in self._servers)
+            for server in self._servers:
+                server.close()
+            self._servers = []
+            self._idle = []
+
+        if runs:
+            logging.info(f"ngspice servers ran {runs} netlists, {loads} of them were loaded from scratch")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,136 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# CONSTANT VALUES
+RAWFILE_MAGIC = b"Title:"
+BINARY_MARKER = b"Binary:"
+VALUES_MARKER = b"Values:"
+
+
+def _parse_header(buf: bytes) -> tuple:
+    """
+    Parse the ASCII header of the first plot of a rawfile.
+
+    Parameters
+    ----------
+    buf : bytes
+        Content of the rawfile.
+    Returns
+    -------
+    header : tuple
+        (names, num_points, is_complex, data_kind, data_offset)
+    """
+
+    names = []
+    num_vars = num_points = None
+    is_complex = False
+    in_vars = False
+    pos = 0
+
+    while pos < len(buf):
+        end = buf.find(b"\n", pos)
+        end = len(buf) if end < 0 else end
+        line = buf[pos:end].decode("ascii", errors="replace").rstrip("\r")
+        pos = end + 1
+
+        if line.startswith(("Binary:", "Values:")):
+            if num_vars is None or num_points is None or len(names) != num_vars:
+                raise ValueError("Incomplete rawfile header")
+            return names, num_points, is_complex, line.split(":")[0], pos
+
+        if in_vars and line[:1] in (" ", "\t"):
+            # "<index> <name> <type> [dims=...]"
+            names.append(line.split()[1])
+            continue
+        in_vars = False
+
+        key, _, value = line.partition(":")
+        key = key.strip().lower()
+        if key == "flags":
+            is_complex = "complex" in value.lower()
+        elif key == "no. variables":
+            num_vars = int(value)
+        elif key == "no. points":
+            num_points = int(value)
+        elif key == "variables":
+            in_vars = True
+
+    raise ValueError("Rawfile has no data section")
+
+
+def read_rawfile(raw_path: str) -> dict:
+    """
+    Read the vectors of the first plot of a SPICE rawfile.
+
+    Binary data is mapped with `np.frombuffer` without any text parsing,
+    ASCII rawfiles are supported as a fallback.
+
+    Parameters
+    ----------
+    raw_path : str
+        Path of the rawfile written by ngspice `write`.
+    Returns
+    -------
+    vectors : dict
+        Vector name to numpy array, in file order.
+    """
+
+    with open(raw_path, "rb") as f:
+        buf = f.read()
+
+    names, num_points, is_complex, data_kind, offset = _parse_header(buf)
+    num_vars = len(names)
+
+    if data_kind == "Binary":
+        dtype = np.complex128 if is_complex else np.float64
+        data = np.frombuffer(buf, dtype=dtype, count=num_points * num_vars, offset=offset)
+        data = data.reshape(num_points, num_vars)
+    elif is_complex:
+        raise ValueError(f"Complex ASCII rawfiles aren't supported: {raw_path}")
+    else:
+        # Every point is "<index> <value0>" followed by one line per vector
+        tokens = buf[offset:].split()[: num_points * (num_vars + 1)]
+        data = np.array(tokens).reshape(num_points, num_vars + 1)[:, 1:].astype(np.float64)
+
+    return {name: data[:, i] for i, name in enumerate(names)}
+
+
+def read_sim_output(result_path: str) -> pd.DataFrame:
+    """
+    Read a simulation output, either a rawfile or an ASCII `wrdata` file.
+
+    Parameters
+    ----------
+    result_path : str
+        Path of the simulator output.
+    Returns
+    -------
+    result_df : pd.DataFrame
+        One column per written vector.
+    """
+
+    with open(result_path, "rb") as f:
+        is_rawfile = f.read(len(RAWFILE_MAGIC)) == RAWFILE_MAGIC
+
+    if is_rawfile:
+        return pd.DataFrame(read_rawfile(result_path))
+
+    return pd.read_csv(result_path, delimiter=r"\s+")
@@ -0,0 +1,146 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import hashlib
+import logging
+import threading
+
+# CONSTANT VALUES
+RESULT_PATH_MARKER = "<result_path>"
+# Bumped whenever the format of cached entries changes
+CACHE_FORMAT = "2"
+
+
+class ResultCache:
+    """
+    Content addressed cache of simulation results.
+
+    Entries are keyed on the rendered netlist, the content of the files it
+    depends on [model card, design file] and the simulator version, so a
+    point is only simulated again when one of them changes.
+    """
+
+    def __init__(self, cache_dir: str, simulator_version: str):
+        self.cache_dir = cache_dir
+        self.simulator_version = simulator_version.strip()
+        self._file_digests = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def file_digest(self, file_path: str) -> str:
+        """
+        Get the sha256 of a file, reused while its size and mtime are unchanged.
+
+        Parameters
+        ----------
+        file_path : str
+            Path of the file to be hashed.
+        Returns
+        -------
+        str
+            Hex digest of the file content.
+        """
+
+        stat = os.stat(file_path)
+        stamp = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            if stamp not in self._file_digests:
+                with open(file_path, "rb") as f:
+                    self._file_digests[stamp] = hashlib.sha256(f.read()).hexdigest()
+            return self._file_digests[stamp]
+
+    def key(self, netlist_text: str, result_path: str, dep_paths: list) -> str:
+        """
+        Get the cache key of one simulation.
+
+        Parameters
+        ----------
+        netlist_text : str
+            Rendered netlist of the simulation.
+        result_path : str
+            Output path used in the netlist, masked as it changes between runs.
+        dep_paths : list
+            Files used by the netlist [model card, design file].
+        Returns
+        -------
+        str
+            Hex digest used as cache key.
+        """
+
+        h = hashlib.sha256()
+        h.update(CACHE_FORMAT.encode())
+        h.update(self.simulator_version.encode())
+        h.update(netlist_text.replace(result_path, RESULT_PATH_MARKER).encode())
+        for dep_path in dep_paths:
+            h.update(self.file_digest(dep_path).encode())
+
+        return h.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key: str, dest_path: str) -> bool:
+        """
+        Copy a cached result to its output path if it exists.
+
+        Parameters
+        ----------
+        key : str
+            Cache key of the simulation.
+        dest_path : str
+            Output path of the simulation result.
+        Returns
+        -------
+        bool
+            True if the result was found in cache.
+        """
+
+        entry_path = self._entry_path(key)
+        if not os.path.isfile(entry_path):
+            with self._lock:
+                self.misses += 1
+            return False
+
+        shutil.copyfile(entry_path, dest_path)
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def put(self, key: str, src_path: str):
+        """
+        Store a simulation result in cache.
+
+        Parameters
+        ----------
+        key : str
+            Cache key of the simulation.
+        src_path : str
+            Path of the result to be stored.
+        """
+
+        entry_path = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, entry_path)
+
+    def log_stats(self):
+        logging.info(f"Simulation cache hits: {self.hits}, misses: {self.misses}")
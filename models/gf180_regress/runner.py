@@ -0,0 +1,260 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+import ast
+import sys
+import time
+import shutil
+import logging
+import subprocess
+from datetime import datetime
+from .scheduler import create_jobserver, JOBSERVER_ENV, TIMEOUT_ENV
+from .simulators import BACKENDS
+
+# CONSTANT VALUES
+MODELS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIMULATORS = list(BACKENDS)
+## Same run folder as the testing Makefiles, so relative paths of suites still work
+RUN_FOLDER_FORMAT = "models_run_%Y_%m_%d_%H_%M_%S"
+## Interval between checks of running suites, in seconds
+POLL_INTERVAL = 0.5
+## Long options of a docopt usage [e.g. "--num_cores=<num>" or "--sim_cache"]
+OPTION_PATTERN = re.compile(r"(--\w[\w-]*)(=<)?")
+
+
+def regression_dir(sim: str) -> str:
+    return os.path.join(MODELS_DIR, sim, "testing", "regression")
+
+
+def list_suites(sim: str) -> list:
+    """
+    Get all regression suites of one simulator.
+
+    Parameters
+    ----------
+    sim : str
+        Simulator name [ngspice or xyce].
+    Returns
+    -------
+    list
+        Names of suites [e.g. mos_id], each one is a directory holding models_regression.py.
+    """
+
+    reg_dir = regression_dir(sim)
+    return sorted(
+        d for d in os.listdir(reg_dir) if os.path.isfile(os.path.join(reg_dir, d, "models_regression.py"))
+    )
+
+
+def prepare_run_dir(sim: str, suites: list, run_folder: str) -> str:
+    """
+    Create the run folder of one simulator and copy the suites to it, like the testing Makefile does.
+
+    Suites find measured data and models by relative paths, so the run
+    folder has to be at the same depth as the regression folder.
+
+    Parameters
+    ----------
+    sim : str
+        Simulator name [ngspice or xyce].
+    suites : list
+        Names of suites to be copied.
+    run_folder : str
+        Name of the run folder under <sim>/testing [e.g. models_run_2023_06_01_10_00_00].
+    Returns
+    -------
+    str
+        Path of the run folder.
+    """
+
+    run_dir = os.path.join(MODELS_DIR, sim, "testing", run_folder)
+    os.makedirs(run_dir, exist_ok=True)
+
+    for suite in suites:
+        shutil.copytree(os.path.join(regression_dir(sim), suite), os.path.join(run_dir, suite), dirs_exist_ok=True)
+
+    return run_dir
+
+
+def suite_options(sim: str, suite: str) -> dict:
+    """
+    Get options accepted by models_regression.py of one suite, read from its docopt usage.
+
+    Parameters
+    ----------
+    sim : str
+        Simulator name [ngspice or xyce].
+    suite : str
+        Suite name [e.g. mos_id].
+    Returns
+    -------
+    dict
+        True for each option taking a value [e.g. {"--num_cores": True, "--sim_cache": False}].
+    """
+
+    with open(os.path.join(regression_dir(sim), suite, "models_regression.py")) as script:
+        usage = ast.get_docstring(ast.parse(script.read())) or ""
+
+    options = {}
+    for name, value in OPTION_PATTERN.findall(usage):
+        options[name] = options.get(name, False) or bool(value)
+    return options
+
+
+def filter_suite_args(args: list, options: dict) -> tuple:
+    """
+    Split arguments between those accepted by one suite and the others.
+
+    Parameters
+    ----------
+    args : list
+        Arguments given for all suites [e.g. ["--sim_cache", "--batch_size", "64"]].
+    options : dict
+        Options accepted by the suite, as returned by `suite_options`.
+    Returns
+    -------
+    tuple
+        (accepted args, skipped args)
+    """
+
+    accepted = []
+    skipped = []
+    i = 0
+    while i < len(args):
+        name, has_value, _ = args[i].partition("=")
+        takes_value = options.get(name, False) and not has_value and i + 1 < len(args)
+        arg = args[i:i + 2] if takes_value else args[i:i + 1]
+        (accepted if name in options else skipped).extend(arg)
+        i += len(arg)
+    return accepted, skipped
+
+
+class SuiteRun:
+    """
+    One regression suite running in its own process, its output is written to <run_dir>/<suite>.log.
+    """
+
+    def __init__(self, sim: str, suite: str, run_dir: str, args: list, env: dict, fds: tuple):
+        """
+        Parameters
+        ----------
+        sim : str
+            Simulator name [ngspice or xyce].
+        suite : str
+            Suite name [e.g. mos_id].
+        run_dir : str
+            Run folder holding a copy of the suite.
+        args : list
+            Arguments of models_regression.py.
+        env : dict
+            Environment of the suite, holding the jobserver pipe.
+        fds : tuple
+            Jobserver pipe descriptors, inherited by the suite.
+        """
+
+        self.name = f"{sim}/{suite}"
+        self.log_path = os.path.join(run_dir, f"{suite}.log")
+        self.start = time.perf_counter()
+        self.duration = None
+
+        with open(self.log_path, "w") as log_file:
+            self.proc = subprocess.Popen(
+                [sys.executable, "models_regression.py"] + args,
+                cwd=os.path.join(run_dir, suite),
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                env=env,
+                pass_fds=fds,
+            )
+
+    def poll(self):
+        returncode = self.proc.poll()
+        if returncode is not None and self.duration is None:
+            self.duration = time.perf_counter() - self.start
+        return returncode
+
+
+def run_suites(sims: list, suites: list, jobs: int, suite_args: list = None, sim_timeout: float = None) -> dict:
+    """
+    Run regression suites of all simulators at once, sharing one queue of simulations.
+
+    Every suite runs in its own process, as started by the testing Makefile,
+    and all of them take their simulations from one jobserver of `jobs`
+    tokens, so a suite finishing its last simulations leaves its cores to
+    the other suites.
+
+    Parameters
+    ----------
+    sims : list
+        Simulator names [ngspice or xyce].
+    suites : list
+        Names of suites to be run, all suites of each simulator if empty.
+    jobs : int
+        Max number of simulators running at once over all suites.
+    suite_args : list
+        Other arguments of models_regression.py, each suite only gets the options its usage accepts.
+    sim_timeout : float
+        Max run time of one simulation of any suite in seconds [0 for no timeout], default timeout of the scheduler if None.
+    Returns
+    -------
+    dict
+        Exit code of each suite [e.g. {"ngspice/mos_id": 0}].
+    """
+
+    suite_args = list(suite_args or [])
+    if not any(a.startswith("--num_cores") for a in suite_args):
+        # Each suite could use all tokens when the other suites are done
+        suite_args.append(f"--num_cores={jobs}")
+
+    env = dict(os.environ, **create_jobserver(jobs))
+    if sim_timeout is not None:
+        # Suites give it to their scheduler and ngspice servers
+        env[TIMEOUT_ENV] = str(sim_timeout)
+    fds = tuple(int(fd) for fd in env[JOBSERVER_ENV].split(","))
+    run_folder = datetime.now().strftime(RUN_FOLDER_FORMAT)
+
+    runs = []
+    try:
+        for sim in sims:
+            sim_suites = suites or list_suites(sim)
+            sim_run_dir = prepare_run_dir(sim, sim_suites, run_folder)
+            logging.info(f"Running {sim} suites {', '.join(sim_suites)} in {sim_run_dir}")
+            for suite in sim_suites:
+                args, skipped = filter_suite_args(suite_args, suite_options(sim, suite))
+                if skipped:
+                    logging.warning(f"{sim}/{suite} doesn't accept {' '.join(skipped)}, run without them")
+                runs.append(SuiteRun(sim, suite, sim_run_dir, args, env, fds))
+
+        running = list(runs)
+        while running:
+            time.sleep(POLL_INTERVAL)
+            for run in list(running):
+                returncode = run.poll()
+                if returncode is None:
+                    continue
+                running.remove(run)
+                status = "passed" if returncode == 0 else f"failed with exit code {returncode}"
+                log = logging.info if returncode == 0 else logging.error
+                log(f"{run.name} {status} in {run.duration:.1f} s, log: {run.log_path}")
+    finally:
+        for run in runs:
+            if run.poll() is None:
+                run.proc.terminate()
+                run.proc.wait()
+        for fd in fds:
+            os.close(fd)
+
+    return {run.name: run.poll() for run in runs}
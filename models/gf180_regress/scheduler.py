@@ -0,0 +1,297 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import logging
+import threading
+from .lazy import lazy_import
+
+# asyncio and subprocess are only needed once the first simulation is scheduled
+asyncio = lazy_import("asyncio")
+subprocess = lazy_import("subprocess")
+
+# CONSTANT VALUES
+DEFAULT_RETRIES = 1
+## Max run time of one simulator job in seconds, a hung simulator is killed after it
+DEFAULT_TIMEOUT = 1800
+## Pipe holding the job tokens shared by all regressions of one run [e.g. "5,6"]
+JOBSERVER_ENV = "GF180_JOBSERVER"
+## Job timeout of regressions started by the runner, in seconds [0 for no timeout]
+TIMEOUT_ENV = "GF180_SIM_TIMEOUT"
+
+
+def default_timeout() -> float:
+    """
+    Get the timeout of simulator jobs, given by the runner or DEFAULT_TIMEOUT.
+
+    Returns
+    -------
+    float
+        Timeout in seconds, None for no timeout.
+    """
+
+    timeout = float(os.environ.get(TIMEOUT_ENV) or DEFAULT_TIMEOUT)
+    return timeout if timeout > 0 else None
+
+
+def create_jobserver(jobs: int) -> dict:
+    """
+    Create a pipe holding `jobs` tokens, shared by regressions started by this process.
+
+    Like the make jobserver, every simulator started by any regression holds a
+    token while it runs, so all regressions of a run share one queue of at
+    most `jobs` simulators.
+
+    Parameters
+    ----------
+    jobs : int
+        Max number of simulators running at once over all regressions.
+    Returns
+    -------
+    dict
+        Environment of the regressions, their processes have to be started
+        with `pass_fds` set to the pipe descriptors.
+    """
+
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"+" * jobs)
+    return {JOBSERVER_ENV: f"{read_fd},{write_fd}"}
+
+
+def jobserver_fds() -> tuple:
+    """
+    Get the job tokens pipe given by the regression runner.
+
+    Returns
+    -------
+    tuple
+        (read_fd, write_fd), None if this process isn't started by the runner.
+    """
+
+    if not os.environ.get(JOBSERVER_ENV):
+        return None
+    read_fd, write_fd = (int(fd) for fd in os.environ[JOBSERVER_ENV].split(","))
+    os.set_blocking(read_fd, False)
+    return read_fd, write_fd
+
+
+def available_cpus() -> list:
+    """
+    Get the CPUs this process is allowed to run on.
+
+    Returns
+    -------
+    cpus : list
+        Sorted list of CPU ids.
+    """
+
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class SimScheduler:
+    """
+    Asyncio scheduler for simulator processes.
+
+    Simulators are started with `asyncio.create_subprocess_exec` [no shell]
+    and at most `max_jobs` of them run at once, one per available core by
+    default. Jobs killed by a signal or hitting `timeout` are retried up to
+    `retries` times. The timeout is `default_timeout()` if not given, so a hung
+    simulator can't block a regression forever.
+    When started by the regression runner, every job also holds a token of
+    the runner's jobserver, shared with the other regressions of the run.
+
+    The event loop runs in a background thread, so `run` can be called from
+    the worker threads of the regression scripts.
+    """
+
+    def __init__(self, max_jobs: int = None, timeout: float = None,
+                 retries: int = DEFAULT_RETRIES):
+        cpus = len(available_cpus())
+        self.max_jobs = min(max_jobs, cpus) if max_jobs else cpus
+        self.timeout = default_timeout() if timeout is None else (timeout if timeout > 0 else None)
+        self.retries = retries
+        self._job_fds = jobserver_fds()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._semaphore, self._token_lock = asyncio.run_coroutine_threadsafe(
+            self._make_locks(), self._loop
+        ).result()
+
+    async def _make_locks(self):
+        # Semaphore and lock have to be created inside the loop they are used from
+        return asyncio.Semaphore(self.max_jobs), asyncio.Lock()
+
+    async def _acquire_token(self) -> bytes:
+        if self._job_fds is None:
+            return None
+
+        # Tokens are read one at a time, other regressions could take a token first
+        async with self._token_lock:
+            while True:
+                try:
+                    return os.read(self._job_fds[0], 1)
+                except BlockingIOError:
+                    readable = self._loop.create_future()
+                    self._loop.add_reader(self._job_fds[0], lambda: readable.done() or readable.set_result(None))
+                    try:
+                        await readable
+                    finally:
+                        self._loop.remove_reader(self._job_fds[0])
+
+    def _release_token(self, token: bytes):
+        if token:
+            os.write(self._job_fds[1], token)
+
+    async def _exec(self, cmd: list, log_path: str, cwd: str) -> int:
+        log = open(log_path, "w") if log_path else subprocess.DEVNULL
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=log, stderr=subprocess.STDOUT, cwd=cwd
+            )
+            try:
+                return await asyncio.wait_for(proc.wait(), self.timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                return None
+        finally:
+            if log_path:
+                log.close()
+
+    async def run_async(self, cmd: list, log_path: str = None, cwd: str = None) -> int:
+        """
+        Run one simulator process, retrying it if it crashed or timed out.
+
+        Parameters
+        ----------
+        cmd : list
+            Simulator command and its arguments.
+        log_path : str
+            File receiving stdout/stderr of the simulator, discarded if None.
+        cwd : str
+            Working directory of the simulator.
+        Returns
+        -------
+        int
+            Return code of the last attempt, None if it timed out.
+        """
+
+        async with self._semaphore:
+            token = await self._acquire_token()
+            try:
+                for attempt in range(self.retries + 1):
+                    returncode = await self._exec(cmd, log_path, cwd)
+                    if returncode is not None and returncode >= 0:
+                        return returncode
+
+                    reason = "timed out" if returncode is None else f"crashed with signal {-returncode}"
+                    logging.warning(f"{' '.join(cmd)} {reason} (attempt {attempt + 1}/{self.retries + 1})")
+
+                return returncode
+            finally:
+                self._release_token(token)
+
+    def run(self, cmd: list, log_path: str = None, cwd: str = None, check: bool = False) -> int:
+        """
+        Run one simulator process and wait for it.
+
+        Parameters
+        ----------
+        cmd : list
+            Simulator command and its arguments.
+        log_path : str
+            File receiving stdout/stderr of the simulator, discarded if None.
+        cwd : str
+            Working directory of the simulator.
+        check : bool
+            Raise CalledProcessError if the simulator failed, like check_call.
+        Returns
+        -------
+        int
+            Return code of the simulator, -1 if it timed out.
+        """
+
+        returncode = asyncio.run_coroutine_threadsafe(
+            self.run_async(cmd, log_path, cwd), self._loop
+        ).result()
+        returncode = -1 if returncode is None else returncode
+
+        if check and returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd)
+
+        return returncode
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+def configure_scheduler(**kwargs) -> SimScheduler:
+    """
+    Replace the scheduler used by `run_simulator`.
+
+    Parameters
+    ----------
+    kwargs : dict
+        Arguments passed to SimScheduler.
+    Returns
+    -------
+    SimScheduler
+        The new default scheduler.
+    """
+
+    global _default_scheduler
+    with _default_lock:
+        _default_scheduler = SimScheduler(**kwargs)
+        return _default_scheduler
+
+
+def get_scheduler() -> SimScheduler:
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = SimScheduler()
+        return _default_scheduler
+
+
+def run_simulator(cmd: list, log_path: str = None, cwd: str = None, check: bool = False) -> int:
+    """
+    Run a simulator through the shared scheduler of this process.
+
+    Parameters
+    ----------
+    cmd : list
+        Simulator command and its arguments.
+    log_path : str
+        File receiving stdout/stderr of the simulator, discarded if None.
+    cwd : str
+        Working directory of the simulator.
+    check : bool
+        Raise CalledProcessError if the simulator failed, like check_call.
+    Returns
+    -------
+    int
+        Return code of the simulator.
+    """
+
+    return get_scheduler().run(cmd, log_path, cwd, check)
@@ -0,0 +1,263 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import sys
+import logging
+from multiprocessing import shared_memory
+from .lazy import lazy_import
+from .meas_data import read_meas_data
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# CONSTANT VALUES
+## Columns are aligned in the shared block so every array view is aligned
+ALIGN_BYTES = 64
+## dtype of codes of text and categorical columns
+CODES_DTYPE = "int32"
+
+## Blocks attached by this process, so each worker attaches once per block
+_ATTACHED = {}
+
+
+def _aligned(size: int) -> int:
+    return -(-size // ALIGN_BYTES) * ALIGN_BYTES
+
+
+def _open_block(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach an existing shared memory block without taking its ownership.
+
+    Workers started by the owner through multiprocessing share its resource
+    tracker, so the block is only released by the owner. Python 3.13 could
+    skip tracking attached blocks.
+
+    Parameters
+    ----------
+    name : str
+        Name of the shared memory block.
+    Returns
+    -------
+    shared_memory.SharedMemory
+        Attached block.
+    """
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedMeasData:
+    """
+    Measured data of one device held in one shared memory block.
+
+    The owner process publishes the data once with `SharedMeasData.create()`
+    and passes the small picklable `handle` to its workers [e.g. as argument of
+    a process pool initializer]. Workers attach with `SharedMeasData.attach()`:
+    numeric columns are numpy arrays on the shared buffer, so memory doesn't
+    grow with the number of workers. Text and categorical columns [device,
+    corner, ...] are stored as int32 codes, their categories are part of the
+    handle.
+
+    Frames and arrays got from an attached block are views on it, they have to
+    be released before the block is closed.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, handle: dict, owner: bool):
+        """
+        Parameters
+        ----------
+        shm : shared_memory.SharedMemory
+            Block holding all columns.
+        handle : dict
+            Layout of the block, as returned by `handle`.
+        owner : bool
+            True for the process that created the block, it's unlinked when this process closes it.
+        """
+
+        self._shm = shm
+        self.handle = handle
+        self.owner = owner
+        self.rows = handle["rows"]
+        self.arrays = {
+            col["name"]: np.ndarray((self.rows,), dtype=col["dtype"], buffer=shm.buf, offset=col["offset"])
+            for col in handle["columns"]
+        }
+        self.categories = {col["name"]: col["categories"] for col in handle["columns"] if col["categories"] is not None}
+
+    @classmethod
+    def create(cls, df: pd.DataFrame) -> SharedMeasData:
+        """
+        Copy measured data to a new shared memory block.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Measured data of one device.
+        Returns
+        -------
+        SharedMeasData
+            Owner of the new block.
+        """
+
+        columns = []
+        values = []
+        offset = 0
+        for name in df.columns:
+            col = df[name]
+            if isinstance(col.dtype, np.dtype) and col.dtype.kind in "biuf":
+                data, categories = col.to_numpy(), None
+            else:
+                codes, uniques = pd.factorize(col, sort=False)
+                data, categories = codes.astype(CODES_DTYPE), list(uniques)
+            columns.append({"name": name, "dtype": data.dtype.str, "offset": offset, "categories": categories})
+            values.append(data)
+            offset += _aligned(data.nbytes)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        handle = {"name": shm.name, "rows": len(df), "columns": columns}
+        shared = cls(shm, handle, owner=True)
+        for col, data in zip(columns, values):
+            shared.arrays[col["name"]][:] = data
+
+        _ATTACHED[shm.name] = shared
+        logging.info(f"Measured data of {len(df)} points shared in {shm.name} [{offset / 2**20:.1f} MiB]")
+
+        return shared
+
+    @classmethod
+    def load(cls, csv_path: str) -> SharedMeasData:
+        """
+        Read extracted measured data and copy it to a new shared memory block.
+
+        Parameters
+        ----------
+        csv_path : str
+            Path of the extracted csv file [e.g. gf180mcu_data/MOS_iv/nfet_03v3_meas_id.csv].
+        Returns
+        -------
+        SharedMeasData
+            Owner of the new block.
+        """
+
+        return cls.create(read_meas_data(csv_path))
+
+    @classmethod
+    def attach(cls, handle: dict) -> SharedMeasData:
+        """
+        Attach measured data shared by the owner process, each block is attached once per process.
+
+        Parameters
+        ----------
+        handle : dict
+            Layout of the block, as given by the owner.
+        Returns
+        -------
+        SharedMeasData
+            Attached data, without copy.
+        """
+
+        if handle["name"] not in _ATTACHED:
+            _ATTACHED[handle["name"]] = cls(_open_block(handle["name"]), handle, owner=False)
+        return _ATTACHED[handle["name"]]
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get the values of one column.
+
+        Parameters
+        ----------
+        name : str
+            Column name.
+        Returns
+        -------
+        np.ndarray
+            Shared array for numeric columns, decoded copy for text columns.
+        """
+
+        if name not in self.categories:
+            return self.arrays[name]
+        return np.asarray(pd.Categorical.from_codes(self.arrays[name], self.categories[name]), dtype=object)
+
+    def rows_where(self, values: dict) -> np.ndarray:
+        """
+        Select points matching the values of some columns [e.g. one variation].
+
+        Parameters
+        ----------
+        values : dict
+            Value of each column to be matched [e.g. {"W (um)": 10.0, "corner": "typical"}].
+        Returns
+        -------
+        np.ndarray
+            Boolean mask of selected points.
+        """
+
+        mask = np.ones(self.rows, dtype=bool)
+        for name, value in values.items():
+            if name in self.categories:
+                value = self.categories[name].index(value) if value in self.categories[name] else -2
+            mask &= self.arrays[name] == value
+        return mask
+
+    def frame(self, rows=None, columns: list = None) -> pd.DataFrame:
+        """
+        Get measured data as a data frame.
+
+        Numeric columns of the whole data [or a slice of rows] are views on the
+        shared block, a boolean mask or an index array copies the selected rows only.
+
+        Parameters
+        ----------
+        rows : slice or np.ndarray
+            Rows to be selected, all rows by default.
+        columns : list
+            Columns to be selected, all columns by default.
+        Returns
+        -------
+        pd.DataFrame
+            Measured data.
+        """
+
+        rows = slice(None) if rows is None else rows
+        data = {}
+        for name in columns or list(self.arrays):
+            values = self.arrays[name][rows]
+            if name in self.categories:
+                values = pd.Categorical.from_codes(values, self.categories[name])
+            data[name] = values
+
+        return pd.DataFrame(data, copy=False)
+
+    def close(self):
+        """
+        Release the block in this process, the owner also removes it from the system.
+        """
+
+        self.arrays = {}
+        _ATTACHED.pop(self.handle["name"], None)
+        try:
+            self._shm.close()
+        except BufferError:
+            logging.warning(f"Views on shared measured data {self.handle['name']} are still used, it's kept mapped")
+        if self.owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,302 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import re
+import abc
+import logging
+import threading
+from typing import TYPE_CHECKING
+from .lazy import lazy_import
+from .scheduler import run_simulator
+from .rawfile import read_sim_output
+
+if TYPE_CHECKING:
+    from .result_cache import ResultCache
+
+pd = lazy_import("pandas")
+jinja2 = lazy_import("jinja2")
+subprocess = lazy_import("subprocess")
+
+# CONSTANT VALUES
+MIN_NGSPICE_VERSION = 38
+XYCE_VERSION = "7.5"
+
+
+class SimulatorBackend(abc.ABC):
+    """
+    One simulator used by the models regressions.
+
+    A regression point goes through the same steps for all simulators:
+    `render` its netlist template, `run` the simulator on it, then `parse`
+    the written results to a data frame. Backends only differ by the
+    simulator command, its version check and its output format, so work
+    done on the shared steps [scheduling, caching, templates] serves all
+    simulators. Backends have to define `check_version`, `command` and
+    `parse`, they can't be created otherwise.
+    """
+
+    name = None
+    executable = None
+
+    def __init__(self, args: list = None):
+        """
+        Parameters
+        ----------
+        args : list
+            Extra command line arguments of the simulator [e.g. ["-hspice-ext", "all"]].
+        """
+
+        self.args = list(args or [])
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def version(self) -> str:
+        """
+        Get the version text printed by the simulator.
+
+        Returns
+        -------
+        str
+            Output of `<simulator> -v`, empty if the simulator isn't found.
+        """
+
+        try:
+            proc = subprocess.run(
+                [self.executable, "-v"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=False
+            )
+        except FileNotFoundError:
+            return ""
+        return proc.stdout.strip()
+
+    @abc.abstractmethod
+    def check_version(self) -> bool:
+        """
+        Check that the simulator is installed and its version works with the models.
+
+        Returns
+        -------
+        bool
+            True if the simulator could be used, errors are logged otherwise.
+        """
+
+    @abc.abstractmethod
+    def command(self, netlist_path: str) -> list:
+        """
+        Get the command simulating one netlist in batch mode.
+
+        Parameters
+        ----------
+        netlist_path : str
+            Path of the netlist.
+        Returns
+        -------
+        list
+            Simulator command.
+        """
+
+    def template(self, template_path: str) -> jinja2.Template:
+        """
+        Get a netlist template, each template is compiled once.
+
+        Parameters
+        ----------
+        template_path : str
+            Path of the jinja2 netlist template.
+        Returns
+        -------
+        jinja2.Template
+            Compiled template.
+        """
+
+        with self._lock:
+            if template_path not in self._templates:
+                with open(template_path) as f:
+                    self._templates[template_path] = jinja2.Template(f.read())
+            return self._templates[template_path]
+
+    def render(self, template_path: str, netlist_path: str = None, /, **params) -> str:
+        """
+        Render a netlist template with the values of one regression point.
+
+        Parameters
+        ----------
+        template_path : str
+            Path of the jinja2 netlist template.
+        netlist_path : str
+            Path the netlist is written to, it's only returned if not given.
+        **params
+            Values used by the template [e.g. device, corner, temp, result_path].
+        Returns
+        -------
+        str
+            Netlist text.
+        """
+
+        netlist_text = self.template(template_path).render(**params)
+        if netlist_path is not None:
+            with open(netlist_path, "w") as netlist:
+                netlist.write(netlist_text)
+        return netlist_text
+
+    def run(self, netlist_path: str, log_path: str = None, check: bool = False) -> int:
+        """
+        Simulate one netlist through the shared simulator scheduler.
+
+        Parameters
+        ----------
+        netlist_path : str
+            Path of the netlist.
+        log_path : str
+            Path of the simulator log, <netlist_path>.log by default.
+        check : bool
+            Raise CalledProcessError if the simulator fails.
+        Returns
+        -------
+        int
+            Return code of the simulator.
+        """
+
+        return run_simulator(self.command(netlist_path), log_path or f"{netlist_path}.log", check=check)
+
+    @abc.abstractmethod
+    def parse(self, result_path: str) -> pd.DataFrame:
+        """
+        Read results written by the simulator.
+
+        Parameters
+        ----------
+        result_path : str
+            Path of the simulator output.
+        Returns
+        -------
+        pd.DataFrame
+            One column per written vector.
+        """
+
+    def result_cache(self, cache_dir: str) -> ResultCache:
+        """
+        Get the cache of simulation results of this simulator version.
+
+        Parameters
+        ----------
+        cache_dir : str
+            Directory of the cache.
+        Returns
+        -------
+        ResultCache
+            Results cache keyed on netlists and simulator version.
+        """
+
+        from .result_cache import ResultCache
+
+        return ResultCache(cache_dir, self.version())
+
+
+class NgspiceBackend(SimulatorBackend):
+    """
+    ngspice in batch mode, results are written by `wrdata` [ASCII] or `write` [rawfile].
+
+    With `pool` set to a NgspicePool, netlists are run by long-lived ngspice
+    servers instead of a new process per netlist.
+    """
+
+    name = "ngspice"
+    executable = "ngspice"
+
+    def __init__(self, args: list = None):
+        super().__init__(args)
+        self.pool = None
+
+    def check_version(self) -> bool:
+        version_text = self.version()
+        if "ngspice-" not in version_text:
+            logging.error("ngspice is not found. Please make sure ngspice is installed.")
+            return False
+
+        version = int(re.search(r"ngspice-([0-9]+)", version_text).group(1))
+        logging.info(f"Your ngspice version is: ngspice {version}")
+        if version < MIN_NGSPICE_VERSION:
+            logging.error(f"ngspice version is not supported. Please use ngspice version {MIN_NGSPICE_VERSION} or newer.")
+            return False
+
+        return True
+
+    def command(self, netlist_path: str) -> list:
+        return [self.executable, "-b"] + self.args + [netlist_path]
+
+    def run(self, netlist_path: str, log_path: str = None, check: bool = False) -> int:
+        if self.pool is not None:
+            return self.pool.simulate(netlist_path)
+        return super().run(netlist_path, log_path, check)
+
+    def parse(self, result_path: str) -> pd.DataFrame:
+        return read_sim_output(result_path)
+
+
+class XyceBackend(SimulatorBackend):
+    """
+    Xyce in serial mode, results are written by `.print` statements with `format=csv`.
+    """
+
+    name = "xyce"
+    executable = "Xyce"
+
+    def check_version(self) -> bool:
+        version_text = self.version()
+        if version_text == "":
+            logging.error("Xyce is not found. Please make sure Xyce is installed.")
+            return False
+
+        logging.info(f"Your Xyce version is: {version_text}")
+        if XYCE_VERSION not in version_text:
+            logging.error(f"Xyce version {XYCE_VERSION} is required.")
+            return False
+
+        return True
+
+    def command(self, netlist_path: str) -> list:
+        return [self.executable] + self.args + [netlist_path]
+
+    def parse(self, result_path: str) -> pd.DataFrame:
+        return pd.read_csv(result_path)
+
+
+## Backends by simulator name, as used by the regression runner
+BACKENDS = {
+    NgspiceBackend.name: NgspiceBackend,
+    XyceBackend.name: XyceBackend,
+}
+
+
+def get_simulator(name: str, args: list = None) -> SimulatorBackend:
+    """
+    Create the backend of one simulator.
+
+    Parameters
+    ----------
+    name : str
+        Simulator name [ngspice or xyce].
+    args : list
+        Extra command line arguments of the simulator.
+    Returns
+    -------
+    SimulatorBackend
+        Simulator backend.
+    """
+
+    if name.lower() not in BACKENDS:
+        raise ValueError(f"Unknown simulator {name}, allowed simulators: {', '.join(BACKENDS)}")
+    return BACKENDS[name.lower()](args)
@@ -0,0 +1,189 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Usage:
+  startup_budget.py [--budget_ms=<ms>] [--runs=<runs>] [<script>...]
+
+  -h, --help                Show help text.
+  -v, --version             Show version.
+  --budget_ms=<ms>          Max startup time of `<script> --help` over a bare python startup, in ms, not checked by default.
+  --runs=<runs>             Number of runs per script, the median time is used. [default: 5]
+  <script>                  Scripts to be checked, all regression and extraction scripts by default.
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import logging
+import statistics
+import subprocess
+from docopt import docopt
+
+# CONSTANT VALUES
+MODELS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+## Scripts run by the Makefiles, each of them is started once per device group
+SCRIPTS_GLOBS = [
+    os.path.join("ngspice", "testing", "regression", "*", "models_regression.py"),
+    os.path.join("xyce", "testing", "regression", "*", "models_regression.py"),
+    os.path.join("180MCU_SPICE_DATA_clean", "scripts", "extract_all.py"),
+    os.path.join("180MCU_SPICE_DATA_clean", "scripts", "convert_foundry_csv.py"),
+    os.path.join("180MCU_SPICE_DATA_clean", "scripts", "validate_extraction.py"),
+]
+## Modules that have to be imported on first use only
+HEAVY_MODULES = [
+    "pandas",
+    "numpy",
+    "jinja2",
+    "pyarrow",
+    "asyncio",
+    "concurrent.futures",
+    "multiprocessing",
+    "zipfile",
+    "xml.etree.ElementTree",
+]
+
+
+def default_scripts() -> list:
+    """
+    Get all regression and extraction scripts.
+
+    Returns
+    -------
+    list
+        Paths of scripts.
+    """
+
+    return sorted(p for g in SCRIPTS_GLOBS for p in glob.glob(os.path.join(MODELS_DIR, g)))
+
+
+def startup_ms(cmd: list, cwd: str, runs: int) -> float:
+    """
+    Measure the median wall time of a command.
+
+    Parameters
+    ----------
+    cmd : list
+        Command to be run.
+    cwd : str
+        Directory the command is run from.
+    runs : int
+        Number of runs.
+    Returns
+    -------
+    float
+        Median wall time in ms.
+    """
+
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def heavy_imports(script: str) -> list:
+    """
+    Get heavy modules imported by `<script> --help`, as reported by `python -X importtime`.
+
+    Parameters
+    ----------
+    script : str
+        Path of the script.
+    Returns
+    -------
+    list
+        Names of heavy modules imported at startup.
+    """
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", script, "--help"],
+        cwd=os.path.dirname(script),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+    imported = set(re.findall(r"\|\s+([\w.]+)\s*$", proc.stderr, re.M))
+    return [m for m in HEAVY_MODULES if m in imported]
+
+
+def check_startup(scripts: list, budget_ms: float = None, runs: int = 5) -> bool:
+    """
+    Check that `--help` of all scripts returns without importing heavy modules.
+
+    Startup times over a bare `python -c pass` are reported for all scripts.
+    They depend on the machine running the check, so they are only checked
+    against `budget_ms` when it's given.
+
+    Parameters
+    ----------
+    scripts : list
+        Paths of scripts.
+    budget_ms : float
+        Max time over bare python startup, in ms, not checked if None.
+    runs : int
+        Number of runs per script.
+    Returns
+    -------
+    bool
+        True if no script imports heavy modules at startup [and all of them are within the budget].
+    """
+
+    base_ms = startup_ms([sys.executable, "-c", "pass"], MODELS_DIR, runs)
+    budget_msg = f"budget: {budget_ms:.0f} ms over it" if budget_ms is not None else "no time budget"
+    logging.info(f"Bare python startup: {base_ms:.0f} ms, {budget_msg}")
+
+    passed = True
+    for script in scripts:
+        script = os.path.abspath(script)
+        total_ms = startup_ms([sys.executable, script, "--help"], os.path.dirname(script), runs)
+        heavy = heavy_imports(script)
+        ok = not heavy and (budget_ms is None or total_ms - base_ms <= budget_ms)
+        passed &= ok
+
+        msg = f"{os.path.relpath(script, MODELS_DIR)}: {total_ms:.0f} ms (+{total_ms - base_ms:.0f} ms)"
+        if heavy:
+            msg += f", imports {', '.join(heavy)} at startup"
+        if ok:
+            logging.info(msg)
+        else:
+            logging.error(msg)
+
+    return passed
+
+
+if __name__ == "__main__":
+
+    # Args
+    arguments = docopt(__doc__, version="STARTUP-BUDGET: 0.1")
+
+    # logging setup
+    logging.basicConfig(
+        level=logging.DEBUG,
+        handlers=[
+            logging.StreamHandler(),
+        ],
+        format="%(asctime)s | %(levelname)-7s | %(message)s",
+        datefmt="%d-%b-%Y %H:%M:%S",
+    )
+
+    # Calling main function
+    scripts = arguments["<script>"] or default_scripts()
+    budget_ms = float(arguments["--budget_ms"]) if arguments["--budget_ms"] else None
+    if not check_startup(scripts, budget_ms, int(arguments["--runs"])):
+        logging.error("Startup budget exceeded")
+        exit(1)
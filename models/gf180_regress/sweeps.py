@@ -0,0 +1,257 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+from .lazy import lazy_import
+from .meas_data import read_meas_data
+
+pd = lazy_import("pandas")
+
+# CONSTANT VALUES
+## Each sweep axis is stored in typed columns sweep<i>_var, sweep<i>_start, sweep<i>_stop, sweep<i>_step
+SWEEP_FIELDS = ["var", "start", "stop", "step"]
+## Text columns of sweep files [e.g. "vgs 0.0 3.3 0.05 vbs -3.3 0.0 0.825"]
+SWEEP_TEXT_COLS = ["sweeps", "sweep"]
+## Columns that have to be common for all rows simulated together, when found in sweep file
+BIAS_COLS = ["corner", "temp", "const_var", "const_var_val"]
+
+
+def axis_columns(axis: int) -> list:
+    """
+    Get typed columns of one sweep axis.
+
+    Parameters
+    ----------
+    axis : int
+        1-based position of the axis in the sweep [1 for main sweep].
+    Returns
+    -------
+    list
+        Column names of var, start, stop and step of the axis.
+    """
+
+    return [f"sweep{axis}_{field}" for field in SWEEP_FIELDS]
+
+
+def sweep_axes(df: pd.DataFrame) -> list:
+    """
+    Get positions of sweep axes held by typed columns of a data frame.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Sweep data.
+    Returns
+    -------
+    list
+        1-based positions of axes, empty if the data has no typed sweep columns.
+    """
+
+    axes = []
+    while f"sweep{len(axes) + 1}_var" in df.columns:
+        axes.append(len(axes) + 1)
+    return axes
+
+
+def sweep_text_column(df: pd.DataFrame):
+    """
+    Get the name of the text sweep column of a data frame.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Sweep data.
+    Returns
+    -------
+    str
+        Column name, None if the data has no text sweeps.
+    """
+
+    return next((c for c in SWEEP_TEXT_COLS if c in df.columns), None)
+
+
+def to_float(token) -> float:
+    """
+    Convert one sweep token to float, keeping all digits and the sign of zero as written.
+
+    Parameters
+    ----------
+    token : str
+        Token of a sweep string.
+    Returns
+    -------
+    float
+        Value of the token, nan if it isn't a number.
+    """
+
+    try:
+        return float(token)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def parse_sweeps(sweeps: pd.Series) -> pd.DataFrame:
+    """
+    Parse sweep strings to typed columns, each distinct string is parsed once.
+
+    Parameters
+    ----------
+    sweeps : pd.Series
+        Sweep strings made of (var, start, stop, step) groups.
+    Returns
+    -------
+    pd.DataFrame
+        Typed sweep columns with the same index as `sweeps`, values that can't be parsed are nan.
+    """
+
+    codes, uniques = pd.factorize(sweeps.astype(str))
+    tokens = pd.Series(uniques, dtype=object).str.split(expand=True)
+    n_axes = max(1, -(-tokens.shape[1] // len(SWEEP_FIELDS)))
+
+    columns = {}
+    for axis in range(n_axes):
+        axis_tokens = tokens.reindex(columns=range(axis * 4, axis * 4 + 4))
+        var_col, start_col, stop_col, step_col = axis_columns(axis + 1)
+        columns[var_col] = axis_tokens[axis * 4]
+        columns[start_col] = axis_tokens[axis * 4 + 1].map(to_float).astype(float)
+        columns[stop_col] = axis_tokens[axis * 4 + 2].map(to_float).astype(float)
+        columns[step_col] = axis_tokens[axis * 4 + 3].map(to_float).astype(float)
+
+    typed_df = pd.DataFrame(columns).take(codes)
+    typed_df.index = sweeps.index
+
+    return typed_df
+
+
+def format_axes(axes: list) -> str:
+    """
+    Write sweep axes in the format used by simulator dc statements.
+
+    Parameters
+    ----------
+    axes : list
+        List of (var, start, stop, step) tuples.
+    Returns
+    -------
+    str
+        Sweep string [e.g. "vgs 0.0 3.3 0.05 vbs -3.3 0.0 0.825"].
+    """
+
+    return " ".join(f"{var} {float(start)} {float(stop)} {float(step)}" for var, start, stop, step in axes)
+
+
+def row_axes(row) -> list:
+    """
+    Get sweep axes of one row of sweep data.
+
+    Parameters
+    ----------
+    row : pd.Series or dict
+        Row holding typed sweep columns.
+    Returns
+    -------
+    list
+        List of (var, start, stop, step) tuples, axes that aren't set for this row are left out.
+    """
+
+    axes = []
+    axis = 1
+    while f"sweep{axis}_var" in row:
+        var, start, stop, step = (row[c] for c in axis_columns(axis))
+        if isinstance(var, str):
+            axes.append((var, float(start), float(stop), float(step)))
+        axis += 1
+    return axes
+
+
+def format_sweeps(df: pd.DataFrame) -> pd.Series:
+    """
+    Write typed sweep columns of all rows as sweep strings.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Sweep data with typed sweep columns.
+    Returns
+    -------
+    pd.Series
+        Sweep string of each row.
+    """
+
+    typed_cols = [c for axis in sweep_axes(df) for c in axis_columns(axis)]
+    # Keys are the written values, so -0.0 isn't merged with 0.0
+    keys = df[typed_cols].astype(str).agg(" ".join, axis=1)
+    codes, uniques = pd.factorize(keys)
+    first = pd.Series(range(len(codes))).groupby(codes, sort=True).first()
+    texts = [format_axes(row_axes(df.iloc[pos])) for pos in first]
+
+    return pd.Series(texts, dtype=object).take(codes).set_axis(df.index)
+
+
+def add_typed_sweeps(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add typed sweep columns to sweep data that only has sweep strings, and sweep strings to typed data.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Sweep data.
+    Returns
+    -------
+    pd.DataFrame
+        Sweep data with both typed columns and sweep strings.
+    """
+
+    text_col = sweep_text_column(df)
+    if not sweep_axes(df) and text_col:
+        df = pd.concat([df, parse_sweeps(df[text_col])], axis=1)
+    elif sweep_axes(df) and not text_col:
+        df = df.assign(sweeps=format_sweeps(df))
+
+    return df
+
+
+def load_sweeps(csv_path: str, group_cols: list = None) -> pd.DataFrame:
+    """
+    Load extracted sweep data with typed sweeps and one group id per identical sweep.
+
+    Rows of one group share their sweeps and biases [corner, temp, constant
+    bias], so they could be simulated together in one netlist. Sweep files
+    written before typed columns were added are parsed once here.
+
+    Parameters
+    ----------
+    csv_path : str
+        Path of extracted sweeps csv file [e.g. gf180mcu_data/MOS_iv/nfet_03v3_sweeps_id.csv].
+    group_cols : list
+        Columns that have to be common for rows of one group, `BIAS_COLS` found in the file by default.
+    Returns
+    -------
+    df : pd.DataFrame
+        Sweep data with typed sweep columns and `sweep_group` column.
+    """
+
+    df = add_typed_sweeps(read_meas_data(csv_path, exact_floats=True))
+
+    if group_cols is None:
+        group_cols = [c for c in BIAS_COLS if c in df.columns]
+    typed_cols = [c for axis in sweep_axes(df) for c in axis_columns(axis)]
+
+    # Sweep strings are grouped too, rows with -0.0 and 0.0 are written apart
+    df["sweep_group"] = df.groupby(
+        group_cols + typed_cols + [sweep_text_column(df)], sort=False, dropna=False, observed=True
+    ).ngroup()
+
+    return df
@@ -0,0 +1,38 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pandas as pd
+
+from gf180_regress.compare import Comparison, relative_error
+
+
+MEAS = np.array([-2e-3, -1e-9, 1e-6, 4.0])
+SIM = np.array([-1e-3, -3e-9, 2e-6, np.nan])
+
+
+def test_relative_error():
+    err = relative_error(MEAS, SIM)
+    np.testing.assert_allclose(err[:3], [50.0, 200.0, 100.0])
+    assert np.isnan(err[3])
+
+
+def test_signed_error_matches_diode_formula():
+    # Formula of the Xyce diode regression, negative for negative currents
+    df = pd.DataFrame({"meas": MEAS, "sim": SIM})
+    expected = np.abs(df["sim"] - df["meas"]) * 100.0 / df["meas"]
+
+    comparison = Comparison(df, "meas", "sim", "error", signed=True)
+    pd.testing.assert_series_equal(df["error"], expected, check_names=False)
+    assert comparison.rms_error == Comparison(df.copy(), "meas", "sim", "error").rms_error
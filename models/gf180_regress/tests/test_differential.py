@@ -0,0 +1,81 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ast
+import os
+import multiprocessing
+import concurrent.futures
+
+import pandas as pd
+import pytest
+
+from gf180_regress.differential import (
+    DIFF_SUITES, MODELS_DIR, SIMULATORS, attach_meas_data, compare_variation, diff_points, edge_vds
+)
+from gf180_regress.shared_data import SharedMeasData
+
+
+def regression_simulator_args(sim: str, suite: str):
+    # Arguments of the module level get_simulator() call of a regression
+    path = os.path.join(MODELS_DIR, sim, "testing", "regression", suite, "models_regression.py")
+    with open(path) as script:
+        tree = ast.parse(script.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "get_simulator":
+            args = [ast.literal_eval(arg) for arg in node.args[1:]]
+            return args[0] if args else None
+    raise AssertionError(f"{path} doesn't call get_simulator")
+
+
+@pytest.mark.parametrize("suite", list(DIFF_SUITES))
+@pytest.mark.parametrize("sim", SIMULATORS)
+def test_simulator_args_match_regressions(suite, sim):
+    assert DIFF_SUITES[suite]["simulators"][sim] == regression_simulator_args(sim, suite)
+
+
+@pytest.mark.parametrize("device, last_vds", [("nfet_03v3", 3.3), ("pfet_06v0", 6.6), ("nfet_06v0_nvt", 6.6)])
+def test_rds_edge_points_dropped(device, last_vds):
+    suite_cfg = DIFF_SUITES["mos_rds"]
+    keys = suite_cfg["keys"]
+    vds = [0.0, 0.05, 1.0, last_vds, -0.05, -last_vds]
+    sim_df = pd.DataFrame({"W (um)": 10.0, "L (um)": 1.0, "corner": "typical", "temp": 25,
+                           "vds": vds, "vgs": 1.0, "vbs": 0.0, "rds": 1e3})
+    meas_df = sim_df.iloc[:0]
+
+    points_df = diff_points({sim: sim_df for sim in SIMULATORS}, meas_df, suite_cfg, edge_vds("rds", device))
+    assert sorted(points_df["vds"]) == [-0.05, 0.05, 1.0]
+    assert (points_df["rds_diff"] == 0).all()
+    assert list(points_df[keys].columns) == keys
+
+    assert edge_vds("id", device) == []
+
+
+def test_compare_workers_select_shared_meas_data():
+    suite_cfg = DIFF_SUITES["mos_id"]
+    meas_df = pd.DataFrame({"W (um)": [10.0] * 3 + [5.0] * 3, "L (um)": 1.0,
+                            "corner": pd.Categorical(["typical"] * 3 + ["ff"] * 3), "temp": 25,
+                            "vds": [0.0, 1.0, 2.0] * 2, "vgs": 1.0, "vbs": 0.0, "id": [1e-6, 2e-6, 3e-6] * 2})
+    sim_df = meas_df[meas_df["W (um)"] == 10.0].astype({"corner": object}).assign(id=lambda df: df["id"] * 1.1)
+    results = {"ngspice": sim_df, "xyce": sim_df.assign(id=sim_df["id"] * 1.01)}
+    variation = {"W (um)": 10.0, "L (um)": 1.0, "corner": "typical", "temp": 25}
+
+    expected = diff_points(results, meas_df[meas_df["W (um)"] == 10.0], suite_cfg)
+    with SharedMeasData.create(meas_df) as shared:
+        with concurrent.futures.ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"),
+                                                    initializer=attach_meas_data,
+                                                    initargs=(shared.handle,)) as pool:
+            points_df = pool.submit(compare_variation, results, variation, suite_cfg).result()
+
+    assert len(points_df) == 3
+    pd.testing.assert_frame_equal(points_df.astype({"corner": object}), expected.astype({"corner": object}))
@@ -0,0 +1,67 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import pandas as pd
+import pytest
+
+from gf180_regress.meas_data import parquet_path_of, read_meas_data
+
+# Parquet copies are only read when pyarrow is installed
+pytest.importorskip("pyarrow")
+
+MEAS_DF = pd.DataFrame({
+    "device": "nfet_03v3",
+    "corner": ["typical", "ff", "ss", "typical"],
+    "W (um)": [10.0, 10.0, 0.22, 0.22],
+    "temp": [25, 25, -40, 125],
+    "vgs": [0.04999999999999999, 0.1, 3.3, -0.0],
+    "id": [1.5e-6, 2.25e-5, 3.0e-12, 0.0],
+})
+
+
+def write_extracted(csv_path, df):
+    # Same files as utils.write_extracted_data of the extraction scripts
+    df.to_csv(csv_path, index=False)
+    typed_df = df.copy()
+    for col in ["device", "corner"]:
+        typed_df[col] = typed_df[col].astype("category")
+    typed_df.to_parquet(parquet_path_of(str(csv_path)), index=False, compression="zstd")
+
+
+def test_parquet_matches_csv(tmp_path):
+    csv_path = tmp_path / "nfet_03v3_meas_id.csv"
+    write_extracted(csv_path, MEAS_DF)
+
+    parquet_df = read_meas_data(str(csv_path))
+    os.remove(parquet_path_of(str(csv_path)))
+    csv_df = read_meas_data(str(csv_path), exact_floats=True)
+
+    assert isinstance(parquet_df["corner"].dtype, pd.CategoricalDtype)
+    text_dtypes = {col: csv_df[col].dtype for col in ["device", "corner"]}
+    pd.testing.assert_frame_equal(parquet_df.astype(text_dtypes), csv_df)
+
+
+def test_stale_parquet_falls_back_to_csv(tmp_path, caplog):
+    csv_path = tmp_path / "nfet_03v3_meas_id.csv"
+    write_extracted(csv_path, MEAS_DF.assign(id=0.0))
+    MEAS_DF.to_csv(csv_path, index=False)
+    parquet_mtime = os.path.getmtime(parquet_path_of(str(csv_path)))
+    os.utime(csv_path, (parquet_mtime + 10, parquet_mtime + 10))
+
+    df = read_meas_data(str(csv_path), exact_floats=True)
+
+    pd.testing.assert_frame_equal(df, MEAS_DF)
+    assert "is older than" in caplog.text
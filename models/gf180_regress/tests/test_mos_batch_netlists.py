@@ -0,0 +1,70 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+
+import pytest
+
+from gf180_regress.mos_netlists import netlist_group
+from gf180_regress.ngspice_pool import split_netlist
+from gf180_regress.simulators import get_simulator
+
+REGRESSION_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "ngspice", "testing", "regression",
+)
+DEVICES = [
+    "nfet_03v3", "pfet_03v3", "nfet_06v0", "pfet_06v0", "nfet_06v0_nvt",
+    "nfet_03v3_dss", "pfet_03v3_dss", "nfet_06v0_dss", "pfet_06v0_dss",
+]
+POINT = dict(
+    temp=25, corner="typical", sweeps="vds 0 3.3 0.05 vgs 0.8 3.3 0.5", vds_val=6, vbs_val=0,
+    result_path="out.dat", rawfile=False, model_card_path="sm141064.ngspice", model_design_path="design.ngspice",
+)
+
+
+def unbatch(netlist_text: str) -> str:
+    """
+    Rewrite a batched netlist of one variation like the un-batched netlist.
+
+    The drain of the variation is sensed by vsense0 instead of the vds source,
+    i(vsense0) is the current flowing out of vds so it's -i(Vds).
+    """
+
+    netlist_text = re.sub(r"^vsense0 .*$", "", netlist_text, flags=re.MULTILINE)
+    netlist_text = re.sub(r"(-?)i\(vsense0\)", lambda m: "i(Vds)" if m.group(1) else "-i(Vds)", netlist_text)
+    netlist_text = netlist_text.replace("D_0", "D_tn")
+    netlist_text = re.sub(r"\b(xm[np])0\b", r"\g<1>1", netlist_text)
+    return re.sub(r"\b(id|rds)_0\b", r"\1", netlist_text)
+
+
+@pytest.mark.parametrize("suite", ["mos_id", "mos_rds"])
+@pytest.mark.parametrize("meas_out_result", ["id", "rds"])
+@pytest.mark.parametrize("device", DEVICES)
+def test_batched_netlist_matches_unbatched(suite, meas_out_result, device):
+    simulator = get_simulator("ngspice")
+
+    group = netlist_group(device, meas_out_result)
+    netlists_dir = os.path.join(REGRESSION_DIR, suite, f"device_netlists_{meas_out_result}")
+
+    netlist = simulator.render(
+        os.path.join(netlists_dir, f"{group}.spice"), device=device, width=10, length=0.28, **POINT
+    )
+    batched = simulator.render(
+        os.path.join(netlists_dir, f"{group}_batch.spice"),
+        device=device, variations=[{"width": 10, "length": 0.28}], **POINT
+    )
+
+    assert split_netlist(unbatch(batched)) == split_netlist(netlist)
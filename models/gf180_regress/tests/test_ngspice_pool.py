@@ -0,0 +1,136 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import time
+import textwrap
+import subprocess
+
+import pytest
+
+from gf180_regress.ngspice_pool import NgspicePool, alter_commands, circuit_key, split_netlist
+from gf180_regress.simulators import get_simulator
+
+MOS_ID_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "ngspice", "testing", "regression", "mos_id", "device_netlists_id",
+)
+
+
+def render_point(**params):
+    """
+    Render the nfet Id netlist of one regression point.
+    """
+
+    values = dict(
+        device="nfet_03v3", width=10, length=0.28, temp=25, corner="typical",
+        sweeps="vds 0 3.3 0.05 vgs 0.8 3.3 0.5", vds_val=6, vbs_val=0,
+        result_path="out.dat", rawfile=False,
+        model_card_path="sm141064.ngspice", model_design_path="design.ngspice",
+    )
+    values.update(params)
+    return get_simulator("ngspice").render(os.path.join(MOS_ID_DIR, "nfet.spice"), **values)
+
+
+def test_split_netlist():
+    circuit, control = split_netlist(render_point())
+
+    assert "vds D_tn 0 dc=6" in circuit
+    assert ".temp 25" in circuit
+    assert ".lib sm141064.ngspice typical" in circuit
+    assert "dc vds 0 3.3 0.05 vgs 0.8 3.3 0.5" in control
+    assert not any(line.lower() in (".control", ".endc", ".end") for line in circuit)
+
+
+def test_alter_in_place():
+    loaded, _ = split_netlist(render_point())
+    circuit, _ = split_netlist(render_point(vbs_val=-1.1, temp=125, result_path="out2.dat"))
+
+    assert circuit_key(loaded) == circuit_key(circuit)
+    assert alter_commands(loaded, circuit) == ["alter Vbs dc = -1.1", "option temp = 125"]
+    assert alter_commands(circuit, circuit) == []
+
+
+def test_reload_on_new_circuit():
+    loaded, _ = split_netlist(render_point())
+
+    for params in ({"width": 5}, {"length": 0.5}, {"corner": "ff"}, {"device": "nfet_06v0"}):
+        circuit, _ = split_netlist(render_point(**params))
+        assert alter_commands(loaded, circuit) is None
+
+    assert alter_commands(None, loaded) is None
+
+
+def fake_ngspice(tmp_path, hang_on: str = None) -> str:
+    """
+    Write a stand-in of `ngspice -p` that logs the commands it gets, it hangs on `hang_on` commands.
+    """
+
+    script = tmp_path / "ngspice"
+    script.write_text(textwrap.dedent(f"""\
+        #!{sys.executable}
+        import sys
+        import time
+        for line in sys.stdin:
+            with open({str(tmp_path / "commands.log")!r}, "a") as f:
+                f.write(line)
+            if {hang_on!r} and line.startswith({hang_on!r}):
+                time.sleep(3600)
+            if line.startswith("echo "):
+                print(line[5:].strip(), flush=True)
+            if line.strip() == "quit":
+                break
+    """))
+    script.chmod(0o755)
+    return str(script)
+
+
+def test_pool_runs_in_place(tmp_path):
+    points = [{}, {"vbs_val": -1.1}, {"width": 5}, {"width": 5, "temp": 125}]
+    netlists = []
+    for i, params in enumerate(points):
+        netlist_path = tmp_path / f"netlist_{i}.spice"
+        netlist_path.write_text(render_point(**params))
+        netlists.append(str(netlist_path))
+
+    with NgspicePool(1, fake_ngspice(tmp_path)) as pool:
+        for netlist_path in netlists:
+            assert pool.simulate(netlist_path) == 0
+        server = pool._servers[0]
+        assert (server.runs, server.loads) == (4, 2)
+
+    commands = (tmp_path / "commands.log").read_text().splitlines()
+    assert [c for c in commands if c.startswith(("source", "remcirc", "alter", "option"))] == [
+        f"source {netlists[0]}",
+        "alter Vbs dc = -1.1",
+        "remcirc",
+        f"source {netlists[2]}",
+        "option temp = 125",
+    ]
+    assert commands.count("dc vds 0 3.3 0.05 vgs 0.8 3.3 0.5") == 2
+
+
+def test_hung_server_is_killed(tmp_path):
+    netlist_path = tmp_path / "netlist.spice"
+    netlist_path.write_text(render_point())
+
+    with NgspicePool(1, fake_ngspice(tmp_path, hang_on="source"), timeout=0.5) as pool:
+        start = time.perf_counter()
+        with pytest.raises(subprocess.CalledProcessError):
+            pool.simulate(str(netlist_path))
+        assert time.perf_counter() - start < 10
+
+        # The killed server is replaced by a new one
+        assert pool._servers[0].is_alive()
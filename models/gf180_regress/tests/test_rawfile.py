@@ -0,0 +1,108 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gf180_regress.rawfile import read_rawfile, read_sim_output
+
+NAMES = ["v-sweep", "vds", "id"]
+VALUES = np.array([
+    [0.0, 0.0, 1e-12],
+    [0.05, 0.05, 2.5e-6],
+    [0.1, 0.1, 4.75e-6],
+    [0.15, 0.15, -6.125e-5],
+])
+
+
+def raw_header(names: list, num_points: int, flags: str = "real") -> str:
+    # Header of the first plot, as written by ngspice `write`
+    lines = [
+        "Title: * rawfile test",
+        "Date: Thu Jun  1 10:00:00  2023",
+        "Plotname: DC transfer characteristic",
+        f"Flags: {flags}",
+        f"No. Variables: {len(names)}",
+        f"No. Points: {num_points}",
+        "Variables:",
+    ]
+    lines += [f"\t{i}\t{name}\t{'current' if name == 'id' else 'voltage'}" for i, name in enumerate(names)]
+    return "\n".join(lines) + "\n"
+
+
+def write_wrdata(path, names: list, values: np.ndarray):
+    # ASCII output of `wrdata` with wr_singlescale and wr_vecnames
+    lines = [" ".join(names)] + [" ".join(f"{v:.15e}" for v in row) for row in values]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_binary_rawfile_matches_wrdata(tmp_path):
+    raw_path = tmp_path / "out.raw"
+    raw_path.write_bytes(raw_header(NAMES, len(VALUES)).encode() + b"Binary:\n" + VALUES.astype("<f8").tobytes())
+    csv_path = tmp_path / "out.dat"
+    write_wrdata(csv_path, NAMES, VALUES)
+
+    raw_df = read_sim_output(str(raw_path))
+    csv_df = read_sim_output(str(csv_path))
+
+    assert list(raw_df.columns) == NAMES
+    pd.testing.assert_frame_equal(raw_df, csv_df)
+
+
+def test_ascii_rawfile_matches_wrdata(tmp_path):
+    points = [
+        f" {i}\t{row[0]:.15e}\n" + "".join(f"\t{v:.15e}\n" for v in row[1:]) + "\n"
+        for i, row in enumerate(VALUES)
+    ]
+    raw_path = tmp_path / "out.raw"
+    raw_path.write_text(raw_header(NAMES, len(VALUES)) + "Values:\n" + "".join(points))
+    csv_path = tmp_path / "out.dat"
+    write_wrdata(csv_path, NAMES, VALUES)
+
+    raw_df = read_sim_output(str(raw_path))
+
+    assert list(raw_df.columns) == NAMES
+    pd.testing.assert_frame_equal(raw_df, read_sim_output(str(csv_path)))
+
+
+def test_complex_binary_rawfile(tmp_path):
+    names = ["frequency", "v(out)"]
+    values = np.array([[1e3 + 0j, 1.0 - 0.5j], [1e4 + 0j, 0.25 + 0.125j]])
+    raw_path = tmp_path / "ac.raw"
+    raw_path.write_bytes(
+        raw_header(names, len(values), "complex").encode() + b"Binary:\n" + values.astype("<c16").tobytes()
+    )
+
+    vectors = read_rawfile(str(raw_path))
+
+    assert list(vectors) == names
+    np.testing.assert_array_equal(vectors["v(out)"], values[:, 1])
+    assert vectors["frequency"].dtype == np.complex128
+
+
+def test_complex_ascii_rawfile_not_supported(tmp_path):
+    raw_path = tmp_path / "ac.raw"
+    raw_path.write_text(raw_header(["frequency"], 1, "complex") + "Values:\n 0\t1e3,0\n")
+
+    with pytest.raises(ValueError, match="Complex ASCII"):
+        read_rawfile(str(raw_path))
+
+
+def test_incomplete_header(tmp_path):
+    raw_path = tmp_path / "out.raw"
+    raw_path.write_bytes(raw_header(NAMES, len(VALUES)).encode().replace(b"\t2\tid\tcurrent\n", b"") + b"Binary:\n")
+
+    with pytest.raises(ValueError, match="Incomplete rawfile header"):
+        read_rawfile(str(raw_path))
@@ -0,0 +1,47 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from gf180_regress.runner import SIMULATORS, filter_suite_args, list_suites, suite_options
+
+SUITE_ARGS = ["--sim_cache", "--batch_size", "64", "--meas_result=id", "--num_cores=8"]
+
+
+def test_suite_options():
+    options = suite_options("ngspice", "mos_id")
+    assert options["--num_cores"] and options["--batch_size"]
+    assert not options["--sim_cache"]
+    assert "--sim_cache" not in suite_options("ngspice", "bjt_beta")
+
+
+@pytest.mark.parametrize(
+    "sim, suite, expected",
+    [
+        ("ngspice", "mos_id", SUITE_ARGS),
+        ("ngspice", "mos_hv_id", ["--sim_cache", "--meas_result=id", "--num_cores=8"]),
+        ("xyce", "mos_rds", ["--meas_result=id", "--num_cores=8"]),
+        ("ngspice", "bjt_beta", ["--num_cores=8"]),
+    ],
+)
+def test_filter_suite_args(sim, suite, expected):
+    accepted, skipped = filter_suite_args(SUITE_ARGS, suite_options(sim, suite))
+    assert accepted == expected
+    assert sorted(accepted + skipped) == sorted(SUITE_ARGS)
+
+
+def test_all_suites_accept_num_cores():
+    for sim in SIMULATORS:
+        for suite in list_suites(sim):
+            assert suite_options(sim, suite).get("--num_cores"), f"{sim}/{suite}"
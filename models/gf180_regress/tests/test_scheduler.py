@@ -0,0 +1,41 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import time
+
+from gf180_regress.scheduler import DEFAULT_TIMEOUT, TIMEOUT_ENV, SimScheduler, default_timeout
+
+
+def test_default_timeout(monkeypatch):
+    monkeypatch.delenv(TIMEOUT_ENV, raising=False)
+    assert default_timeout() == DEFAULT_TIMEOUT
+
+    monkeypatch.setenv(TIMEOUT_ENV, "12.5")
+    assert default_timeout() == 12.5
+
+    monkeypatch.setenv(TIMEOUT_ENV, "0")
+    assert default_timeout() is None
+
+
+def test_hung_job_is_killed(monkeypatch):
+    monkeypatch.setenv(TIMEOUT_ENV, "0.5")
+    scheduler = SimScheduler(max_jobs=1, retries=0)
+    try:
+        start = time.perf_counter()
+        assert scheduler.run([sys.executable, "-c", "import time; time.sleep(3600)"]) == -1
+        assert time.perf_counter() - start < 10
+        assert scheduler.run([sys.executable, "-c", "pass"]) == 0
+    finally:
+        scheduler.close()
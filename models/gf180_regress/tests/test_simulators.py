@@ -0,0 +1,34 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from gf180_regress.simulators import BACKENDS, SimulatorBackend
+
+
+def test_backend_missing_override_fails_at_construction():
+    class PartialBackend(SimulatorBackend):
+        name = "partial"
+        executable = "partial"
+
+        def command(self, netlist_path: str) -> list:
+            return [self.executable, netlist_path]
+
+    with pytest.raises(TypeError, match="check_version"):
+        PartialBackend()
+
+
+@pytest.mark.parametrize("name", list(BACKENDS))
+def test_backends_define_all_steps(name):
+    assert BACKENDS[name]().command("netlist.spice")[-1] == "netlist.spice"
@@ -0,0 +1,38 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pandas as pd
+
+from gf180_regress.sweeps import add_typed_sweeps, format_axes, format_sweeps, load_sweeps, row_axes
+
+SWEEPS = [
+    "vgs -0.5 6.0 0.04999999999999999 vbs -3.0 0.0 0.75",
+    "vgs -3.3 3.3 0.1 vbs -0.0 -0.0 0.0",
+    "vgs -3.3 3.3 0.1 vbs 0.0 0.0 0.0",
+    "vds 0.0 6.6 0.05 vgs 0.25 6.0 1.15",
+]
+
+
+def test_sweeps_round_trip(tmp_path):
+    csv_path = tmp_path / "fet_sweeps.csv"
+    df = pd.DataFrame({"corner": "typical", "temp": 25, "sweeps": SWEEPS * 2})
+    add_typed_sweeps(df).to_csv(csv_path, index=False)
+
+    loaded = load_sweeps(str(csv_path))
+    assert format_sweeps(loaded.drop(columns="sweeps")).tolist() == SWEEPS * 2
+
+    # Rows of one group are rendered from the first one, as the regressions do
+    assert loaded["sweep_group"].nunique() == len(SWEEPS)
+    for _, group_df in loaded.groupby("sweep_group"):
+        assert set(group_df["sweeps"]) == {format_axes(row_axes(group_df.iloc[0]))}
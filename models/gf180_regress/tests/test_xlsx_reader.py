@@ -0,0 +1,48 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from gf180_regress.xlsx_reader import _dedup_names, read_excel
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+
+# Workbook with column names repeated up to 96 times
+DUP_WORKBOOK = os.path.join(MODELS_DIR, "180MCU_SPICE_DATA", "HV_FET", "pmos_10p0_asym_iv.nl_out.xlsx")
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "x,y,x,x",
+        "a,a,a.1,a",
+        "a.1,a,a,a",
+        "vbs =0,vbs =0.75,vbs =0,vbs =0.75,vbs =0,vbs =0.75",
+        "a,,a,,Unnamed: 1",
+    ],
+)
+def test_dedup_names_like_pandas(header):
+    names = [name or f"Unnamed: {i}" for i, name in enumerate(header.split(","))]
+    unnamed = [i for i, name in enumerate(header.split(",")) if not name]
+    expected = pd.read_csv(io.StringIO(header + "\n"), engine="python").columns
+    assert _dedup_names(names, unnamed) == list(expected)
+
+
+@pytest.mark.skipif(not os.path.isfile(DUP_WORKBOOK), reason="measurement data not available")
+def test_read_excel_like_pandas():
+    pd.testing.assert_frame_equal(read_excel(DUP_WORKBOOK), pd.read_excel(DUP_WORKBOOK))
@@ -0,0 +1,352 @@
+# Copyright 2023 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import array
+import posixpath
+from collections import defaultdict
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+# Workbook parsing modules are only needed once a workbook is read
+zipfile = lazy_import("zipfile")
+ET = lazy_import("xml.etree.ElementTree")
+
+# CONSTANT VALUES
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def _col_index(cell_ref: str) -> int:
+    """
+    Convert the column letters of a cell reference to a 0-based index [e.g. "AB12" -> 27].
+
+    Parameters
+    ----------
+    cell_ref : str
+        Cell reference.
+    Returns
+    -------
+    int
+        Column index.
+    """
+
+    idx = 0
+    for ch in cell_ref:
+        if ch.isdigit():
+            break
+        idx = idx * 26 + ord(ch) - 64
+    return idx - 1
+
+
+def _text_of(elem) -> str:
+    """
+    Text of a string item, rich text runs are joined and phonetic runs skipped.
+    """
+
+    parts = []
+    for child in elem:
+        if child.tag == f"{NS_MAIN}t":
+            parts.append(child.text or "")
+        elif child.tag == f"{NS_MAIN}r":
+            parts.extend(t.text or "" for t in child.iter(f"{NS_MAIN}t"))
+    return "".join(parts)
+
+
+def _shared_strings(zf: zipfile.ZipFile) -> list:
+    """
+    Load the shared strings table of a workbook.
+
+    Parameters
+    ----------
+    zf : zipfile.ZipFile
+        Opened xlsx file.
+    Returns
+    -------
+    list
+        Shared strings in table order.
+    """
+
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+
+    strings = []
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag == f"{NS_MAIN}si":
+                strings.append(_text_of(elem))
+                elem.clear()
+    return strings
+
+
+def _sheet_part(zf: zipfile.ZipFile, sheet) -> str:
+    """
+    Get the zip member holding a worksheet.
+
+    Parameters
+    ----------
+    zf : zipfile.ZipFile
+        Opened xlsx file.
+    sheet : int or str
+        Sheet position or sheet name.
+    Returns
+    -------
+    str
+        Path of the worksheet xml inside the xlsx file.
+    """
+
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    sheets = workbook.findall(f"{NS_MAIN}sheets/{NS_MAIN}sheet")
+    if isinstance(sheet, int):
+        if sheet >= len(sheets):
+            raise ValueError(f"Worksheet index {sheet} is invalid, {len(sheets)} worksheets found")
+        selected = sheets[sheet]
+    else:
+        selected = next((s for s in sheets if s.get("name") == sheet), None)
+        if selected is None:
+            raise ValueError(f"Worksheet named '{sheet}' not found")
+
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    rel_id = selected.get(f"{NS_REL}id")
+    target = next(r.get("Target") for r in rels.iter(f"{NS_PKG_REL}Relationship") if r.get("Id") == rel_id)
+
+    return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+
+
+def iter_sheet_rows(excel_path: str, sheet=0):
+    """
+    Stream the cells of a worksheet row by row.
+
+    The sheet xml is parsed incrementally and the cells of every row are
+    released once yielded, so memory doesn't grow with the number of cells. Numbers are returned
+    as float, strings as str, booleans as bool and errors as None.
+
+    Parameters
+    ----------
+    excel_path : str
+        Path of the xlsx file.
+    sheet : int or str
+        Sheet position or sheet name, first sheet by default.
+    Yields
+    ------
+    tuple
+        (row_index, cells) with 0-based row index and list of (col_index, value).
+    """
+
+    t_row = f"{NS_MAIN}row"
+    t_c = f"{NS_MAIN}c"
+    t_v = f"{NS_MAIN}v"
+    t_is = f"{NS_MAIN}is"
+    # Column letters are the same for every row, they are converted once
+    col_of = {}
+
+    with zipfile.ZipFile(excel_path) as zf:
+        strings = _shared_strings(zf)
+        part = _sheet_part(zf, sheet)
+
+        with zf.open(part) as f:
+            next_row = 0
+            for _, elem in ET.iterparse(f):
+                if elem.tag != t_row:
+                    continue
+
+                row_ref = elem.get("r")
+                row_idx = int(row_ref) - 1 if row_ref else next_row
+                next_row = row_idx + 1
+
+                cells = []
+                next_col = 0
+                for c in elem.iter(t_c):
+                    ref = c.get("r")
+                    if ref:
+                        letters = ref.rstrip("0123456789")
+                        col = col_of.get(letters)
+                        if col is None:
+                            col = col_of[letters] = _col_index(letters)
+                    else:
+                        col = next_col
+                    next_col = col + 1
+
+                    cell_type = c.get("t", "n")
+                    if cell_type == "inlineStr":
+                        inline = c.find(t_is)
+                        if inline is not None:
+                            cells.append((col, _text_of(inline)))
+                        continue
+
+                    v = c.find(t_v)
+                    if v is None or v.text is None:
+                        continue
+                    if cell_type == "n":
+                        cells.append((col, float(v.text)))
+                    elif cell_type == "s":
+                        cells.append((col, strings[int(v.text)]))
+                    elif cell_type == "b":
+                        cells.append((col, v.text == "1"))
+                    elif cell_type == "e":
+                        cells.append((col, None))
+                    else:
+                        cells.append((col, v.text))
+
+                # Release cells of parsed rows, only the empty row elements are kept by the parser
+                elem.clear()
+
+                yield row_idx, cells
+
+
+def _dedup_names(names: list, unnamed_cols: list = ()) -> list:
+    """
+    Rename duplicated column names the same way `pd.read_excel` does [e.g. "vgs", "vgs.1"].
+
+    Named columns are renamed before unnamed ones, and a suffix already used
+    by another column name is skipped [e.g. "vgs =0.76" after "vgs =0.75"].
+    """
+
+    names = list(names)
+    unnamed = set(unnamed_cols)
+    present = defaultdict(int)
+    for name in names:
+        present[name] += 1
+
+    counts = defaultdict(int)
+    for i in [i for i in range(len(names)) if i not in unnamed] + list(unnamed_cols):
+        name = old_name = names[i]
+        cur_count = counts[name]
+        while cur_count > 0:
+            counts[old_name] = cur_count + 1
+            name = f"{old_name}.{cur_count}"
+            cur_count = cur_count + 1 if present[name] else counts[name]
+        present[names[i]] -= 1
+        present[name] += 1
+        names[i] = name
+        counts[name] = cur_count + 1
+    return names
+
+
+def read_excel(excel_path: str, sheet=0, usecols=None) -> pd.DataFrame:
+    """
+    Read a measurement workbook sheet as `pd.read_excel` does, streaming its cells.
+
+    First row holds column names, empty names are set to "Unnamed: <index>"
+    and duplicates are suffixed like pandas. Numeric cells are gathered in
+    compact float arrays while the sheet is read, and columns not selected by
+    `usecols` are skipped without being converted.
+
+    Parameters
+    ----------
+    excel_path : str
+        Path of the xlsx file.
+    sheet : int or str
+        Sheet position or sheet name, first sheet by default.
+    usecols : list or callable
+        Column names to keep, or a function called with each column name
+        returning True for columns to keep. All columns by default.
+    Returns
+    -------
+    df : pd.DataFrame
+        Sheet data with one column per sheet column.
+    """
+
+    rows = iter_sheet_rows(excel_path, sheet)
+
+    header_row = None
+    for row_idx, cells in rows:
+        if cells:
+            header_row = row_idx
+            header_cells = dict(cells)
+            break
+
+    if header_row is None:
+        return pd.DataFrame()
+
+    # Numeric cells as (row, col, value) arrays, other cells as Python objects
+    num_rows, num_cols, num_vals = array.array("q"), array.array("q"), array.array("d")
+    obj_cells = []
+    max_col = max(header_cells)
+    n_rows = 0
+
+    keep = None
+    if usecols is not None:
+        # Column names are needed before filtering, they are resolved on the header cells
+        names = _header_names(header_cells, max_col)
+        keep_names = usecols if callable(usecols) else set(usecols).__contains__
+        keep = {i for i, n in enumerate(names) if keep_names(n)}
+
+    for row_idx, cells in rows:
+        if not cells:
+            continue
+        # Blank rows inside the data are kept as empty rows, trailing ones are dropped
+        pos = row_idx - header_row - 1
+        n_rows = pos + 1
+        for col, value in cells:
+            max_col = max(max_col, col)
+            if keep is not None and col not in keep:
+                continue
+            if type(value) is float:
+                num_rows.append(pos)
+                num_cols.append(col)
+                num_vals.append(value)
+            elif value is not None:
+                obj_cells.append((pos, col, value))
+
+    names = _header_names(header_cells, max_col)
+    n_cols = max_col + 1
+
+    num_rows = np.frombuffer(num_rows, dtype=np.int64)
+    num_cols = np.frombuffer(num_cols, dtype=np.int64)
+    values = np.full((n_rows, n_cols), np.nan)
+    values[num_rows, num_cols] = np.frombuffer(num_vals, dtype=np.float64)
+
+    obj_by_col = defaultdict(list)
+    for pos, col, value in obj_cells:
+        obj_by_col[col].append((pos, value))
+
+    columns = {}
+    for col, name in enumerate(names):
+        if keep is not None and col not in keep:
+            continue
+        col_values = values[:, col]
+        if col in obj_by_col:
+            mixed = [np.nan if np.isnan(v) else (int(v) if v.is_integer() else v) for v in col_values.tolist()]
+            for pos, value in obj_by_col[col]:
+                mixed[pos] = value
+            columns[name] = pd.Series(mixed, dtype=object).infer_objects()
+        elif n_rows and not np.isnan(col_values).any() and np.all(np.mod(col_values, 1) == 0):
+            columns[name] = col_values.astype(np.int64)
+        else:
+            columns[name] = col_values
+
+    return pd.DataFrame(columns, index=pd.RangeIndex(n_rows))
+
+
+def _header_names(header_cells: dict, max_col: int) -> list:
+    """
+    Column names of a sheet from its header cells, matching `pd.read_excel`.
+    """
+
+    names = []
+    unnamed_cols = []
+    for col in range(max_col + 1):
+        value = header_cells.get(col)
+        if value is None or value == "":
+            names.append(f"Unnamed: {col}")
+            unnamed_cols.append(col)
+        elif isinstance(value, float) and value.is_integer():
+            names.append(int(value))
+        else:
+            names.append(value)
+    return _dedup_names(names, unnamed_cols)
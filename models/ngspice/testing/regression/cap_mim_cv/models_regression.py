@@ -20,17 +20,29 @@ Usage:
   --num_cores=<num>              Number of cores to be used by simulator
 """
 
+from __future__ import annotations
+
 from docopt import docopt
-import pandas as pd
-import numpy as np
-from subprocess import check_call, Popen, PIPE
-from jinja2 import Template
-import concurrent.futures
 import shutil
 import glob
 import os
 import logging
-import re
+import sys
+
+# Shared regression helpers live in models/gf180_regress
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".."))
+from gf180_regress.simulators import get_simulator  # noqa: E402
+from gf180_regress.compare import Comparison, join_results  # noqa: E402
+from gf180_regress.meas_data import read_meas_data  # noqa: E402
+from gf180_regress.lazy import lazy_import  # noqa: E402
+
+# Heavy modules are imported on first use, so --help doesn't wait for them
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+futures = lazy_import("concurrent.futures")
+
+# Simulator backend shared by all points of this regression
+simulator = get_simulator("ngspice")
 
 # CONSTANT VALUES
 PASS_THRESH = 5.0
@@ -38,27 +50,6 @@ MAX_VAL_DETECT = 0.1e-15  # Max value to detect bad errors 0.1fF
 QUANTILE_RATIO = 0.98  # quantile ratio used for regression test
 
 
-def check_ngspice_version():
-    """
-    check_ngspice_version checks ngspice version and makes sure it would work with the models.
-    """
-    # ======= Checking ngspice  =======
-    ngspice_v_ = os.popen("ngspice -v").read()
-
-    if "ngspice-" not in ngspice_v_:
-        logging.error("ngspice is not found. Please make sure ngspice is installed.")
-        exit(1)
-    else:
-        version = int(re.search(r"ngspice-([0-9]+)", ngspice_v_).group(1))
-        logging.info(f"Your ngspice version is: ngspice {version}")
-
-        if version <= 37:
-            logging.error(
-                "ngspice version is not supported. Please use ngspice version 38 or newer."
-            )
-            exit(1)
-
-
 def find_mimcap(log_file):
     """
     Function to parse capacitance value from simulation run log.
@@ -72,23 +63,9 @@ def find_mimcap(log_file):
         Parsed capacitance value measured in simulation run.
     """
 
-    cmd = 'grep "cj" {} | head -n 1'.format(log_file)
-    process = Popen(cmd, shell=True, stdout=PIPE)
-    return float(process.communicate()[0][:-1].decode("utf-8").split("=")[1])
-
-
-def simulate_device(netlist_path: str):
-    """
-    Call simulation commands to perform simulation.
-    Args:
-        file_name (str): Netlist cir for run.
-    Returns:
-        int: Return code of the simulation. 0 if success.  Non-zero if failed.
-    """
-    return check_call(
-        f"ngspice -b {netlist_path} -o {netlist_path}.log > {netlist_path}.log 2>&1",
-        shell=True,
-    )
+    with open(log_file) as f:
+        line = next(line for line in f if "cj" in line)
+    return float(line.rstrip("\n").split("=")[1])
 
 
 def run_sim(
@@ -145,20 +122,17 @@ def run_sim(
     result_df["temp"] = temp
 
     # Generating netlist templates for all variations
-    with open(netlist_tmp) as f:
-        tmpl = Template(f.read())
-        with open(netlist_path, "w") as netlist:
-            netlist.write(
-                tmpl.render(
-                    device=device_name,
-                    width=width,
-                    length=length,
-                    temp=temp,
-                    corner=corner,
-                    model_card_path=model_card_path,
-                    model_design_path=model_design_path,
-                )
-            )
+    simulator.render(
+        netlist_tmp,
+        netlist_path,
+        device=device_name,
+        width=width,
+        length=length,
+        temp=temp,
+        corner=corner,
+        model_card_path=model_card_path,
+        model_design_path=model_design_path,
+    )
 
     # Running ngspice for each netlist
     logging.info(
@@ -167,7 +141,7 @@ def run_sim(
 
     # calling simulator to run netlist and write its results
     try:
-        simulate_device(netlist_path)
+        simulator.run(netlist_path, check=True)
         # Get Cj value from run log
         try:
             cj_val = find_mimcap(f"{netlist_path}.log")
@@ -207,7 +181,7 @@ def run_sims(df: pd.DataFrame, dirpath: str) -> pd.DataFrame:
     """
 
     results = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
+    with futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
         futures_list = []
         for j, row in df.iterrows():
             futures_list.append(
@@ -222,7 +196,7 @@ def run_sims(df: pd.DataFrame, dirpath: str) -> pd.DataFrame:
                 )
             )
 
-        for future in concurrent.futures.as_completed(futures_list):
+        for future in futures.as_completed(futures_list):
             try:
                 data = future.result()
                 results.append(data)
@@ -240,7 +214,8 @@ def main():
     """
 
     ## Check ngspice version
-    check_ngspice_version()
+    if not simulator.check_version():
+        exit(1)
 
     # pandas setup
     pd.set_option("display.max_columns", None)
@@ -283,7 +258,7 @@ def main():
             logging.error(f"{meas_data_path} file doesn't exist, please recheck")
             exit(1)
 
-        meas_df = pd.read_csv(meas_data_path)
+        meas_df = read_meas_data(meas_data_path)
 
         # For MIMCAP [Metal cap], the cap value is almost same for all voltages.
         ## We will drop voltage column and round cap value (fF) to 2 numbers after digits.
@@ -299,7 +274,7 @@ def main():
         )
 
         # We have 4 types for MIMCAP, all have same data points
-        meas_df["device_name"] = meas_df["device_name"] + f"_{dev}"
+        meas_df["device_name"] = meas_df["device_name"].astype(str) + f"_{dev}"
 
         # Simulating all data points to be compared with measured ones
         sim_df = run_sims(meas_df, dev_path)
@@ -310,42 +285,28 @@ def main():
         )
 
         # Merging meas and sim dataframe in one
-        full_df = meas_df.merge(
-            sim_df,
-            on=["device_name", "W (um)", "L (um)", "corner", "temp"],
-            how="left",
-            suffixes=("_meas", "_sim"),
-        )
+        full_df = join_results(meas_df, sim_df, ["device_name", "W (um)", "L (um)", "corner", "temp"])
 
         # Error calculation and report
         ## Relative error calculation for fets
-        full_df["Cj_err"] = np.abs((full_df["Cj_meas"] - full_df["Cj_sim"]) * 100.0 / (full_df["Cj_meas"]))
+        comparison = Comparison(full_df, "Cj_meas", "Cj_sim", "Cj_err")
         full_df.to_csv(f"{dev_path}/{dev}_full_merged_data.csv", index=False)
 
         # Calculate Q [quantile] to verify matching between measured and simulated data
         ## Refer to https://builtin.com/data-science/boxplot for more details.
-        q_target = full_df["Cj_err"].quantile(QUANTILE_RATIO)
+        q_target = comparison.quantile(QUANTILE_RATIO)
         logging.info(f"Quantile target for {dev} device is: {q_target}")
 
-        bad_err_full_df_loc = full_df[full_df["Cj_err"] > PASS_THRESH]
-        bad_err_full_df = bad_err_full_df_loc[
-            (bad_err_full_df_loc["Cj_sim"] >= MAX_VAL_DETECT)
-            | (bad_err_full_df_loc["Cj_meas"] >= MAX_VAL_DETECT)
-        ]
+        bad_err_full_df = comparison.bad_points(PASS_THRESH, ["Cj_sim", "Cj_meas"], MAX_VAL_DETECT)
         bad_err_full_df.to_csv(f"{dev_path}/{dev}_bad_err_cv.csv", index=False)
         logging.info(
             f"Bad relative errors between measured and simulated data at {dev}_bad_err_cv.csv"
         )
 
-        # calculating the relative error of each device and reporting it
-        min_error_total = float(full_df["Cj_err"].min())
-        max_error_total = float(full_df["Cj_err"].max())
-        mean_error_total = float(full_df["Cj_err"].mean())
-
-        # Cliping relative error at 100%
-        min_error_total = 100 if min_error_total > 100 else min_error_total
-        max_error_total = 100 if max_error_total > 100 else max_error_total
-        mean_error_total = 100 if mean_error_total > 100 else mean_error_total
+        # calculating the relative error of each device and reporting it [clipped at 100%]
+        min_error_total = comparison.min_error
+        max_error_total = comparison.max_error
+        mean_error_total = comparison.mean_error
 
         # logging relative error
         logging.info(
@@ -20,18 +20,32 @@ Usage:
   --num_cores=<num>              Number of cores to be used by simulator
 """
 
+from __future__ import annotations
+
 from docopt import docopt
-import pandas as pd
-import numpy as np
-from subprocess import check_call, Popen, PIPE
-from jinja2 import Template
-import concurrent.futures
+from subprocess import Popen, PIPE
 import shutil
 import glob
 import os
 import logging
 import warnings
-import re
+import sys
+
+# Shared regression helpers live in models/gf180_regress
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".."))
+from gf180_regress.simulators import get_simulator  # noqa: E402
+from gf180_regress.compare import Comparison, join_results  # noqa: E402
+from gf180_regress.meas_data import read_meas_data  # noqa: E402
+from gf180_regress.sweeps import load_sweeps, row_axes  # noqa: E402
+from gf180_regress.lazy import lazy_import  # noqa: E402
+
+# Heavy modules are imported on first use, so --help doesn't wait for them
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+futures = lazy_import("concurrent.futures")
+
+# Simulator backend shared by all points of this regression
+simulator = get_simulator("ngspice")
 
 # CONSTANT VALUES
 RES_MOSCAP = 100   # We will use this res (kohm) in RC circuit for MOSCAP measurement
@@ -41,41 +55,9 @@ CLIP_CAP = 200e-15  # lowest curr to clip on
 QUANTILE_RATIO = 0.95  # quantile ratio used for regression test
 
 
-def check_ngspice_version():
-    """
-    check_ngspice_version checks ngspice version and makes sure it would work with the models.
-    """
-    # ======= Checking ngspice  =======
-    ngspice_v_ = os.popen("ngspice -v").read()
-
-    if "ngspice-" not in ngspice_v_:
-        logging.error("ngspice is not found. Please make sure ngspice is installed.")
-        exit(1)
-    else:
-        version = int(re.search(r"ngspice-([0-9]+)", ngspice_v_).group(1))
-        logging.info(f"Your ngspice version is: ngspice {version}")
-
-        if version <= 37:
-            logging.error(
-                "ngspice version is not supported. Please use ngspice version 38 or newer."
-            )
-            exit(1)
-
-
-def simulate_device(netlist_path: str):
-    """
-    Call simulation commands to perform simulation.
-    Args:
-        file_name (str): Netlist cir for run.
-    Returns:
-        int: Return code of the simulation. 0 if success.  Non-zero if failed.
-    """
-    return os.system(f"ngspice -b {netlist_path} -o {netlist_path}.log > {netlist_path}.log 2>&1")
-
-
 def run_sim(dirpath: str, device_name: str, width: str,
             length: float, corner: float, temp: float,
-            cj_max: float, sweep: str) -> dict:
+            cj_max: float, sweep: tuple) -> dict:
     """
     Function to run simulation for all data points per each variation.
 
@@ -95,8 +77,8 @@ def run_sim(dirpath: str, device_name: str, width: str,
         temp value for the current run
     cj_max: float
         Max cap value in measured data for this device
-    sweep: str
-        Voltage sweep will be used during simulation
+    sweep: tuple
+        (var, start, stop, step) of voltage sweep will be used during simulation
     Returns
     -------
     result_df: dict
@@ -126,43 +108,38 @@ def run_sim(dirpath: str, device_name: str, width: str,
     result_path = os.path.join(dev_netlists_path, sim_file)
 
     # Extactng main values used in all sim for same device
-    ## Sweep variable in this format: Vj {min} {max} {step}
+    ## Sweep variable in this format: (Vj, min, max, step)
     ## We will use supply voltage with double max voltage value,
     ## to make sure that the cap is fully charged.
-    min_volt_sweep = float(sweep.split(" ")[1])
-    max_volt_sweep = float(sweep.split(" ")[2])
-    step_volt_sweep = float(sweep.split(" ")[3])
+    _, min_volt_sweep, max_volt_sweep, step_volt_sweep = sweep
 
     # We will get our cap value at 4*time_const [4*R*C]
     ## R * C = kohm * fF = ps
     sim_run_time = round(4 * float(RES_MOSCAP * cj_max))
 
     # Generating netlist templates for all variations
-    with open(netlist_tmp) as f:
-        tmpl = Template(f.read())
-        with open(netlist_path, "w") as netlist:
-            netlist.write(
-                tmpl.render(
-                    device=device_name,
-                    width=width,
-                    length=length,
-                    temp=temp,
-                    corner=corner,
-                    supp_val=max_volt_sweep,
-                    res_val=RES_MOSCAP,
-                    sim_run_time=sim_run_time,
-                    result_path_pos=result_path_pos,
-                    result_path_neg=result_path_neg,
-                    model_card_path=model_card_path,
-                    model_design_path=model_design_path,
-                )
-            )
+    simulator.render(
+        netlist_tmp,
+        netlist_path,
+        device=device_name,
+        width=width,
+        length=length,
+        temp=temp,
+        corner=corner,
+        supp_val=max_volt_sweep,
+        res_val=RES_MOSCAP,
+        sim_run_time=sim_run_time,
+        result_path_pos=result_path_pos,
+        result_path_neg=result_path_neg,
+        model_card_path=model_card_path,
+        model_design_path=model_design_path,
+    )
 
     # Running ngspice for each netlist
     logging.info(f"Running simulation for {device_name}-cv at w={width}, l={length}, temp={temp}, corner={corner}")
 
     # calling simulator to run netlist and write its results
-    simulate_device(netlist_path)
+    simulator.run(netlist_path)
 
     # check if pos sim data is generated
     if not os.path.exists(result_path_pos) or not os.path.isfile(result_path_pos):
@@ -223,7 +200,7 @@ def run_sims(df: pd.DataFrame, dirpath: str) -> pd.DataFrame:
     """
 
     results = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
+    with futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
         futures_list = []
         for j, row in df.iterrows():
             futures_list.append(
@@ -236,11 +213,11 @@ def run_sims(df: pd.DataFrame, dirpath: str) -> pd.DataFrame:
                     row["corner"],
                     row["temp"],
                     row["cj_max"],
-                    row["sweep"],
+                    row_axes(row)[0],
                 )
             )
 
-        for future in concurrent.futures.as_completed(futures_list):
+        for future in futures.as_completed(futures_list):
             try:
                 data = future.result()
                 results.append(data)
@@ -263,7 +240,8 @@ def main():
     """
 
     ## Check ngspice version
-    check_ngspice_version()
+    if not simulator.check_version():
+        exit(1)
 
     # pandas setup
     pd.set_option("display.max_columns", None)
@@ -300,7 +278,7 @@ def main():
             logging.error(f"{meas_data_path} file doesn't exist, please recheck")
             exit(1)
 
-        meas_df = pd.read_csv(meas_data_path)
+        meas_df = read_meas_data(meas_data_path)
         meas_df.drop_duplicates(inplace=True)
 
         logging.info(f"# Device {dev} number of measured datapoints for cv : {len(meas_df)} ")
@@ -313,7 +291,7 @@ def main():
             logging.error(f"{sweep_data_path} file doesn't exist, please recheck")
             exit(1)
 
-        sweep_df = pd.read_csv(sweep_data_path)
+        sweep_df = load_sweeps(sweep_data_path)
         sweep_df.drop_duplicates(inplace=True)
 
         logging.info(f"# Device {dev} number of sweep datapoints (runs) for cv : {len(sweep_df)} ")
@@ -324,35 +302,26 @@ def main():
         logging.info(f"# Device {dev} number of simulated datapoints for cv : {len(sim_df)} ")
 
         # Merging meas and sim dataframe in one
-        full_df = meas_df.merge(sim_df,
-                                on=['device_name', 'W (um)', 'L (um)', 'corner', 'temp', 'Vj'],
-                                how='left',
-                                suffixes=('_meas', '_sim'))
+        full_df = join_results(meas_df, sim_df, ['device_name', 'W (um)', 'L (um)', 'corner', 'temp', 'Vj'])
 
         # Error calculation and report
         ## Relative error calculation for fets
-        full_df["Cj_err"] = np.abs((full_df["Cj_meas"] - full_df["Cj_sim"]) * 100.0 / (full_df["Cj_meas"]))
+        comparison = Comparison(full_df, "Cj_meas", "Cj_sim", "Cj_err")
         full_df.to_csv(f"{dev_path}/{dev}_full_merged_data.csv", index=False)
 
         # Calculate Q [quantile] to verify matching between measured and simulated data
         ## Refer to https://builtin.com/data-science/boxplot for more details.
-        q_target = full_df["Cj_err"].quantile(QUANTILE_RATIO)
+        q_target = comparison.quantile(QUANTILE_RATIO)
         logging.info(f"Quantile target for {dev} device is: {q_target}")
 
-        bad_err_full_df_loc = full_df[full_df["Cj_err"] > PASS_THRESH]
-        bad_err_full_df = bad_err_full_df_loc[(bad_err_full_df_loc["Cj_sim"] >= MAX_VAL_DETECT) | (bad_err_full_df_loc["Cj_meas"] >= MAX_VAL_DETECT)]
+        bad_err_full_df = comparison.bad_points(PASS_THRESH, ["Cj_sim", "Cj_meas"], MAX_VAL_DETECT)
         bad_err_full_df.to_csv(f"{dev_path}/{dev}_bad_err_cv.csv", index=False)
         logging.info(f"Bad relative errors between measured and simulated data at {dev}_bad_err_cv.csv")
 
-        # calculating the relative error of each device and reporting it
-        min_error_total = float(full_df["Cj_err"].min())
-        max_error_total = float(full_df["Cj_err"].max())
-        mean_error_total = float(full_df["Cj_err"].mean())
-
-        # Cliping relative error at 100%
-        min_error_total = 100 if min_error_total > 100 else min_error_total
-        max_error_total = 100 if max_error_total > 100 else max_error_total
-        mean_error_total = 100 if mean_error_total > 100 else mean_error_total
+        # calculating the relative error of each device and reporting it [clipped at 100%]
+        min_error_total = comparison.min_error
+        max_error_total = comparison.max_error
+        mean_error_total = comparison.mean_error
 
         # logging relative error
         logging.info(
@@ -20,17 +20,30 @@ Usage:
   --num_cores=<num>              Number of cores to be used by simulator
 """
 
+from __future__ import annotations
+
 from docopt import docopt
-import pandas as pd
-import numpy as np
-from subprocess import check_call, Popen, PIPE
-from jinja2 import Template
-import concurrent.futures
+from subprocess import Popen, PIPE
 import shutil
 import glob
 import os
 import logging
-import re
+import sys
+
+# Shared regression helpers live in models/gf180_regress
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".."))
+from gf180_regress.simulators import get_simulator  # noqa: E402
+from gf180_regress.compare import Comparison, join_results  # noqa: E402
+from gf180_regress.meas_data import read_meas_data  # noqa: E402
+from gf180_regress.lazy import lazy_import  # noqa: E402
+
+# Heavy modules are imported on first use, so --help doesn't wait for them
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+futures = lazy_import("concurrent.futures")
+
+# Simulator backend shared by all points of this regression
+simulator = get_simulator("ngspice")
 
 # CONSTANT VALUES
 PASS_THRESH = 5.0  # Threshold value that will be used to test our regression
@@ -39,38 +52,6 @@ CLIP_CURR = 10e-12
 QUANTILE_RATIO = 0.95  # quantile ratio used for regression test
 
 
-def check_ngspice_version():
-    """
-    check_ngspice_version checks ngspice version and makes sure it would work with the models.
-    """
-    # ======= Checking ngspice  =======
-    ngspice_v_ = os.popen("ngspice -v").read()
-
-    if "ngspice-" not in ngspice_v_:
-        logging.error("ngspice is not found. Please make sure ngspice is installed.")
-        exit(1)
-    else:
-        version = int(re.search(r"ngspice-([0-9]+)", ngspice_v_).group(1))
-        logging.info(f"Your ngspice version is: ngspice {version}")
-
-        if version <= 37:
-            logging.error(
-                "ngspice version is not supported. Please use ngspice version 38 or newer."
-            )
-            exit(1)
-
-
-def simulate_device(netlist_path: str):
-    """
-    Call simulation commands to perform simulation.
-    Args:
-        file_name (str): Netlist cir for run.
-    Returns:
-        int: Return code of the simulation. 0 if success.  Non-zero if failed.
-    """
-    return os.system(f"ngspice -b {netlist_path} -o {netlist_path}.log > {netlist_path}.log 2>&1")
-
-
 def run_sim(dirpath: str, device_name: str, area: str,
             perim: float, corner: float, temp: float,
             sweep: str) -> dict:
@@ -125,32 +106,29 @@ def run_sim(dirpath: str, device_name: str, area: str,
     info["Pj (um)"] = perim
 
     # Generating netlist templates for all variations
-    with open(netlist_tmp) as f:
-        tmpl = Template(f.read())
-        with open(netlist_path, "w") as netlist:
-            netlist.write(
-                tmpl.render(
-                    device=device_name,
-                    area=area,
-                    perim=perim,
-                    temp=temp,
-                    corner=corner,
-                    result_path=result_path,
-                    sweep=sweep,
-                    model_card_path=model_card_path,
-                    model_design_path=model_design_path,
-                )
-            )
+    simulator.render(
+        netlist_tmp,
+        netlist_path,
+        device=device_name,
+        area=area,
+        perim=perim,
+        temp=temp,
+        corner=corner,
+        result_path=result_path,
+        sweep=sweep,
+        model_card_path=model_card_path,
+        model_design_path=model_design_path,
+    )
 
     # Running ngspice for each netlist
     logging.info(f"Running simulation for {device_name}-cv at A={area}p, P={perim}u, temp={temp}, corner={corner}")
 
     # calling simulator to run netlist and write its results
-    simulate_device(netlist_path)
+    simulator.run(netlist_path)
 
     # calling simulator to run netlist and write its results
     try:
-        simulate_device(netlist_path)
+        simulator.run(netlist_path)
         diode_iv = result_path if os.path.exists(result_path) else np.nan
     except Exception:
         diode_iv = np.nan
@@ -158,7 +136,7 @@ def run_sim(dirpath: str, device_name: str, area: str,
     # Cleaning output csv files from simulation results and
     ## fromating columns to match what we have in measurement
     if os.path.exists(result_path) and os.path.isfile(result_path):
-        result_df = pd.read_csv(result_path, delimiter=r"\s+")
+        result_df = simulator.parse(result_path)
         # Drop unwanted columns for simplicity
         result_df.drop("v-sweep", axis=1, inplace=True)
 
@@ -195,7 +173,7 @@ def run_sims(df: pd.DataFrame, dirpath: str, device_name: str) -> pd.DataFrame:
     """
 
     results = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
+    with futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
         futures_list = []
         for j, row in df.iterrows():
             futures_list.append(
@@ -211,7 +189,7 @@ def run_sims(df: pd.DataFrame, dirpath: str, device_name: str) -> pd.DataFrame:
                 )
             )
 
-        for future in concurrent.futures.as_completed(futures_list):
+        for future in futures.as_completed(futures_list):
             try:
                 data = future.result()
                 results.append(data)
@@ -234,7 +212,8 @@ def main():
     """
 
     ## Check ngspice version
-    check_ngspice_version()
+    if not simulator.check_version():
+        exit(1)
 
     # pandas setup
     pd.set_option("display.max_columns", None)
@@ -277,7 +256,7 @@ def main():
             logging.error(f"{meas_data_path} file doesn't exist, please recheck")
             exit(1)
 
-        meas_df = pd.read_csv(meas_data_path)
+        meas_df = read_meas_data(meas_data_path)
         meas_df.drop_duplicates(inplace=True)
 
         logging.info(f"# Device {dev} number of measured datapoints for cv : {len(meas_df)} ")
@@ -290,7 +269,7 @@ def main():
             logging.error(f"{sweep_data_path} file doesn't exist, please recheck")
             exit(1)
 
-        sweep_df = pd.read_csv(sweep_data_path)
+        sweep_df = read_meas_data(sweep_data_path)
         sweep_df.drop_duplicates(inplace=True)
 
         logging.info(f"# Device {dev} number of sweep datapoints (runs) for cv : {len(sweep_df)} ")
@@ -301,10 +280,7 @@ def main():
         logging.info(f"# Device {dev} number of simulated datapoints for cv : {len(sim_df)} ")
 
         # Merging meas and sim dataframe in one
-        full_df = meas_df.merge(sim_df,
-                                on=['Area (pm^2)', 'Pj (um)', 'corner', 'temp', 'Vn'],
-                                how='left',
-                                suffixes=('_meas', '_sim'))
+        full_df = join_results(meas_df, sim_df, ['Area (pm^2)', 'Pj (um)', 'corner', 'temp', 'Vn'])
 
         # Clipping current values to lowest curr
         # full_df['In_meas'] = full_df['In_meas'].clip(lower=CLIP_CURR)
@@ -312,28 +288,22 @@ def main():
 
         # Error calculation and report
         ## Relative error calculation for fets
-        full_df["In_err"] = np.abs(full_df["In_meas"] - full_df["In_sim"]) * 100.0 / (full_df["In_meas"])
+        comparison = Comparison(full_df, "In_meas", "In_sim", "In_err")
         full_df.to_csv(f"{dev_path}/{dev}_full_merged_data.csv", index=False)
 
         # Calculate Q [quantile] to verify matching between measured and simulated data
         ## Refer to https://builtin.com/data-science/boxplot for more details.
-        q_target = full_df["In_err"].quantile(QUANTILE_RATIO)
+        q_target = comparison.quantile(QUANTILE_RATIO)
         logging.info(f"Quantile target for {dev} device is: {q_target}")
 
-        bad_err_full_df_loc = full_df[full_df["In_err"] > PASS_THRESH]
-        bad_err_full_df = bad_err_full_df_loc[(bad_err_full_df_loc["In_sim"] >= MAX_VAL_DETECT) | (bad_err_full_df_loc["In_meas"] >= MAX_VAL_DETECT)]
+        bad_err_full_df = comparison.bad_points(PASS_THRESH, ["In_sim", "In_meas"], MAX_VAL_DETECT)
         bad_err_full_df.to_csv(f"{dev_path}/{dev}_iv_bad_err.csv", index=False)
         logging.info(f"Bad relative errors between measured and simulated data at {dev}_iv_bad_err.csv")
 
-        # calculating the relative error of each device and reporting it
-        min_error_total = float(full_df["In_err"].min())
-        max_error_total = float(full_df["In_err"].max())
-        mean_error_total = float(full_df["In_err"].mean())
-
-        # Cliping relative error at 100%
-        min_error_total = 100 if min_error_total > 100 else min_error_total
-        max_error_total = 100 if max_error_total > 100 else max_error_total
-        mean_error_total = 100 if mean_error_total > 100 else mean_error_total
+        # calculating the relative error of each device and reporting it [clipped at 100%]
+        min_error_total = comparison.min_error
+        max_error_total = comparison.max_error
+        mean_error_total = comparison.mean_error
 
         # logging relative error
         logging.info(
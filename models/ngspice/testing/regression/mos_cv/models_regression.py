@@ -20,18 +20,31 @@ Usage:
   --num_cores=<num>              Number of cores to be used by simulator
 """
 
+from __future__ import annotations
+
 from docopt import docopt
-import pandas as pd
-import numpy as np
-from subprocess import check_call
-from jinja2 import Template
-import concurrent.futures
 import shutil
-import multiprocessing as mp
 import glob
 import os
 import logging
-import re
+import sys
+
+# Shared regression helpers live in models/gf180_regress
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".."))
+from gf180_regress.simulators import get_simulator  # noqa: E402
+from gf180_regress.compare import Comparison, join_results  # noqa: E402
+from gf180_regress.meas_data import read_meas_data  # noqa: E402
+from gf180_regress.sweeps import format_axes, load_sweeps, row_axes  # noqa: E402
+from gf180_regress.lazy import lazy_import  # noqa: E402
+
+# Heavy modules are imported on first use, so --help doesn't wait for them
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+futures = lazy_import("concurrent.futures")
+mp = lazy_import("multiprocessing")
+
+# Simulator backend shared by all points of this regression
+simulator = get_simulator("ngspice")
 
 # CONSTANT VALUES
 PASS_THRESH = 5.0
@@ -40,42 +53,10 @@ CLIP_CURR = 10e-12   # lowest curr to clip on
 TOLE = 0.001
 
 
-def check_ngspice_version():
-    """
-    check_ngspice_version checks ngspice version and makes sure it would work with the models.
-    """
-    # ======= Checking ngspice  =======
-    ngspice_v_ = os.popen("ngspice -v").read()
-
-    if "ngspice-" not in ngspice_v_:
-        logging.error("ngspice is not found. Please make sure ngspice is installed.")
-        exit(1)
-    else:
-        version = int(re.search(r"ngspice-([0-9]+)", ngspice_v_).group(1))
-        logging.info(f"Your ngspice version is: ngspice {version}")
-
-        if version <= 37:
-            logging.error(
-                "ngspice version is not supported. Please use ngspice version 38 or newer."
-            )
-            exit(1)
-
-
-def simulate_device(netlist_path: str):
-    """
-    Call simulation commands to perform simulation.
-    Args:
-        file_name (str): Netlist cir for run.
-    Returns:
-        int: Return code of the simulation. 0 if success.  Non-zero if failed.
-    """
-    return check_call(f"ngspice -b {netlist_path} -o {netlist_path}.log > {netlist_path}.log 2>&1", shell=True)
-
-
 def run_sim(dirpath: str, device: str, cap: str,
             width: str, length: float, nf: int,
             corner: float, temp: float, const_var: str,
-            const_var_val: float, sweeps: str) -> dict:
+            const_var_val: float, sweeps: list) -> dict:
     """
     Function to run simulation for all data points per each variation.
 
@@ -99,8 +80,8 @@ def run_sim(dirpath: str, device: str, cap: str,
         Name of constant voltage for the current run
     const_var_val: float
         Value of constant voltage for the current run
-    sweeps: str
-        Str that holds all voltage sweeps for the current run
+    sweeps: list
+        (var, start, stop, step) of all voltage sweeps for the current run
     Returns
     -------
     info(dict):
@@ -144,47 +125,41 @@ def run_sim(dirpath: str, device: str, cap: str,
 
     # Formating sweeps to be valid for our template
     tole = 0 if cap == 'cgg' else TOLE
-    main_sweep = " ".join(sweeps.split(" ")[:4])
-    second_sweep = " ".join(sweeps.split(" ")[4:])
-    second_sweep_volt = second_sweep.split(" ")[0]
-    second_sweep_start = float(second_sweep.split(" ")[1])
-    second_sweep_stop = float(second_sweep.split(" ")[2]) + tole
-    second_sweep_step = float(second_sweep.split(" ")[3])
+    main_sweep = format_axes(sweeps[:1])
+    second_sweep_volt, second_sweep_start, second_sweep_stop, second_sweep_step = sweeps[1]
+    second_sweep_stop += tole
 
     # Generating netlist templates for all variations
-    with open(netlist_tmp) as f:
-        tmpl = Template(f.read())
-        with open(netlist_path, "w") as netlist:
-            netlist.write(
-                tmpl.render(
-                    device=device,
-                    width=width,
-                    length=length,
-                    nf=nf,
-                    temp=temp,
-                    corner=corner,
-                    cap=cap,
-                    main_sweep=main_sweep,
-                    second_sweep_volt=second_sweep_volt,
-                    second_sweep_start=second_sweep_start,
-                    second_sweep_stop=second_sweep_stop,
-                    second_sweep_step=second_sweep_step,
-                    vds_val=vds_val,
-                    vbs_val=vbs_val,
-                    const_var=const_var,
-                    const_var_val=const_var_val,
-                    result_path=result_path,
-                    model_card_path=model_card_path,
-                    model_design_path=model_design_path,
-                )
-            )
+    simulator.render(
+        netlist_tmp,
+        netlist_path,
+        device=device,
+        width=width,
+        length=length,
+        nf=nf,
+        temp=temp,
+        corner=corner,
+        cap=cap,
+        main_sweep=main_sweep,
+        second_sweep_volt=second_sweep_volt,
+        second_sweep_start=second_sweep_start,
+        second_sweep_stop=second_sweep_stop,
+        second_sweep_step=second_sweep_step,
+        vds_val=vds_val,
+        vbs_val=vbs_val,
+        const_var=const_var,
+        const_var_val=const_var_val,
+        result_path=result_path,
+        model_card_path=model_card_path,
+        model_design_path=model_design_path,
+    )
 
     # Running ngspice for each netlist
-    logging.info(f"Running simulation for {device} at w={width}, l={length}, temp={temp}, sweeps={sweeps}, out={cap}")
+    logging.info(f"Running simulation for {device} at w={width}, l={length}, temp={temp}, sweeps={format_axes(sweeps)}, out={cap}")
 
     # calling simulator to run netlist and write its results
     try:
-        simulate_device(netlist_path)
+        simulator.run(netlist_path, check=True)
         mos_id_rd = result_path if os.path.exists(result_path) else np.nan
     except Exception:
         mos_id_rd = np.nan
@@ -192,7 +167,7 @@ def run_sim(dirpath: str, device: str, cap: str,
     # Cleaning output csv files from simulation results and
     ## fromating columns to match what we have in measurement
     if os.path.exists(result_path) and os.path.isfile(result_path):
-        result_df = pd.read_csv(result_path, delimiter=r"\s+")
+        result_df = simulator.parse(result_path)
         result_df = result_df[result_df.iloc[:, 0] != result_df.columns[0]]
 
         # Drop unwanted columns for simplicity
@@ -237,7 +212,7 @@ def run_sims(
     """
 
     results = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
+    with futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
         futures_list = []
         for j, row in df.iterrows():
             futures_list.append(
@@ -253,11 +228,11 @@ def run_sims(
                     row["temp"],
                     row["const_var"],
                     row["const_var_val"],
-                    row["sweeps"],
+                    row_axes(row),
                 )
             )
 
-        for future in concurrent.futures.as_completed(futures_list):
+        for future in futures.as_completed(futures_list):
             try:
                 data = future.result()
                 results.append(data)
@@ -280,7 +255,8 @@ def main():
     """
 
     ## Check ngspice version
-    check_ngspice_version()
+    if not simulator.check_version():
+        exit(1)
 
     # pandas setup
     pd.set_option("display.max_columns", None)
@@ -325,7 +301,7 @@ def main():
                 logging.error(f"{sweeps_file} file doesn't exist, please recheck")
                 exit(1)
 
-            df_sweeps = pd.read_csv(sweeps_file)
+            df_sweeps = load_sweeps(sweeps_file)
             logging.info(f"Data points used in simulation for {dev}:\n {df_sweeps}")
 
             # Running simulation for all data points
@@ -347,7 +323,7 @@ def main():
                 logging.error(f"Data file at {meas_data_path} doesn't exist, please recheck")
                 exit(1)
 
-            meas_df = pd.read_csv(meas_data_path)
+            meas_df = read_meas_data(meas_data_path)
             meas_df = meas_df.round({'vbs': 2, 'vgs': 2, 'vds': 2})
             meas_df = meas_df.replace(-0, 0)
             meas_df.drop_duplicates(inplace=True)
@@ -355,36 +331,27 @@ def main():
             logging.info(f"# Device {dev} number of measured datapoints for {cap} : {len(meas_df)} ")
 
             # Merging meas and sim dataframe in one
-            full_df = meas_df.merge(sim_df,
-                                    on=['device_name', 'W (um)', 'L (um)', 'nf',
-                                        'corner', 'temp', 'vds', 'vgs', 'vbs'],
-                                    how='left',
-                                    suffixes=('_meas', '_sim'))
+            full_df = join_results(meas_df, sim_df, ['device_name', 'W (um)', 'L (um)', 'nf',
+                                                     'corner', 'temp', 'vds', 'vgs', 'vbs'])
 
             # Error calculation and report
             ## Relative error calculation for fets
-            full_df[f"{cap}_err"] = np.abs(full_df[f"{cap}_meas"] - full_df[f"{cap}_sim"]) * 100.0 / (full_df[f"{cap}_meas"])
+            comparison = Comparison(full_df, f"{cap}_meas", f"{cap}_sim", f"{cap}_err")
             full_df.to_csv(f"{dev_path}/{dev}_full_merged_data_{cap}.csv", index=False)
 
             # Calculate Q [quantile] to verify matching between measured and simulated data
             ## Refer to https://builtin.com/data-science/boxplot for more details.
-            q_target = full_df[f"{cap}_err"].quantile(0.98)
+            q_target = comparison.quantile(0.98)
             logging.info(f"Quantile target for {dev} device is: {q_target} %")
 
-            bad_err_full_df_loc = full_df[full_df[f"{cap}_err"] > PASS_THRESH]
-            bad_err_full_df = bad_err_full_df_loc[(bad_err_full_df_loc[f"{cap}_sim"] >= MAX_VAL_DETECT) | (bad_err_full_df_loc[f"{cap}_meas"] >= MAX_VAL_DETECT)]
+            bad_err_full_df = comparison.bad_points(PASS_THRESH, [f"{cap}_sim", f"{cap}_meas"], MAX_VAL_DETECT)
             bad_err_full_df.to_csv(f"{dev_path}/{dev}_bad_err_{cap}.csv", index=False)
             logging.info(f"Bad relative errors between measured and simulated data at {dev}_bad_err_{cap}.csv")
 
-            # calculating the relative error of each device and reporting it
-            min_error_total = float(full_df[f"{cap}_err"].min())
-            max_error_total = float(full_df[f"{cap}_err"].max())
-            mean_error_total = float(full_df[f"{cap}_err"].mean())
-
-            # Cliping relative error at 100%
-            min_error_total = 100 if min_error_total > 100 else min_error_total
-            max_error_total = 100 if max_error_total > 100 else max_error_total
-            mean_error_total = 100 if mean_error_total > 100 else mean_error_total
+            # calculating the relative error of each device and reporting it [clipped at 100%]
+            min_error_total = comparison.min_error
+            max_error_total = comparison.max_error
+            mean_error_total = comparison.mean_error
 
             # logging relative error
             logging.info(
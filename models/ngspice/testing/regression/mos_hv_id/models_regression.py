@@ -13,60 +13,43 @@
 # limitations under the License.
 """
 Usage:
-  models_regression.py [--num_cores=<num>] [--meas_result=<meas_result>]
+  models_regression.py [--num_cores=<num>] [--meas_result=<meas_result>] [--ngspice_pool] [--sliced_models] [--sim_cache] [--rawfile] [--save_sim_csv]
 
   -h, --help                     Show help text.
   -v, --version                  Show version.
   --num_cores=<num>              Number of cores to be used by simulator
   --meas_result=<meas_result>    Measurement to be tested (Allowed: id, rds). [default: id]
+  --ngspice_pool                 Reuse long-lived ngspice processes instead of starting one per netlist.
+  --sliced_models                Use per device/corner fragments of the model card instead of the full card.
+  --sim_cache                    Reuse results of unchanged simulations from the simulation cache.
+  --rawfile                      Write ngspice results as binary rawfiles instead of ASCII wrdata.
+  --save_sim_csv                 Keep a clean csv of every simulation next to its netlist.
 """
 
+from __future__ import annotations
+
 from docopt import docopt
-import pandas as pd
-import numpy as np
-from subprocess import check_call
-from jinja2 import Template
-import concurrent.futures
 import shutil
-import multiprocessing as mp
-import glob
 import os
 import logging
-import re
+import sys
 
+# Shared regression helpers live in models/gf180_regress
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".."))
+from gf180_regress.ngspice_pool import NgspicePool  # noqa: E402
+from gf180_regress.model_slicer import ModelCardSlicer  # noqa: E402
+from gf180_regress.simulators import get_simulator  # noqa: E402
+from gf180_regress.meas_data import read_meas_data  # noqa: E402
+from gf180_regress.lazy import lazy_import  # noqa: E402
 
-def check_ngspice_version():
-    """
-    check_ngspice_version checks ngspice version and makes sure it would work with the models.
-    """
-    # ======= Checking ngspice  =======
-    ngspice_v_ = os.popen("ngspice -v").read()
+# Heavy modules are imported on first use, so --help doesn't wait for them
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+futures = lazy_import("concurrent.futures")
+mp = lazy_import("multiprocessing")
 
-    if "ngspice-" not in ngspice_v_:
-        logging.error("ngspice is not found. Please make sure ngspice is installed.")
-        exit(1)
-    else:
-        version = int(re.search(r"ngspice-([0-9]+)", ngspice_v_).group(1))
-        logging.info(f"Your ngspice version is: ngspice {version}")
-
-        if version <= 37:
-            logging.error(
-                "ngspice version is not supported. Please use ngspice version 38 or newer."
-            )
-            exit(1)
-
-
-def simulate_device(netlist_path: str):
-    """
-    Call simulation commands to perform simulation.
-    Args:
-        file_name (str): Netlist cir for run.
-    Returns:
-        int: Return code of the simulation. 0 if success.  Non-zero if failed.
-    """
-    return check_call(
-        f"ngspice -b {netlist_path} -o {netlist_path}.log > {netlist_path}.log 2>&1",
-        shell=True)
+# Simulator backend shared by all points of this regression
+simulator = get_simulator("ngspice")
 
 
 def run_sim(dirpath: str, device: str, meas_out_result: str,
@@ -99,7 +82,7 @@ def run_sim(dirpath: str, device: str, meas_out_result: str,
     Returns
     -------
     info(dict):
-        Dataframe contains results for the current run
+        Info of the current run, its results are kept in info["result"]
     """
 
     # Get model card path
@@ -108,6 +91,10 @@ def run_sim(dirpath: str, device: str, meas_out_result: str,
     model_card_path = os.path.join(models_dir, "smbb000149.ngspice")
     model_design_path = os.path.join(models_dir, "design.ngspice")
 
+    # Use the minimal fragment of the model card for this device
+    if model_slicer is not None:
+        model_card_path = model_slicer.get_fragment(model_card_path, device, corner)
+
     # Select desired nelist templete to be used in the current run
     device_group_netlist = "nfet" if "nfet" in device else "pfet"
 
@@ -125,6 +112,7 @@ def run_sim(dirpath: str, device: str, meas_out_result: str,
     sim_file_name = \
         f"simulated_w{width}_l{length}_t{temp}_{corner}_{const_var}{const_var_val}_{meas_out_result}.csv"
     result_path = os.path.join(dev_netlists_path, sim_file_name)
+    sim_out_path = result_path.replace(".csv", ".raw" if rawfile_output else ".dat")
 
     info = {}
     info["device"] = device
@@ -138,56 +126,76 @@ def run_sim(dirpath: str, device: str, meas_out_result: str,
     vds_val = const_var_val if const_var == "vds" else 10
 
     # Generating netlist templates for all variations
-    with open(netlist_tmp) as f:
-        tmpl = Template(f.read())
-        with open(netlist_path, "w") as netlist:
-            netlist.write(
-                tmpl.render(
-                    device=device,
-                    meas_out_result=meas_out_result,
-                    width=width,
-                    length=length,
-                    temp=temp,
-                    corner=corner,
-                    sweeps=sweeps,
-                    vds_val=vds_val,
-                    vbs_val=vbs_val,
-                    const_var=const_var,
-                    const_var_val=const_var_val,
-                    result_path=result_path,
-                    model_card_path=model_card_path,
-                    model_design_path=model_design_path,
-                )
-            )
+    netlist_text = simulator.render(
+        netlist_tmp,
+        netlist_path,
+        device=device,
+        meas_out_result=meas_out_result,
+        width=width,
+        length=length,
+        temp=temp,
+        corner=corner,
+        sweeps=sweeps,
+        vds_val=vds_val,
+        vbs_val=vbs_val,
+        const_var=const_var,
+        const_var_val=const_var_val,
+        result_path=sim_out_path,
+        rawfile=rawfile_output,
+        model_card_path=model_card_path,
+        model_design_path=model_design_path,
+    )
 
-    # Running ngspice for each netlist
-    logging.info(f"Running simulation for {device} at \
+    # Results of an earlier run in this directory must not be read or cached again
+    if os.path.exists(sim_out_path):
+        os.remove(sim_out_path)
+
+    # Reusing results of an identical simulation from the cache
+    cache_key = None
+    cache_hit = False
+    sim_ok = False
+    if sim_cache is not None:
+        cache_key = sim_cache.key(netlist_text, sim_out_path, [model_card_path, model_design_path])
+        cache_hit = sim_cache.get(cache_key, sim_out_path)
+
+    if not cache_hit:
+        # Running ngspice for each netlist
+        logging.info(f"Running simulation for {device} at \
 w={width}, l={length}, temp={temp}, sweeps={sweeps}, out={meas_out_result}")
 
-    # calling simulator to run netlist and write its results
-    try:
-        simulate_device(netlist_path)
-        mos_id_rd = result_path if os.path.exists(result_path) else np.nan
-    except Exception:
-        mos_id_rd = np.nan
-
-    # Cleaning output csv files from simulation results and
-    ## fromating columns to match what we have in measurement
-    if os.path.exists(result_path) and os.path.isfile(result_path):
-        result_df = pd.read_csv(result_path, delimiter=r"\s+")
-        # Drop unwanted columns for simplicity
-        result_df.drop("v-sweep", axis=1, inplace=True)
-
-        # Adding columns for all variations per each run
-        result_df["W (um)"] = width
-        result_df["L (um)"] = length
-        result_df["corner"] = corner
-        result_df["temp"] = temp
-
-        # Writing output in clean format in same csv path of resutls
+        # calling simulator to run netlist and write its results
+        try:
+            simulator.run(netlist_path, check=True)
+            sim_ok = True
+        except Exception:
+            pass
+
+    info["result"] = None
+    if not os.path.isfile(sim_out_path):
+        info["id_rds_sim"] = np.nan
+        return info
+
+    # Only complete results of a successful run are cached, not partial output of a failed one
+    if cache_key is not None and sim_ok:
+        sim_cache.put(cache_key, sim_out_path)
+
+    # Fromating columns of simulation results to match what we have in measurement
+    result_df = simulator.parse(sim_out_path)
+    # Drop unwanted columns for simplicity
+    result_df.drop("v-sweep", axis=1, inplace=True)
+
+    # Adding columns for all variations per each run
+    result_df["W (um)"] = width
+    result_df["L (um)"] = length
+    result_df["corner"] = corner
+    result_df["temp"] = temp
+
+    # Writing output in clean format is only needed for debugging
+    if save_sim_csv:
         result_df.to_csv(result_path, index=False, header=True, sep=",")
 
-    info["id_rds_sim"] = mos_id_rd
+    info["id_rds_sim"] = sim_out_path
+    info["result"] = result_df
 
     return info
 
@@ -215,7 +223,7 @@ def run_sims(
     """
 
     results = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
+    with futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
         futures_list = []
         for __j, row in df.iterrows():
             futures_list.append(
@@ -234,19 +242,15 @@ def run_sims(
                 )
             )
 
-        for future in concurrent.futures.as_completed(futures_list):
+        for future in futures.as_completed(futures_list):
             try:
                 data = future.result()
                 results.append(data)
             except Exception as exc:
                 logging.info("Test case generated an exception: %s" % (exc))
 
-    # Get all simulation generated csv files
-    results_path = os.path.join(dirpath, f"{device}_netlists")
-    run_results_csv = glob.glob(f"{results_path}/*.csv")
-
     # Merging all simulation results in one dataframe
-    df = pd.concat([pd.read_csv(f) for f in run_results_csv], ignore_index=True)
+    df = pd.concat([info["result"] for info in results if info["result"] is not None], ignore_index=True)
     return df
 
 
@@ -260,7 +264,8 @@ def main(meas_out_result):
     """
 
     ## Check ngspice version
-    check_ngspice_version()
+    if not simulator.check_version():
+        exit(1)
 
     # pandas setup
     pd.set_option("display.max_columns", None)
@@ -297,7 +302,7 @@ def main(meas_out_result):
             logging.error(f"{sweeps_file} file doesn't exist, please recheck")
             exit(1)
 
-        df_sweeps = pd.read_csv(sweeps_file)
+        df_sweeps = read_meas_data(sweeps_file)
         logging.info(f"Data points used in simulation for {dev}:\n {df_sweeps}")
 
         sim_df = run_sims(df_sweeps, dev_path, dev, meas_out_result)
@@ -338,6 +343,8 @@ if __name__ == "__main__":
     )
 
     meas_out_result = arguments["--meas_result"]
+    rawfile_output = arguments["--rawfile"]
+    save_sim_csv = arguments["--save_sim_csv"]
 
     logging.basicConfig(
         level=logging.DEBUG,
@@ -353,5 +360,31 @@ if __name__ == "__main__":
                       allowed measurements for Fets are [id, rds], please recheck")
         exit(1)
 
+    # Starting ngspice servers shared by all simulation threads
+    if arguments["--ngspice_pool"]:
+        simulator.pool = NgspicePool(min(workers_count, os.cpu_count()))
+
+    # Model card fragments are cached next to the model card
+    model_slicer = (
+        ModelCardSlicer(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".model_slices"))
+        if arguments["--sliced_models"]
+        else None
+    )
+
+    # Simulation results cache is kept next to the model card
+    sim_cache = (
+        simulator.result_cache(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".sim_cache")
+        )
+        if arguments["--sim_cache"]
+        else None
+    )
+
     # Calling main function
-    main(meas_out_result)
+    try:
+        main(meas_out_result)
+    finally:
+        if simulator.pool is not None:
+            simulator.pool.close()
+        if sim_cache is not None:
+            sim_cache.log_stats()
@@ -13,26 +13,48 @@
 # limitations under the License.
 """
 Usage:
-  models_regression.py [--num_cores=<num>] [--meas_result=<meas_result>]
+  models_regression.py [--num_cores=<num>] [--meas_result=<meas_result>] [--ngspice_pool] [--sliced_models] [--sim_cache] [--rawfile] [--save_sim_csv] [--batch_size=<num>]
 
   -h, --help                     Show help text.
   -v, --version                  Show version.
   --num_cores=<num>              Number of cores to be used by simulator
   --meas_result=<meas_result>    Select measurement output to be tested (Allowed values for Fets are id, rds). [default: id]
+  --ngspice_pool                 Reuse long-lived ngspice processes instead of starting one per netlist.
+  --sliced_models                Use per device/corner fragments of the model card instead of the full card.
+  --sim_cache                    Reuse results of unchanged simulations from the simulation cache.
+  --rawfile                      Write ngspice results as binary rawfiles instead of ASCII wrdata.
+  --save_sim_csv                 Keep a clean csv of every simulation next to its netlist.
+  --batch_size=<num>             Number of W/L variations simulated together in one netlist.
 """
 
+from __future__ import annotations
+
 from docopt import docopt
-import pandas as pd
-import numpy as np
-from subprocess import check_call
-from jinja2 import Template
-import concurrent.futures
 import shutil
-import multiprocessing as mp
-import glob
 import os
 import logging
-import re
+import sys
+
+# Shared regression helpers live in models/gf180_regress
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".."))
+from gf180_regress.ngspice_pool import NgspicePool  # noqa: E402
+from gf180_regress.model_slicer import ModelCardSlicer  # noqa: E402
+from gf180_regress.batching import batch_sweeps, split_batch_result  # noqa: E402
+from gf180_regress.sweeps import format_axes, load_sweeps, row_axes  # noqa: E402
+from gf180_regress.simulators import get_simulator  # noqa: E402
+from gf180_regress.mos_netlists import netlist_group  # noqa: E402
+from gf180_regress.compare import Comparison, join_results  # noqa: E402
+from gf180_regress.meas_data import read_meas_data  # noqa: E402
+from gf180_regress.lazy import lazy_import  # noqa: E402
+
+# Heavy modules are imported on first use, so --help doesn't wait for them
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+futures = lazy_import("concurrent.futures")
+mp = lazy_import("multiprocessing")
+
+# Simulator backend shared by all points of this regression
+simulator = get_simulator("ngspice")
 
 # CONSTANT VALUES
 PASS_THRESH = 5.0
@@ -45,38 +67,6 @@ MAX_VAL_DETECT_RDS = 10e3
 QUANTILE_RDS = 0.95
 
 
-def check_ngspice_version():
-    """
-    check_ngspice_version checks ngspice version and makes sure it would work with the models.
-    """
-    # ======= Checking ngspice  =======
-    ngspice_v_ = os.popen("ngspice -v").read()
-
-    if "ngspice-" not in ngspice_v_:
-        logging.error("ngspice is not found. Please make sure ngspice is installed.")
-        exit(1)
-    else:
-        version = int(re.search(r"ngspice-([0-9]+)", ngspice_v_).group(1))
-        logging.info(f"Your ngspice version is: ngspice {version}")
-
-        if version <= 37:
-            logging.error(
-                "ngspice version is not supported. Please use ngspice version 38 or newer."
-            )
-            exit(1)
-
-
-def simulate_device(netlist_path: str):
-    """
-    Call simulation commands to perform simulation.
-    Args:
-        file_name (str): Netlist cir for run.
-    Returns:
-        int: Return code of the simulation. 0 if success.  Non-zero if failed.
-    """
-    return check_call(f"ngspice -b {netlist_path} -o {netlist_path}.log > {netlist_path}.log 2>&1", shell=True)
-
-
 def run_sim(dirpath: str, device: str, meas_out_result: str,
             width: str, length: float, corner: float,
             temp: float, const_var: str, const_var_val: float,
@@ -107,7 +97,7 @@ def run_sim(dirpath: str, device: str, meas_out_result: str,
     Returns
     -------
     info(dict):
-        Dataframe contains results for the current run
+        Info of the current run, its results are kept in info["result"]
     """
 
     # Get model card path
@@ -116,17 +106,12 @@ def run_sim(dirpath: str, device: str, meas_out_result: str,
     model_card_path = os.path.join(models_dir, "sm141064.ngspice")
     model_design_path = os.path.join(models_dir, "design.ngspice")
 
-    # Select desired nelist templete to be used in the current run
-    if meas_out_result == "id":
-        device_group_netlist = "nfet" if "nfet" in device else "pfet"
-    else:
-        if "03v3" in device:
-            device_group_netlist = "nfet_03v3" if "nfet" in device else "pfet_03v3"
-        elif "06v0_nvt" in device:
-            device_group_netlist = "nfet_06v0_nvt"
-        else:
-            device_group_netlist = "nfet_06v0" if "nfet" in device else "pfet_06v0"
+    # Use the minimal fragment of the model card for this device
+    if model_slicer is not None:
+        model_card_path = model_slicer.get_fragment(model_card_path, device, corner)
 
+    # Select desired nelist templete to be used in the current run
+    device_group_netlist = netlist_group(device, meas_out_result)
     netlist_tmp = os.path.join(f"device_netlists_{meas_out_result}", f"{device_group_netlist}.spice")
 
     # Preparing output directory at which results will be added
@@ -138,6 +123,7 @@ def run_sim(dirpath: str, device: str, meas_out_result: str,
 
     sim_file_name = f"simulated_w{width}_l{length}_t{temp}_{const_var}{const_var_val}_{meas_out_result}.csv"
     result_path = os.path.join(dev_netlists_path, sim_file_name)
+    sim_out_path = result_path.replace(".csv", ".raw" if rawfile_output else ".dat")
 
     info = {}
     info["device"] = device
@@ -151,44 +137,197 @@ def run_sim(dirpath: str, device: str, meas_out_result: str,
     vds_val = const_var_val if const_var == "vds" else 6
 
     # Generating netlist templates for all variations
-    with open(netlist_tmp) as f:
-        tmpl = Template(f.read())
-        with open(netlist_path, "w") as netlist:
-            netlist.write(
-                tmpl.render(
-                    device=device,
-                    meas_out_result=meas_out_result,
-                    width=width,
-                    length=length,
-                    temp=temp,
-                    corner=corner,
-                    sweeps=sweeps,
-                    vds_val=vds_val,
-                    vbs_val=vbs_val,
-                    const_var=const_var,
-                    const_var_val=const_var_val,
-                    result_path=result_path,
-                    model_card_path=model_card_path,
-                    model_design_path=model_design_path,
-                )
-            )
+    netlist_text = simulator.render(
+        netlist_tmp,
+        netlist_path,
+        device=device,
+        meas_out_result=meas_out_result,
+        width=width,
+        length=length,
+        temp=temp,
+        corner=corner,
+        sweeps=sweeps,
+        vds_val=vds_val,
+        vbs_val=vbs_val,
+        const_var=const_var,
+        const_var_val=const_var_val,
+        result_path=sim_out_path,
+        rawfile=rawfile_output,
+        model_card_path=model_card_path,
+        model_design_path=model_design_path,
+    )
 
-    # Running ngspice for each netlist
-    logging.info(f"Running simulation for {device} at w={width}, l={length}, temp={temp}, sweeps={sweeps}, out={meas_out_result}")
+    # Results of an earlier run in this directory must not be read or cached again
+    if os.path.exists(sim_out_path):
+        os.remove(sim_out_path)
+
+    # Reusing results of an identical simulation from the cache
+    cache_key = None
+    cache_hit = False
+    sim_ok = False
+    if sim_cache is not None:
+        cache_key = sim_cache.key(netlist_text, sim_out_path, [model_card_path, model_design_path])
+        cache_hit = sim_cache.get(cache_key, sim_out_path)
+
+    if not cache_hit:
+        # Running ngspice for each netlist
+        logging.info(f"Running simulation for {device} at w={width}, l={length}, temp={temp}, sweeps={sweeps}, out={meas_out_result}")
+
+        # calling simulator to run netlist and write its results
+        try:
+            simulator.run(netlist_path, check=True)
+            sim_ok = True
+        except Exception:
+            pass
+
+    info["result"] = None
+    if not os.path.isfile(sim_out_path):
+        info["id_rds_sim"] = "None"
+        return info
+
+    # Only complete results of a successful run are cached, not partial output of a failed one
+    if cache_key is not None and sim_ok:
+        sim_cache.put(cache_key, sim_out_path)
+
+    # Fromating columns of simulation results to match what we have in measurement
+    result_df = simulator.parse(sim_out_path)
+    # Drop unwanted columns for simplicity
+    result_df.drop("v-sweep", axis=1, inplace=True)
+
+    # Adding columns for all variations per each run
+    result_df["W (um)"] = width
+    result_df["L (um)"] = length
+    result_df["corner"] = corner
+    result_df["temp"] = temp
+
+    # Writing output in clean format is only needed for debugging
+    if save_sim_csv:
+        result_df.to_csv(result_path, index=False, header=True, sep=",")
 
-    # calling simulator to run netlist and write its results
-    try:
-        simulate_device(netlist_path)
-        mos_id_rd = result_path if os.path.exists(result_path) else "None"
-    except Exception:
-        mos_id_rd = "None"
-
-    # Cleaning output csv files from simulation results and
-    ## fromating columns to match what we have in measurement
-    if os.path.exists(result_path) and os.path.isfile(result_path):
-        result_df = pd.read_csv(result_path, delimiter=r"\s+")
-        # Drop unwanted columns for simplicity
-        result_df.drop("v-sweep", axis=1, inplace=True)
+    info["id_rds_sim"] = sim_out_path
+    info["result"] = result_df
+
+    return info
+
+
+def run_batch_sim(dirpath: str, device: str, meas_out_result: str,
+                  batch_df: pd.DataFrame, batch_index: int) -> list:
+    """
+    Function to run simulation for many W/L variations in one netlist.
+
+    Parameters
+    ----------
+    dirpath : str or Path
+        Path to the run results directory
+    device : str
+        Device used in regression test
+    meas_out_result : str
+        Measurement selected to be test for the current regression.
+    batch_df : pd.DataFrame
+        Sweep rows of this batch, all sharing corner, temp, biases and sweeps.
+    batch_index : int
+        Index of the batch used to name its netlist.
+    Returns
+    -------
+    info(list):
+        List of dicts contains info and results of each variation of the batch
+    """
+
+    # Get model card path
+    regression_dir = os.path.dirname(os.path.abspath(__file__))
+    models_dir = os.path.dirname(os.path.dirname(os.path.dirname(regression_dir)))
+    model_card_path = os.path.join(models_dir, "sm141064.ngspice")
+    model_design_path = os.path.join(models_dir, "design.ngspice")
+
+    # All rows of a batch share these values
+    corner = batch_df["corner"].iloc[0]
+    temp = batch_df["temp"].iloc[0]
+    const_var = batch_df["const_var"].iloc[0]
+    const_var_val = batch_df["const_var_val"].iloc[0]
+    sweeps = format_axes(row_axes(batch_df.iloc[0]))
+
+    # Use the minimal fragment of the model card for this device
+    if model_slicer is not None:
+        model_card_path = model_slicer.get_fragment(model_card_path, device, corner)
+
+    # Batched templates measure the same output as un-batched ones of the device group
+    device_group_netlist = netlist_group(device, meas_out_result)
+    netlist_tmp = os.path.join(f"device_netlists_{meas_out_result}", f"{device_group_netlist}_batch.spice")
+
+    # Preparing output directory at which results will be added
+    dev_netlists_path = os.path.join(dirpath, f"{device}_netlists")
+    os.makedirs(dev_netlists_path, exist_ok=True)
+
+    netlist_path = os.path.join(dev_netlists_path, f"netlist_batch{batch_index}_{meas_out_result}.spice")
+    batch_result_ext = "raw" if rawfile_output else "dat"
+    batch_result_path = os.path.join(dev_netlists_path, f"simulated_batch{batch_index}_{meas_out_result}.{batch_result_ext}")
+
+    # Check constant voltage values
+    vbs_val = const_var_val if const_var == "vbs" else 0
+    vds_val = const_var_val if const_var == "vds" else 6
+
+    variations = [
+        {"width": row["W (um)"], "length": row["L (um)"]} for _, row in batch_df.iterrows()
+    ]
+
+    # Generating one netlist for all variations of the batch
+    netlist_text = simulator.render(
+        netlist_tmp,
+        netlist_path,
+        device=device,
+        variations=variations,
+        temp=temp,
+        corner=corner,
+        sweeps=sweeps,
+        vds_val=vds_val,
+        vbs_val=vbs_val,
+        result_path=batch_result_path,
+        rawfile=rawfile_output,
+        model_card_path=model_card_path,
+        model_design_path=model_design_path,
+    )
+
+    # Results of an earlier run in this directory must not be read or cached again
+    if os.path.exists(batch_result_path):
+        os.remove(batch_result_path)
+
+    # Reusing results of an identical batch from the cache
+    cache_key = None
+    cache_hit = False
+    sim_ok = False
+    if sim_cache is not None:
+        cache_key = sim_cache.key(netlist_text, batch_result_path, [model_card_path, model_design_path])
+        cache_hit = sim_cache.get(cache_key, batch_result_path)
+
+    if not cache_hit:
+        logging.info(f"Running batched simulation for {device} with {len(variations)} variations at temp={temp}, sweeps={sweeps}, out={meas_out_result}")
+
+        # calling simulator to run netlist and write its results
+        try:
+            simulator.run(netlist_path, check=True)
+            sim_ok = True
+        except Exception:
+            pass
+
+    if not os.path.isfile(batch_result_path):
+        return [{"device": device, "id_rds_sim": "None", "result": None}]
+
+    # Only complete results of a successful run are cached, not partial output of a failed one
+    if cache_key is not None and sim_ok:
+        sim_cache.put(cache_key, batch_result_path)
+
+    # Splitting batch results per variation like un-batched runs
+    batch_result_df = simulator.parse(batch_result_path)
+    var_frames = split_batch_result(batch_result_df, len(variations), ["vds", "vgs", "vbs"], meas_out_result)
+
+    results = []
+    for var, result_df in zip(variations, var_frames):
+        width = var["width"]
+        length = var["length"]
+        result_path = os.path.join(
+            dev_netlists_path,
+            f"simulated_w{width}_l{length}_t{temp}_{const_var}{const_var_val}_{meas_out_result}.csv",
+        )
 
         # Adding columns for all variations per each run
         result_df["W (um)"] = width
@@ -196,12 +335,20 @@ def run_sim(dirpath: str, device: str, meas_out_result: str,
         result_df["corner"] = corner
         result_df["temp"] = temp
 
-        # Writing output in clean format in same csv path of resutls
-        result_df.to_csv(result_path, index=False, header=True, sep=",")
+        if save_sim_csv:
+            result_df.to_csv(result_path, index=False, header=True, sep=",")
 
-    info["id_rds_sim"] = mos_id_rd
+        results.append({
+            "device": device,
+            "temp": temp,
+            "corner": corner,
+            "length": length,
+            "width": width,
+            "id_rds_sim": batch_result_path,
+            "result": result_df,
+        })
 
-    return info
+    return results
 
 
 def run_sims(
@@ -227,38 +374,42 @@ def run_sims(
     """
 
     results = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
+    with futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
         futures_list = []
-        for j, row in df.iterrows():
-            futures_list.append(
-                executor.submit(
-                    run_sim,
-                    dirpath,
-                    device,
-                    meas_out_result,
-                    row["W (um)"],
-                    row["L (um)"],
-                    row["corner"],
-                    row["temp"],
-                    row["const_var"],
-                    row["const_var_val"],
-                    row["sweeps"],
+        if batch_size is not None:
+            # Packing variations sharing the same biases into one netlist
+            batches = batch_sweeps(df, ["sweep_group"], batch_size)
+            for i, batch_df in enumerate(batches):
+                futures_list.append(
+                    executor.submit(run_batch_sim, dirpath, device, meas_out_result, batch_df, i)
+                )
+        else:
+            for j, row in df.iterrows():
+                futures_list.append(
+                    executor.submit(
+                        run_sim,
+                        dirpath,
+                        device,
+                        meas_out_result,
+                        row["W (um)"],
+                        row["L (um)"],
+                        row["corner"],
+                        row["temp"],
+                        row["const_var"],
+                        row["const_var_val"],
+                        row["sweeps"],
+                    )
                 )
-            )
 
-        for future in concurrent.futures.as_completed(futures_list):
+        for future in futures.as_completed(futures_list):
             try:
                 data = future.result()
-                results.append(data)
+                results.extend(data if isinstance(data, list) else [data])
             except Exception as exc:
                 logging.info("Test case generated an exception: %s" % (exc))
 
-    # Get all simulation generated csv files
-    results_path = os.path.join(dirpath, f"{device}_netlists")
-    run_results_csv = glob.glob(f"{results_path}/*.csv")
-
     # Merging all simulation results in one dataframe
-    df = pd.concat([pd.read_csv(f) for f in run_results_csv], ignore_index=True)
+    df = pd.concat([info["result"] for info in results if info["result"] is not None], ignore_index=True)
     return df
 
 
@@ -272,7 +423,8 @@ def main(meas_out_result):
     """
 
     ## Check ngspice version
-    check_ngspice_version()
+    if not simulator.check_version():
+        exit(1)
 
     # pandas setup
     pd.set_option("display.max_columns", None)
@@ -316,7 +468,7 @@ def main(meas_out_result):
             logging.error(f"{sweeps_file} file doesn't exist, please recheck")
             exit(1)
 
-        df_sweeps = pd.read_csv(sweeps_file)
+        df_sweeps = load_sweeps(sweeps_file)
         logging.info(f"Data points used in simulation for {dev}:\n {df_sweeps}")
 
         sim_df = run_sims(df_sweeps, dev_path, dev, meas_out_result)
@@ -335,17 +487,14 @@ def main(meas_out_result):
             logging.error(f"{meas_data_path} file doesn't exist, please recheck")
             exit(1)
 
-        meas_df = pd.read_csv(meas_data_path)
+        meas_df = read_meas_data(meas_data_path)
         meas_df = meas_df.round({'vbs': 2, 'vgs': 2, 'vds': 2})
         meas_df.drop_duplicates(inplace=True)
 
         logging.info(f"# Device {dev} number of measured datapoints for {meas_out_result} : {len(meas_df)} ")
 
         # Merging meas and sim dataframe in one
-        full_df = meas_df.merge(sim_df,
-                                on=['W (um)', 'L (um)', 'corner', 'temp', 'vds', 'vgs', 'vbs'],
-                                how='left',
-                                suffixes=('_meas', '_sim'))
+        full_df = join_results(meas_df, sim_df, ['W (um)', 'L (um)', 'corner', 'temp', 'vds', 'vgs', 'vbs'])
 
         # Clipping current values to lowest curr
         if meas_out_result == "id":
@@ -366,7 +515,7 @@ def main(meas_out_result):
 
         # Error calculation and report
         ## Relative error calculation for FETs
-        full_df[f"{meas_out_result}_err"] = np.abs((full_df[f"{meas_out_result}_meas"] - full_df[f"{meas_out_result}_sim"]) * 100.0 / full_df[f"{meas_out_result}_meas"])
+        comparison = Comparison(full_df, f"{meas_out_result}_meas", f"{meas_out_result}_sim", f"{meas_out_result}_err")
         full_df.to_csv(f"{dev_path}/{dev}_full_merged_data.csv", index=False)
 
         # Calculate Q [quantile] to verify matching between measured and simulated data
@@ -374,23 +523,17 @@ def main(meas_out_result):
         quantile_val = QUANTILE_ID if meas_out_result == 'id' else QUANTILE_RDS
         max_val_detect = MAX_VAL_DETECT_ID if meas_out_result == 'id' else MAX_VAL_DETECT_RDS
 
-        q_target = full_df[f"{meas_out_result}_err"].quantile(quantile_val)
+        q_target = comparison.quantile(quantile_val)
         logging.info(f"Quantile target for {dev} device is: {q_target} %")
 
-        bad_err_full_df_loc = full_df[full_df[f"{meas_out_result}_err"] > PASS_THRESH]
-        bad_err_full_df = bad_err_full_df_loc[(bad_err_full_df_loc[f"{meas_out_result}_sim"] >= max_val_detect) | (bad_err_full_df_loc[f"{meas_out_result}_meas"] >= max_val_detect)]
+        bad_err_full_df = comparison.bad_points(PASS_THRESH, [f"{meas_out_result}_sim", f"{meas_out_result}_meas"], max_val_detect)
         bad_err_full_df.to_csv(f"{dev_path}/{dev}_bad_err_{meas_out_result}.csv", index=False)
         logging.info(f"Bad relative errors between measured and simulated data at {dev}_bad_err_{meas_out_result}.csv")
 
-        # calculating the relative error of each device and reporting it
-        min_error_total = float(full_df[f"{meas_out_result}_err"].min())
-        max_error_total = float(full_df[f"{meas_out_result}_err"].max())
-        mean_error_total = float(full_df[f"{meas_out_result}_err"].mean())
-
-        # Cliping relative error at 100%
-        min_error_total = 100 if min_error_total > 100 else min_error_total
-        max_error_total = 100 if max_error_total > 100 else max_error_total
-        mean_error_total = 100 if mean_error_total > 100 else mean_error_total
+        # calculating the relative error of each device and reporting it [clipped at 100%]
+        min_error_total = comparison.min_error
+        max_error_total = comparison.max_error
+        mean_error_total = comparison.mean_error
 
         # logging relative error
         logging.info(
@@ -425,6 +568,14 @@ if __name__ == "__main__":
     )
 
     meas_out_result = arguments["--meas_result"]
+    batch_size = (
+        None
+        if arguments["--batch_size"] is None
+        else int(arguments["--batch_size"])
+    )
+
+    rawfile_output = arguments["--rawfile"]
+    save_sim_csv = arguments["--save_sim_csv"]
 
     logging.basicConfig(
         level=logging.DEBUG,
@@ -439,5 +590,31 @@ if __name__ == "__main__":
         logging.error(f"{meas_out_result} is not supported, allowed measurements for Fets are [id, rds], please recheck")
         exit(1)
 
+    # Starting ngspice servers shared by all simulation threads
+    if arguments["--ngspice_pool"]:
+        simulator.pool = NgspicePool(min(workers_count, os.cpu_count()))
+
+    # Model card fragments are cached next to the model card
+    model_slicer = (
+        ModelCardSlicer(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".model_slices"))
+        if arguments["--sliced_models"]
+        else None
+    )
+
+    # Simulation results cache is kept next to the model card
+    sim_cache = (
+        simulator.result_cache(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".sim_cache")
+        )
+        if arguments["--sim_cache"]
+        else None
+    )
+
     # Calling main function
-    main(meas_out_result)
+    try:
+        main(meas_out_result)
+    finally:
+        if simulator.pool is not None:
+            simulator.pool.close()
+        if sim_cache is not None:
+            sim_cache.log_stats()
@@ -7,44 +7,33 @@ Usage:
   --num_cores=<num>      Number of cores to be used by simulator
 """
 
+from __future__ import annotations
+
 from cmath import inf
 from re import T
 from docopt import docopt
-import pandas as pd
-import numpy as np
 import os
-from jinja2 import Template
-import concurrent.futures
 import shutil
 import logging
 import glob
-import multiprocessing as mp
-
-pd.options.mode.chained_assignment = None  # default='warn'
-
-PASS_THRESH = 5.0
+import sys
 
+# Shared regression helpers live in models/gf180_regress
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".."))
+from gf180_regress.simulators import get_simulator  # noqa: E402
+from gf180_regress.xlsx_reader import read_excel  # noqa: E402
+from gf180_regress.lazy import lazy_import  # noqa: E402
 
-def check_xyce_version():
-    """
-    check_xyce_version checks ngspice version and makes sure it would work with the models.
-    """
-    # ======= Checking Xyce  =======
-    Xyce_v_ = os.popen("Xyce  -v 2> /dev/null").read()
-    if Xyce_v_ == "":
-        logging.error("Xyce is not found. Please make sure Xyce is installed.")
-        exit(1)
-    elif "7.5" not in Xyce_v_:
-        logging.error("Xyce version 7.5 is required.")
-        exit(1)
+# Heavy modules are imported on first use, so --help doesn't wait for them
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+futures = lazy_import("concurrent.futures")
+mp = lazy_import("multiprocessing")
 
+# Simulator backend shared by all points of this regression
+simulator = get_simulator("xyce", ["-hspice-ext", "all"])
 
-def call_simulator(file_name):
-    """Call simulation commands to perform simulation.
-    Args:
-        file_name (str): Netlist file name.
-    """
-    os.system(f"Xyce -hspice-ext all {file_name} -l {file_name}.log 2>/dev/null")
+PASS_THRESH = 5.0
 
 
 def ext_measured(
@@ -185,15 +174,12 @@ def run_sim(
     result_path = f"{dirpath}/simulated_{Id_sim}/{s}"
     os.makedirs(f"{dirpath}/simulated_{Id_sim}", exist_ok=True)
 
-    with open(netlist_tmp) as f:
-        tmpl = Template(f.read())
-        os.makedirs(f"{dirpath}/{device}_netlists_{Id_sim}", exist_ok=True)
-        with open(netlist_path, "w") as netlist:
-            netlist.write(tmpl.render(device=list_devices_str, temp=temp_str))
+    os.makedirs(f"{dirpath}/{device}_netlists_{Id_sim}", exist_ok=True)
+    simulator.render(netlist_tmp, netlist_path, device=list_devices_str, temp=temp_str)
 
     # Running ngspice for each netlist
     try:
-        call_simulator(netlist_path)
+        simulator.run(netlist_path)
 
         if os.path.exists(result_path):
             bjt_iv = result_path
@@ -244,7 +230,7 @@ def run_sims(
     df["temp"][3 * temp_range :] = -175
 
     results = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+    with futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
         futures_list = []
         for j, row in df.iterrows():
             futures_list.append(
@@ -258,7 +244,7 @@ def run_sims(
                 )
             )
 
-        for future in concurrent.futures.as_completed(futures_list):
+        for future in futures.as_completed(futures_list):
             try:
                 data = future.result()
                 results.append(data)
@@ -417,9 +403,11 @@ def main():
     """
 
     ## Check Xyce version
-    check_xyce_version()
+    if not simulator.check_version():
+        exit(1)
 
     # pandas setup
+    pd.options.mode.chained_assignment = None  # default='warn'
     pd.set_option("display.max_columns", None)
     pd.set_option("display.max_rows", None)
     pd.set_option("max_colwidth", None)
@@ -466,7 +454,7 @@ def main():
             )
             continue
         # From xlsx to csv
-        read_file = pd.read_excel(
+        read_file = read_excel(
             f"../../180MCU_SPICE_DATA/BJT/bjt_{device}_beta_f.nl_out.xlsx"
         )
         read_file.to_csv(f"{dirpath}/{device}.csv", index=False, header=True)
@@ -20,17 +20,29 @@ Usage:
   --num_cores=<num>      Number of cores to be used by simulator
 """
 
+from __future__ import annotations
+
 from docopt import docopt
-import pandas as pd
-import numpy as np
 import os
-from jinja2 import Template
-import concurrent.futures
 import shutil
-import multiprocessing as mp
 import logging
-import subprocess
 import glob
+import sys
+
+# Shared regression helpers live in models/gf180_regress
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".."))
+from gf180_regress.simulators import get_simulator  # noqa: E402
+from gf180_regress.xlsx_reader import read_excel  # noqa: E402
+from gf180_regress.lazy import lazy_import  # noqa: E402
+
+# Heavy modules are imported on first use, so --help doesn't wait for them
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+futures = lazy_import("concurrent.futures")
+mp = lazy_import("multiprocessing")
+
+# Simulator backend shared by all points of this regression
+simulator = get_simulator("xyce", ["-hspice-ext", "all"])
 
 PASS_THRESH = 5.0  # threshold value for passing devices
 NO_ROWS_NPN = 54  # no.of combinations extracted from npn sheet
@@ -38,29 +50,13 @@ NO_ROWS_PNP = 24  # no.of combinations extracted from pnp sheet
 NO_ROWS_NPN_W = 32  # no.of combinations extracted from npn sheet without csj
 
 
-def check_xyce_version():
-    """
-    check_xyce_version checks ngspice version and makes sure it would work with the models.
-    """
-    # ======= Checking Xyce  =======
-    Xyce_v_ = os.popen("Xyce  -v 2> /dev/null").read()
-    if Xyce_v_ == "":
-        logging.error("Xyce is not found. Please make sure Xyce is installed.")
-        exit(1)
-    elif "7.5" not in Xyce_v_:
-        logging.error("Xyce version 7.5 is required.")
-        exit(1)
-
-
 def find_freq(filename):
     """
     Find res in log
     """
-    cmd = 'grep "FREQ" {}'.format(filename)
-    process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE)
-    x = process.communicate()[0][:-1].decode("utf-8")
-    # split the line into a list
-    x = x.split("\n")
+    with open(filename) as f:
+        # one list item per line holding a frequency
+        x = [line.rstrip("\n") for line in f if "FREQ" in line]
     y = x
     for i in range(len(x)):
 
@@ -83,14 +79,6 @@ def find_freq(filename):
     return y
 
 
-def call_simulator(file_name):
-    """Call simulation commands to perform simulation.
-    Args:
-        file_name (str): Netlist file name.
-    """
-    os.system(f"Xyce -hspice-ext all {file_name} -l {file_name}.log 2> /dev/null")
-
-
 def ext_measured(
     cj_file: str, dev: str, devices: list, dev_path: str, no_rows=int
 ) -> pd.DataFrame:
@@ -109,7 +97,7 @@ def ext_measured(
     """
 
     # Reading excel sheet and creating data frame
-    df = pd.read_excel(cj_file)
+    df = read_excel(cj_file)
 
     # temp_range is threshold for switching between 25, -40, 125
     temp_range = int(no_rows / 3)
@@ -270,30 +258,20 @@ def run_sim(dirpath: str, cap: str, device: str, temp: float) -> dict:
             connection = "0 0 open out"
             Iopen = "Iopen open 0 0"
 
-        with open(netlist_tmp) as f:
-            tmpl = Template(f.read())
-            os.makedirs(f"{dirpath}/{dev}_netlists", exist_ok=True)
-            with open(netlist_path, "w") as netlist:
-                netlist.write(
-                    tmpl.render(
-                        device=device,
-                        Iopen=Iopen,
-                        connection=connection,
-                        temp=temp_str,
-                        corner=corner,
-                    )
-                )
-            with open(netlist_path, "r") as netlist:
-                netlist_str = netlist.read()
-            netlist_str.replace(".endend", ".end")
-            # logging.info(netlist_str)
-            # exit()
-            with open(netlist_path, "w") as netlist:
-                netlist.write(netlist_str)
+        os.makedirs(f"{dirpath}/{dev}_netlists", exist_ok=True)
+        simulator.render(
+            netlist_tmp,
+            netlist_path,
+            device=device,
+            Iopen=Iopen,
+            connection=connection,
+            temp=temp_str,
+            corner=corner,
+        )
 
         # Running ngspice for each netlist
         try:
-            call_simulator(netlist_path)
+            simulator.run(netlist_path)
 
             # check if results stored in csv file or not!
             if os.path.exists(netlist_path):
@@ -325,7 +303,7 @@ def run_sims(df: pd.DataFrame, dirpath: str, num_workers=mp.cpu_count()):
     """
 
     results = list()
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+    with futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
         futures_list = list()
         for j, row in df.iterrows():
             futures_list.append(
@@ -333,7 +311,7 @@ def run_sims(df: pd.DataFrame, dirpath: str, num_workers=mp.cpu_count()):
                     run_sim, dirpath, row["cap"], row["device"], row["temp"]
                 )
             )
-        for future in concurrent.futures.as_completed(futures_list):
+        for future in futures.as_completed(futures_list):
             try:
                 data = future.result()
                 results.append(data)
@@ -482,9 +460,6 @@ def main():
     Main function applies all regression steps
     """
 
-    ## Check Xyce version
-    check_xyce_version()
-
     # pandas setup
     pd.set_option("display.max_columns", None)
     pd.set_option("display.max_rows", None)
@@ -641,5 +616,9 @@ if __name__ == "__main__":
         datefmt="%d-%b-%Y %H:%M:%S",
     )
 
+    ## Check Xyce version
+    if not simulator.check_version():
+        exit(1)
+
     # Calling main function
     main()
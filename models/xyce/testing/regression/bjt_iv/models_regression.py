@@ -20,17 +20,31 @@ Usage:
   --num_cores=<num>              Number of cores to be used by simulator
 """
 
+from __future__ import annotations
+
 from docopt import docopt
-import pandas as pd
-import numpy as np
-from subprocess import check_call, Popen, PIPE
-from jinja2 import Template
-import concurrent.futures
+from subprocess import Popen, PIPE
 import shutil
 import glob
 import os
 import logging
 import re
+import sys
+
+# Shared regression helpers live in models/gf180_regress
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".."))
+from gf180_regress.simulators import get_simulator  # noqa: E402
+from gf180_regress.compare import Comparison, join_results  # noqa: E402
+from gf180_regress.meas_data import read_meas_data  # noqa: E402
+from gf180_regress.lazy import lazy_import  # noqa: E402
+
+# Heavy modules are imported on first use, so --help doesn't wait for them
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+futures = lazy_import("concurrent.futures")
+
+# Simulator backend shared by all points of this regression
+simulator = get_simulator("xyce", ["-hspice-ext", "all"])
 
 # CONSTANT VALUES
 PASS_THRESH = 5.0
@@ -39,31 +53,6 @@ MAX_VAL_DETECT = 10e-6  # Max value to detect bad errors above it
 QUANTILE_RATIO = 0.98
 
 
-def check_xyce_version():
-    """
-    check_xyce_version checks Xyce version and makes sure it would work with the models.
-    """
-    # ======= Checking Xyce  =======
-    Xyce_v_ = os.popen("Xyce  -v 2> /dev/null").read()
-    if Xyce_v_ == "":
-        logging.error("Xyce is not found. Please make sure Xyce is installed.")
-        exit(1)
-    elif "7.5" not in Xyce_v_:
-        logging.error("Xyce version 7.5 is required.")
-        exit(1)
-
-
-def simulate_device(netlist_path: str):
-    """
-    Call simulation commands to perform simulation.
-    Args:
-        netlist_path (str): Netlist cir for run.
-    Returns:
-        int: Return code of the simulation. 0 if success.  Non-zero if failed.
-    """
-    return os.system(f"Xyce -hspice-ext all {netlist_path} -l {netlist_path}.log > {netlist_path}.log 2>&1")
-
-
 def run_sim(dirpath: str, device: str, corner: float, temp: float, sweep: str) -> dict:
     """
     Function to run simulation for all data points per each variation.
@@ -115,28 +104,25 @@ def run_sim(dirpath: str, device: str, corner: float, temp: float, sweep: str) -
         terminals = "c b 0"
 
     # Generating netlist templates for all variations
-    with open(netlist_tmp) as f:
-        tmpl = Template(f.read())
-        with open(netlist_path, "w") as netlist:
-            netlist.write(
-                tmpl.render(
-                    device=device,
-                    terminals=terminals,
-                    corner=corner,
-                    temp=temp,
-                    sweep=sweep,
-                    result_path=result_path,
-                    model_card_path=model_card_path,
-                    model_design_path=model_design_path,
-                )
-            )
+    simulator.render(
+        netlist_tmp,
+        netlist_path,
+        device=device,
+        terminals=terminals,
+        corner=corner,
+        temp=temp,
+        sweep=sweep,
+        result_path=result_path,
+        model_card_path=model_card_path,
+        model_design_path=model_design_path,
+    )
 
     # Running xyce for each netlist
     logging.info(f"Running simulation for {device}-iv at temp={temp}, corner={corner}")
 
     # calling simulator to run netlist and write its results
     try:
-        simulate_device(netlist_path)
+        simulator.run(netlist_path)
         bjt_iv = result_path if os.path.exists(result_path) else np.nan
     except Exception:
         bjt_iv = np.nan
@@ -144,7 +130,7 @@ def run_sim(dirpath: str, device: str, corner: float, temp: float, sweep: str) -
     # Cleaning output csv files from simulation results and
     ## fromating columns to match what we have in measurement
     if os.path.exists(result_path) and os.path.isfile(result_path):
-        result_df = pd.read_csv(result_path)
+        result_df = simulator.parse(result_path)
         # Renaming df columns with proper names
         result_df.rename(columns={'V(C)': 'vcp', 'I(VBB)': 'ibp', '{-I(VCP)}': 'ic'}, inplace=True)
 
@@ -178,7 +164,7 @@ def run_sims(df: pd.DataFrame, dirpath: str) -> pd.DataFrame:
     """
 
     results = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
+    with futures.ThreadPoolExecutor(max_workers=workers_count) as executor:
         futures_list = []
         for j, row in df.iterrows():
             futures_list.append(
@@ -192,7 +178,7 @@ def run_sims(df: pd.DataFrame, dirpath: str) -> pd.DataFrame:
                 )
             )
 
-        for future in concurrent.futures.as_completed(futures_list):
+        for future in futures.as_completed(futures_list):
             try:
                 data = future.result()
                 results.append(data)
@@ -215,7 +201,8 @@ def main():
     """
 
     ## Check xyce version
-    check_xyce_version()
+    if not simulator.check_version():
+        exit(1)
 
     # pandas setup
     pd.set_option("display.max_columns", None)
@@ -254,7 +241,7 @@ def main():
             logging.error(f"{meas_data_path} file doesn't exist, please recheck")
             exit(1)
 
-        meas_df = pd.read_csv(meas_data_path)
+        meas_df = read_meas_data(meas_data_path)
         meas_df.drop_duplicates(inplace=True)
 
         logging.info(f"# Device BJT {dev}-iv number of measured datapoints : {len(meas_df)} ")
@@ -267,7 +254,7 @@ def main():
             logging.error(f"{sweeps_file} file doesn't exist, please recheck")
             exit(1)
 
-        df_sweeps = pd.read_csv(sweeps_file)
+        df_sweeps = read_meas_data(sweeps_file)
         logging.info(f"Data points used in simulation for {dev}:\n {df_sweeps}")
 
         # Simulating all data points
@@ -277,35 +264,26 @@ def main():
         logging.info(f"# Device {dev} number of simulated datapoints: {len(sim_df)} ")
 
         # Merging meas and sim dataframe in one
-        full_df = meas_df.merge(sim_df,
-                                on=['device_name', 'corner', 'temp', 'ibp' , 'vcp'],
-                                how='left',
-                                suffixes=('_meas', '_sim'))
+        full_df = join_results(meas_df, sim_df, ['device_name', 'corner', 'temp', 'ibp' , 'vcp'])
 
         # Error calculation and report
         ## Relative error calculation for BJT-iv
-        full_df["ic_err"] = np.abs((full_df["ic_meas"] - full_df["ic_sim"]) * 100.0 / (full_df["ic_meas"]))
+        comparison = Comparison(full_df, "ic_meas", "ic_sim", "ic_err")
         full_df.to_csv(f"{dev_path}/{dev}_full_merged_data.csv", index=False)
 
         # Calculate Q [quantile] to verify matching between measured and simulated data
         ## Refer to https://builtin.com/data-science/boxplot for more details.
-        q_target = full_df["ic_err"].quantile(QUANTILE_RATIO)
+        q_target = comparison.quantile(QUANTILE_RATIO)
         logging.info(f"Quantile target for {dev} device is: {q_target} %")
 
-        bad_err_full_df_loc = full_df[full_df["ic_err"] > PASS_THRESH]
-        bad_err_full_df = bad_err_full_df_loc[(bad_err_full_df_loc["ic_sim"] >= MAX_VAL_DETECT) | (bad_err_full_df_loc["ic_err"] >= MAX_VAL_DETECT)]
+        bad_err_full_df = comparison.bad_points(PASS_THRESH, ["ic_sim", "ic_err"], MAX_VAL_DETECT)
         bad_err_full_df.to_csv(f"{dev_path}/{dev}_ic_bad_err.csv", index=False)
         logging.info(f"Bad relative errors between measured and simulated data at {dev}_ic_bad_err.csv")
 
-        # calculating the relative error of each device and reporting it
-        min_error_total = float(full_df["ic_err"].min())
-        max_error_total = float(full_df["ic_err"].max())
-        mean_error_total = float(full_df["ic_err"].mean())
-
-        # Cliping relative error at 100%
-        min_error_total = 100 if min_error_total > 100 else min_error_total
-        max_error_total = 100 if max_error_total > 100 else max_error_total
-        mean_error_total = 100 if mean_error_total > 100 else mean_error_total
+        # calculating the relative error of each device and reporting it [clipped at 100%]
+        min_error_total = comparison.min_error
+        max_error_total = comparison.max_error
+        mean_error_total = comparison.mean_error
 
         # logging relative error
         logging.info(
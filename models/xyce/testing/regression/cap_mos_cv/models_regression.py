@@ -20,54 +20,42 @@ Usage:
   --num_cores=<num>      Number of cores to be used by simulator
 """
 
-from unittest.mock import DEFAULT
+from __future__ import annotations
+
 from docopt import docopt
-import pandas as pd
-import numpy as np
 import os
-from jinja2 import Template
-import concurrent.futures
 import shutil
-import multiprocessing as mp
 import logging
-import subprocess
 import glob
+import sys
 
+# Shared regression helpers live in models/gf180_regress
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".."))
+from gf180_regress.simulators import get_simulator  # noqa: E402
+from gf180_regress.xlsx_reader import read_excel  # noqa: E402
+from gf180_regress.lazy import lazy_import  # noqa: E402
 
-DEFAULT_TEMP = 25.0
-PASS_THRESH = 5.0
+# Heavy modules are imported on first use, so --help doesn't wait for them
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+futures = lazy_import("concurrent.futures")
+mp = lazy_import("multiprocessing")
 
+# Simulator backend shared by all points of this regression
+simulator = get_simulator("xyce")
 
-def check_xyce_version():
-    """
-    check_xyce_version checks ngspice version and makes sure it would work with the models.
-    """
-    # ======= Checking Xyce  =======
-    Xyce_v_ = os.popen("Xyce  -v 2> /dev/null").read()
-    if Xyce_v_ == "":
-        logging.error("Xyce is not found. Please make sure Xyce is installed.")
-        exit(1)
-    elif "7.5" not in Xyce_v_:
-        logging.error("Xyce version 7.5 is required.")
-        exit(1)
+
+DEFAULT_TEMP = 25.0
+PASS_THRESH = 5.0
 
 
 def find_moscap(filename):
     """
     Find moscap in log
     """
-    cmd = 'grep "CV" {} | head -n 1'.format(filename)
-    process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE)
-    return float(process.communicate()[0][:-1].decode("utf-8").split(" ")[2])
-
-
-def call_simulator(file_name):
-    """Call simulation commands to perform simulation.
-    Args:
-        file_name (str): Netlist file name.
-    """
-    log_file = file_name.replace("-hspice-ext all ", "")
-    os.system(f"Xyce {file_name} -l {log_file}.log 2> /dev/null")
+    with open(filename) as f:
+        line = next(line for line in f if "CV" in line)
+    return float(line.rstrip("\n").split(" ")[2])
 
 
 def ext_measured(dev_data_path: str, device: str) -> pd.DataFrame:
@@ -79,7 +67,7 @@ def ext_measured(dev_data_path: str, device: str) -> pd.DataFrame:
         df (pd.DataFrame): Dataframe containing extracted data
     """
     # Read Data
-    df = pd.read_excel(dev_data_path)
+    df = read_excel(dev_data_path)
 
     length = []
     width = []
@@ -193,24 +181,20 @@ def run_sim(
 
     netlist_path = f"{dirpath}/{device}_netlists/netlist_w{width_str}_l{length_str}_t{temp_str}_{corner}.spice"
 
-    with open(netlist_tmp) as f:
-        tmpl = Template(f.read())
-        os.makedirs(f"{dirpath}/{device}_netlists", exist_ok=True)
-
-        with open(netlist_path, "w") as netlist:
-            netlist.write(
-                tmpl.render(
-                    device=device,
-                    width=width_str,
-                    length=length_str,
-                    corner=corner,
-                    temp=temp_str,
-                )
-            )
+    os.makedirs(f"{dirpath}/{device}_netlists", exist_ok=True)
+    simulator.render(
+        netlist_tmp,
+        netlist_path,
+        device=device,
+        width=width_str,
+        length=length_str,
+        corner=corner,
+        temp=temp_str,
+    )
 
     # Running ngspice for each netlist
     try:
-        call_simulator(netlist_path)
+        simulator.run(netlist_path)
         # Find moscap in log
         try:
             moscap = find_moscap(f"{netlist_path}.log")
@@ -241,7 +225,7 @@ def run_sims(
     """
 
     results = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+    with futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
         futures_list = []
         for j, row in df.iterrows():
             futures_list.append(
@@ -256,7 +240,7 @@ def run_sims(
                 )
             )
 
-        for future in concurrent.futures.as_completed(futures_list):
+        for future in futures.as_completed(futures_list):
             try:
                 data = future.result()
                 results.append(data)
@@ -276,7 +260,8 @@ def main():
     """
 
     ## Check Xyce version
-    check_xyce_version()
+    if not simulator.check_version():
+        exit(1)
 
     # pandas setup
     pd.set_option("display.max_columns", None)
@@ -20,16 +20,30 @@ Usage:
   --num_cores=<num>      Number of cores to be used by simulator
 """
 
+from __future__ import annotations
+
 from docopt import docopt
-import pandas as pd
-import numpy as np
 import os
-from jinja2 import Template
-import concurrent.futures
 import shutil
-import multiprocessing as mp
 import logging
 import glob
+import sys
+
+# Shared regression helpers live in models/gf180_regress
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".."))
+from gf180_regress.simulators import get_simulator  # noqa: E402
+from gf180_regress.compare import Comparison, join_results  # noqa: E402
+from gf180_regress.xlsx_reader import read_excel  # noqa: E402
+from gf180_regress.lazy import lazy_import  # noqa: E402
+
+# Heavy modules are imported on first use, so --help doesn't wait for them
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+futures = lazy_import("concurrent.futures")
+mp = lazy_import("multiprocessing")
+
+# Simulator backend shared by all points of this regression
+simulator = get_simulator("xyce", ["-hspice-ext", "all"])
 
 
 DEFAULT_TEMP = 25.0
@@ -37,20 +51,6 @@ PASS_THRESH = 5.0
 MAX_VOLTAGE = 3.3
 
 
-def check_xyce_version():
-    """
-    check_xyce_version checks ngspice version and makes sure it would work with the models.
-    """
-    # ======= Checking Xyce  =======
-    Xyce_v_ = os.popen("Xyce  -v 2> /dev/null").read()
-    if Xyce_v_ == "":
-        logging.error("Xyce is not found. Please make sure Xyce is installed.")
-        exit(1)
-    elif "7.5" not in Xyce_v_:
-        logging.error("Xyce version 7.5 is required.")
-        exit(1)
-
-
 def find_diode(filepath):
     """
     Find diode in csv files
@@ -58,12 +58,20 @@ def find_diode(filepath):
     return os.path.exists(filepath)
 
 
-def call_simulator(file_name):
-    """Call simulation commands to perform simulation.
+def read_iv_simulated(result_path: str) -> pd.DataFrame:
+    """Read the currents written by Xyce for one variation
     Args:
-        file_name (str): Netlist file name.
+        result_path (str): simulated csv file path
+
+    Returns:
+        df: one row per point, with its index and diode_simulated columns
     """
-    os.system(f"Xyce -hspice-ext all {file_name} -l {file_name}.log 2> /dev/null")
+    sdf = pd.read_csv(result_path, header=None, delimiter=r"\s+")
+    # First line is the header written by Xyce
+    sdf = sdf.iloc[1:, [0]].reset_index(drop=True)
+    sdf.columns = ["diode_simulated"]
+    sdf["diode_simulated"] = pd.to_numeric(sdf["diode_simulated"], errors="coerce")
+    return sdf.rename_axis("point")
 
 
 def ext_iv_measured(
@@ -77,10 +85,10 @@ def ext_iv_measured(
         dev_path (str): device [path]
 
     Returns:
-        df: output dataframe
+        df: measured points of all variations, one row per point
     """
     # Read Data
-    df = pd.read_excel(dev_data_path)
+    df = read_excel(dev_data_path)
 
     dim_df = df[["L (um)", "W (um)"]].copy()
     dim_df.rename(
@@ -88,7 +96,8 @@ def ext_iv_measured(
         inplace=True,
     )
 
-    all_dfs = []
+    # Points of each variation, the last sheet column of a variation is kept
+    var_dfs = {}
 
     loops = dim_df["length"].count()
     for corner in corners:
@@ -106,12 +115,6 @@ def ext_iv_measured(
             else:
                 temp = 175
 
-            leng = []
-            wid = []
-            tempr = []
-            cor = []
-            meas = []
-
             if i == 0:
                 idf = df[["Vn1 (V)", f" |In1(A)| diode_{corner}"]].copy()
                 idf.rename(
@@ -134,30 +137,31 @@ def ext_iv_measured(
                 )
             meas_csv = f"measured_A{width}_P{length}_t{temp}_{corner}.csv"
 
+            # Written for plotting only, points are compared from memory
             os.makedirs(f"{dev_path}/measured_iv", exist_ok=True)
             idf.to_csv(f"{dev_path}/measured_iv/{meas_csv}")
 
-            leng.append(length)
-            wid.append(width)
-            tempr.append(temp)
-            cor.append(corner)
-            meas.append(f"{dev_path}/measured_iv/{meas_csv}")
-
-            sdf = {
-                "length": leng,
-                "width": wid,
-                "temp": tempr,
-                "corner": cor,
-                "diode_measured": meas,
-            }
-            sdf = pd.DataFrame(sdf)
-            all_dfs.append(sdf)
-
-    df = pd.concat(all_dfs)
-    df.dropna(axis=0, inplace=True)
-    df.drop_duplicates(inplace=True)
-    df["device"] = device
-    df = df[["device", "length", "width", "temp", "corner", "diode_measured"]]
+            if pd.isna(width) or pd.isna(length):
+                continue
+            var_dfs[(length, width, temp, corner)] = (
+                idf.rename_axis("point")
+                .reset_index()
+                .assign(device=device, length=length, width=width, temp=temp, corner=corner)
+            )
+
+    df = pd.concat(var_dfs.values(), ignore_index=True)
+    df = df[
+        [
+            "device",
+            "length",
+            "width",
+            "temp",
+            "corner",
+            "point",
+            "measured_volt",
+            "diode_measured",
+        ]
+    ]
 
     return df
 
@@ -202,26 +206,22 @@ def run_sim(
     netlist_path = f"{dirpath}/{device}_netlists_{char}/{net_sp}"
     result_path = f"{dirpath}/simulated_{char}/{res_csv}"
 
-    with open(netlist_tmp) as f:
-        tmpl = Template(f.read())
-        os.makedirs(f"{dirpath}/{device}_netlists_{char}", exist_ok=True)
-        os.makedirs(f"{dirpath}/simulated_{char}", exist_ok=True)
-
-        with open(netlist_path, "w") as netlist:
-            netlist.write(
-                tmpl.render(
-                    device=device,
-                    area=width_str,
-                    pj=length_str,
-                    Id_sim=char,
-                    corner=corner,
-                    temp=temp_str,
-                )
-            )
+    os.makedirs(f"{dirpath}/{device}_netlists_{char}", exist_ok=True)
+    os.makedirs(f"{dirpath}/simulated_{char}", exist_ok=True)
+    simulator.render(
+        netlist_tmp,
+        netlist_path,
+        device=device,
+        area=width_str,
+        pj=length_str,
+        Id_sim=char,
+        corner=corner,
+        temp=temp_str,
+    )
 
     # Running ngspice for each netlist
     try:
-        call_simulator(netlist_path)
+        simulator.run(netlist_path)
         # Find diode in csv
         if find_diode(result_path):
             diode_simu = result_path
@@ -232,6 +232,13 @@ def run_sim(
 
     info["diode_sim_unscaled"] = diode_simu
 
+    # Output is read once here, and written back in clean format for plotting
+    info["points"] = None
+    if diode_simu != "None":
+        sdf = read_iv_simulated(result_path)
+        sdf.to_csv(result_path, index=True)
+        info["points"] = sdf.reset_index()
+
     return info
 
 
@@ -246,10 +253,10 @@ def run_sims(
         num_workers (_type_, optional): num of cores. Defaults to mp.cpu_count().
 
     Returns:
-        pd.DataFrame: simulation df output
+        pd.DataFrame: simulated points of all variations, one row per point
     """
     results = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+    with futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
         futures_list = []
         for j, row in df.iterrows():
             futures_list.append(
@@ -265,35 +272,23 @@ def run_sims(
                 )
             )
 
-        for future in concurrent.futures.as_completed(futures_list):
+        for future in futures.as_completed(futures_list):
             try:
                 data = future.result()
                 results.append(data)
             except Exception as exc:
                 logging.info("Test case generated an exception: %s" % (exc))
 
-    sf = glob.glob(f"{dirpath}/simulated_{char}/*.csv")  # stored simulated data files
-    for i in range(len(sf)):
-        sdf = pd.read_csv(
-            sf[i],
-            header=None,
-            delimiter=r"\s+",
-        )
-        sdf.drop(index=0, inplace=True)
-        sdf.rename(
-            columns={0: "diode_simulated"},
-            inplace=True,
-        )
-        sdf.to_csv(sf[i], index=False)
-        sdf = pd.read_csv(sf[i])
-        sdf.to_csv(sf[i], index=True)
-
-    df = pd.DataFrame(results)
-
-    df = df[["device", "length", "width", "temp", "corner", "diode_sim_unscaled"]]
-    df["diode_sim"] = df["diode_sim_unscaled"]
+    var_cols = ["device", "length", "width", "temp", "corner"]
+    sim_points = [
+        data["points"].assign(**{col: data[col] for col in var_cols})
+        for data in results
+        if data["points"] is not None
+    ]
+    if not sim_points:
+        return pd.DataFrame(columns=var_cols + ["point", "diode_simulated"])
 
-    return df
+    return pd.concat(sim_points, ignore_index=True)[var_cols + ["point", "diode_simulated"]]
 
 
 def main():
@@ -302,7 +297,8 @@ def main():
     """
 
     ## Check Xyce version
-    check_xyce_version()
+    if not simulator.check_version():
+        exit(1)
 
     # pandas setup
     pd.set_option("display.max_columns", None)
@@ -360,100 +356,42 @@ def main():
                 continue
             f = ext_iv_measured
 
-            if diode_file != "":
-                meas_df = f(diode_file, dev, corners, dev_path)
-            else:
-                meas_df = []
-
-            meas_len = len(pd.read_csv(glob.glob(f"{dev_path}/measured_{c}/*.csv")[1]))
+            meas_df = f(diode_file, dev, corners, dev_path)
 
             logging.info(
-                f"# Device {dev} number of {c}_measured_datapoints : {len(meas_df) * meas_len}"
+                f"# Device {dev} number of {c}_measured_datapoints : {len(meas_df)}"
             )
 
-            sim_df = run_sims(c, meas_df, dev_path, 3)
-            sim_len = len(pd.read_csv(glob.glob(f"{dev_path}/simulated_{c}/*.csv")[1]))
+            var_cols = ["device", "corner", "length", "width", "temp"]
+            var_df = meas_df[["device", "length", "width", "temp", "corner"]].drop_duplicates()
+            sim_df = run_sims(c, var_df, dev_path, 3)
             logging.info(
-                f"# Device {dev} number of {c}_simulated datapoints : {len(sim_df) * sim_len}"
+                f"# Device {dev} number of {c}_simulated datapoints : {len(sim_df)}"
             )
 
             # compare section
 
-            merged_df = meas_df.merge(
-                sim_df, on=["device", "corner", "length", "width", "temp"], how="left"
+            # Comparing all points of the device in one pass, keyed on variation and point index
+            full_df = join_results(meas_df, sim_df, var_cols + ["point"])
+            # Error keeps the sign of the measured current, as reported before
+            comparison = Comparison(
+                full_df, "diode_measured", "diode_simulated", "error", signed=True
             )
-            merged_dfs = []
-            # create a new dataframe for rms error
-            rms_df = pd.DataFrame(
-                columns=["device", "corner", "length", "width", "temp", "rms_error"]
-            )
-
-            for i in range(len(merged_df)):
-                measured_data = pd.read_csv(merged_df["diode_measured"][i])
-                simulated_data = pd.read_csv(merged_df["diode_sim"][i])
-                simulated_data
-                result_data = simulated_data.merge(measured_data, how="left")
-                result_data["corner"] = (
-                    merged_df["diode_measured"][i]
-                    .split("/")[-1]
-                    .split("_")[-1]
-                    .split(".")[0]
-                )
-                result_data["device"] = merged_df["diode_measured"][i].split("/")[1]
-                result_data["length"] = (
-                    merged_df["diode_measured"][i]
-                    .split("/")[-1]
-                    .split("_")[1]
-                    .split("A")[1]
-                )
-                result_data["width"] = (
-                    merged_df["diode_measured"][i]
-                    .split("/")[-1]
-                    .split("_")[2]
-                    .split("P")[1]
-                )
-                result_data["temp"] = (
-                    merged_df["diode_measured"][i]
-                    .split("/")[-1]
-                    .split("_")[3]
-                    .split("t")[1]
-                )
-
-                result_data["error"] = (
-                    np.abs(
-                        result_data["diode_simulated"] - result_data["diode_measured"]
-                    )
-                    * 100.0
-                    / result_data["diode_measured"]
-                )
-                # get rms error
-                result_data["rms_error"] = np.sqrt(np.mean(result_data["error"] ** 2))
-                # fill rms dataframe
-                rms_df.loc[i] = [
-                    result_data["device"][0],
-                    result_data["corner"][0],
-                    result_data["length"][0],
-                    result_data["width"][0],
-                    result_data["temp"][0],
-                    result_data["rms_error"][0],
-                ]
-                result_data = result_data[
-                    [
-                        "device",
-                        "length",
-                        "width",
-                        "temp",
-                        "corner",
-                        "measured_volt",
-                        "diode_measured",
-                        "diode_simulated",
-                        "error",
-                    ]
+            rms_df = comparison.group_rms(var_cols)
+
+            merged_out = full_df[
+                [
+                    "device",
+                    "length",
+                    "width",
+                    "temp",
+                    "corner",
+                    "measured_volt",
+                    "diode_measured",
+                    "diode_simulated",
+                    "error",
                 ]
-
-                merged_dfs.append(result_data)
-
-            merged_out = pd.concat(merged_dfs)
+            ]
 
             merged_out.to_csv(f"{dev_path}/error_analysis_{c}.csv", index=False)
             rms_df.to_csv(f"{dev_path}/final_error_analysis_{c}.csv", index=False)
@@ -20,18 +20,30 @@ Usage:
   --num_cores=<num>      Number of cores to be used by simulator
 """
 
+from __future__ import annotations
+
 from docopt import docopt
-import pandas as pd
-import numpy as np
 import os
-from jinja2 import Template
-import concurrent.futures
 import shutil
-import multiprocessing as mp
 import glob
 import logging
+import sys
+
+# Shared regression helpers live in models/gf180_regress
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".."))
+from gf180_regress.simulators import get_simulator  # noqa: E402
+from gf180_regress.xlsx_reader import read_excel  # noqa: E402
+from gf180_regress.lazy import lazy_import  # noqa: E402
+
+# Heavy modules are imported on first use, so --help doesn't wait for them
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+futures = lazy_import("concurrent.futures")
+mp = lazy_import("multiprocessing")
+
+# Simulator backend shared by all points of this regression
+simulator = get_simulator("xyce")
 
-pd.options.mode.chained_assignment = None  # default='warn'
 # constants
 PASS_THRESH = 5.0
 
@@ -70,20 +82,6 @@ VDS_P06V0D = "0 -6 -0.1"
 VDS_N06V0_ND = "0 6 0.1"
 
 
-def check_xyce_version():
-    """
-    check_xyce_version checks ngspice version and makes sure it would work with the models.
-    """
-    # ======= Checking Xyce  =======
-    Xyce_v_ = os.popen("Xyce  -v 2> /dev/null").read()
-    if Xyce_v_ == "":
-        logging.error("Xyce is not found. Please make sure Xyce is installed.")
-        exit(1)
-    elif "7.5" not in Xyce_v_:
-        logging.error("Xyce version 7.5 is required.")
-        exit(1)
-
-
 def ext_measured(dev_data_path: str, device: str) -> pd.DataFrame:
     """Extracting the measured data of  devices from excel sheet
 
@@ -97,7 +95,7 @@ def ext_measured(dev_data_path: str, device: str) -> pd.DataFrame:
     """
 
     # Read Data
-    read_file = pd.read_excel(dev_data_path)
+    read_file = read_excel(dev_data_path)
     read_file.to_csv(f"mos_cv_regr/{device}/{device}.csv", index=False, header=True)
 
     df = pd.read_csv(f"mos_cv_regr/{device}/{device}.csv")
@@ -326,15 +324,6 @@ def ext_measured(dev_data_path: str, device: str) -> pd.DataFrame:
     return dfs1, dfs2, dfs3
 
 
-def call_simulator(file_name):
-    """Call simulation commands to perform simulation.
-    Args:
-        file_name (str): Netlist file name.
-    """
-    log_file = file_name.replace("-hspice-ext all ", "")
-    os.system(f"Xyce {file_name} -l {log_file}.log 2> /dev/null")
-
-
 def run_sim(dirpath: str, device: str, width: float, length: float, nf: float) -> dict:
     """Run simulation at specific information and corner
     Args:
@@ -398,29 +387,26 @@ def run_sim(dirpath: str, device: str, width: float, length: float, nf: float) -
         netlist_path = f"{dirpath}/{device}_netlists_Cg{cap}/{s}"
         s = f"simulated_W{width_str}_L{length_str}.csv"
         result_path = f"{dirpath}/{device}_netlists_Cg{cap}/{s}"
-        with open(netlist_tmp) as f:
-            tmpl = Template(f.read())
-            os.makedirs(f"{dirpath}/{device}_netlists_Cg{cap}", exist_ok=True)
-            with open(netlist_path, "w") as netlist:
-                netlist.write(
-                    tmpl.render(
-                        width=width_str,
-                        length=length_str,
-                        nf=nf_str,
-                        vgs=vgs,
-                        vds=vds,
-                        vbs=vbs,
-                        device=device,
-                        AD=float(width_str) * 0.24,
-                        PD=2 * (float(width_str) + 0.24),
-                        AS=float(width_str) * 0.24,
-                        PS=2 * (float(width_str) + 0.24),
-                    )
-                )
+        os.makedirs(f"{dirpath}/{device}_netlists_Cg{cap}", exist_ok=True)
+        simulator.render(
+            netlist_tmp,
+            netlist_path,
+            width=width_str,
+            length=length_str,
+            nf=nf_str,
+            vgs=vgs,
+            vds=vds,
+            vbs=vbs,
+            device=device,
+            AD=float(width_str) * 0.24,
+            PD=2 * (float(width_str) + 0.24),
+            AS=float(width_str) * 0.24,
+            PS=2 * (float(width_str) + 0.24),
+        )
 
         # Running ngspice for each netlist
         try:
-            call_simulator(netlist_path)
+            simulator.run(netlist_path)
 
             if os.path.exists(result_path):
                 mos_iv = result_path
@@ -454,7 +440,7 @@ def run_sims(
     results = []
     df["nf"] = 1
     df["nf"][0] = 20
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+    with futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
         futures_list = []
         for j, row in df.iterrows():
             futures_list.append(
@@ -463,7 +449,7 @@ def run_sims(
                 )
             )
 
-        for future in concurrent.futures.as_completed(futures_list):
+        for future in futures.as_completed(futures_list):
             try:
                 data = future.result()
                 results.append(data)
@@ -810,9 +796,11 @@ def main():
     """
 
     ## Check Xyce version
-    check_xyce_version()
+    if not simulator.check_version():
+        exit(1)
 
     # pandas setup
+    pd.options.mode.chained_assignment = None  # default='warn'
     pd.set_option("display.max_columns", None)
     pd.set_option("display.max_rows", None)
     pd.set_option("max_colwidth", None)
@@ -20,18 +20,29 @@ Usage:
   --num_cores=<num>      Number of cores to be used by simulator
 """
 
-from unittest.mock import DEFAULT
+from __future__ import annotations
+
 from docopt import docopt
-import pandas as pd
-import numpy as np
 import os
-from jinja2 import Template
-import concurrent.futures
 import shutil
-import multiprocessing as mp
 import logging
-import subprocess
 import glob
+import sys
+
+# Shared regression helpers live in models/gf180_regress
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".."))
+from gf180_regress.simulators import get_simulator  # noqa: E402
+from gf180_regress.xlsx_reader import read_excel  # noqa: E402
+from gf180_regress.lazy import lazy_import  # noqa: E402
+
+# Heavy modules are imported on first use, so --help doesn't wait for them
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+futures = lazy_import("concurrent.futures")
+mp = lazy_import("multiprocessing")
+
+# Simulator backend shared by all points of this regression
+simulator = get_simulator("xyce")
 
 
 PASS_THRESH = 5.0
@@ -39,44 +50,23 @@ DEFAULT_TEMP = 25.0
 DEFAULT_VOLTAGE = 1.0
 
 
-def check_xyce_version():
-    """
-    check_xyce_version checks ngspice version and makes sure it would work with the models.
-    """
-    # ======= Checking Xyce  =======
-    Xyce_v_ = os.popen("Xyce  -v 2> /dev/null").read()
-    if Xyce_v_ == "":
-        logging.error("Xyce is not found. Please make sure Xyce is installed.")
-        exit(1)
-    elif "7.5" not in Xyce_v_:
-        logging.error("Xyce version 7.5 is required.")
-        exit(1)
-
-
 def find_res(filename):
     """
     Find res in log
     """
-    cmd = 'grep " R  " {} | tail -n 1'.format(filename)
-    process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE)
-    x = process.communicate()[0][:-1].decode("utf-8")
+    with open(filename) as f:
+        # keep the last matching line
+        for line in f:
+            if " R  " in line:
+                x = line
     # split the line into a list
-    x = x.split(" ")
+    x = x.rstrip("\n").split(" ")
     # remove empty strings
     x = list(filter(None, x))
     # return the 1rd element
     return float(x[1])
 
 
-def call_simulator(file_name):
-    """Call simulation commands to perform simulation.
-    Args:
-        file_name (str): Netlist file name.
-    """
-    log_file = file_name.replace("-hspice-ext all ", "")
-    os.system(f"Xyce {file_name} -l {log_file}.log 2> /dev/null")
-
-
 def ext_const_temp_corners(
     dev_data_path: str, device: str, corners: str
 ) -> pd.DataFrame:
@@ -89,7 +79,7 @@ def ext_const_temp_corners(
         pd.DataFrame: Dataframe with extracted data.
     """
     # Read Data
-    df = pd.read_excel(dev_data_path)
+    df = read_excel(dev_data_path)
 
     all_dfs = []
     for corner in corners:
@@ -125,7 +115,7 @@ def ext_temp_corners(dev_data_path: str, device: str, corners: str) -> pd.DataFr
         pd.DataFrame: Dataframe with extracted data.
     """
     # Read Data
-    df = pd.read_excel(dev_data_path)
+    df = read_excel(dev_data_path)
 
     all_dfs = []
     for corner in corners:
@@ -197,26 +187,22 @@ def run_sim(
 
     netlist_path = f"{dirpath}/{device}_netlists/netlist_w{width_str}_l{length_str}_t{temp_str}_{corner}.spice"
 
-    with open(netlist_tmp) as f:
-        tmpl = Template(f.read())
-        os.makedirs(f"{dirpath}/{device}_netlists", exist_ok=True)
-
-        with open(netlist_path, "w") as netlist:
-            netlist.write(
-                tmpl.render(
-                    device=device,
-                    width=width_str,
-                    length=length_str,
-                    corner=corner,
-                    terminals=terminals,
-                    temp=temp_str,
-                    voltage=voltage_str,
-                )
-            )
+    os.makedirs(f"{dirpath}/{device}_netlists", exist_ok=True)
+    simulator.render(
+        netlist_tmp,
+        netlist_path,
+        device=device,
+        width=width_str,
+        length=length_str,
+        corner=corner,
+        terminals=terminals,
+        temp=temp_str,
+        voltage=voltage_str,
+    )
 
     # Running xyce for each netlist
     try:
-        call_simulator(netlist_path)
+        simulator.run(netlist_path)
         # Find res in log
         try:
             res = find_res(f"{netlist_path}.log")
@@ -243,7 +229,7 @@ def run_sims(
     """
 
     results = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+    with futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
         futures_list = []
         for j, row in df.iterrows():
             futures_list.append(
@@ -259,7 +245,7 @@ def run_sims(
                 )
             )
 
-        for future in concurrent.futures.as_completed(futures_list):
+        for future in futures.as_completed(futures_list):
             try:
                 data = future.result()
                 results.append(data)
@@ -280,7 +266,8 @@ def main(num_cores: int):
     """
 
     ## Check Xyce version
-    check_xyce_version()
+    if not simulator.check_version():
+        exit(1)
 
     # pandas setup
     pd.set_option("display.max_columns", None)